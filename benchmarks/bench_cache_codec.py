@@ -0,0 +1,125 @@
+"""
+Micro-benchmark cache payload codecs on realistic market analysis dicts.
+
+Reports encode/decode time (µs per payload) and stored bytes for the
+legacy JSON+zlib path and every PayloadCodec combination installed.
+
+Usage:
+    python benchmarks/bench_cache_codec.py --iterations 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cache.codec import PayloadCodec, available_codecs  # noqa: E402
+
+
+def make_analysis(rng: random.Random, n_comps: int) -> dict:
+    """Build a market analysis payload shaped like PipelineCoordinator output."""
+    return {
+        'zip_code': f"{rng.randint(10000, 99999)}",
+        'analysis_type': 'market_prediction',
+        'timestamp': '2024-05-01T12:00:00',
+        'metrics': {
+            'price': {
+                'median_price': rng.uniform(2e5, 2e6),
+                'average_price': rng.uniform(2e5, 2e6),
+                'price_range': {'min': rng.uniform(5e4, 2e5), 'max': rng.uniform(2e6, 5e6)}
+            },
+            'inventory': {
+                'active_listings': rng.randint(10, 900),
+                'pending_listings': rng.randint(0, 300),
+                'days_on_market': rng.uniform(5, 120)
+            },
+            'trends': {
+                'price_trend': [rng.uniform(-0.05, 0.05) for _ in range(36)],
+                'inventory_trend': [rng.uniform(-0.1, 0.1) for _ in range(36)],
+                'dom_trend': [rng.uniform(5, 120) for _ in range(36)]
+            }
+        },
+        'comparables': [
+            {
+                'address': f"{rng.randint(1, 9999)} Main St",
+                'price': rng.randint(100000, 3000000),
+                'sqft': rng.randint(600, 6000),
+                'beds': rng.randint(1, 6),
+                'baths': rng.choice([1, 1.5, 2, 2.5, 3]),
+                'distance': rng.uniform(0, 2),
+                'similarity_score': rng.random()
+            }
+            for _ in range(n_comps)
+        ],
+        'confidence': rng.random()
+    }
+
+
+def legacy_encode(data, threshold=1024):
+    data_bytes = json.dumps(data, separators=(',', ':')).encode()
+    if len(data_bytes) > threshold:
+        return zlib.compress(data_bytes)
+    return data_bytes
+
+
+def legacy_decode(data):
+    try:
+        decompressed = zlib.decompress(data).decode()
+    except zlib.error:
+        decompressed = data.decode()
+    return json.loads(decompressed)
+
+
+def bench(encode, decode, payloads, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        encoded = encode(payloads[i % len(payloads)])
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    blobs = [encode(p) for p in payloads]
+    start = time.perf_counter()
+    for i in range(iterations):
+        decode(blobs[i % len(blobs)])
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return encode_us, decode_us, sum(len(b) for b in blobs) / len(blobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--payloads', type=int, default=50)
+    parser.add_argument('--threshold', type=int, default=1024)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    available = available_codecs()
+
+    for label, n_comps in (('small', 0), ('medium', 10), ('large', 200)):
+        payloads = [make_analysis(rng, n_comps) for _ in range(args.payloads)]
+        raw_size = sum(len(json.dumps(p)) for p in payloads) / len(payloads)
+        print(f"\n{label} payloads (~{raw_size:,.0f} bytes JSON)")
+        print(f"{'codec':<16} {'encode µs':>10} {'decode µs':>10} {'bytes':>10}")
+
+        rows = [('legacy', legacy_encode, legacy_decode)]
+        for serializer in ('json', 'msgpack'):
+            if not available[serializer]:
+                continue
+            for compressor in ('none', 'zlib', 'zstd', 'lz4'):
+                if compressor != 'none' and not available[compressor]:
+                    continue
+                codec = PayloadCodec(args.threshold, compressor=compressor, serializer=serializer)
+                rows.append((codec.name, codec.encode, codec.decode))
+
+        for name, encode, decode in rows:
+            enc, dec, size = bench(encode, decode, payloads, args.iterations)
+            print(f"{name:<16} {enc:>10.1f} {dec:>10.1f} {size:>10,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark MarketCache eviction: legacy KEYS scan vs indexed LRU batches.
+
+Populates a Redis database with N cache keys, then frees ~10% of them
+with each strategy while a probe thread PINGs Redis to measure how long
+the server is blocked.
+
+Usage:
+    python benchmarks/bench_cache_eviction.py --redis-url redis://localhost:6379/15 --keys 1000000
+
+WARNING: the target database is flushed before each run.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import redis
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cache.eviction import CacheEvictor  # noqa: E402
+
+
+class PingProbe(threading.Thread):
+    """Measure Redis responsiveness while eviction runs."""
+
+    def __init__(self, url: str):
+        super().__init__(daemon=True)
+        self.client = redis.Redis.from_url(url)
+        self.samples = []
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            start = time.perf_counter()
+            self.client.ping()
+            self.samples.append(time.perf_counter() - start)
+            time.sleep(0.001)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return max(self.samples) if self.samples else 0.0
+
+
+def populate(client: redis.Redis, evictor: CacheEvictor, n: int, value_size: int, indexed: bool):
+    client.flushdb()
+    value = b'x' * value_size
+    chunk = 10000
+    for start in range(0, n, chunk):
+        pipe = client.pipeline(transaction=False)
+        now = time.time()
+        for i in range(start, min(start + chunk, n)):
+            key = f"ma:{i:07d}:price_trends:{i:016x}"
+            pipe.set(key, value)
+            if indexed:
+                evictor._write(args=['ma', key, value_size, now + i * 1e-6], client=pipe)
+        pipe.execute()
+
+
+def run_legacy(url: str, client: redis.Redis) -> dict:
+    probe = PingProbe(url)
+    probe.start()
+    start = time.perf_counter()
+    keys = client.keys('*')
+    keys_to_remove = keys[:max(1, len(keys) // 10)]
+    client.delete(*keys_to_remove)
+    elapsed = time.perf_counter() - start
+    return {'evicted': len(keys_to_remove), 'total_s': elapsed, 'max_ping_s': probe.stop()}
+
+
+def run_indexed(url: str, evictor: CacheEvictor, n: int, value_size: int) -> dict:
+    probe = PingProbe(url)
+    probe.start()
+    start = time.perf_counter()
+    evicted, _ = evictor.evict_prefix('ma', (n // 10) * value_size)
+    elapsed = time.perf_counter() - start
+    return {
+        'evicted': evicted,
+        'total_s': elapsed,
+        'max_batch_s': evictor.stats['max_batch_seconds'],
+        'max_ping_s': probe.stop()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--redis-url', default='redis://localhost:6379/15')
+    parser.add_argument('--keys', type=int, default=1_000_000)
+    parser.add_argument('--value-size', type=int, default=256)
+    parser.add_argument('--batch-size', type=int, default=200)
+    args = parser.parse_args()
+
+    client = redis.Redis.from_url(args.redis_url)
+    evictor = CacheEvictor(client, {'batch_size': args.batch_size, 'max_batches': 10 ** 9})
+
+    print(f"Populating {args.keys:,} keys (legacy)...")
+    populate(client, evictor, args.keys, args.value_size, indexed=False)
+    legacy = run_legacy(args.redis_url, client)
+
+    print(f"Populating {args.keys:,} keys (indexed)...")
+    populate(client, evictor, args.keys, args.value_size, indexed=True)
+    indexed = run_indexed(args.redis_url, evictor, args.keys, args.value_size)
+    client.flushdb()
+
+    print(f"\n{'strategy':<10} {'evicted':>10} {'total (s)':>10} {'max block (ms)':>15}")
+    print(f"{'legacy':<10} {legacy['evicted']:>10,} {legacy['total_s']:>10.3f} {legacy['max_ping_s'] * 1000:>15.1f}")
+    print(f"{'indexed':<10} {indexed['evicted']:>10,} {indexed['total_s']:>10.3f} {indexed['max_ping_s'] * 1000:>15.1f}")
+    print(f"\nLongest indexed batch: {indexed['max_batch_s'] * 1000:.2f}ms ({args.batch_size} keys)")
+
+
+if __name__ == '__main__':
+    main()
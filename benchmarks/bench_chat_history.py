@@ -0,0 +1,111 @@
+"""
+Benchmark chat history logging: whole-file JSON rewrite per message vs the
+bounded store with batched JSONL appends.
+
+legacy  - the previous chat_history module: log_chat adds to an unbounded
+          dict and json.dumps all of it after every message;
+          get_chat_history sorts every entry. Run on --baseline-entries and
+          extrapolated, since each call costs more as the log grows.
+new     - ChatHistoryStore for --entries messages across --users users,
+          closed at the end so every message is on disk.
+
+Usage:
+    python benchmarks/bench_chat_history.py --entries 100000 --baseline-entries 500
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.chat_history import ChatHistoryStore  # noqa: E402
+
+RESULT = {"type": "investment_analysis", "zip": "30318", "confidence_score": 85,
+          "summary": "Stable appreciation with moderate rental demand."}
+
+
+class LegacyChatLog:
+    """The pre-store log_chat/get_chat_history path."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.session_log = {}
+
+    def log_chat(self, query, result, user_id=None):
+        chat_id = str(uuid.uuid4())[:8]
+        self.session_log[chat_id] = {"timestamp": datetime.now().isoformat(), "query": query,
+                                     "result": result, "result_type": result.get("type", "unknown"),
+                                     "user_id": user_id}
+        with open(self.file_path, 'w') as f:
+            json.dump(self.session_log, f, indent=2)
+        return chat_id
+
+    def get_chat_history(self, user_id=None, limit=20):
+        logs = {cid: log for cid, log in self.session_log.items() if log.get("user_id") == user_id}
+        ordered = sorted(logs.items(), key=lambda x: x[1]["timestamp"], reverse=True)
+        return [{"id": cid, "query": log["query"], "timestamp": log["timestamp"],
+                 "result_type": log.get("result_type", "unknown")} for cid, log in ordered[:limit]]
+
+
+def time_history_reads(get_history, users, repeats=200):
+    start = time.perf_counter()
+    for i in range(repeats):
+        get_history(users[i % len(users)])
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100_000)
+    parser.add_argument('--baseline-entries', type=int, default=500,
+                        help='Messages to run through the legacy path (extrapolated)')
+    parser.add_argument('--users', type=int, default=100)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    users = [f"user-{i}" for i in range(args.users)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ChatHistoryStore(os.path.join(tmp, 'history.jsonl'), max_entries=args.entries,
+                                 max_per_user=args.entries)
+        start = time.perf_counter()
+        for i in range(args.entries):
+            store.add(f"What is the outlook for ZIP {30000 + i % 500}?", RESULT, user_id=users[i % args.users])
+        log_time = time.perf_counter() - start
+        close_start = time.perf_counter()
+        store.close()
+        close_time = time.perf_counter() - close_start
+        read_time = time_history_reads(lambda user: store.latest(user, 20), users)
+        file_mb = os.path.getsize(store.file_path) / 1e6
+
+        print(f"{args.entries} messages, {args.users} users")
+        print(f"  {'new: log_chat':<30}: {log_time:8.2f} s  ({args.entries / log_time:9.0f} msgs/s, "
+              f"{log_time / args.entries * 1e6:6.1f} us/msg)")
+        print(f"  {'new: final flush':<30}: {close_time:8.2f} s  ({file_mb:.1f} MB JSONL)")
+        print(f"  {'new: get_chat_history(20)':<30}: {read_time * 1e6:8.1f} us")
+
+        legacy = LegacyChatLog(os.path.join(tmp, 'chat_history.json'))
+        start = time.perf_counter()
+        for i in range(args.baseline_entries):
+            legacy.log_chat(f"What is the outlook for ZIP {30000 + i % 500}?", RESULT, user_id=users[i % args.users])
+        legacy_time = time.perf_counter() - start
+        legacy_read = time_history_reads(lambda user: legacy.get_chat_history(user, 20), users, repeats=20)
+
+        # Each call rewrites the whole log, so total time grows with the square of the count
+        estimate = legacy_time * (args.entries / args.baseline_entries) ** 2
+        print(f"  {'legacy (' + str(args.baseline_entries) + ' msgs)':<30}: {legacy_time:8.2f} s  "
+              f"({legacy_time / args.baseline_entries * 1000:6.2f} ms/msg average)")
+        print(f"  {'legacy estimate (' + str(args.entries) + ')':<30}: {estimate:8.0f} s  (quadratic extrapolation)")
+        print(f"  {'legacy get_chat_history(20)':<30}: {legacy_read * 1e6:8.1f} us  "
+              f"(at {args.baseline_entries} entries)")
+        print(f"  {'log_chat speedup (estimate)':<30}: {estimate / (log_time + close_time):8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark CMA comparable search: full-scan per target vs the shared spatial index.
+
+Builds a synthetic metro-wide comps dataset (500k properties by default)
+and times three paths:
+  legacy  - per target: haversine against every row, then a freshly fitted
+            NearestNeighbors (the pre-index implementation, distance units
+            corrected so it finds the same comps), on a sample of targets
+  single  - CMAAnalyzer.generate_cma per target over the cached CompsIndex
+  batch   - CMAAnalyzer.generate_cma_batch over all targets
+
+Usage:
+    python benchmarks/bench_cma.py --properties 500000 --targets 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.cma_analyzer import CMAAnalyzer  # noqa: E402
+from src.analysis.comps_index import EARTH_RADIUS_MILES  # noqa: E402
+
+
+def make_properties(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Properties scattered over a ~70 mile wide metro."""
+    return pd.DataFrame({
+        'latitude': 33.75 + rng.normal(0, 0.5, n),
+        'longitude': -84.39 + rng.normal(0, 0.5, n),
+        'sqft': rng.integers(800, 4000, n),
+        'beds': rng.integers(1, 6, n),
+        'baths': rng.integers(1, 4, n),
+        'lot_size': rng.integers(2000, 20000, n),
+        'age': rng.integers(0, 80, n),
+        'condition': rng.integers(1, 6, n),
+        'price': rng.integers(150000, 900000, n)
+    })
+
+
+def make_market_data(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    return pd.DataFrame({
+        'period': rng.choice(pd.date_range('2024-01-01', periods=12, freq='MS'), n),
+        'days_on_market': rng.integers(5, 120, n),
+        'status': rng.choice(['active', 'sold'], n),
+        'price': rng.integers(150000, 900000, n)
+    })
+
+
+def make_targets(properties: pd.DataFrame, n: int, rng: np.random.Generator):
+    targets = []
+    for i in rng.choice(len(properties), n, replace=False):
+        target = properties.iloc[i].drop('price').to_dict()
+        target['latitude'] += 0.001
+        target['list_price'] = 400000
+        targets.append(target)
+    return targets
+
+
+def legacy_find_comparables(analyzer, target, properties, radius_miles, max_comps):
+    """Pre-index comps search: full-table distance scan and a per-target model fit."""
+    lat, lon = target['latitude'], target['longitude']
+    distance = np.arccos(np.clip(
+        np.sin(np.deg2rad(lat)) * np.sin(np.deg2rad(properties['latitude'])) +
+        np.cos(np.deg2rad(lat)) * np.cos(np.deg2rad(properties['latitude'])) *
+        np.cos(np.deg2rad(properties['longitude'] - lon)), -1, 1
+    )) * EARTH_RADIUS_MILES
+    nearby = properties[distance <= radius_miles].copy()
+    nearby['distance'] = distance[distance <= radius_miles]
+    if len(nearby) == 0:
+        return pd.DataFrame()
+
+    features = analyzer._prepare_comparison_features(nearby, target)
+    nbrs = NearestNeighbors(n_neighbors=min(max_comps, len(nearby))).fit(features)
+    distances, indices = nbrs.kneighbors(analyzer._prepare_comparison_features(pd.DataFrame([target]), target))
+    comps = nearby.iloc[indices[0]].copy()
+    comps['similarity_score'] = 1 - (distances[0] / distances[0].max())
+    return comps
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def report(label, seconds, n):
+    print(f"  {label:<28}: {seconds:8.2f} s  ({n / seconds:9.0f} targets/s, {seconds / n * 1000:7.3f} ms/target)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--properties', type=int, default=500_000)
+    parser.add_argument('--targets', type=int, default=10_000)
+    parser.add_argument('--baseline-targets', type=int, default=200,
+                        help='Targets to run through the legacy path (extrapolated)')
+    parser.add_argument('--radius', type=float, default=1.0)
+    parser.add_argument('--max-comps', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    properties = make_properties(args.properties, rng)
+    market_data = make_market_data(5000, rng)
+    targets = make_targets(properties, args.targets, rng)
+    sample = targets[:args.baseline_targets]
+    analyzer = CMAAnalyzer()
+
+    print(f"{args.properties} properties, {args.targets} targets, radius {args.radius} mi")
+
+    _, build = timed(lambda: analyzer.get_comps_index(properties))
+    print(f"  {'index build':<28}: {build:8.2f} s")
+
+    # Comps search only
+    legacy, legacy_time = timed(lambda: [
+        legacy_find_comparables(analyzer, t, properties, args.radius, args.max_comps) for t in sample
+    ])
+    indexed, indexed_time = timed(lambda: [
+        analyzer._find_comparables(t, properties, args.radius, args.max_comps) for t in sample
+    ])
+    same = sum(
+        1 for a, b in zip(legacy, indexed)
+        if a.index.tolist() == b.index.tolist()
+    )
+    print(f"\ncomps search ({len(sample)} target sample, {same}/{len(sample)} identical comp sets)")
+    report('legacy full scan', legacy_time, len(sample))
+    report('indexed', indexed_time, len(sample))
+    print(f"  {'speedup':<28}: {legacy_time / indexed_time:8.1f}x")
+
+    # Full CMA reports
+    print("\nfull CMA reports")
+    _, single_time = timed(lambda: [
+        analyzer.generate_cma(t, properties, market_data, args.radius, args.max_comps) for t in sample
+    ])
+    report(f'generate_cma ({len(sample)})', single_time, len(sample))
+    _, batch_time = timed(lambda: analyzer.generate_cma_batch(
+        targets, properties, market_data, args.radius, args.max_comps
+    ))
+    report(f'generate_cma_batch ({len(targets)})', batch_time, len(targets))
+    legacy_estimate = (legacy_time + single_time - indexed_time) / len(sample) * len(targets)
+    print(f"  {'legacy estimate (' + str(len(targets)) + ')':<28}: {legacy_estimate:8.2f} s  (extrapolated)")
+
+
+if __name__ == '__main__':
+    main()
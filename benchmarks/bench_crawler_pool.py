@@ -0,0 +1,186 @@
+"""
+Benchmark Reddit crawling with the pooled browser against the old crawler.
+
+legacy - the old NeighborhoodCrawler.crawl_reddit: a new Chromium per
+         neighborhood, one search page at a time, networkidle plus a fixed
+         3 second wait, every image and font downloaded.
+pooled - NeighborhoodCrawler.crawl_reddit on a BrowserPool: one browser for
+         every neighborhood, --max-pages searches at once, a wait for the
+         posts to render, images/fonts/media aborted.
+
+Both crawl a local fixture server whose search pages render posts by script
+after --render-ms and reference --assets images and a font, each served
+after --asset-ms. Peak RSS is sampled from /proc for this process and every
+browser process it starts (Linux only). Needs `playwright install chromium`.
+
+Usage:
+    python benchmarks/bench_crawler_pool.py --neighborhoods 20 --max-pages 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+from playwright.async_api import async_playwright
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_collection import neighborhood_crawler  # noqa: E402
+from src.data_collection.browser_pool import BrowserPool, USER_AGENT  # noqa: E402
+from src.data_collection.neighborhood_crawler import NeighborhoodCrawler, REDDIT_POST_SELECTOR  # noqa: E402
+
+
+def serve(render_ms, assets, asset_ms):
+    images = "".join(f'<img src="/img/{i}.png">' for i in range(assets))
+    page = ("<html><head><style>@font-face {{font-family: f; src: url(/font.woff2)}} body {{font-family: f}}</style>"
+            "</head><body>" + images + "<div id='results'></div><script>setTimeout(function () {{"
+            "var r = document.getElementById('results'); for (var i = 0; i < 10; i++) r.insertAdjacentHTML("
+            "'beforeend', '<div data-testid=\"post-container\"><h3>{q} post ' + i + '</h3><a data-click-id=\"body\" "
+            "href=\"/r/x/{u}/' + i + '\">Great parks in {q}</a></div>');}}, " + str(render_ms) + ");</script>"
+            "</body></html>")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/search":
+                query = parse_qs(url.query)["q"][0]
+                body, content_type = page.format(q=query, u=quote_plus(query)).encode(), "text/html"
+            else:
+                time.sleep(asset_ms / 1000)
+                body, content_type = b"\0" * 20000, "application/octet-stream"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/search?q={{query}}"
+
+
+def tree_rss(root_pid):
+    # Sum VmRSS over root_pid and all of its descendants
+    parents = {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                parents[int(pid)] = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree, frontier = {root_pid}, [root_pid]
+    while frontier:
+        children = [pid for pid, parent in parents.items() if parent in frontier and pid not in tree]
+        tree.update(children)
+        frontier = children
+    total = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) * 1024
+        except (OSError, StopIteration):
+            continue
+    return total
+
+
+class PeakRSS:
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss(os.getpid()))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def legacy_crawl_reddit(neighborhood, max_posts=15):
+    """The old crawl_reddit page handling, pointed at the fixture server."""
+    results = []
+    search_terms = [f"{neighborhood} neighborhood review", f"{neighborhood} living", f"moving to {neighborhood}"]
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context(user_agent=USER_AGENT)
+        for search_term in search_terms:
+            page = await context.new_page()
+            try:
+                await page.goto(neighborhood_crawler.REDDIT_SEARCH_URL.format(query=quote_plus(search_term)),
+                                timeout=30000)
+                await page.wait_for_load_state("networkidle", timeout=10000)
+                await page.wait_for_timeout(3000)
+                posts = await page.query_selector_all(REDDIT_POST_SELECTOR)
+                for post in posts[:max_posts // len(search_terms)]:
+                    title_elem = await post.query_selector("h3")
+                    results.append({"title": await title_elem.inner_text(), "content": await post.inner_text()})
+            finally:
+                await page.close()
+        await browser.close()
+    return results
+
+
+async def run_legacy(neighborhoods):
+    return [await legacy_crawl_reddit(name) for name in neighborhoods]
+
+
+async def run_pooled(neighborhoods, max_pages, db_path):
+    # No rate limits: the fixture server is local and this measures the browser
+    crawler = NeighborhoodCrawler(db_path, browser_pool=BrowserPool(max_pages=max_pages, rate_limits={}))
+    try:
+        # Neighborhoods crawled together share the pool's page slots
+        return await asyncio.gather(*(crawler.crawl_reddit(name) for name in neighborhoods))
+    finally:
+        await crawler.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--neighborhoods', type=int, default=20)
+    parser.add_argument('--max-pages', type=int, default=4)
+    parser.add_argument('--render-ms', type=int, default=300, help='Delay before posts are rendered')
+    parser.add_argument('--assets', type=int, default=10, help='Images per search page')
+    parser.add_argument('--asset-ms', type=int, default=100, help='Delay serving each image or font')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    server, neighborhood_crawler.REDDIT_SEARCH_URL = serve(args.render_ms, args.assets, args.asset_ms)
+    neighborhoods = [f"Neighborhood {n}" for n in range(args.neighborhoods)]
+    pages = 3 * args.neighborhoods
+    print(f"{args.neighborhoods} neighborhoods x 3 searches = {pages} pages, {os.cpu_count()} CPUs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [("legacy", lambda: run_legacy(neighborhoods)),
+                ("pooled", lambda: run_pooled(neighborhoods, args.max_pages, os.path.join(tmp, "neighborhood.db")))]
+        posts = {}
+        for name, run in runs:
+            with PeakRSS() as rss:
+                start = time.perf_counter()
+                results = asyncio.run(run())
+                elapsed = time.perf_counter() - start
+            posts[name] = sum(len(r) for r in results)
+            print(f"  {name} : {elapsed:7.2f}s  {pages / elapsed * 60:7.1f} pages/min  "
+                  f"peak RSS {rss.peak / 2 ** 20:7.1f} MiB  {posts[name]} posts")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark pooled vs per-request HTTP connections against a local stub server.
+
+Compares:
+- async: new aiohttp.ClientSession per request vs the shared AsyncHTTPPool
+- sync:  bare requests.get per request vs the shared SyncHTTPPool
+
+Usage:
+    python benchmarks/bench_http_pool.py --requests 2000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.integrations.http_pool import AsyncHTTPPool, SyncHTTPPool  # noqa: E402
+
+BODY = json.dumps({'market': {'medianPrice': 450000, 'averageDom': 32}}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/market/snapshot"
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000
+    }
+
+
+async def run_async(url, n, concurrency, pooled):
+    pool = AsyncHTTPPool()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            if pooled:
+                response = await pool.get(url)
+                response.json()
+            else:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(url) as response:
+                        await response.json()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(n)])
+    elapsed = time.perf_counter() - start
+    await pool.close()
+    return summarize(latencies, elapsed)
+
+
+def run_sync(url, n, concurrency, pooled):
+    pool = SyncHTTPPool()
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        response = pool.get(url) if pooled else requests.get(url)
+        response.json()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(n)))
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return summarize(latencies, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    args = parser.parse_args()
+
+    server, url = start_server()
+    print(f"{'mode':<16} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for label, result in (
+        ('async per-call', asyncio.run(run_async(url, args.requests, args.concurrency, False))),
+        ('async pooled', asyncio.run(run_async(url, args.requests, args.concurrency, True))),
+        ('sync per-call', run_sync(url, args.requests, args.concurrency, False)),
+        ('sync pooled', run_sync(url, args.requests, args.concurrency, True)),
+    ):
+        print(f"{label:<16} {result['rps']:>10,.0f} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Measure cold import time of the main entry points with `python -X importtime`.
+
+Each target is imported in a fresh interpreter (best of --repeat runs).
+The harness reports total cumulative import time, the slowest top-level
+modules, and whether the market analyzers loaded their CSVs during import.
+It exits non-zero when a target fails to import or, with --budget-ms, is
+over budget, so it can gate regressions in CI.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --budget-ms 1500 --top 5
+    python benchmarks/bench_import_time.py --target modules.analyze_market
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, module) pairs; main.py and run_bot.py are imported as modules so
+# their CLI entry code under __main__ does not run
+DEFAULT_TARGETS = [
+    ('main.py', 'main'),
+    ('src/api/reic_api.py', 'src.api.reic_api'),
+    ('run_bot.py', 'run_bot'),
+    ('src/modules/analyze_market.py', 'modules.analyze_market'),
+]
+
+LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# Printed by the child after import: 1 if any Zillow CSV was loaded
+PROBE = (
+    "import sys; s = [sys.modules.get(n) for n in ('modules.zillow_store', 'src.modules.zillow_store')]; "
+    "print('ANALYZER_LOADED=%d' % int(any(m is not None and m._datasets for m in s)))"
+)
+
+
+def import_once(module: str) -> Tuple[Optional[Dict[str, int]], bool, str]:
+    """Import a module in a fresh interpreter; return (cumulative µs per top-level module, analyzer loaded, error)."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ROOT, os.path.join(ROOT, 'src'), env.get('PYTHONPATH', '')])
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}; {PROBE}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        error = next((l for l in reversed(proc.stderr.splitlines()) if l and not l.startswith('import time:')), 'unknown error')
+        return None, False, error
+
+    # Top-level entries (no indent) carry the cumulative time of their subtree
+    top_level = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match and len(match.group(3)) <= 1:
+            top_level[match.group(4)] = top_level.get(match.group(4), 0) + int(match.group(2))
+    return top_level, 'ANALYZER_LOADED=1' in proc.stdout, ''
+
+
+def measure(module: str, repeat: int):
+    best = None
+    for _ in range(repeat):
+        top_level, loaded, error = import_once(module)
+        if top_level is None:
+            return None, False, error
+        if best is None or sum(top_level.values()) < sum(best[0].values()):
+            best = (top_level, loaded)
+    return best[0], best[1], ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', help='Module to import (repeatable); defaults to the main entry points')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8, help='Slowest top-level imports to show')
+    parser.add_argument('--budget-ms', type=float, help='Fail if any target exceeds this total import time')
+    args = parser.parse_args()
+
+    targets: List[Tuple[str, str]] = [(t, t) for t in args.target] if args.target else DEFAULT_TARGETS
+    over_budget, failed = [], []
+
+    for label, module in targets:
+        top_level, loaded, error = measure(module, args.repeat)
+        print(f"\n{label}")
+        if top_level is None:
+            print(f"  import failed: {error}")
+            failed.append(label)
+            continue
+
+        total_ms = sum(top_level.values()) / 1000
+        print(f"  total            : {total_ms:9.1f} ms")
+        print(f"  analyzers loaded : {'yes' if loaded else 'no'}")
+        for name, us in sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+            print(f"    {us / 1000:9.1f} ms  {name}")
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            over_budget.append(label)
+
+    if over_budget:
+        print(f"\nOver {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+    if failed:
+        print(f"\nFailed to import: {', '.join(failed)}")
+    if over_budget or failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
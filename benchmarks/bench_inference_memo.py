@@ -0,0 +1,92 @@
+"""
+Benchmark a three-layer (past/present/future) REIC query with and without
+the shared per-query analysis context.
+
+combine_analysis is replaced by a stub that sleeps for --latency ms so the
+numbers reflect pipeline cost rather than whichever mock is importable.
+"before" runs each relevant layer with the plain enhanced context, as
+InferenceLayerManager did previously; "after" runs process_query, which
+shares one analysis per ZIP across layers (and, with --ttl, across queries).
+
+Usage:
+    python benchmarks/bench_inference_memo.py --latency 250 --zips 3 --queries 5
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.inference import past_layer, present_layer, future_layer  # noqa: E402
+from src.inference.inference_layer_manager import InferenceLayerManager  # noqa: E402
+
+
+def make_stub(latency: float, calls: list):
+    def combine_analysis(zip_code, **params):
+        calls.append(zip_code)
+        time.sleep(latency)
+        return {"zip": zip_code, "market_score": 72.0, "reputation_score": 78.0,
+                "trend_score": 64.0, "econ_score": 69.0}
+    return combine_analysis
+
+
+def run_before(manager: InferenceLayerManager, query: str):
+    """The pre-context manager loop: every layer computes its own analysis."""
+    context = manager._extract_entities(query, {})
+    layer_results = {
+        name: manager.layers[name].process_query(query, context)
+        for name in manager._determine_relevant_layers(query)
+    }
+    return manager._combine_layer_results(layer_results, query)
+
+
+def bench(label, fn, query, queries, calls):
+    calls.clear()
+    times = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        fn(query)
+        times.append(time.perf_counter() - start)
+    print(f"  {label:<22}: median {statistics.median(times) * 1000:8.1f} ms/query, "
+          f"{len(calls) / queries:5.1f} combine_analysis calls/query")
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=250, help='Simulated combine_analysis latency (ms)')
+    parser.add_argument('--zips', type=int, default=3, help='ZIP codes per query')
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('--ttl', type=float, default=300, help='Cross-request cache TTL for the cached run')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    zips = ' and '.join(str(30301 + i) for i in range(args.zips))
+    query = (f"How have {zips} changed over the past 5 years, what are conditions now, "
+             f"and what is the forecast for the next 12 months?")
+
+    calls = []
+    stub = make_stub(args.latency / 1000, calls)
+    with patch.object(past_layer, 'combine_analysis', stub), \
+         patch.object(present_layer, 'combine_analysis', stub), \
+         patch.object(future_layer, 'combine_analysis', stub):
+        manager = InferenceLayerManager(analysis_cache_ttl=0)
+        cached_manager = InferenceLayerManager(analysis_cache_ttl=args.ttl)
+        print(f"layers {manager._determine_relevant_layers(query)}, {args.zips} ZIPs, "
+              f"{args.latency:.0f} ms per analysis")
+
+        before = bench('before (per layer)', lambda q: run_before(manager, q), query, args.queries, calls)
+        after = bench('after (per query)', manager.process_query, query, args.queries, calls)
+        cached = bench(f'after + {args.ttl:.0f}s TTL cache', cached_manager.process_query, query, args.queries, calls)
+
+    print(f"  {'speedup (per query)':<22}: {before / after:8.1f}x")
+    print(f"  {'speedup (TTL cache)':<22}: {before / cached:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
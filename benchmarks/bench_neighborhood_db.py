@@ -0,0 +1,241 @@
+"""
+Benchmark neighborhood database access under a mixed workload: one
+background refresh thread writing while API threads read.
+
+legacy  - the previous access pattern: sqlite3.connect per call, default
+          rollback journal, no secondary indexes (schema as the crawler,
+          cache and refresh agent created it).
+new     - NeighborhoodDB: per-thread pooled connections, WAL, tuned
+          pragmas, cached statements and indexes.
+
+The refresh thread loops over neighborhoods storing a batch of posts, the
+sentiment analysis, the cache entry and refresh status. Each API thread
+runs get_cached_data / get_cached_sentiment / get_stored_posts style
+reads plus an access-count update. Both run for --seconds.
+
+Usage:
+    python benchmarks/bench_neighborhood_db.py --neighborhoods 300 --posts 100 --api-threads 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_management.neighborhood_db import NeighborhoodDB, POST_COLUMNS  # noqa: E402
+
+LEGACY_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS neighborhood_posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, neighborhood TEXT NOT NULL, source TEXT NOT NULL,
+        title TEXT, content TEXT NOT NULL, url TEXT, post_date TEXT, crawl_date TEXT NOT NULL, metadata TEXT)''',
+    '''CREATE TABLE IF NOT EXISTS neighborhood_cache (
+        neighborhood TEXT PRIMARY KEY, city TEXT, data TEXT NOT NULL, last_updated TEXT NOT NULL,
+        refresh_status TEXT DEFAULT 'idle')''',
+    '''CREATE TABLE IF NOT EXISTS sentiment_analysis (
+        neighborhood TEXT PRIMARY KEY, analysis_data TEXT NOT NULL, last_updated TEXT NOT NULL)''',
+    '''CREATE TABLE IF NOT EXISTS refresh_tracking (
+        neighborhood TEXT PRIMARY KEY, city TEXT, last_refresh TEXT, last_access TEXT,
+        access_count INTEGER DEFAULT 0, priority INTEGER DEFAULT 0, status TEXT DEFAULT 'idle')'''
+]
+
+ANALYSIS = json.dumps({"overall_sentiment": {"score": 0.4, "label": "positive"},
+                       "aspects": {a: {"score": 0.1, "mentions": 3} for a in ["safety", "schools", "parks"]},
+                       "summary": "Mostly positive." * 20})
+
+
+def make_posts(neighborhood, n, now, rng):
+    return [{"neighborhood": neighborhood, "source": "reddit", "title": f"Living in {neighborhood}",
+             "content": "Great parks, some traffic, friendly neighbors. " * 5, "url": f"https://example.com/{i}",
+             "post_date": None, "crawl_date": (now - timedelta(days=rng.randint(0, 90))).isoformat(),
+             "metadata": "{}"} for i in range(n)]
+
+
+class LegacyAccess:
+    """The per-call connect pattern used by the crawler, analyzer, cache and refresh agent."""
+
+    def __init__(self, path):
+        self.path = path
+        conn = sqlite3.connect(path)
+        for statement in LEGACY_SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+
+    def insert_posts(self, posts):
+        conn = sqlite3.connect(self.path, timeout=30)
+        cursor = conn.cursor()
+        for post in posts:
+            cursor.execute('INSERT INTO neighborhood_posts (neighborhood, source, title, content, url, post_date, '
+                           'crawl_date, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                           tuple(post[c] for c in POST_COLUMNS))
+        conn.commit()
+        conn.close()
+
+    def _write(self, sql, params):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute(sql, params)
+        conn.commit()
+        conn.close()
+
+    def _read(self, sql, params, one=False):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.execute(sql, params)
+        result = cursor.fetchone() if one else [dict(r) for r in cursor.fetchall()]
+        conn.close()
+        return result
+
+    def put_sentiment(self, neighborhood, analysis_json, updated):
+        self._write('INSERT OR REPLACE INTO sentiment_analysis (neighborhood, analysis_data, last_updated) '
+                    'VALUES (?, ?, ?)', (neighborhood, analysis_json, updated))
+
+    def put_cache_entry(self, neighborhood, city, data_json, updated, status="idle"):
+        self._write('INSERT OR REPLACE INTO neighborhood_cache (neighborhood, city, data, last_updated, '
+                    'refresh_status) VALUES (?, ?, ?, ?, ?)', (neighborhood, city, data_json, updated, status))
+
+    def set_tracking_status(self, neighborhood, status):
+        self._write('UPDATE refresh_tracking SET status = ? WHERE neighborhood = ?', (status, neighborhood))
+
+    def mark_refreshed(self, neighborhood, city, refreshed):
+        self._write('''INSERT OR REPLACE INTO refresh_tracking
+            (neighborhood, city, last_refresh, last_access, access_count, status)
+            VALUES (?, ?, ?, (SELECT last_access FROM refresh_tracking WHERE neighborhood = ?),
+                    (SELECT access_count FROM refresh_tracking WHERE neighborhood = ?), 'idle')''',
+                    (neighborhood, city, refreshed, neighborhood, neighborhood))
+
+    def get_cache_entry(self, neighborhood):
+        return self._read('SELECT data, last_updated, city, refresh_status FROM neighborhood_cache '
+                          'WHERE neighborhood = ?', (neighborhood,), one=True)
+
+    def find_cache_entry(self, name, prefix=None, with_sentiment=False):
+        return self._read('''SELECT n.*, s.analysis_data FROM neighborhood_cache n
+            LEFT JOIN sentiment_analysis s ON n.neighborhood = s.neighborhood
+            WHERE n.neighborhood = ? OR n.city = ?''', (name, name), one=True)
+
+    def get_posts(self, neighborhood, since=None):
+        return self._read('SELECT * FROM neighborhood_posts WHERE neighborhood = ? AND crawl_date > ? '
+                          'ORDER BY crawl_date DESC', (neighborhood, since))
+
+    def record_access(self, neighborhood, city, accessed):
+        conn = sqlite3.connect(self.path, timeout=30)
+        cursor = conn.cursor()
+        cursor.execute('SELECT access_count FROM refresh_tracking WHERE neighborhood = ?', (neighborhood,))
+        if cursor.fetchone():
+            cursor.execute('UPDATE refresh_tracking SET last_access = ?, access_count = access_count + 1 '
+                           'WHERE neighborhood = ?', (accessed, neighborhood))
+        else:
+            cursor.execute('INSERT INTO refresh_tracking (neighborhood, city, last_access, access_count) '
+                           'VALUES (?, ?, ?, 1)', (neighborhood, city, accessed))
+        conn.commit()
+        conn.close()
+
+
+def seed(db, neighborhoods, posts_per, rng):
+    now = datetime.now()
+    for name in neighborhoods:
+        db.insert_posts(make_posts(name, posts_per, now, rng))
+        db.put_sentiment(name, ANALYSIS, now.isoformat())
+        db.put_cache_entry(name, "Atlanta", json.dumps({"post_count": posts_per}), now.isoformat())
+
+
+def run_workload(db, neighborhoods, api_threads, seconds, batch, seed_value):
+    stop = threading.Event()
+    read_latencies = [[] for _ in range(api_threads)]
+    writes = [0]
+    errors = []
+    cutoff = (datetime.now() - timedelta(days=30)).isoformat()
+
+    def refresher():
+        rng = random.Random(seed_value)
+        try:
+            while not stop.is_set():
+                name = rng.choice(neighborhoods)
+                now = datetime.now()
+                db.set_tracking_status(name, "refreshing")
+                db.insert_posts(make_posts(name, batch, now, rng))
+                db.put_sentiment(name, ANALYSIS, now.isoformat())
+                db.put_cache_entry(name, "Atlanta", json.dumps({"post_count": batch}), now.isoformat())
+                db.mark_refreshed(name, "Atlanta", now.isoformat())
+                writes[0] += 1
+        except Exception as e:
+            errors.append(e)
+
+    def api(slot):
+        rng = random.Random(seed_value + slot + 1)
+        latencies = read_latencies[slot]
+        try:
+            while not stop.is_set():
+                name = rng.choice(neighborhoods)
+                start = time.perf_counter()
+                db.get_cache_entry(name)
+                db.find_cache_entry(name, None, with_sentiment=True)
+                db.get_posts(name, since=cutoff)
+                db.record_access(name, "Atlanta", datetime.now().isoformat())
+                latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=refresher)] + [threading.Thread(target=api, args=(i,))
+                                                       for i in range(api_threads)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies = sorted(lat for per_thread in read_latencies for lat in per_thread)
+    return {
+        "requests": len(latencies),
+        "refreshes": writes[0],
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float("nan"),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--neighborhoods', type=int, default=300)
+    parser.add_argument('--posts', type=int, default=100, help='Seed posts per neighborhood')
+    parser.add_argument('--batch', type=int, default=15, help='Posts stored per refresh')
+    parser.add_argument('--api-threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    neighborhoods = [f"{30000 + i}" for i in range(args.neighborhoods)]
+    print(f"{args.neighborhoods} neighborhoods x {args.posts} posts, 1 refresh thread + "
+          f"{args.api_threads} API threads, {args.seconds:.0f}s each")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, factory in (("legacy", LegacyAccess), ("new", NeighborhoodDB)):
+            db = factory(os.path.join(tmp, f"{label}.db"))
+            seed(db, neighborhoods, args.posts, random.Random(args.seed))
+            results[label] = run_workload(db, neighborhoods, args.api_threads, args.seconds, args.batch, args.seed)
+            if hasattr(db, "close"):
+                db.close()
+
+    for label, r in results.items():
+        print(f"  {label:<7}: {r['requests'] / args.seconds:8.0f} API requests/s  "
+              f"p50 {r['p50_ms']:6.2f} ms  p95 {r['p95_ms']:7.2f} ms  "
+              f"{r['refreshes'] / args.seconds:6.1f} refreshes/s  errors {r['errors']}")
+    legacy, new = results["legacy"], results["new"]
+    print(f"  {'speedup':<7}: {new['requests'] / max(legacy['requests'], 1):8.1f}x API throughput, "
+          f"{new['refreshes'] / max(legacy['refreshes'], 1):.1f}x refresh throughput")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark storing, re-crawling and analyzing crawled neighborhood posts.
+
+legacy  - the previous path: one INSERT per post with no uniqueness
+          constraint, and reads that materialize every row as a dict
+          before analysis.
+new     - NeighborhoodDB.insert_posts (batched executemany upsert on
+          post_key with a unique index) and iter_posts streaming.
+
+Phases (posts are stored --crawl-size at a time, as store_posts is called
+once per crawl; pass --crawl-size equal to --posts for one bulk insert):
+    insert   store --posts posts for one neighborhood
+    recrawl  store them again with --recrawl-new fresh posts mixed in
+    read     read the neighborhood back (time, then peak traced memory)
+    analyze  SentimentAnalyzer.analyze_neighborhood on --analyze-posts
+             posts, extrapolated to --posts
+
+Usage:
+    python benchmarks/bench_post_ingest.py --posts 1000000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_management.neighborhood_db import NeighborhoodDB, POST_COLUMNS  # noqa: E402
+from src.analysis.sentiment_analyzer import SentimentAnalyzer  # noqa: E402
+
+LEGACY_POSTS_TABLE = '''
+CREATE TABLE IF NOT EXISTS neighborhood_posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, neighborhood TEXT NOT NULL, source TEXT NOT NULL,
+    title TEXT, content TEXT NOT NULL, url TEXT, post_date TEXT, crawl_date TEXT NOT NULL, metadata TEXT)
+'''
+
+SNIPPETS = [
+    "Great parks and friendly neighbors, but traffic is terrible at rush hour.",
+    "Rent is expensive and parking is a problem. Schools are good though.",
+    "Quiet, safe, walkable streets with lots of restaurants and shops.",
+    "Some crime lately and construction noise, the worst traffic in town.",
+]
+
+
+def make_posts(neighborhood, start, count, crawl_date):
+    metadata = json.dumps({"search_term": neighborhood})
+    for i in range(start, start + count):
+        yield {"neighborhood": neighborhood, "source": "reddit" if i % 3 else "city-data",
+               "title": f"Living in {neighborhood} #{i}", "content": SNIPPETS[i % len(SNIPPETS)],
+               "url": f"https://example.com/{neighborhood}/{i}", "post_date": None,
+               "crawl_date": crawl_date, "metadata": metadata}
+
+
+def legacy_store_posts(path, posts):
+    """The old NeighborhoodCrawler.store_posts: one INSERT per post."""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    for post in posts:
+        cursor.execute('''
+        INSERT INTO neighborhood_posts
+        (neighborhood, source, title, content, url, post_date, crawl_date, metadata)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', tuple(post[c] for c in POST_COLUMNS))
+    conn.commit()
+    conn.close()
+
+
+def in_crawls(store, posts, crawl_size):
+    batch = []
+    for post in posts:
+        batch.append(post)
+        if len(batch) == crawl_size:
+            store(batch)
+            batch = []
+    if batch:
+        store(batch)
+
+
+def legacy_get_posts(path, neighborhood):
+    """The old SentimentAnalyzer._get_neighborhood_posts: every row as a dict."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM neighborhood_posts WHERE neighborhood = ? ORDER BY crawl_date DESC',
+                   (neighborhood,))
+    posts = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return posts
+
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    count = conn.execute("SELECT COUNT(*) FROM neighborhood_posts").fetchone()[0]
+    conn.close()
+    return count
+
+
+def timed(fn, trace=False):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--crawl-size', type=int, default=100, help='Posts per store_posts call')
+    parser.add_argument('--recrawl-new', type=int, default=None,
+                        help='New posts in the re-crawl (default: 10%% of --posts)')
+    parser.add_argument('--analyze-posts', type=int, default=10000)
+    args = parser.parse_args()
+    recrawl_new = args.recrawl_new if args.recrawl_new is not None else args.posts // 10
+
+    logging.disable(logging.WARNING)
+    first_crawl = (datetime.now() - timedelta(days=7)).isoformat()
+    second_crawl = datetime.now().isoformat()
+    area = "30318"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute(LEGACY_POSTS_TABLE)
+        conn.close()
+        db = NeighborhoodDB(os.path.join(tmp, "new.db"))
+
+        def legacy_store(posts):
+            in_crawls(lambda batch: legacy_store_posts(legacy_path, batch), posts, args.crawl_size)
+
+        def new_store(posts):
+            in_crawls(db.insert_posts, posts, args.crawl_size)
+
+        print(f"insert {args.posts} posts, {args.crawl_size} per crawl")
+        _, legacy_s, _ = timed(lambda: legacy_store(make_posts(area, 0, args.posts, first_crawl)))
+        _, new_s, _ = timed(lambda: new_store(make_posts(area, 0, args.posts, first_crawl)))
+        print(f"  legacy : {legacy_s:7.2f}s  {args.posts / legacy_s:9.0f} posts/s")
+        print(f"  new    : {new_s:7.2f}s  {args.posts / new_s:9.0f} posts/s")
+
+        total = args.posts + recrawl_new
+        print(f"re-crawl {total} posts ({recrawl_new} new)")
+        _, legacy_s, _ = timed(lambda: legacy_store(make_posts(area, 0, total, second_crawl)))
+        _, new_s, _ = timed(lambda: new_store(make_posts(area, 0, total, second_crawl)))
+        print(f"  legacy : {legacy_s:7.2f}s  {count_rows(legacy_path):9d} rows")
+        print(f"  new    : {new_s:7.2f}s  {count_rows(db.db_path):9d} rows")
+
+        print(f"read {area}")
+        for label, read in (("legacy", lambda: len(legacy_get_posts(legacy_path, area))),
+                            ("new", lambda: sum(1 for _ in db.iter_posts(area)))):
+            posts, elapsed, _ = timed(read)
+            _, _, peak = timed(read, trace=True)
+            print(f"  {label:<7}: {elapsed:7.2f}s  {posts:9d} posts  peak {peak / 2 ** 20:8.1f} MiB")
+
+        sample = "sample"
+        db.insert_posts(make_posts(sample, 0, args.analyze_posts, second_crawl))
+        analyzer = SentimentAnalyzer(db.db_path)
+        analysis, analyze_s, _ = timed(lambda: analyzer.analyze_neighborhood(sample, force_refresh=True))
+        per_post = analyze_s / analysis["post_count"]
+        print(f"analyze {analysis['post_count']} posts: {analyze_s:.2f}s ({per_post * 1e6:.0f} us/post, "
+              f"~{per_post * total:.0f}s for {total} posts)")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
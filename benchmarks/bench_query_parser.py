@@ -0,0 +1,173 @@
+"""
+Benchmark InferenceLayerManager intent/entity extraction over a synthetic
+prompt corpus: the legacy per-layer keyword scans and per-call regexes vs
+the compiled single-pass QueryParser, cold and with its LRU memo.
+
+The corpus mixes ZIP codes, streets, time frames and investment types the
+way REIC prompts do; --unique controls how many distinct prompts it holds
+(the rest are repeats, as from retries and canned questions). Every
+prompt's legacy and parsed outputs are compared.
+
+Usage:
+    python benchmarks/bench_query_parser.py --prompts 10000 --unique 4000
+"""
+
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.inference.inference_layer_manager import InferenceLayerManager  # noqa: E402
+from src.inference.query_parser import QueryParser  # noqa: E402
+
+TEMPLATES = [
+    "What is the current median price in {zip}?",
+    "How has {zip} changed over the past {n} years?",
+    "Show me the price history for {street} in {zip}",
+    "What will {zip} look like in the next {n} months?",
+    "Is {street} a good place for {inv} investment right now?",
+    "Compare {zip} and {zip2}: historical trends vs forecast for the next {n} years",
+    "What's the buzz around {street} today?",
+    "Give me the market outlook and growth potential for ZIP code {zip}",
+    "Which {inv} deals near {street} are active listings at the moment?",
+    "How did {zip} perform {n} years ago and what is expected {n} months ahead?",
+    "Tell me about {inv} property in zip: {zip}",
+    "Any vacant lot or undeveloped land near {street}?",
+    "Rental demand in {zip} this quarter",
+]
+STREETS = ["Peachtree Street", "Ponce Avenue", "Moreland Ave", "Piedmont Road", "Howell Mill Rd",
+           "Memorial Drive", "Edgewood Court", "North Highland Ln", "Auburn Way", "Decatur Blvd"]
+INVESTMENT = ["residential", "commercial", "office", "warehouse", "mixed use", "condos", "retail", "single family"]
+
+
+def make_corpus(n: int, unique: int, rng: random.Random):
+    prompts = []
+    for _ in range(unique):
+        template = rng.choice(TEMPLATES)
+        prompts.append(template.format(
+            zip=str(rng.randint(30001, 39999)), zip2=str(rng.randint(30001, 39999)),
+            n=rng.randint(1, 10), street=rng.choice(STREETS), inv=rng.choice(INVESTMENT)
+        ))
+    return [prompts[i] if i < unique else rng.choice(prompts) for i in range(n)]
+
+
+# Legacy keyword lists, as each layer's is_relevant_for_query held them
+LEGACY_TIME_KEYWORDS = {
+    "past": ["history", "historical", "past", "previous", "before",
+             "last year", "five years", "decade", "trend", "cycle"],
+    "present": ["current", "now", "today", "present", "real-time",
+                "live", "active", "right now", "currently", "at the moment"],
+    "future": ["future", "forecast", "predict", "projection", "outlook",
+               "potential", "growth", "will be", "expected", "anticipated",
+               "next year", "coming months", "next quarter", "long-term"],
+}
+LEGACY_PRESENT_DEFAULT_UNLESS = ["history", "historical", "past", "previous", "before",
+                                 "future", "predict", "forecast", "projection", "will be"]
+
+
+def legacy_is_relevant(name, layer, query):
+    query_lower = query.lower()
+    for capability in layer.get_capabilities():
+        if capability.lower() in query_lower:
+            return True
+    for keyword in LEGACY_TIME_KEYWORDS[name]:
+        if keyword in query_lower:
+            return True
+    if name == "present":
+        for keyword in LEGACY_PRESENT_DEFAULT_UNLESS:
+            if keyword in query_lower:
+                return False
+        return True
+    return False
+
+
+def legacy_extract(layers, query):
+    """The pre-parser extraction path, one scan per layer and entity."""
+    relevant = [name for name, layer in layers.items() if legacy_is_relevant(name, layer, query)]
+
+    zip_codes = list(set(re.findall(r'\b(\d{5})\b', query) +
+                         re.findall(r'\b[Zz][Ii][Pp]\s*(?:code)?\s*:?\s*(\d{5})\b', query)))
+
+    street_suffixes = ["Street", "St", "Avenue", "Ave", "Road", "Rd", "Boulevard", "Blvd",
+                       "Lane", "Ln", "Drive", "Dr", "Court", "Ct", "Place", "Pl", "Way"]
+    suffix_pattern = "|".join([s + "\\b" for s in street_suffixes])
+    streets = re.findall(r'\b([A-Z][a-z]+ (?:' + suffix_pattern + '))', query)
+
+    years_back = months_ahead = None
+    for pattern in [r'\b(\d+)\s+years?\s+(?:ago|back|history|historical|past)\b',
+                    r'\bpast\s+(\d+)\s+years?\b',
+                    r'\bover\s+(?:the\s+)?(?:last|past)\s+(\d+)\s+years?\b']:
+        matches = re.findall(pattern, query.lower())
+        if matches:
+            years_back = int(matches[0])
+            break
+    for pattern in [r'\b(?:next|coming|following|future)\s+(\d+)\s+months?\b',
+                    r'\b(\d+)\s+months?\s+(?:ahead|forward|future|forecast|projection)\b',
+                    r'\b(?:next|coming|following|future)\s+(\d+)\s+years?\b',
+                    r'\b(\d+)\s+years?\s+(?:ahead|forward|future|forecast|projection)\b']:
+        matches = re.findall(pattern, query.lower())
+        if matches:
+            months_ahead = int(matches[0]) * (12 if "year" in pattern else 1)
+            break
+
+    investment_type = None
+    investment_types = {
+        "residential": ["residential", "housing", "homes", "apartments", "condos"],
+        "commercial": ["commercial", "office", "retail", "shopping", "business"],
+        "industrial": ["industrial", "warehouse", "manufacturing", "factory"],
+        "mixed-use": ["mixed-use", "mixed use", "multi-use"],
+        "land": ["land", "vacant", "undeveloped", "lot"]
+    }
+    query_lower = query.lower()
+    for inv_type, keywords in investment_types.items():
+        if any(keyword in query_lower for keyword in keywords):
+            investment_type = inv_type
+            break
+
+    return relevant, set(zip_codes), streets, years_back, months_ahead, investment_type
+
+
+def as_legacy(parsed):
+    return (list(parsed.relevant_layers), set(parsed.zip_codes), list(parsed.streets),
+            parsed.years_back, parsed.months_ahead, parsed.investment_type)
+
+
+def timed(fn, corpus):
+    start = time.perf_counter()
+    for query in corpus:
+        fn(query)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prompts', type=int, default=10_000)
+    parser.add_argument('--unique', type=int, default=4_000, help='Distinct prompts in the corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    corpus = make_corpus(args.prompts, min(args.unique, args.prompts), random.Random(args.seed))
+    layers = InferenceLayerManager(analysis_cache_ttl=0).layers
+    query_parser = QueryParser(layers)
+
+    mismatches = sum(1 for q in set(corpus) if legacy_extract(layers, q) != as_legacy(query_parser._parse(q)))
+    print(f"{len(corpus)} prompts ({len(set(corpus))} distinct), {mismatches} mismatches vs legacy")
+
+    legacy = timed(lambda q: legacy_extract(layers, q), corpus)
+    cold = timed(query_parser._parse, corpus)
+    query_parser.parse.cache_clear()
+    memo = timed(query_parser.parse, corpus)
+    for label, seconds in [("legacy", legacy), ("compiled, no memo", cold), ("compiled + memo", memo)]:
+        print(f"  {label:<20}: {seconds * 1000:8.1f} ms  ({len(corpus) / seconds:10.0f} prompts/s, "
+              f"{legacy / seconds:5.1f}x)")
+    print(f"  memo: {query_parser.cache_info()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark batch sentiment refreshes on the refresh scheduler.
+
+serial    - the old SentimentRefreshAgent.refresh_batch: one neighborhood at a
+            time, plus the neighborhood cache's own thread refreshing the
+            stale entries it read, even those the batch also refreshes.
+scheduler - refresh_batch on a RefreshScheduler with --workers, and the
+            cache's refreshes submitted to the same scheduler, so
+            neighborhoods both ask for are refreshed once.
+
+Each refresh is simulated: it sleeps --crawl-ms (crawl I/O) and then
+busy-waits --analyze-ms (sentiment scoring on the event loop). --overlap of
+the batch is also read stale from the cache.
+
+Usage:
+    python benchmarks/bench_refresh_scheduler.py --batch 20 --workers 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.advanced.refresh_agent import SentimentRefreshAgent  # noqa: E402
+from src.data_management.neighborhood_db import get_neighborhood_db  # noqa: E402
+from src.data_management.refresh_scheduler import RefreshScheduler  # noqa: E402
+
+
+def make_refresh(crawl_ms, analyze_ms, calls):
+    async def refresh(neighborhood, city=None, force=False):
+        calls.append(neighborhood)
+        await asyncio.sleep(crawl_ms / 1000)
+        end = time.perf_counter() + analyze_ms / 1000
+        while time.perf_counter() < end:
+            pass
+        return {"refreshed": True, "neighborhood": neighborhood, "city": city}
+    return refresh
+
+
+def run_serial(agent, stale, refresh):
+    # The cache's old private refresh thread, draining its own queue
+    cache_thread = threading.Thread(target=lambda: asyncio.run(_drain(stale, refresh)))
+    cache_thread.start()
+    batch = agent.get_neighborhoods_to_refresh(len(agent.db.refresh_candidates()))
+
+    async def refresh_batch():
+        return [await refresh(neighborhood, city) for neighborhood, city in batch]
+
+    asyncio.run(refresh_batch())
+    cache_thread.join()
+
+
+async def _drain(stale, refresh):
+    for neighborhood in stale:
+        await refresh(neighborhood, "Atlanta")
+
+
+def run_scheduler(agent, stale, refresh):
+    for neighborhood in stale:
+        agent.scheduler.submit(neighborhood, "Atlanta", refresh)
+    asyncio.run(agent.refresh_batch(len(agent.db.refresh_candidates())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch', type=int, default=20, help='Neighborhoods due for refresh')
+    parser.add_argument('--overlap', type=int, default=5, help='Of those, also read stale from the cache')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--crawl-ms', type=int, default=200)
+    parser.add_argument('--analyze-ms', type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    neighborhoods = [f"n{i}" for i in range(args.batch)]
+    stale = neighborhoods[:args.overlap]
+    print(f"{args.batch} neighborhoods, {args.overlap} also stale in the cache, "
+          f"{args.crawl_ms} ms crawl + {args.analyze_ms} ms analysis each")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "neighborhood.db")
+        db = get_neighborhood_db(path)
+        now = datetime.now()
+        for i, neighborhood in enumerate(neighborhoods):
+            db.put_cache_entry(neighborhood, "Atlanta", "{}", now.isoformat())
+            db.mark_refreshed(neighborhood, "Atlanta", (now - timedelta(days=20 + i)).isoformat())
+
+        for name, run in [("serial", run_serial), ("scheduler", run_scheduler)]:
+            scheduler = RefreshScheduler(args.workers)
+            agent = SentimentRefreshAgent(path, scheduler=scheduler)
+            calls = []
+            agent.refresh_sentiment_for_zip = make_refresh(args.crawl_ms, args.analyze_ms, calls)
+            start = time.perf_counter()
+            run(agent, stale, agent.refresh_sentiment_for_zip)
+            elapsed = time.perf_counter() - start
+            metrics = scheduler.metrics()
+            line = f"  {name:9}: {elapsed:6.2f}s  {len(calls):3d} refreshes"
+            if metrics["latency"]["count"]:
+                line += (f"  latency p50 {metrics['latency']['p50'] * 1000:.0f} ms"
+                         f" p95 {metrics['latency']['p95'] * 1000:.0f} ms"
+                         f"  max queue depth {metrics['max_queue_depth']}")
+            print(line)
+            scheduler.stop()
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Load-test the REIC API in-process with stubbed analyzers.
+
+combine_analysis is replaced in every inference layer by a stub that blocks
+for --latency ms, and requests go straight into the ASGI app through
+httpx's ASGITransport, so the numbers reflect the API's own scheduling:
+executor offload, request timeouts and 429 backpressure. --clients
+closed-loop clients cycle through the query, trends, sentiment and
+forecast endpoints for --duration seconds while a probe hits /health to
+show the event loop stays responsive.
+
+Usage:
+    python benchmarks/bench_reic_api_load.py --clients 64 --duration 10 --latency 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api import reic_api  # noqa: E402
+from src.inference import past_layer, present_layer, future_layer  # noqa: E402
+from src.utils.executor import BoundedExecutor  # noqa: E402
+
+REQUESTS = [
+    ("/conversation/query", {"prompt": "What are conditions now and the forecast for the next 12 months?",
+                             "zip_code": "30318"}),
+    ("/market/trends", {"zip_code": "30318", "time_period": "5y"}),
+    ("/sentiment/scores", {"zip_code": "30307"}),
+    ("/market/forecasts", {"zip_code": "30308", "forecast_period": "12m"}),
+]
+
+
+def make_stub(latency: float):
+    def combine_analysis(zip_code, **params):
+        time.sleep(latency)
+        return {"zip": zip_code, "market_score": 72.0, "reputation_score": 78.0,
+                "trend_score": 64.0, "econ_score": 69.0}
+    return combine_analysis
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+async def client_loop(client, offset, deadline, latencies, statuses, retry_after):
+    i = offset
+    while time.perf_counter() < deadline:
+        path, body = REQUESTS[i % len(REQUESTS)]
+        i += 1
+        start = time.perf_counter()
+        response = await client.post(path, json=body)
+        elapsed = time.perf_counter() - start
+        statuses[response.status_code] += 1
+        if response.status_code == 200:
+            latencies.append(elapsed)
+        elif response.status_code == 429:
+            retry_after.add(response.headers.get("Retry-After"))
+            # Back off briefly rather than the full Retry-After so the run keeps pressure on
+            await asyncio.sleep(0.01)
+
+
+async def health_probe(client, deadline, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=reic_api.app)
+    latencies, health, statuses, retry_after = [], [], Counter(), set()
+    async with httpx.AsyncClient(transport=transport, base_url="http://reic", timeout=None) as client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(
+            health_probe(client, deadline, health),
+            *(client_loop(client, i, deadline, latencies, statuses, retry_after) for i in range(args.clients))
+        )
+        wall = time.perf_counter() - start
+    return latencies, health, statuses, retry_after, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=64, help='Concurrent closed-loop clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--latency', type=float, default=50, help='Simulated combine_analysis latency (ms)')
+    parser.add_argument('--workers', type=int, default=8, help='API executor threads')
+    parser.add_argument('--max-pending', type=int, default=32, help='Running plus queued requests before 429')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Request timeout (s)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    stub = make_stub(args.latency / 1000)
+    executor = BoundedExecutor(args.workers, args.max_pending, thread_name_prefix="reic-api",
+                               retry_after=reic_api.api_executor.retry_after)
+    with patch.object(past_layer, 'combine_analysis', stub), \
+         patch.object(present_layer, 'combine_analysis', stub), \
+         patch.object(future_layer, 'combine_analysis', stub), \
+         patch.object(reic_api, 'api_executor', executor), \
+         patch.object(reic_api, 'REQUEST_TIMEOUT', args.timeout):
+        latencies, health, statuses, retry_after, wall = asyncio.run(run(args))
+
+    ok = statuses.get(200, 0)
+    print(f"{args.clients} clients, {args.duration:.0f}s, {args.latency:.0f} ms per analysis, "
+          f"{args.workers} workers, {args.max_pending} max pending")
+    print(f"  responses      : {dict(sorted(statuses.items()))}"
+          + (f"  (Retry-After {', '.join(sorted(r for r in retry_after if r))})" if retry_after else ""))
+    print(f"  throughput     : {ok / wall:8.1f} ok req/s  ({sum(statuses.values()) / wall:.1f} total req/s)")
+    print(f"  latency (200)  : p50 {percentile(latencies, 50) * 1000:7.1f} ms  "
+          f"p95 {percentile(latencies, 95) * 1000:7.1f} ms  p99 {percentile(latencies, 99) * 1000:7.1f} ms")
+    print(f"  /health        : p50 {percentile(health, 50) * 1000:7.1f} ms  "
+          f"p99 {percentile(health, 99) * 1000:7.1f} ms  max {max(health, default=0) * 1000:.1f} ms")
+    print(f"  executor       : {executor.get_stats()}")
+    if latencies:
+        print(f"  mean latency   : {statistics.mean(latencies) * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
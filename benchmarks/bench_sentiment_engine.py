@@ -0,0 +1,80 @@
+"""
+Benchmark per-post sentiment scoring against the vectorized batch engine.
+
+legacy  - SentimentAnalyzer.analyze_post, one post at a time (aspect
+          matching scans every lexicon term for every token); timed on
+          --legacy-posts and extrapolated.
+new     - SentimentAnalyzer.analyze_posts, scoring --batch-size posts per
+          NumPy pass.
+
+Posts are synthetic: 20-120 words drawn from the analyzer's lexicons and
+filler words. The legacy sample is also checked for identical output.
+
+Usage:
+    python benchmarks/bench_sentiment_engine.py --posts 100000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.sentiment_analyzer import (SentimentAnalyzer, POSITIVE_TERMS, NEGATIVE_TERMS,  # noqa: E402
+                                             NEGATION_WORDS, ASPECT_CATEGORIES)
+
+FILLER = ("the a and to of in is it for we my our this that was have been just like "
+          "live moved here years street house apartment area place downtown near").split()
+
+
+def make_posts(n, seed):
+    rng = random.Random(seed)
+    lexicon = sorted(POSITIVE_TERMS | NEGATIVE_TERMS) + [t for terms in ASPECT_CATEGORIES.values() for t in terms]
+    negations = sorted(NEGATION_WORDS)
+    posts = []
+    for i in range(n):
+        words = []
+        for _ in range(rng.randint(20, 120)):
+            roll = rng.random()
+            words.append(rng.choice(lexicon) if roll < 0.25 else rng.choice(negations) if roll < 0.28
+                         else rng.choice(FILLER))
+        cut = rng.randint(3, 8)
+        posts.append({"id": i, "source": "reddit" if i % 3 else "city-data",
+                      "title": " ".join(words[:cut]).capitalize() + "?",
+                      "content": ", ".join(" ".join(words[j:j + 7]) for j in range(cut, len(words), 7)) + "."})
+    return posts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--legacy-posts', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    posts = make_posts(args.posts, args.seed)
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    print(f"{args.posts} synthetic posts, batch size {args.batch_size}")
+
+    sample = posts[:args.legacy_posts]
+    start = time.perf_counter()
+    expected = [analyzer.analyze_post(post) for post in sample]
+    legacy_rate = len(sample) / (time.perf_counter() - start)
+    print(f"  legacy : {legacy_rate:9.0f} posts/s  (~{args.posts / legacy_rate:.0f}s for {args.posts}, "
+          f"timed on {len(sample)})")
+
+    start = time.perf_counter()
+    results = list(analyzer.analyze_posts(posts, batch_size=args.batch_size))
+    new_rate = len(posts) / (time.perf_counter() - start)
+    print(f"  new    : {new_rate:9.0f} posts/s  ({args.posts / new_rate:.1f}s)")
+
+    print(f"  speedup: {new_rate / legacy_rate:9.1f}x, output identical on sample: {results[:len(sample)] == expected}")
+
+
+if __name__ == '__main__':
+    main()
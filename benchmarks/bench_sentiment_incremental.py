@@ -0,0 +1,104 @@
+"""
+Benchmark incremental neighborhood sentiment refreshes.
+
+full        - aggregate every post of the neighborhood, as
+              analyze_neighborhood(force_refresh=True) did before it kept a
+              running aggregate.
+incremental - analyze_neighborhood(force_refresh=True) after --new posts were
+              added and --recrawl existing posts were crawled again unchanged:
+              only the new posts are scored and merged into the stored
+              aggregate.
+window      - the same refresh for analyze_neighborhood(window_days=--window),
+              a day later, so posts that aged out are scored and subtracted too.
+
+Each size is a fresh database with that many existing posts, first crawled
+over the last 2 x --window days. Every incremental result is checked
+against a full recompute.
+
+Usage:
+    python benchmarks/bench_sentiment_incremental.py --existing 1000 10000 100000 --new 50
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis import sentiment_analyzer  # noqa: E402
+from src.analysis.sentiment_analyzer import ANALYZED_POST_COLUMNS, SentimentAnalyzer  # noqa: E402
+from src.data_management.neighborhood_db import get_neighborhood_db  # noqa: E402
+from bench_sentiment_engine import make_posts as make_texts  # noqa: E402
+
+NEIGHBORHOOD = "30318"
+
+
+def make_rows(texts, first, count, now, span):
+    # Spread first crawls evenly over the span, newest first
+    step = span / max(count, 1)
+    return [{**texts[i], "neighborhood": NEIGHBORHOOD, "url": f"https://example.com/{i}", "post_date": None,
+             "crawl_date": (now - step * (i - first)).isoformat(), "metadata": "{}"}
+            for i in range(first, first + count)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--existing', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--new', type=int, default=50, help='Posts added between refreshes')
+    parser.add_argument('--recrawl', type=int, default=50, help='Existing posts crawled again, unchanged')
+    parser.add_argument('--window', type=int, default=30, help='Days in the windowed analysis')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    engine = sentiment_analyzer._engine.get()
+    print(f"{args.new} new + {args.recrawl} re-crawled posts per refresh, {args.window}-day window")
+
+    for existing in args.existing:
+        texts = make_texts(existing + args.new, args.seed)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "neighborhood.db")
+            db = get_neighborhood_db(path)
+            now = datetime.now()
+            span = timedelta(days=2 * args.window)
+            db.insert_posts(make_rows(texts, 0, existing, now - timedelta(minutes=1), span))
+            analyzer = SentimentAnalyzer(path)
+            analyzer.analyze_neighborhood(NEIGHBORHOOD, force_refresh=True)
+            analyzer.analyze_neighborhood(NEIGHBORHOOD, window_days=args.window)
+
+            recrawled = [dict(row, crawl_date=now.isoformat()) for row in make_rows(texts, 0, args.recrawl, now, span)]
+            db.insert_posts(make_rows(texts, existing, args.new, now, timedelta(minutes=1)) + recrawled)
+
+            full, full_s = timed(lambda: engine.aggregate(
+                db.iter_posts(NEIGHBORHOOD, columns=ANALYZED_POST_COLUMNS)).to_analysis(NEIGHBORHOOD, "-"))
+            incremental, incremental_s = timed(lambda: analyzer.analyze_neighborhood(NEIGHBORHOOD, force_refresh=True))
+            incremental["analysis_date"] = "-"
+
+            later = now + timedelta(days=1)
+            cutoff = (later - timedelta(days=args.window)).isoformat()
+            windowed, window_s = timed(lambda: analyzer._refresh_aggregate(NEIGHBORHOOD, args.window, now=later))
+            window_full = engine.aggregate(db.iter_posts_first_crawled(NEIGHBORHOOD, cutoff,
+                                                                       columns=ANALYZED_POST_COLUMNS))
+            state_kib = len(db.get_sentiment_aggregate(NEIGHBORHOOD, 0)["state"]) / 1024
+
+            print(f"{existing} existing posts (stored aggregate {state_kib:.0f} KiB)")
+            print(f"  full       : {full_s * 1000:9.1f} ms")
+            print(f"  incremental: {incremental_s * 1000:9.1f} ms  {full_s / incremental_s:6.1f}x  "
+                  f"identical: {incremental == full}")
+            print(f"  window     : {window_s * 1000:9.1f} ms  "
+                  f"identical: {windowed.to_analysis(NEIGHBORHOOD, '-') == window_full.to_analysis(NEIGHBORHOOD, '-')}")
+            db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark metro-wide sentiment refreshes across worker processes.
+
+serial  - SentimentAnalyzer.analyze_neighborhood for each neighborhood in
+          turn, in this process.
+N       - SentimentAnalyzer.analyze_neighborhoods(workers=N): posts are
+          split into --shard-size shards, aggregated in N spawned worker
+          processes and merged in post order.
+
+Every parallel result is checked against the serial one. Speedup is
+bounded by the CPUs available (printed first).
+
+Usage:
+    python benchmarks/bench_sentiment_workers.py --neighborhoods 200 --posts 250 --workers 1 2 4 8
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.sentiment_analyzer import SentimentAnalyzer  # noqa: E402
+from src.data_management.neighborhood_db import get_neighborhood_db  # noqa: E402
+from bench_sentiment_engine import make_posts as make_texts  # noqa: E402
+
+
+def seed(db, neighborhoods, posts_per, seed_value):
+    texts = make_texts(neighborhoods * posts_per, seed_value)
+    now = datetime.now()
+    for n in range(neighborhoods):
+        name = f"{30000 + n}"
+        db.insert_posts({**texts[n * posts_per + i], "neighborhood": name, "url": f"https://example.com/{name}/{i}",
+                         "post_date": None, "crawl_date": (now - timedelta(minutes=i)).isoformat(), "metadata": "{}"}
+                        for i in range(posts_per))
+    return [f"{30000 + n}" for n in range(neighborhoods)]
+
+
+def strip_date(results):
+    return {name: {k: v for k, v in analysis.items() if k != "analysis_date"} for name, analysis in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--neighborhoods', type=int, default=200)
+    parser.add_argument('--posts', type=int, default=250, help='Posts per neighborhood')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--shard-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    total = args.neighborhoods * args.posts
+    print(f"{args.neighborhoods} neighborhoods x {args.posts} posts = {total} posts, {os.cpu_count()} CPUs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "neighborhood.db")
+        neighborhoods = seed(get_neighborhood_db(path), args.neighborhoods, args.posts, args.seed)
+        analyzer = SentimentAnalyzer(path)
+
+        start = time.perf_counter()
+        serial = {name: analyzer.analyze_neighborhood(name, force_refresh=True) for name in neighborhoods}
+        serial_s = time.perf_counter() - start
+        print(f"  serial   : {serial_s:7.2f}s  {total / serial_s:8.0f} posts/s")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            results = analyzer.analyze_neighborhoods(neighborhoods, force_refresh=True, workers=workers,
+                                                     shard_size=args.shard_size)
+            elapsed = time.perf_counter() - start
+            print(f"  {workers} worker{'s' if workers > 1 else ' '}: {elapsed:7.2f}s  {total / elapsed:8.0f} posts/s  "
+                  f"{serial_s / elapsed:5.2f}x  identical: {strip_date(results) == strip_date(serial)}")
+
+
+if __name__ == '__main__':
+    main()
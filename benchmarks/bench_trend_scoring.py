@@ -0,0 +1,83 @@
+"""
+Benchmark nationwide trend scoring: per-region loop vs one batch pass.
+
+Writes a synthetic Zillow ZHVI CSV (~900 metros by default), then times
+calling MarketTrendAnalyzer.get_trend_score for every region against a
+single score_all_regions() call, and checks both agree.
+
+Usage:
+    python benchmarks/bench_trend_scoring.py --regions 900 --months 36
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.market_trend import MarketTrendAnalyzer  # noqa: E402
+
+
+def write_zhvi(path: str, n_regions: int, n_months: int, seed: int = 0) -> None:
+    """Write a Zillow-shaped CSV with noisy growth and some missing months."""
+    rng = np.random.default_rng(seed)
+    growth = rng.uniform(-0.01, 0.02, size=(n_regions, 1))
+    noise = rng.normal(0, 0.01, size=(n_regions, n_months))
+    prices = 250000 * np.cumprod(1 + growth + noise, axis=1)
+    prices[rng.random(prices.shape) < 0.02] = np.nan
+
+    df = pd.DataFrame(prices, columns=pd.period_range("2000-01", periods=n_months, freq="M").astype(str))
+    df.insert(0, "RegionID", np.arange(n_regions))
+    df.insert(1, "SizeRank", np.arange(n_regions))
+    df.insert(2, "RegionName", [f"Metro {i}, ST" for i in range(n_regions)])
+    df.insert(3, "RegionType", "msa")
+    df.insert(4, "StateName", "ST")
+    df.to_csv(path, index=False)
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--regions', type=int, default=900)
+    parser.add_argument('--history', type=int, default=300, help='Months of history in the CSV')
+    parser.add_argument('--months', type=int, default=36, help='Scoring window')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'Metro_zhvi.csv')
+        write_zhvi(path, args.regions, args.history)
+        analyzer = MarketTrendAnalyzer(path)
+        regions = analyzer.trend_store.regions
+
+        loop = best_of(lambda: [analyzer.get_trend_score(r, args.months) for r in regions], args.repeat)
+        batch = best_of(lambda: analyzer.score_all_regions(args.months), args.repeat)
+
+        scores = analyzer.score_all_regions(args.months)
+        mismatches = sum(
+            1 for r in regions
+            if analyzer.get_trend_score(r, args.months).trend_score != scores.at[r, 'trend_score']
+        )
+
+    print(f"{args.regions} regions x {args.history} months, window {args.months}")
+    print(f"  per-region loop   : {loop * 1000:9.2f} ms  ({loop / args.regions * 1e6:.1f} µs/region)")
+    print(f"  score_all_regions : {batch * 1000:9.2f} ms  ({batch / args.regions * 1e6:.1f} µs/region)")
+    print(f"  speedup           : {loop / batch:9.1f}x")
+    print(f"  mismatches        : {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark UsageTracker call recording: per-call Excel appends vs the
+buffered append-only usage log.
+
+legacy  - the previous UsageTracker storage path: every tracked call opens
+          usage_tracking.xlsx with ExcelWriter(mode='a'), and every
+          completed address re-reads the workbook to rebuild the daily and
+          endpoint summaries. Run on --baseline-calls and extrapolated,
+          since its cost grows with the file.
+new     - UsageTracker over UsageLog for --calls calls, then get_stats()
+          and a one-off Excel export.
+
+Requires openpyxl for the legacy path and the export.
+
+Usage:
+    python benchmarks/bench_usage_log.py --calls 100000 --baseline-calls 300
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.accounting import UsageAccounting  # noqa: E402
+from src.utils.tracker import UsageTracker  # noqa: E402
+
+ENDPOINTS = ['property_details', 'owner_info', 'market_data', 'foreclosure', 'liens', 'tax']
+
+
+class LegacyExcelStore:
+    """The pre-log storage path from UsageTracker."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        sheets = {
+            'api_usage': ['timestamp', 'endpoint', 'address', 'success', 'response_time', 'cost', 'data_source'],
+            'daily_summary': ['date', 'total_requests', 'success_rate', 'total_cost', 'avg_response_time'],
+            'endpoint_stats': ['endpoint', 'total_calls', 'success_rate', 'avg_cost', 'avg_response_time']
+        }
+        with pd.ExcelWriter(path) as writer:
+            for sheet, columns in sheets.items():
+                pd.DataFrame(columns=columns).to_excel(writer, sheet_name=sheet, index=False)
+        self.rows = 0
+
+    def store_api_call(self, **row):
+        with pd.ExcelWriter(self.path, mode='a', if_sheet_exists='overlay') as writer:
+            pd.DataFrame([row]).to_excel(writer, sheet_name='api_usage', header=False,
+                                         index=False, startrow=self.rows + 1)
+        self.rows += 1
+
+    def complete_tracking(self):
+        df = pd.read_excel(self.path, sheet_name='api_usage')
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        today = df[df['timestamp'].dt.date == datetime.now().date()]
+        summary = pd.DataFrame([{'date': datetime.now().date(), 'total_requests': len(today),
+                                 'success_rate': today['success'].mean() * 100,
+                                 'total_cost': today['cost'].sum(),
+                                 'avg_response_time': today['response_time'].mean()}])
+        with pd.ExcelWriter(self.path, mode='a', if_sheet_exists='overlay') as writer:
+            summary.to_excel(writer, sheet_name='daily_summary', header=False, index=False)
+        stats = df.groupby('endpoint').agg(total_calls=('endpoint', 'count'), success_rate=('success', 'mean'),
+                                           avg_cost=('cost', 'mean'), avg_response_time=('response_time', 'mean'))
+        with pd.ExcelWriter(self.path, mode='a', if_sheet_exists='replace') as writer:
+            stats.reset_index().to_excel(writer, sheet_name='endpoint_stats', index=False)
+
+
+def make_calls(n: int, rng: random.Random):
+    """Calls grouped by address, a few endpoints per address."""
+    calls = []
+    while len(calls) < n:
+        address = f"{rng.randint(1, 9999)} Peachtree St"
+        for endpoint in rng.sample(ENDPOINTS, rng.randint(1, 4)):
+            calls.append((address, endpoint, rng.random() > 0.05, rng.choice(['attom', 'redfin'])))
+    return calls[:n]
+
+
+def run_legacy(calls, path: Path):
+    store = LegacyExcelStore(path)
+    start = time.perf_counter()
+    for i, (address, endpoint, success, source) in enumerate(calls):
+        store.store_api_call(timestamp=datetime.now(), endpoint=endpoint, address=address, success=success,
+                             response_time=0.1, cost=0.04, data_source=source)
+        if i + 1 == len(calls) or calls[i + 1][0] != address:
+            store.complete_tracking()
+    return time.perf_counter() - start
+
+
+def run_new(calls, data_dir: Path):
+    tracker = UsageTracker(data_dir=data_dir, accounting=UsageAccounting(None))
+    start = time.perf_counter()
+    for i, (address, endpoint, success, source) in enumerate(calls):
+        tracker.track_api_call(address, endpoint, success, source)
+        if i + 1 == len(calls) or calls[i + 1][0] != address:
+            tracker.complete_tracking(address, True)
+    record_time = time.perf_counter() - start
+    stats_start = time.perf_counter()
+    stats = tracker.get_stats()
+    stats_time = time.perf_counter() - stats_start
+    return record_time, stats_time, stats, tracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=100_000)
+    parser.add_argument('--baseline-calls', type=int, default=300,
+                        help='Calls to run through the legacy Excel path (extrapolated)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    calls = make_calls(args.calls, random.Random(args.seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        record_time, stats_time, stats, tracker = run_new(calls, tmp / 'new')
+        export_start = time.perf_counter()
+        try:
+            tracker.export_excel(tmp / 'export.xlsx')
+            export_time = time.perf_counter() - export_start
+        except ImportError:
+            export_time = None
+        tracker.close()
+
+        print(f"{args.calls} tracked calls")
+        print(f"  {'new: record':<28}: {record_time:8.2f} s  ({args.calls / record_time:9.0f} calls/s, "
+              f"{record_time / args.calls * 1e6:7.1f} us/call)")
+        print(f"  {'new: get_stats':<28}: {stats_time * 1000:8.2f} ms  ({stats['daily']['requests']} calls today)")
+        if export_time is not None:
+            print(f"  {'new: Excel export':<28}: {export_time:8.2f} s")
+
+        try:
+            legacy_time = run_legacy(calls[:args.baseline_calls], tmp / 'legacy.xlsx')
+        except ImportError as e:
+            print(f"  legacy path skipped: {e}")
+            return
+        per_call = legacy_time / args.baseline_calls
+        print(f"  {'legacy (' + str(args.baseline_calls) + ' calls)':<28}: {legacy_time:8.2f} s  "
+              f"({per_call * 1000:7.1f} ms/call, growing with file size)")
+        print(f"  {'legacy estimate (' + str(args.calls) + ')':<28}: {per_call * args.calls:8.0f} s  "
+              f"(lower bound, linear extrapolation)")
+        print(f"  {'speedup (lower bound)':<28}: {per_call * args.calls / record_time:8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,8 @@ from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 import logging
 
+from src.integrations.http_pool import get_sync_pool
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +28,8 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DEFAULT_MODEL = os.getenv("DEFAULT_LLM_MODEL", "gpt-4")
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "1000"))
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
+# Seconds to wait for a completion; long generations outlast the pool's default
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "300"))
 
 class LLMClient:
     """Client for interacting with Large Language Models."""
@@ -72,10 +76,12 @@ class LLMClient:
                 "temperature": temperature
             }
             
-            response = requests.post(
+            pool = get_sync_pool()
+            response = pool.post(
                 "https://api.openai.com/v1/chat/completions",
                 headers=headers,
-                json=payload
+                json=payload,
+                timeout=(pool.config.connect_timeout, LLM_READ_TIMEOUT)
             )
             
             response.raise_for_status()
@@ -21,6 +21,7 @@ logger = logging.getLogger(__name__)
 from src.advanced.agent_router import ManusAgentRouter, choose_agent_source
 from src.advanced.refresh_agent import SentimentRefreshAgent
 from src.advanced.reputation_index import NeighborhoodReputationIndex
+from src.utils.executor import run_blocking
 
 
 async def run_neighborhood_analysis(zip_code: str) -> Dict[str, Any]:
@@ -54,7 +55,7 @@ async def run_neighborhood_analysis(zip_code: str) -> Dict[str, Any]:
     
     print(f"📊 Computing reputation score...")
     reputation_index = NeighborhoodReputationIndex()
-    index_result = reputation_index.compute_reputation_index(zip_code)
+    index_result = await run_blocking(reputation_index.compute_reputation_index, zip_code)
     
     # Report the source result back to the router
     success = index_result.get('confidence_score', 0) > 0.3  # Consider it successful if we got a decent confidence score
@@ -4,14 +4,16 @@ Sentiment Refresh Agent
 This module provides functionality to automatically refresh neighborhood sentiment data
 based on age, importance, and user activity. It implements a smart refresh strategy
 that prioritizes neighborhoods that are frequently accessed or have stale data.
+Refreshes run on the process-wide RefreshScheduler, concurrently and without
+duplicating refreshes the neighborhood cache already queued.
 """
 
 import asyncio
+import heapq
 import json
 import logging
 import os
 import random
-import sqlite3
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple, Set
@@ -33,19 +35,25 @@ if sys_path not in sys.path:
 
 from src.data_collection.neighborhood_crawler import NeighborhoodCrawler
 from src.analysis.sentiment_analyzer import SentimentAnalyzer
+from src.data_management.neighborhood_db import get_neighborhood_db
+from src.data_management.refresh_scheduler import (FOREGROUND_PRIORITY, RefreshScheduler, get_refresh_scheduler,
+                                                   refresh_priority, staleness_days)
+from src.utils.executor import run_blocking
 
 
 class SentimentRefreshAgent:
     """Agent that manages the automatic refresh of neighborhood sentiment data."""
     
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: str = DB_PATH, scheduler: Optional[RefreshScheduler] = None):
         """
         Initialize the sentiment refresh agent.
         
         Args:
             db_path: Path to the SQLite database with neighborhood data
+            scheduler: Scheduler to run batch refreshes on (defaults to the shared one)
         """
         self.db_path = db_path
+        self.scheduler = scheduler or get_refresh_scheduler()
         self.crawler = NeighborhoodCrawler(db_path)
         self.analyzer = SentimentAnalyzer(db_path)
         self._ensure_refresh_table()
@@ -54,23 +62,7 @@ class SentimentRefreshAgent:
         """
         Ensure the refresh tracking table exists in the database.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS refresh_tracking (
-            neighborhood TEXT PRIMARY KEY,
-            city TEXT,
-            last_refresh TEXT,
-            last_access TEXT,
-            access_count INTEGER DEFAULT 0,
-            priority INTEGER DEFAULT 0,
-            status TEXT DEFAULT 'idle'
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        self.db = get_neighborhood_db(self.db_path)
     
     def get_cached_sentiment(self, zip_code: str) -> Optional[Dict[str, Any]]:
         """
@@ -82,41 +74,13 @@ class SentimentRefreshAgent:
         Returns:
             Dictionary with cached sentiment data or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Try to find by exact match
-        cursor.execute('''
-        SELECT n.*, s.analysis_data
-        FROM neighborhood_cache n
-        LEFT JOIN sentiment_analysis s ON n.neighborhood = s.neighborhood
-        WHERE n.neighborhood = ? OR n.city = ?
-        ''', (zip_code, zip_code))
-        
-        row = cursor.fetchone()
-        
-        # If not found, try to find by ZIP code prefix
-        if not row and zip_code.isdigit():
-            zip_prefix = zip_code[:3] if len(zip_code) >= 3 else zip_code
-            cursor.execute('''
-            SELECT n.*, s.analysis_data
-            FROM neighborhood_cache n
-            LEFT JOIN sentiment_analysis s ON n.neighborhood = s.neighborhood
-            WHERE n.neighborhood LIKE ? OR n.city LIKE ?
-            LIMIT 1
-            ''', (f"{zip_prefix}%", f"{zip_prefix}%"))
-            
-            row = cursor.fetchone()
+        # Try to find by exact match, then by ZIP code prefix
+        zip_prefix = zip_code[:3] if zip_code.isdigit() else None
+        data = self.db.find_cache_entry(zip_code, zip_prefix, with_sentiment=True)
         
-        conn.close()
-        
-        if not row:
+        if not data:
             return None
         
-        # Convert row to dictionary
-        data = dict(row)
-        
         # Parse JSON data
         if 'data' in data and data['data']:
             try:
@@ -155,36 +119,8 @@ class SentimentRefreshAgent:
             neighborhood: The neighborhood name or ZIP code
             city: The city containing the neighborhood (optional)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check if neighborhood exists in tracking table
-        cursor.execute('''
-        SELECT access_count FROM refresh_tracking
-        WHERE neighborhood = ?
-        ''', (neighborhood,))
-        
-        row = cursor.fetchone()
-        
-        now = datetime.now().isoformat()
-        
-        if row:
-            # Update existing record
-            cursor.execute('''
-            UPDATE refresh_tracking
-            SET last_access = ?, access_count = access_count + 1
-            WHERE neighborhood = ?
-            ''', (now, neighborhood))
-        else:
-            # Insert new record
-            cursor.execute('''
-            INSERT INTO refresh_tracking
-            (neighborhood, city, last_access, access_count)
-            VALUES (?, ?, ?, 1)
-            ''', (neighborhood, city, now))
-        
-        conn.commit()
-        conn.close()
+        # Insert or bump the access count in one statement
+        self.db.record_access(neighborhood, city, datetime.now().isoformat())
     
     async def refresh_sentiment_for_zip(self, zip_code: str, city: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
         """
@@ -219,8 +155,8 @@ class SentimentRefreshAgent:
             logger.info(f"Refreshing sentiment data for {zip_code}")
             posts = await self.crawler.crawl_neighborhood(zip_code, city, force_refresh=True)
             
-            # Analyze the data
-            analysis = self.analyzer.analyze_neighborhood(zip_code, force_refresh=True)
+            # Analyze the data off the event loop; scoring is CPU bound
+            analysis = await run_blocking(self.analyzer.analyze_neighborhood, zip_code, force_refresh=True)
             
             # Extract summary and score
             summary = self.analyzer.generate_text_summary(analysis)
@@ -265,17 +201,7 @@ class SentimentRefreshAgent:
             neighborhood: The neighborhood name or ZIP code
             status: The refresh status (idle, refreshing, error)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        UPDATE refresh_tracking
-        SET status = ?
-        WHERE neighborhood = ?
-        ''', (status, neighborhood))
-        
-        conn.commit()
-        conn.close()
+        self.db.set_tracking_status(neighborhood, status)
     
     def _update_refresh_tracking(self, neighborhood: str, city: Optional[str] = None):
         """
@@ -285,26 +211,8 @@ class SentimentRefreshAgent:
             neighborhood: The neighborhood name or ZIP code
             city: The city containing the neighborhood (optional)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        now = datetime.now().isoformat()
-        
-        cursor.execute('''
-        INSERT OR REPLACE INTO refresh_tracking
-        (neighborhood, city, last_refresh, last_access, access_count, status)
-        VALUES (
-            ?,
-            ?,
-            ?,
-            (SELECT last_access FROM refresh_tracking WHERE neighborhood = ?),
-            (SELECT access_count FROM refresh_tracking WHERE neighborhood = ?),
-            'idle'
-        )
-        ''', (neighborhood, city, now, neighborhood, neighborhood))
-        
-        conn.commit()
-        conn.close()
+        # Keeps access tracking for the neighborhood
+        self.db.mark_refreshed(neighborhood, city, datetime.now().isoformat())
     
     def get_neighborhoods_to_refresh(self, limit: int = 10) -> List[Tuple[str, Optional[str]]]:
         """
@@ -316,33 +224,22 @@ class SentimentRefreshAgent:
         Returns:
             List of (neighborhood, city) tuples
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get neighborhoods from cache table that haven't been refreshed recently
-        # or have high access counts
-        cursor.execute('''
-        SELECT n.neighborhood, n.city, 
-               COALESCE(r.last_refresh, '2000-01-01') as last_refresh,
-               COALESCE(r.access_count, 0) as access_count,
-               COALESCE(r.status, 'idle') as status
-        FROM neighborhood_cache n
-        LEFT JOIN refresh_tracking r ON n.neighborhood = r.neighborhood
-        WHERE r.status IS NULL OR r.status = 'idle' OR r.status = 'error'
-        ORDER BY 
-            CASE 
-                WHEN julianday('now') - julianday(last_refresh) > 30 THEN 3  -- Very old (>30 days)
-                WHEN julianday('now') - julianday(last_refresh) > 14 THEN 2  -- Old (>14 days)
-                ELSE 1  -- Relatively fresh
-            END DESC,
-            access_count DESC
-        LIMIT ?
-        ''', (limit,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        return [(neighborhood, city) for _, neighborhood, city in self._prioritized_candidates(limit)]
+    
+    def _prioritized_candidates(self, limit: int) -> List[Tuple[float, str, Optional[str]]]:
+        """
+        Get the highest priority refresh candidates.
         
-        return [(row[0], row[1]) for row in rows]
+        Args:
+            limit: Maximum number of neighborhoods to return
+            
+        Returns:
+            List of (priority, neighborhood, city) tuples, highest priority first
+        """
+        now = datetime.now()
+        candidates = ((refresh_priority(staleness_days(last_refresh, now), access_count), neighborhood, city)
+                      for neighborhood, city, last_refresh, access_count in self.db.refresh_candidates())
+        return heapq.nlargest(limit, candidates, key=lambda candidate: candidate[0])
     
     async def refresh_batch(self, limit: int = 5) -> Dict[str, Any]:
         """
@@ -354,21 +251,25 @@ class SentimentRefreshAgent:
         Returns:
             Dictionary with batch refresh results
         """
-        neighborhoods = self.get_neighborhoods_to_refresh(limit)
+        candidates = self._prioritized_candidates(limit)
         
-        if not neighborhoods:
+        if not candidates:
             logger.info("No neighborhoods need refreshing")
             return {
                 "refreshed": 0,
+                "total": 0,
                 "neighborhoods": []
             }
         
-        logger.info(f"Refreshing {len(neighborhoods)} neighborhoods")
+        logger.info(f"Refreshing {len(candidates)} neighborhoods")
         
-        results = []
-        for neighborhood, city in neighborhoods:
-            result = await self.refresh_sentiment_for_zip(neighborhood, city)
-            results.append(result)
+        # Submit the whole batch so the scheduler's workers refresh it concurrently
+        futures = [asyncio.wrap_future(self.scheduler.submit(neighborhood, city, self.refresh_sentiment_for_zip,
+                                                             priority))
+                   for priority, neighborhood, city in candidates]
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+        results = [self._batch_result(neighborhood, city, outcome)
+                   for (_, neighborhood, city), outcome in zip(candidates, outcomes)]
         
         refreshed_count = sum(1 for r in results if r.get('refreshed', False))
         
@@ -378,6 +279,38 @@ class SentimentRefreshAgent:
             "neighborhoods": results
         }
     
+    def _batch_result(self, neighborhood: str, city: Optional[str], outcome: Any) -> Dict[str, Any]:
+        """
+        Normalize the outcome of a scheduled refresh to a refresh result.
+        
+        Args:
+            neighborhood: The neighborhood that was refreshed
+            city: The city containing the neighborhood (optional)
+            outcome: The refresh result, or the exception it raised
+            
+        Returns:
+            Dictionary with refresh results
+        """
+        if isinstance(outcome, BaseException):
+            return {
+                "refreshed": False,
+                "reason": "error",
+                "neighborhood": neighborhood,
+                "city": city,
+                "error": str(outcome)
+            }
+        if isinstance(outcome, dict) and "refreshed" in outcome:
+            return outcome
+        
+        # Shared with a refresh another component queued, which doesn't track refreshes
+        self._update_refresh_tracking(neighborhood, city)
+        return {
+            "refreshed": True,
+            "neighborhood": neighborhood,
+            "city": city,
+            "post_count": outcome.get("post_count") if isinstance(outcome, dict) else None
+        }
+    
     async def start_refresh_daemon(self, interval_minutes: int = 60, batch_size: int = 5):
         """
         Start a daemon process that periodically refreshes neighborhood data.
@@ -393,6 +326,9 @@ class SentimentRefreshAgent:
                 logger.info("Starting refresh cycle")
                 result = await self.refresh_batch(batch_size)
                 logger.info(f"Refresh cycle completed: {result['refreshed']}/{result['total']} neighborhoods refreshed")
+                metrics = self.scheduler.metrics()
+                logger.info(f"Refresh queue depth {metrics['queue_depth']}, "
+                            f"p95 latency {metrics['latency'].get('p95', 0):.1f}s")
             except Exception as e:
                 logger.error(f"Error in refresh cycle: {str(e)}")
             
@@ -405,6 +341,9 @@ async def refresh_sentiment_for_zip(zip_code: str, city: Optional[str] = None, f
     """
     Refresh sentiment data for a ZIP code or neighborhood.
     
+    The refresh runs on the shared scheduler ahead of background refreshes,
+    sharing one that is already queued or running for the neighborhood.
+    
     Args:
         zip_code: The ZIP code or neighborhood name to refresh
         city: The city containing the neighborhood (optional)
@@ -414,7 +353,16 @@ async def refresh_sentiment_for_zip(zip_code: str, city: Optional[str] = None, f
         Dictionary with refresh results
     """
     agent = SentimentRefreshAgent()
-    return await agent.refresh_sentiment_for_zip(zip_code, city, force)
+    
+    async def refresh(neighborhood: str, city: Optional[str]) -> Dict[str, Any]:
+        return await agent.refresh_sentiment_for_zip(neighborhood, city, force)
+    
+    future = agent.scheduler.submit(zip_code, city, refresh, FOREGROUND_PRIORITY)
+    try:
+        outcome = await asyncio.wrap_future(future)
+    except Exception as e:
+        outcome = e
+    return agent._batch_result(zip_code, city, outcome)
 
 
 async def main():
@@ -11,7 +11,7 @@ across different neighborhoods and regions.
 import json
 import logging
 import os
-import sqlite3
+import sys
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 
@@ -20,6 +20,13 @@ logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Ensure project directory is in path
+sys_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if sys_path not in sys.path:
+    sys.path.append(sys_path)
+
+from src.data_management.neighborhood_db import get_neighborhood_db
+
 # Database setup
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                       'data', 'neighborhood_data.db')
@@ -42,25 +49,7 @@ class ReputationIndex:
         """
         Ensure the reputation index table exists in the database.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS reputation_index (
-            zip_code TEXT PRIMARY KEY,
-            neighborhood TEXT,
-            city TEXT,
-            index_score REAL,
-            data_volume INTEGER,
-            data_freshness INTEGER,
-            sentiment_score REAL,
-            last_updated TEXT,
-            metadata TEXT
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        self.db = get_neighborhood_db(self.db_path)
     
     def get_cached_sentiment(self, zip_code: str) -> Optional[Dict[str, Any]]:
         """
@@ -72,36 +61,13 @@ class ReputationIndex:
         Returns:
             Dictionary with cached sentiment data or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        # Try to find by exact ZIP code match, then by ZIP code prefix (first 3 digits)
+        zip_prefix = zip_code[:3]
+        data = self.db.find_cache_entry(zip_code, zip_prefix)
         
-        # First try to find by exact ZIP code match
-        cursor.execute('''
-        SELECT * FROM neighborhood_cache
-        WHERE neighborhood = ? OR city = ?
-        ''', (zip_code, zip_code))
-        
-        row = cursor.fetchone()
-        
-        if not row:
-            # Try to find by ZIP code prefix (first 3 digits)
-            zip_prefix = zip_code[:3] if len(zip_code) >= 3 else zip_code
-            cursor.execute('''
-            SELECT * FROM neighborhood_cache
-            WHERE neighborhood LIKE ? OR city LIKE ?
-            ''', (f"{zip_prefix}%", f"{zip_prefix}%"))
-            
-            row = cursor.fetchone()
-        
-        conn.close()
-        
-        if not row:
+        if not data:
             return None
         
-        # Convert row to dictionary
-        data = dict(row)
-        
         # Parse JSON data
         if 'data' in data and data['data']:
             try:
@@ -120,46 +86,21 @@ class ReputationIndex:
             data['age_days'] = 30
         
         # Get post count
-        cursor = conn.cursor()
-        cursor.execute('''
-        SELECT COUNT(*) FROM neighborhood_posts
-        WHERE neighborhood = ? OR neighborhood LIKE ?
-        ''', (zip_code, f"{zip_prefix}%"))
+        data['posts'] = self.db.count_posts_matching(zip_code, zip_prefix)
         
-        post_count = cursor.fetchone()[0]
-        data['posts'] = post_count
-        
-        # Get average sentiment score
-        cursor.execute('''
-        SELECT data FROM sentiment_analysis
-        WHERE neighborhood = ? OR neighborhood LIKE ?
-        ''', (zip_code, f"{zip_prefix}%"))
-        
-        row = cursor.fetchone()
-        if row and row[0]:
+        # Get average sentiment score and summary if available
+        analysis_json = self.db.find_sentiment(zip_code, zip_prefix)
+        if analysis_json:
             try:
-                sentiment_data = json.loads(row[0])
-                overall_sentiment = sentiment_data.get('overall_sentiment', {})
+                analysis_data = json.loads(analysis_json)
+                overall_sentiment = analysis_data.get('overall_sentiment', {})
                 data['avg_score'] = overall_sentiment.get('score', 0) * 50 + 50  # Convert from [-1,1] to [0,100]
-            except (json.JSONDecodeError, KeyError):
-                data['avg_score'] = 50  # Default to neutral if parsing fails
-        else:
-            data['avg_score'] = 50
-        
-        # Get summary if available
-        cursor.execute('''
-        SELECT analysis_data FROM sentiment_analysis
-        WHERE neighborhood = ? OR neighborhood LIKE ?
-        ''', (zip_code, f"{zip_prefix}%"))
-        
-        row = cursor.fetchone()
-        if row and row[0]:
-            try:
-                analysis_data = json.loads(row[0])
                 data['summary'] = analysis_data.get('summary', '')
             except json.JSONDecodeError:
+                data['avg_score'] = 50  # Default to neutral if parsing fails
                 data['summary'] = ''
         else:
+            data['avg_score'] = 50
             data['summary'] = ''
         
         return data
@@ -237,15 +178,7 @@ class ReputationIndex:
         Args:
             index_data: Dictionary with index data
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT OR REPLACE INTO reputation_index
-        (zip_code, neighborhood, city, index_score, data_volume, data_freshness, 
-         sentiment_score, last_updated, metadata)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        self.db.put_reputation_index((
             index_data['zip'],
             index_data.get('neighborhood', index_data['zip']),
             index_data.get('city', ''),
@@ -256,9 +189,6 @@ class ReputationIndex:
             datetime.now().isoformat(),
             json.dumps(index_data['components'])
         ))
-        
-        conn.commit()
-        conn.close()
     
     def get_stored_index(self, zip_code: str) -> Optional[Dict[str, Any]]:
         """
@@ -270,24 +200,11 @@ class ReputationIndex:
         Returns:
             Dictionary with reputation index or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        result = self.db.get_reputation_index(zip_code)
         
-        cursor.execute('''
-        SELECT * FROM reputation_index
-        WHERE zip_code = ?
-        ''', (zip_code,))
-        
-        row = cursor.fetchone()
-        conn.close()
-        
-        if not row:
+        if not result:
             return None
         
-        # Convert row to dictionary
-        result = dict(row)
-        
         # Parse metadata JSON
         if 'metadata' in result and result['metadata']:
             try:
@@ -1,8 +1,10 @@
 """Automated Comparative Market Analysis (CMA) system."""
 import numpy as np
 import pandas as pd
-from sklearn.neighbors import NearestNeighbors
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+from .comps_index import CompsIndex
 
 class CMAAnalyzer:
     def __init__(self, config: Optional[Dict] = None):
@@ -16,10 +18,35 @@ class CMAAnalyzer:
             'condition': 0.15,
             'location': 0.10
         }
+        # Spatial indexes for recently used comps datasets, most recent last
+        self._indexes: "OrderedDict[int, CompsIndex]" = OrderedDict()
+        self.max_indexes = self.config.get('max_comps_indexes', 4)
+        
+    def get_comps_index(self, properties: Union[pd.DataFrame, CompsIndex]) -> CompsIndex:
+        """Get the spatial index for a comps dataset, building it on first use.
+        
+        Indexes are cached per DataFrame object, so build a new DataFrame (or
+        pass a CompsIndex) rather than editing coordinates in place.
+        """
+        if isinstance(properties, CompsIndex):
+            return properties
+            
+        key = id(properties)
+        index = self._indexes.get(key)
+        if index is not None and index.properties is properties and len(index) == len(properties):
+            self._indexes.move_to_end(key)
+            return index
+            
+        index = CompsIndex(properties)
+        self._indexes[key] = index
+        self._indexes.move_to_end(key)
+        while len(self._indexes) > self.max_indexes:
+            self._indexes.popitem(last=False)
+        return index
         
     def generate_cma(self,
                     target_property: Dict,
-                    comparable_properties: pd.DataFrame,
+                    comparable_properties: Union[pd.DataFrame, CompsIndex],
                     market_data: pd.DataFrame,
                     radius_miles: float = 1.0,
                     max_comps: int = 5) -> Dict:
@@ -32,24 +59,69 @@ class CMAAnalyzer:
             max_comps
         )
         
+        return self._build_report(
+            target_property,
+            comps,
+            market_data,
+            self._analyze_market_conditions(market_data, target_property)
+        )
+    
+    def generate_cma_batch(self,
+                          target_properties: List[Dict],
+                          comparable_properties: Union[pd.DataFrame, CompsIndex],
+                          market_data: pd.DataFrame,
+                          radius_miles: float = 1.0,
+                          max_comps: int = 5) -> List[Dict]:
+        """Generate CMA reports for many targets against the same comps dataset.
+        
+        Runs one batched radius query for all targets and analyzes market
+        conditions once, since they don't depend on the target.
+        """
+        if not target_properties:
+            return []
+            
+        index = self.get_comps_index(comparable_properties)
+        matches = index.query_radius(
+            np.array([t['latitude'] for t in target_properties], dtype=float),
+            np.array([t['longitude'] for t in target_properties], dtype=float),
+            radius_miles
+        )
+        market_conditions = self._analyze_market_conditions(market_data, target_properties[0])
+        market_type = self._determine_market_type(market_data)
+        
+        reports = []
+        for target, (positions, distances) in zip(target_properties, matches):
+            comps = self._rank_comparables(target, index.rows(positions, distances), max_comps)
+            reports.append(self._build_report(
+                target, comps, market_data, dict(market_conditions), market_type
+            ))
+        return reports
+    
+    def _build_report(self,
+                     target: Dict,
+                     comps: pd.DataFrame,
+                     market_data: pd.DataFrame,
+                     market_conditions: Dict,
+                     market_type: Optional[str] = None) -> Dict:
+        """Assemble the CMA report for a target from its comparables."""
         # Calculate adjusted values
-        adjusted_comps = self._adjust_comparable_values(target_property, comps)
+        adjusted_comps = self._adjust_comparable_values(target, comps)
         
         # Generate CMA report
         report = {
-            'target_property': target_property,
+            'target_property': target,
             'comparable_properties': adjusted_comps.to_dict('records'),
-            'value_analysis': self._analyze_value(target_property, adjusted_comps),
-            'market_conditions': self._analyze_market_conditions(market_data, target_property),
-            'price_insights': self._generate_price_insights(target_property, adjusted_comps),
-            'recommendations': self._generate_recommendations(target_property, adjusted_comps, market_data)
+            'value_analysis': self._analyze_value(target, adjusted_comps),
+            'market_conditions': market_conditions,
+            'price_insights': self._generate_price_insights(target, adjusted_comps),
+            'recommendations': self._generate_recommendations(target, adjusted_comps, market_data, market_type)
         }
         
         return report
     
     def _find_comparables(self,
                          target: Dict,
-                         properties: pd.DataFrame,
+                         properties: Union[pd.DataFrame, CompsIndex],
                          radius_miles: float,
                          max_comps: int) -> pd.DataFrame:
         """Find most similar properties within specified radius."""
@@ -61,45 +133,41 @@ class CMAAnalyzer:
             radius_miles
         )
         
+        return self._rank_comparables(target, nearby, max_comps)
+    
+    def _rank_comparables(self,
+                         target: Dict,
+                         nearby: pd.DataFrame,
+                         max_comps: int) -> pd.DataFrame:
+        """Pick the max_comps nearby properties most similar to the target."""
         if len(nearby) == 0:
             return pd.DataFrame()
             
         # Prepare features for similarity comparison
         features = self._prepare_comparison_features(nearby, target)
+        target_features = self._prepare_comparison_features(pd.DataFrame([target]), target)
         
-        # Find nearest neighbors
-        nbrs = NearestNeighbors(n_neighbors=min(max_comps, len(nearby)))
-        nbrs.fit(features)
-        
-        # Get indices of most similar properties
-        distances, indices = nbrs.kneighbors(
-            self._prepare_comparison_features(pd.DataFrame([target]), target)
-        )
+        # Nearest neighbors in feature space (a direct top-k; no model to fit per target)
+        distances = np.sqrt(((features - target_features) ** 2).sum(axis=1))
+        indices = np.argsort(distances, kind='stable')[:min(max_comps, len(nearby))]
+        distances = distances[indices]
         
         # Return comparable properties with similarity scores
-        comps = nearby.iloc[indices[0]].copy()
-        comps['similarity_score'] = 1 - (distances[0] / distances[0].max())
+        comps = nearby.iloc[indices].copy()
+        comps['similarity_score'] = 1 - (distances / distances.max())
         
         return comps
     
     def _filter_by_distance(self,
-                          properties: pd.DataFrame,
+                          properties: Union[pd.DataFrame, CompsIndex],
                           lat: float,
                           lon: float,
                           radius_miles: float) -> pd.DataFrame:
-        """Filter properties within specified radius."""
-        # Calculate distances using Haversine formula
-        R = 3959.87433  # Earth's radius in miles
-        
-        properties['distance'] = np.rad2deg(
-            np.arccos(
-                np.sin(np.deg2rad(lat)) * np.sin(np.deg2rad(properties['latitude'])) +
-                np.cos(np.deg2rad(lat)) * np.cos(np.deg2rad(properties['latitude'])) *
-                np.cos(np.deg2rad(properties['longitude'] - lon))
-            )
-        ) * R
+        """Filter properties within specified radius (haversine), adding a `distance` column.
         
-        return properties[properties['distance'] <= radius_miles]
+        Returns a copy; the caller's DataFrame is not modified.
+        """
+        return self.get_comps_index(properties).nearby(lat, lon, radius_miles)
     
     def _prepare_comparison_features(self,
                                    properties: pd.DataFrame,
@@ -111,14 +179,15 @@ class CMAAnalyzer:
             if feature == 'location':
                 # Location similarity based on distance
                 if 'distance' in properties.columns:
-                    feat = 1 - (properties['distance'] / properties['distance'].max())
+                    distance = properties['distance'].to_numpy(dtype=float)
+                    feat = 1 - (distance / np.nanmax(distance))
                 else:
                     feat = np.ones(len(properties))
             else:
-                feat = properties[feature]
+                feat = properties[feature].to_numpy(dtype=float)
                 
                 # Normalize feature
-                feat = (feat - feat.min()) / (feat.max() - feat.min() + 1e-10)
+                feat = (feat - np.nanmin(feat)) / (np.nanmax(feat) - np.nanmin(feat) + 1e-10)
                 
             features.append(feat * weight)
             
@@ -295,7 +364,8 @@ class CMAAnalyzer:
     def _generate_recommendations(self,
                                 target: Dict,
                                 comps: pd.DataFrame,
-                                market_data: pd.DataFrame) -> List[str]:
+                                market_data: pd.DataFrame,
+                                market_type: Optional[str] = None) -> List[str]:
         """Generate strategic recommendations."""
         recommendations = []
         
@@ -309,7 +379,7 @@ class CMAAnalyzer:
             recommendations.append("Property may be underpriced for its features")
             
         # Market timing
-        market_type = self._determine_market_type(market_data)
+        market_type = market_type or self._determine_market_type(market_data)
         if market_type == "Seller's Market":
             recommendations.append("Strong seller's market - consider aggressive pricing")
         elif market_type == "Buyer's Market":
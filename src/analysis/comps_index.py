@@ -0,0 +1,56 @@
+"""Spatial index for comparable property (comps) search."""
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+from typing import List, Tuple
+
+EARTH_RADIUS_MILES = 3959.87433
+
+class CompsIndex:
+    """Haversine BallTree over a property dataset, built once and queried many times.
+
+    The indexed DataFrame is never modified; query results are copies with a
+    `distance` column (miles) added. Rows without coordinates are skipped.
+    """
+
+    def __init__(self, properties: pd.DataFrame, leaf_size: int = 40):
+        self.properties = properties
+        coords = properties[['latitude', 'longitude']].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(coords).any(axis=1)
+        # Tree row i -> position in `properties`
+        self._positions = np.flatnonzero(valid)
+        self._tree = BallTree(np.deg2rad(coords[valid]), metric='haversine', leaf_size=leaf_size)
+
+    def __len__(self) -> int:
+        return len(self.properties)
+
+    def query_radius(self,
+                     lats: np.ndarray,
+                     lons: np.ndarray,
+                     radius_miles: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Find properties within a radius of each query point.
+
+        Returns one (positions, distances_miles) pair per query point, with
+        positions into `properties` in ascending (original row) order.
+        """
+        points = np.deg2rad(np.column_stack([np.atleast_1d(lats), np.atleast_1d(lons)]).astype(np.float64))
+        indices, distances = self._tree.query_radius(
+            points, r=radius_miles / EARTH_RADIUS_MILES, return_distance=True
+        )
+
+        results = []
+        for idx, dist in zip(indices, distances):
+            order = np.argsort(idx)
+            results.append((self._positions[idx[order]], dist[order] * EARTH_RADIUS_MILES))
+        return results
+
+    def nearby(self, lat: float, lon: float, radius_miles: float) -> pd.DataFrame:
+        """Get properties within a radius of a point, with a `distance` column."""
+        positions, distances = self.query_radius(lat, lon, radius_miles)[0]
+        return self.rows(positions, distances)
+
+    def rows(self, positions: np.ndarray, distances: np.ndarray) -> pd.DataFrame:
+        """Materialize a query result as a DataFrame copy with a `distance` column."""
+        rows = self.properties.iloc[positions].copy()
+        rows['distance'] = distances
+        return rows
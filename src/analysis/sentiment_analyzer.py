@@ -8,22 +8,38 @@ by the crawler and stored in the local database.
 
 import json
 import logging
+import multiprocessing
 import os
-import re
-import sqlite3
-from collections import Counter, defaultdict
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple, Set
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple, Set
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Ensure project directory is in path
+sys_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if sys_path not in sys.path:
+    sys.path.append(sys_path)
+
+from src.data_management.neighborhood_db import get_neighborhood_db
+from src.analysis.sentiment_engine import SentimentAggregate, SentimentBatchEngine, tokenize
+from src.modules.singleton import LazySingleton
+
 # Database setup - use the same path as the crawler
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                       'data', 'neighborhood_data.db')
 
+# Post fields analyze_post reads
+ANALYZED_POST_COLUMNS = ("id", "source", "title", "content")
+
+# Posts per unit of work when analyze_neighborhoods spreads neighborhoods over processes
+SHARD_SIZE = 5000
+
 # Sentiment analysis lexicons
 POSITIVE_TERMS = {
     # General positive terms
@@ -67,6 +83,26 @@ NEGATION_WORDS = {'not', 'no', "n't", 'never', 'none', 'nobody', 'nothing', 'nei
 # Intensifiers that strengthen sentiment
 INTENSIFIERS = {'very', 'really', 'extremely', 'incredibly', 'absolutely', 'completely', 'totally', 'utterly', 'highly', 'especially'}
 
+# Phrases made only of these words are not key phrases
+KEY_PHRASE_STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'of', 'is', 'are'}
+
+# Batch scoring engine shared by all analyzers, so the token vocabulary is built once
+_engine = LazySingleton(lambda: SentimentBatchEngine(POSITIVE_TERMS, NEGATIVE_TERMS, NEGATION_WORDS, INTENSIFIERS,
+                                                     ASPECT_CATEGORIES, KEY_PHRASE_STOP_WORDS))
+
+
+def _aggregate_shard(db_path: str, neighborhood: str, start: Optional[Tuple[str, int]] = None,
+                     stop: Optional[Tuple[str, int]] = None) -> SentimentAggregate:
+    """
+    Aggregate one shard of a neighborhood's posts (all of them by default).
+    
+    Runs in analyze_neighborhoods worker processes, which open their own
+    connection to the database.
+    """
+    posts = get_neighborhood_db(db_path).iter_posts(neighborhood, columns=ANALYZED_POST_COLUMNS,
+                                                    start=start, stop=stop)
+    return _engine.get().aggregate(posts)
+
 
 class SentimentAnalyzer:
     """Self-hosted sentiment analyzer for neighborhood data."""
@@ -85,19 +121,7 @@ class SentimentAnalyzer:
         """
         Ensure the sentiment cache table exists in the database.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sentiment_analysis (
-            neighborhood TEXT PRIMARY KEY,
-            analysis_data TEXT NOT NULL,
-            last_updated TEXT NOT NULL
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        self.db = get_neighborhood_db(self.db_path)
     
     def _tokenize_text(self, text: str) -> List[str]:
         """
@@ -109,19 +133,7 @@ class SentimentAnalyzer:
         Returns:
             List of tokens (words)
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Replace certain punctuation with spaces
-        text = re.sub(r'[,.;:!?()\[\]{}]', ' ', text)
-        
-        # Split on whitespace
-        tokens = text.split()
-        
-        # Remove tokens that are just numbers or single characters (except 'a' and 'i')
-        tokens = [t for t in tokens if not (t.isdigit() or (len(t) == 1 and t not in ['a', 'i']))]
-        
-        return tokens
+        return tokenize(text)
     
     def _analyze_sentiment_lexicon(self, tokens: List[str]) -> Dict[str, Any]:
         """
@@ -138,12 +150,14 @@ class SentimentAnalyzer:
         
         # Track whether we're in a negation context
         negation_active = False
+        negation_index = 0
         intensifier_active = False
         
         for i, token in enumerate(tokens):
             # Check for negation words
             if token in NEGATION_WORDS:
                 negation_active = True
+                negation_index = i
                 continue
                 
             # Check for intensifiers
@@ -151,8 +165,8 @@ class SentimentAnalyzer:
                 intensifier_active = True
                 continue
             
-            # Reset negation after 3 tokens or at punctuation
-            if negation_active and i > 0 and i - tokens.index(list(NEGATION_WORDS)[0]) > 3:
+            # Reset negation more than 3 tokens after the last negation word
+            if negation_active and i - negation_index > 3:
                 negation_active = False
             
             # Reset intensifier after the next token
@@ -278,9 +292,8 @@ class SentimentAnalyzer:
         all_phrases.sort(key=lambda x: x[1], reverse=True)
         
         # Filter out phrases with stop words only
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'of', 'is', 'are'}
         filtered_phrases = [phrase for phrase, count in all_phrases 
-                          if not all(word in stop_words for word in phrase.split())]
+                          if not all(word in KEY_PHRASE_STOP_WORDS for word in phrase.split())]
         
         return filtered_phrases[:top_n]
     
@@ -329,17 +342,43 @@ class SentimentAnalyzer:
             "key_phrases": key_phrases
         }
     
-    def analyze_neighborhood(self, neighborhood: str, force_refresh: bool = False) -> Dict[str, Any]:
+    def analyze_posts(self, posts: Iterable[Dict[str, Any]], batch_size: int = 1024) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze many posts with the vectorized batch engine.
+        
+        Args:
+            posts: Post dictionaries (any iterable, consumed lazily)
+            batch_size: Posts scored together per batch
+            
+        Yields:
+            One analysis per post, in order, identical to analyze_post
+        """
+        return _engine.get().analyze(posts, batch_size=batch_size)
+    
+    def analyze_neighborhood(self, neighborhood: str, force_refresh: bool = False,
+                             window_days: Optional[int] = None) -> Dict[str, Any]:
         """
         Analyze sentiment for a neighborhood using stored posts.
         
+        A fresh analysis updates the neighborhood's stored running aggregate
+        with the posts written since its last refresh instead of re-reading
+        every post (see _refresh_aggregate).
+        
         Args:
             neighborhood: The neighborhood to analyze
             force_refresh: Whether to force a fresh analysis even if cached
+            window_days: Only analyze posts first crawled in the last window_days
+                days; windowed analyses are always fresh and are not cached
             
         Returns:
             Dictionary with neighborhood sentiment analysis
         """
+        if window_days:
+            aggregate = self._refresh_aggregate(neighborhood, window_days)
+            if not aggregate.post_count:
+                return self._generate_empty_analysis(neighborhood)
+            return aggregate.to_analysis(neighborhood)
+        
         # Check for cached analysis unless force_refresh is True
         if not force_refresh:
             cached_analysis = self._get_cached_analysis(neighborhood)
@@ -347,19 +386,135 @@ class SentimentAnalyzer:
                 logger.info(f"Using cached sentiment analysis for {neighborhood}")
                 return cached_analysis
         
-        # Get posts for the neighborhood
-        posts = self._get_neighborhood_posts(neighborhood)
-        if not posts:
-            logger.warning(f"No posts found for {neighborhood}")
-            return self._generate_empty_analysis(neighborhood)
+        return self._finish_analysis(neighborhood, self._refresh_aggregate(neighborhood))
+    
+    def _refresh_aggregate(self, neighborhood: str, window_days: Optional[int] = None,
+                           now: Optional[datetime] = None) -> SentimentAggregate:
+        """
+        Bring a neighborhood's stored running aggregate up to date.
+        
+        The aggregate is stored with a watermark: the post revision and post
+        id it was computed at. Posts are only rescored when they were written
+        after the watermark, or when they have aged out of the time window
+        (first crawled at or before the new cutoff but after the stored one)
+        and their totals have to be subtracted. If a post the aggregate
+        already counts has had its text changed, or the lexicon has changed,
+        the old contribution can't be recovered and everything is recomputed.
+        
+        Args:
+            neighborhood: The neighborhood to refresh
+            window_days: Only count posts first crawled in the last window_days days
+            now: Time the window ends at (defaults to now)
+            
+        Returns:
+            The updated aggregate, equal to aggregating every post in the window
+        """
+        engine = _engine.get()
+        now = now or datetime.now()
+        window = window_days or 0
+        cutoff = (now - timedelta(days=window_days)).isoformat() if window_days else None
+        stored = self.db.get_sentiment_aggregate(neighborhood, window)
+        
+        with self.db.snapshot():
+            revision, max_post_id = self.db.post_watermark()
+            aggregate = None
+            # A cutoff earlier than the stored one would bring back posts the aggregate dropped
+            if stored and stored["lexicon"] == engine.fingerprint and (cutoff or "") >= (stored["cutoff"] or ""):
+                if self.db.has_edited_posts(neighborhood, stored["revision"], stored["max_post_id"]):
+                    logger.info(f"Posts for {neighborhood} changed since its last analysis, recomputing")
+                else:
+                    aggregate = SentimentAggregate.from_state(stored["state"])
+                    if cutoff:
+                        expired = self.db.iter_posts_first_crawled(neighborhood, stored["cutoff"], until=cutoff,
+                                                                   max_revision=stored["revision"],
+                                                                   columns=ANALYZED_POST_COLUMNS)
+                        aggregate.subtract(engine.aggregate(expired))
+                    added = self.db.iter_posts_since_revision(neighborhood, stored["revision"],
+                                                              first_crawled_after=cutoff,
+                                                              columns=ANALYZED_POST_COLUMNS)
+                    engine.aggregate(added, aggregate=aggregate)
+            
+            if aggregate is None:
+                if cutoff:
+                    posts = self.db.iter_posts_first_crawled(neighborhood, cutoff, columns=ANALYZED_POST_COLUMNS)
+                else:
+                    posts = self.db.iter_posts(neighborhood, columns=ANALYZED_POST_COLUMNS)
+                aggregate = engine.aggregate(posts)
+        
+        self.db.put_sentiment_aggregate(neighborhood, window, aggregate.to_state(), revision, max_post_id,
+                                        cutoff, engine.fingerprint, now.isoformat())
+        return aggregate
+    
+    def analyze_neighborhoods(self, neighborhoods: Iterable[str], force_refresh: bool = False,
+                              workers: Optional[int] = None, shard_size: int = SHARD_SIZE) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze many neighborhoods, spreading the work over worker processes.
+        
+        Each neighborhood's posts are split into shards of up to shard_size
+        posts. Workers return a compact SentimentAggregate per shard instead
+        of per-post results, and the shards are merged in post order, so each
+        analysis is identical to analyze_neighborhood's.
         
-        logger.info(f"Analyzing {len(posts)} posts for {neighborhood}")
+        Args:
+            neighborhoods: The neighborhoods to analyze
+            force_refresh: Whether to force fresh analyses even if cached
+            workers: Worker processes (CPU count if None; 1 runs in this process)
+            shard_size: Posts per unit of work
+            
+        Returns:
+            Dictionary mapping each neighborhood to its analysis
+        """
+        results = {}
+        shards = []
+        for neighborhood in dict.fromkeys(neighborhoods):
+            if not force_refresh:
+                cached_analysis = self._get_cached_analysis(neighborhood)
+                if cached_analysis:
+                    results[neighborhood] = cached_analysis
+                    continue
+            results[neighborhood] = SentimentAggregate(ASPECT_CATEGORIES)
+            keys = self.db.post_shard_keys(neighborhood, shard_size)
+            shards.extend((self.db_path, neighborhood, start, stop) for start, stop in zip(keys, keys[1:] + [None]))
+        
+        workers = min(workers or os.cpu_count() or 1, len(shards))
+        logger.info(f"Analyzing {len(results)} neighborhoods in {len(shards)} shards with {max(workers, 1)} workers")
+        if workers <= 1:
+            partials = (_aggregate_shard(*shard) for shard in shards)
+            self._merge_shards(shards, partials, results)
+        else:
+            # spawn, not fork: the parent's SQLite connections must not be shared with children
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                partials = pool.map(_aggregate_shard, *zip(*shards))
+                self._merge_shards(shards, partials, results)
+        
+        for neighborhood, result in results.items():
+            if isinstance(result, SentimentAggregate):
+                results[neighborhood] = self._finish_analysis(neighborhood, result)
+        return results
+    
+    @staticmethod
+    def _merge_shards(shards: List[Tuple], partials: Iterable[SentimentAggregate],
+                      results: Dict[str, Any]) -> None:
+        for (_, neighborhood, _, _), partial in zip(shards, partials):
+            results[neighborhood].merge(partial)
+    
+    def _finish_analysis(self, neighborhood: str, aggregate: SentimentAggregate) -> Dict[str, Any]:
+        """
+        Turn a neighborhood's aggregate into its analysis and cache it.
         
-        # Analyze each post
-        post_analyses = [self.analyze_post(post) for post in posts]
+        Args:
+            neighborhood: The neighborhood name
+            aggregate: Totals over all of the neighborhood's posts
+            
+        Returns:
+            Dictionary with neighborhood sentiment analysis
+        """
+        if not aggregate.post_count:
+            logger.warning(f"No posts found for {neighborhood}")
+            return self._generate_empty_analysis(neighborhood)
         
-        # Aggregate results
-        aggregated = self._aggregate_analyses(post_analyses, neighborhood)
+        aggregated = aggregate.to_analysis(neighborhood)
+        logger.info(f"Analyzed {aggregated['post_count']} posts for {neighborhood}")
         
         # Cache the results
         self._cache_analysis(neighborhood, aggregated)
@@ -376,19 +531,10 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with cached analysis or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT analysis_data FROM sentiment_analysis
-        WHERE neighborhood = ?
-        ''', (neighborhood,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        analysis_json = self.db.get_sentiment(neighborhood)
         
-        if row:
-            return json.loads(row[0])
+        if analysis_json:
+            return json.loads(analysis_json)
         return None
     
     def _cache_analysis(self, neighborhood: str, analysis: Dict[str, Any]):
@@ -399,21 +545,11 @@ class SentimentAnalyzer:
             neighborhood: The neighborhood to cache analysis for
             analysis: The analysis data to cache
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Convert analysis to JSON
         analysis_json = json.dumps(analysis)
         
         # Update or insert
-        cursor.execute('''
-        INSERT OR REPLACE INTO sentiment_analysis
-        (neighborhood, analysis_data, last_updated)
-        VALUES (?, ?, ?)
-        ''', (neighborhood, analysis_json, datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
+        self.db.put_sentiment(neighborhood, analysis_json, datetime.now().isoformat())
         
         logger.info(f"Cached sentiment analysis for {neighborhood}")
     
@@ -427,20 +563,7 @@ class SentimentAnalyzer:
         Returns:
             List of post dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT * FROM neighborhood_posts
-        WHERE neighborhood = ?
-        ORDER BY crawl_date DESC
-        ''', (neighborhood,))
-        
-        rows = cursor.fetchall()
-        posts = [dict(row) for row in rows]
-        
-        conn.close()
+        posts = self.db.get_posts(neighborhood)
         
         return posts
     
@@ -468,87 +591,24 @@ class SentimentAnalyzer:
             "analysis_date": datetime.now().isoformat()
         }
     
-    def _aggregate_analyses(self, post_analyses: List[Dict[str, Any]], neighborhood: str) -> Dict[str, Any]:
+    def _aggregate_analyses(self, post_analyses: Iterable[Dict[str, Any]], neighborhood: str) -> Dict[str, Any]:
         """
         Aggregate individual post analyses into an overall neighborhood analysis.
         
         Args:
-            post_analyses: List of individual post analyses
+            post_analyses: Individual post analyses (any iterable, consumed once)
             neighborhood: The neighborhood name
             
         Returns:
             Aggregated analysis dictionary
         """
-        if not post_analyses:
-            return self._generate_empty_analysis(neighborhood)
-        
-        # Calculate overall sentiment
-        compound_scores = [a["sentiment"]["compound_score"] for a in post_analyses]
-        avg_compound = sum(compound_scores) / len(compound_scores)
-        
-        # Count sentiment labels
-        sentiment_counts = Counter([a["sentiment_label"] for a in post_analyses])
-        total_posts = len(post_analyses)
-        
-        # Determine overall sentiment label
-        if avg_compound >= 0.05:
-            overall_label = "positive"
-        elif avg_compound <= -0.05:
-            overall_label = "negative"
-        else:
-            overall_label = "neutral"
-            
-        # Calculate confidence based on agreement
-        majority_count = sentiment_counts.most_common(1)[0][1]
-        confidence = majority_count / total_posts
-        
-        # Aggregate aspect sentiment
-        aspect_sentiment = defaultdict(lambda: {"mentions": 0, "positive": 0, "negative": 0, "score": 0})
-        
+        aggregate = SentimentAggregate(ASPECT_CATEGORIES)
         for analysis in post_analyses:
-            for aspect, data in analysis["aspects"].items():
-                aspect_sentiment[aspect]["mentions"] += data["mentions"]
-                aspect_sentiment[aspect]["positive"] += data["positive"]
-                aspect_sentiment[aspect]["negative"] += data["negative"]
-        
-        # Calculate aspect scores
-        for aspect in aspect_sentiment:
-            total = aspect_sentiment[aspect]["positive"] + aspect_sentiment[aspect]["negative"]
-            if total > 0:
-                aspect_sentiment[aspect]["score"] = (aspect_sentiment[aspect]["positive"] - 
-                                                 aspect_sentiment[aspect]["negative"]) / total
-        
-        # Sort aspects by mentions
-        sorted_aspects = {k: v for k, v in sorted(aspect_sentiment.items(), 
-                                               key=lambda item: item[1]["mentions"], 
-                                               reverse=True)}
-        
-        # Extract key themes (phrases that appear in multiple posts)
-        all_phrases = [phrase for analysis in post_analyses for phrase in analysis["key_phrases"]]
-        phrase_counter = Counter(all_phrases)
-        key_themes = [phrase for phrase, count in phrase_counter.most_common(10) if count > 1]
-        
-        # Get sources
-        sources = list(set(a["source"] for a in post_analyses))
+            aggregate.add(analysis)
         
-        return {
-            "neighborhood": neighborhood,
-            "post_count": total_posts,
-            "overall_sentiment": {
-                "label": overall_label,
-                "score": avg_compound,
-                "confidence": confidence,
-                "distribution": {
-                    "positive": sentiment_counts.get("positive", 0) / total_posts,
-                    "neutral": sentiment_counts.get("neutral", 0) / total_posts,
-                    "negative": sentiment_counts.get("negative", 0) / total_posts
-                }
-            },
-            "aspect_sentiment": sorted_aspects,
-            "key_themes": key_themes,
-            "sources": sources,
-            "analysis_date": datetime.now().isoformat()
-        }
+        if not aggregate.post_count:
+            return self._generate_empty_analysis(neighborhood)
+        return aggregate.to_analysis(neighborhood)
     
     def generate_text_summary(self, analysis: Dict[str, Any]) -> str:
         """
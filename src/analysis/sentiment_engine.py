@@ -0,0 +1,461 @@
+"""Vectorized batch scoring for the lexicon-based neighborhood sentiment analyzer."""
+import hashlib
+import heapq
+import json
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+from itertools import chain, islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Characters the tokenizer treats as word separators
+PUNCTUATION = str.maketrans({c: ' ' for c in ',.;:!?()[]{}'})
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase, split on whitespace and punctuation, and drop numbers and
+    single characters other than 'a' and 'i'.
+    """
+    return [t for t in text.lower().translate(PUNCTUATION).split()
+            if not (t.isdigit() or (len(t) == 1 and t not in ('a', 'i')))]
+
+
+class _BatchScores(NamedTuple):
+    encoded: List[List[int]]
+    words: List[str]
+    stop: List[bool]
+    positive_counts: np.ndarray
+    negative_counts: np.ndarray
+    mentions: np.ndarray
+    aspect_positive: np.ndarray
+    aspect_negative: np.ndarray
+
+
+class SentimentAggregate:
+    """Mergeable running totals behind a neighborhood sentiment analysis.
+
+    Holds counts and sums rather than per-post results, so shards of a
+    neighborhood's posts can be aggregated separately (in other processes)
+    and merged, and totals for posts can be subtracted again when they leave
+    a time window. Both are exact: compound scores are summed as integers in
+    units of 2**-1074, the smallest double, and the analysis breaks ties
+    between key themes alphabetically and lists sources sorted, so it doesn't
+    depend on the order posts were added in.
+    """
+
+    # Every double is an integer multiple of 2**-1074
+    COMPOUND_SCALE_BITS = 1074
+
+    def __init__(self, categories: Sequence[str]):
+        self.categories = list(categories)
+        self.post_count = 0
+        self.compound_sum = 0
+        self.labels: Counter = Counter()
+        # Per category: mentions, positive, negative
+        self.aspects = np.zeros((len(self.categories), 3), dtype=np.int64)
+        self.phrases: Counter = Counter()
+        # Posts per source
+        self.sources: Counter = Counter()
+
+    def add_compounds(self, compounds: Iterable[float]) -> None:
+        bits = self.COMPOUND_SCALE_BITS
+        for compound in compounds:
+            numerator, denominator = compound.as_integer_ratio()
+            self.compound_sum += numerator << (bits - denominator.bit_length() + 1)
+
+    def add(self, analysis: Dict[str, Any]) -> None:
+        """Add one analyze_post result."""
+        self.post_count += 1
+        self.add_compounds([float(analysis["sentiment"]["compound_score"])])
+        self.labels[analysis["sentiment_label"]] += 1
+        for i, category in enumerate(self.categories):
+            data = analysis["aspects"].get(category)
+            if data:
+                self.aspects[i] += (data["mentions"], data["positive"], data["negative"])
+        self.phrases.update(analysis["key_phrases"])
+        self.sources[analysis["source"]] += 1
+
+    def merge(self, other: "SentimentAggregate") -> "SentimentAggregate":
+        """Add another aggregate's totals in place."""
+        self.post_count += other.post_count
+        self.compound_sum += other.compound_sum
+        self.labels.update(other.labels)
+        self.aspects += other.aspects
+        self.phrases.update(other.phrases)
+        self.sources.update(other.sources)
+        return self
+
+    def subtract(self, other: "SentimentAggregate") -> "SentimentAggregate":
+        """Remove the totals of posts that were added to this aggregate, in place."""
+        self.post_count -= other.post_count
+        self.compound_sum -= other.compound_sum
+        self.aspects -= other.aspects
+        for counts, removed in ((self.labels, other.labels), (self.phrases, other.phrases),
+                                (self.sources, other.sources)):
+            # Only touches the removed keys, unlike Counter's -=, which rescans every key
+            for key, count in removed.items():
+                remaining = counts[key] - count
+                if remaining > 0:
+                    counts[key] = remaining
+                else:
+                    del counts[key]
+        return self
+
+    def to_state(self) -> bytes:
+        """Serialize the totals as compressed JSON, to store between refreshes."""
+        return zlib.compress(json.dumps({
+            "categories": self.categories,
+            "post_count": self.post_count,
+            "compound_sum": self.compound_sum,
+            "labels": self.labels,
+            "aspects": self.aspects.tolist(),
+            "phrases": self.phrases,
+            "sources": self.sources
+        }, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_state(cls, state: bytes) -> "SentimentAggregate":
+        """Rebuild an aggregate from to_state output."""
+        data = json.loads(zlib.decompress(state))
+        aggregate = cls(data["categories"])
+        aggregate.post_count = data["post_count"]
+        aggregate.compound_sum = data["compound_sum"]
+        aggregate.labels = Counter(data["labels"])
+        aggregate.aspects = np.array(data["aspects"], dtype=np.int64).reshape(len(aggregate.categories), 3)
+        aggregate.phrases = Counter(data["phrases"])
+        aggregate.sources = Counter(data["sources"])
+        return aggregate
+
+    def to_analysis(self, neighborhood: str, analysis_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the neighborhood analysis dictionary from the totals.
+
+        Args:
+            neighborhood: The neighborhood name
+            analysis_date: ISO timestamp to record (now if None)
+
+        Returns:
+            Analysis dictionary in the SentimentAnalyzer format
+        """
+        total_posts = self.post_count
+        # Exact mean of the per-post compound scores, correctly rounded
+        avg_compound = self.compound_sum / (total_posts << self.COMPOUND_SCALE_BITS)
+
+        if avg_compound >= 0.05:
+            overall_label = "positive"
+        elif avg_compound <= -0.05:
+            overall_label = "negative"
+        else:
+            overall_label = "neutral"
+
+        # Confidence based on agreement
+        confidence = self.labels.most_common(1)[0][1] / total_posts
+
+        aspect_sentiment = {}
+        for category, (mentions, positive, negative) in zip(self.categories, self.aspects.tolist()):
+            total = positive + negative
+            aspect_sentiment[category] = {"mentions": mentions, "positive": positive, "negative": negative,
+                                          "score": (positive - negative) / total if total > 0 else 0}
+        sorted_aspects = dict(sorted(aspect_sentiment.items(), key=lambda item: item[1]["mentions"], reverse=True))
+
+        # Key themes are phrases that appear in multiple posts
+        top_phrases = heapq.nsmallest(10, self.phrases.items(), key=lambda item: (-item[1], item[0]))
+        key_themes = [phrase for phrase, count in top_phrases if count > 1]
+
+        return {
+            "neighborhood": neighborhood,
+            "post_count": total_posts,
+            "overall_sentiment": {
+                "label": overall_label,
+                "score": avg_compound,
+                "confidence": confidence,
+                "distribution": {
+                    "positive": self.labels.get("positive", 0) / total_posts,
+                    "neutral": self.labels.get("neutral", 0) / total_posts,
+                    "negative": self.labels.get("negative", 0) / total_posts
+                }
+            },
+            "aspect_sentiment": sorted_aspects,
+            "key_themes": key_themes,
+            "sources": sorted(self.sources, key=str),
+            "analysis_date": analysis_date or datetime.now().isoformat()
+        }
+
+
+class SentimentBatchEngine:
+    """Scores batches of posts with NumPy instead of token-by-token lexicon scans.
+
+    Every distinct token is assigned an integer id once, and its lexicon
+    properties (polarity, negation, aspect categories, stop word) are
+    computed once and stored in arrays indexed by id. A batch of posts is
+    encoded into one flat id array; negation scopes come from a running
+    maximum of negation positions, and aspect context windows from prefix
+    sums, so the per-token work is a handful of array operations. Results
+    match SentimentAnalyzer.analyze_post exactly.
+    """
+
+    def __init__(self,
+                 positive_terms: Set[str],
+                 negative_terms: Set[str],
+                 negation_words: Set[str],
+                 intensifiers: Set[str],
+                 aspect_categories: Mapping[str, Sequence[str]],
+                 stop_words: Set[str],
+                 negation_scope: int = 3,
+                 context_window: int = 5,
+                 top_phrases: int = 10,
+                 max_vocab: int = 500000):
+        self.positive_terms = positive_terms
+        self.negative_terms = negative_terms
+        self.negation_words = negation_words
+        self.intensifiers = intensifiers
+        self.categories = list(aspect_categories)
+        self._aspect_terms = [aspect_categories[c] for c in self.categories]
+        self.stop_words = stop_words
+        self.negation_scope = negation_scope
+        self.context_window = context_window
+        self.top_phrases = top_phrases
+        self.max_vocab = max_vocab
+        # Identifies the scoring rules; aggregates stored under another fingerprint are stale
+        self.fingerprint = hashlib.blake2b(repr((
+            sorted(positive_terms), sorted(negative_terms), sorted(negation_words), sorted(intensifiers),
+            [(c, list(terms)) for c, terms in zip(self.categories, self._aspect_terms)], sorted(stop_words),
+            negation_scope, context_window, top_phrases
+        )).encode("utf-8"), digest_size=8).hexdigest()
+        self._lock = threading.Lock()
+        self._reset_vocab()
+
+    def _reset_vocab(self, capacity: int = 4096) -> None:
+        # Id 0 is unused so `vocab.get(token) or add(token)` works
+        self._vocab: Dict[str, int] = {}
+        self._words: List[str] = [""]
+        self._stop: List[bool] = [False]
+        self._score = np.zeros(capacity, dtype=np.int8)
+        self._positive = np.zeros(capacity, dtype=np.int8)
+        self._negative = np.zeros(capacity, dtype=np.int8)
+        self._negation = np.zeros(capacity, dtype=bool)
+        self._aspects = np.zeros((capacity, len(self.categories)), dtype=bool)
+
+    def _add_word(self, token: str) -> int:
+        word_id = len(self._words)
+        if word_id == len(self._score):
+            capacity = 2 * word_id
+            self._score = np.resize(self._score, capacity)
+            self._positive = np.resize(self._positive, capacity)
+            self._negative = np.resize(self._negative, capacity)
+            self._negation = np.resize(self._negation, capacity)
+            aspects = np.zeros((capacity, len(self.categories)), dtype=bool)
+            aspects[:word_id] = self._aspects
+            self._aspects = aspects
+
+        positive = token in self.positive_terms
+        negative = token in self.negative_terms
+        negation = token in self.negation_words
+        # Negations and intensifiers are skipped when scoring, never scored themselves
+        scored = not negation and token not in self.intensifiers
+        self._score[word_id] = (1 if positive else -1 if negative else 0) if scored else 0
+        self._positive[word_id] = positive
+        self._negative[word_id] = negative
+        self._negation[word_id] = negation
+        # Aspect terms match as substrings in either direction
+        self._aspects[word_id] = [any(term in token or token in term for term in terms)
+                                  for terms in self._aspect_terms]
+
+        self._vocab[token] = word_id
+        self._words.append(token)
+        self._stop.append(token in self.stop_words)
+        return word_id
+
+    def _encode(self, texts: List[str]) -> Tuple[List[List[int]], Tuple[Any, ...]]:
+        # Returns the id lists plus the lexicon arrays they index into, taken
+        # under the lock; later growth or a vocab reset replaces the arrays
+        # rather than changing these
+        with self._lock:
+            if len(self._words) > self.max_vocab:
+                self._reset_vocab()
+            get, add = self._vocab.get, self._add_word
+            encoded = [[get(t) or add(t) for t in tokenize(text)] for text in texts]
+            return encoded, (self._score, self._positive, self._negative, self._negation,
+                             self._aspects, self._words, self._stop)
+
+    def analyze(self, posts: Iterable[Dict[str, Any]], batch_size: int = 1024) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze posts in batches, yielding one result per post in order.
+
+        Args:
+            posts: Post dictionaries with title, content, id and source
+            batch_size: Posts scored together per NumPy pass
+
+        Yields:
+            The same dictionaries SentimentAnalyzer.analyze_post returns
+        """
+        iterator = iter(posts)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield from self.analyze_batch(batch)
+
+    def analyze_batch(self, posts: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze one batch of posts."""
+        scores = self._score_batch(posts)
+        positive_counts, negative_counts = scores.positive_counts.tolist(), scores.negative_counts.tolist()
+        mentions = scores.mentions.tolist()
+        aspect_pos, aspect_neg = scores.aspect_positive.tolist(), scores.aspect_negative.tolist()
+
+        results = []
+        for i, post in enumerate(posts):
+            results.append({
+                "post_id": post.get("id"),
+                "source": post.get("source"),
+                **self._sentiment(positive_counts[i], negative_counts[i]),
+                "aspects": self._aspect_scores(mentions[i], aspect_pos[i], aspect_neg[i]),
+                "key_phrases": self._key_phrases(scores.encoded[i], scores.words, scores.stop)
+            })
+        return results
+
+    def aggregate(self, posts: Iterable[Dict[str, Any]], batch_size: int = 1024,
+                  aggregate: Optional["SentimentAggregate"] = None) -> "SentimentAggregate":
+        """
+        Fold posts straight into a SentimentAggregate.
+
+        Gives the same aggregate as adding each analyze_post result, without
+        building per-post result dictionaries.
+
+        Args:
+            posts: Post dictionaries with title, content, id and source
+            batch_size: Posts scored together per NumPy pass
+            aggregate: Aggregate to add to (a new one if None)
+
+        Returns:
+            The aggregate
+        """
+        if aggregate is None:
+            aggregate = SentimentAggregate(self.categories)
+        iterator = iter(posts)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return aggregate
+            self._aggregate_batch(batch, aggregate)
+
+    def _aggregate_batch(self, posts: Sequence[Dict[str, Any]], aggregate: "SentimentAggregate") -> None:
+        scores = self._score_batch(posts)
+        positive, negative = scores.positive_counts, scores.negative_counts
+        total = positive + negative
+        # Same float division as _sentiment, so per-post compounds match exactly
+        compounds = np.divide(positive - negative, total, out=np.zeros(len(posts)), where=total > 0)
+        labels = np.where(compounds >= 0.05, "positive", np.where(compounds <= -0.05, "negative", "neutral"))
+
+        aggregate.post_count += len(posts)
+        aggregate.add_compounds(compounds.tolist())
+        aggregate.labels.update(labels.tolist())
+        aggregate.aspects += np.stack([scores.mentions.sum(axis=0), scores.aspect_positive.sum(axis=0),
+                                       scores.aspect_negative.sum(axis=0)], axis=1)
+        for i, post in enumerate(posts):
+            aggregate.phrases.update(self._key_phrases(scores.encoded[i], scores.words, scores.stop))
+        aggregate.sources.update(post.get("source") for post in posts)
+
+    def _score_batch(self, posts: Sequence[Dict[str, Any]]) -> "_BatchScores":
+        texts = [f"{post.get('title', '')} {post.get('content', '')}" for post in posts]
+        encoded, (score, positive, negative, negation, aspects, words, stop) = self._encode(texts)
+
+        n_posts = len(posts)
+        n_categories = len(self.categories)
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=n_posts)
+        offsets = np.zeros(n_posts + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        n_tokens = int(offsets[-1])
+
+        ids = np.fromiter(chain.from_iterable(encoded), dtype=np.int64, count=n_tokens)
+        post_of = np.repeat(np.arange(n_posts), lengths)
+        first, end = offsets[post_of], offsets[post_of + 1]
+        position = np.arange(n_tokens)
+        is_negation = negation[ids]
+
+        # A token is negated when the last negation word in its post is at most
+        # negation_scope tokens before it
+        last_negation = np.maximum.accumulate(np.where(is_negation, position, -1))
+        negated = (last_negation >= first) & (position - last_negation <= self.negation_scope)
+        value = score[ids] * np.where(negated, -1, 1)
+        positive_counts = np.bincount(post_of[value > 0], minlength=n_posts)
+        negative_counts = np.bincount(post_of[value < 0], minlength=n_posts)
+
+        # Aspect context windows from prefix sums, clipped to the post
+        def prefix(flags):
+            sums = np.zeros(n_tokens + 1, dtype=np.int64)
+            np.cumsum(flags, out=sums[1:])
+            return sums
+
+        lo = np.maximum(first, position - self.context_window)
+        hi = np.minimum(end, position + self.context_window + 1)
+        positive_sums, negative_sums, negation_sums = prefix(positive[ids]), prefix(negative[ids]), prefix(is_negation)
+        context_positive = positive_sums[hi] - positive_sums[lo]
+        context_negative = negative_sums[hi] - negative_sums[lo]
+        flipped = negation_sums[hi] > negation_sums[lo]
+        aspect_positive = np.where(flipped, context_negative, context_positive)
+        aspect_negative = np.where(flipped, context_positive, context_negative)
+
+        hit_token, hit_category = np.nonzero(aspects[ids])
+        cell = post_of[hit_token] * n_categories + hit_category
+        size = n_posts * n_categories
+
+        def per_post(weights=None):
+            counts = np.bincount(cell, weights=weights, minlength=size)
+            return counts.astype(np.int64).reshape(n_posts, n_categories)
+
+        return _BatchScores(encoded, words, stop, positive_counts, negative_counts, per_post(),
+                            per_post(aspect_positive[hit_token]), per_post(aspect_negative[hit_token]))
+
+    @staticmethod
+    def _sentiment(positive_count: int, negative_count: int) -> Dict[str, Any]:
+        total = positive_count + negative_count
+        if total > 0:
+            positive_score = positive_count / total
+            negative_score = negative_count / total
+            compound_score = (positive_count - negative_count) / total
+        else:
+            positive_score = negative_score = compound_score = 0
+
+        if compound_score >= 0.05:
+            label = "positive"
+        elif compound_score <= -0.05:
+            label = "negative"
+        else:
+            label = "neutral"
+
+        return {
+            "sentiment": {
+                "positive_score": positive_score,
+                "negative_score": negative_score,
+                "compound_score": compound_score,
+                "positive_count": positive_count,
+                "negative_count": negative_count
+            },
+            "sentiment_label": label
+        }
+
+    def _aspect_scores(self, mentions: List[int], positive: List[int], negative: List[int]) -> Dict[str, Dict[str, Any]]:
+        aspects = {}
+        for category, m, p, n in zip(self.categories, mentions, positive, negative):
+            aspects[category] = {"mentions": m, "positive": p, "negative": n,
+                                 "score": (p - n) / (p + n) if p + n > 0 else 0}
+        return aspects
+
+    def _key_phrases(self, ids: List[int], words: List[str], stop: List[bool]) -> List[str]:
+        # Count bigrams then trigrams by id; the stable sort keeps first-seen order on ties
+        ranked = sorted(chain(Counter(zip(ids, ids[1:])).items(),
+                              Counter(zip(ids, ids[1:], ids[2:])).items()),
+                        key=itemgetter(1), reverse=True)
+        phrases = []
+        for gram, _ in ranked:
+            if not all(stop[i] for i in gram):
+                phrases.append(' '.join(words[i] for i in gram))
+                if len(phrases) == self.top_phrases:
+                    break
+        return phrases
@@ -9,6 +9,7 @@ natural language queries and report generation.
 
 import os
 import sys
+import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
@@ -25,8 +26,8 @@ if sys_path not in sys.path:
     logger.info(f"Added {sys_path} to Python path")
 
 # Import FastAPI components
-from fastapi import FastAPI, Query, HTTPException, Depends
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, Query, HTTPException, Depends, Header
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
@@ -34,6 +35,8 @@ from pydantic import BaseModel, Field
 from src.inference.inference_layer_manager import InferenceLayerManager
 from src.utils.pdf_generator import generate_pdf_summary
 from src.utils.simple_export import simple_export
+from src.utils.executor import BoundedExecutor, ExecutorSaturated
+from src.utils.export_cache import ExportCache, export_key, etag_matches
 
 
 # Define API models
@@ -91,9 +94,45 @@ app.add_middleware(
 # Initialize inference layer manager
 inference_manager = InferenceLayerManager()
 
+# Dedicated pool for request work, kept apart from the shared analysis pool
+# that combine_analysis offloads to so requests can't starve their own sub-tasks
+api_executor = BoundedExecutor(
+    max_workers=int(os.getenv("API_WORKERS", "8")),
+    max_pending=int(os.getenv("API_MAX_PENDING", "32")),
+    thread_name_prefix="reic-api",
+    retry_after=int(os.getenv("API_RETRY_AFTER", "2"))
+)
+REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "30"))
+
+# Rendered exports, reused for identical inputs and capped in size
+export_cache = ExportCache(
+    os.getenv("EXPORT_CACHE_DIR", os.path.join(sys_path, "output", "exports")),
+    max_bytes=int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+)
+
+
+async def run_in_worker(func, *args, **kwargs):
+    """
+    Run blocking request work on the API executor.
+    
+    Raises:
+        HTTPException: 429 with Retry-After when the executor is full,
+            504 when the work exceeds REQUEST_TIMEOUT
+    """
+    try:
+        return await api_executor.run(func, *args, timeout=REQUEST_TIMEOUT, **kwargs)
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Server is busy, please retry",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Request timed out after {REQUEST_TIMEOUT:g}s")
+
 
 @app.get("/")
-def root():
+async def root():
     """Root endpoint with API information."""
     return {
         "name": "Real Estate Intelligence API",
@@ -111,7 +150,7 @@ def root():
 
 
 @app.post("/conversation/query")
-def conversation_query(req: QueryRequest):
+async def conversation_query(req: QueryRequest):
     """Process a natural language query about real estate."""
     try:
         # Create context with ZIP code
@@ -120,7 +159,7 @@ def conversation_query(req: QueryRequest):
         }
         
         # Process the query using the inference manager
-        result = inference_manager.process_query(req.prompt, context)
+        result = await run_in_worker(inference_manager.process_query, req.prompt, context)
         
         # Add metadata
         result["timestamp"] = datetime.now().isoformat()
@@ -128,13 +167,15 @@ def conversation_query(req: QueryRequest):
         result["zip_code"] = req.zip_code
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing query: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/market/trends")
-def market_trends(req: TrendRequest):
+async def market_trends(req: TrendRequest):
     """Get historical market trends for a ZIP code."""
     try:
         # Create a specific query for the past layer
@@ -147,7 +188,7 @@ def market_trends(req: TrendRequest):
         }
         
         # Process the query using the inference manager (will route to past layer)
-        result = inference_manager.process_query(query, context)
+        result = await run_in_worker(inference_manager.process_query, query, context)
         
         # Add metadata
         result["timestamp"] = datetime.now().isoformat()
@@ -155,13 +196,15 @@ def market_trends(req: TrendRequest):
         result["time_period"] = req.time_period
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting market trends: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/sentiment/scores")
-def sentiment_scores(req: SentimentRequest):
+async def sentiment_scores(req: SentimentRequest):
     """Get current sentiment scores for a ZIP code."""
     try:
         # Create a specific query for the present layer
@@ -174,20 +217,22 @@ def sentiment_scores(req: SentimentRequest):
         }
         
         # Process the query using the inference manager (will route to present layer)
-        result = inference_manager.process_query(query, context)
+        result = await run_in_worker(inference_manager.process_query, query, context)
         
         # Add metadata
         result["timestamp"] = datetime.now().isoformat()
         result["zip_code"] = req.zip_code
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting sentiment scores: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/market/forecasts")
-def market_forecasts(req: ForecastRequest):
+async def market_forecasts(req: ForecastRequest):
     """Get market forecasts for a ZIP code."""
     try:
         # Create a specific query for the future layer
@@ -201,7 +246,7 @@ def market_forecasts(req: ForecastRequest):
         }
         
         # Process the query using the inference manager (will route to future layer)
-        result = inference_manager.process_query(query, context)
+        result = await run_in_worker(inference_manager.process_query, query, context)
         
         # Add metadata
         result["timestamp"] = datetime.now().isoformat()
@@ -210,13 +255,15 @@ def market_forecasts(req: ForecastRequest):
         result["property_type"] = req.property_type
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting market forecasts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/discovery/opportunities")
-def discovery_opportunities(req: OpportunityRequest):
+async def discovery_opportunities(req: OpportunityRequest):
     """Discover investment opportunities for a ZIP code."""
     try:
         # Create a specific query for multi-layer analysis
@@ -230,7 +277,7 @@ def discovery_opportunities(req: OpportunityRequest):
         }
         
         # Process the query using the inference manager (will use multiple layers)
-        result = inference_manager.process_query(query, context)
+        result = await run_in_worker(inference_manager.process_query, query, context)
         
         # Add metadata
         result["timestamp"] = datetime.now().isoformat()
@@ -239,20 +286,23 @@ def discovery_opportunities(req: OpportunityRequest):
         result["budget_range"] = req.budget_range
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error discovering opportunities: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/export/pdf")
-def export_pdf(
+async def export_pdf(
     zip: str = Query(..., description="ZIP code to analyze"),
     summary: str = Query(..., description="Analysis summary"),
     market: float = Query(0.0, description="Market score"),
     rep: float = Query(0.0, description="Reputation score"),
     trend: float = Query(0.0, description="Trend score"),
     econ: float = Query(0.0, description="Economic score"),
-    conf: float = Query(0.0, description="Investment confidence")
+    conf: float = Query(0.0, description="Investment confidence"),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Generate and return a PDF summary report."""
     try:
@@ -265,30 +315,38 @@ def export_pdf(
             "Investment Confidence": conf
         }
         
-        # Create output directory
-        output_dir = os.path.join(sys_path, "output")
-        os.makedirs(output_dir, exist_ok=True)
+        # Identical inputs reuse the cached report
+        key = export_key("pdf", zip=zip, summary=summary, scores=scores)
+        etag = f'"{key}"'
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
         # Generate PDF
-        pdf_path = generate_pdf_summary(zip, summary, scores, output_dir)
+        pdf_path = await run_in_worker(
+            export_cache.get_or_create, key,
+            lambda output_dir: generate_pdf_summary(zip, summary, scores, output_dir)
+        )
         
         if not pdf_path or not os.path.exists(pdf_path):
             logger.error("Failed to generate PDF")
             raise HTTPException(status_code=500, detail="Failed to generate PDF")
         
-        # Return the PDF file
+        # Return the PDF file (streamed from disk)
         return FileResponse(
             path=pdf_path,
             media_type="application/pdf",
-            filename=os.path.basename(pdf_path)
+            filename=f"{zip}_real_estate_summary{os.path.splitext(pdf_path)[1]}",
+            headers={"ETag": etag}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating PDF: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/export/{format_type}")
-def export_analysis(
+async def export_analysis(
     format_type: str,
     zip: str = Query(..., description="ZIP code to analyze"),
     summary: str = Query(..., description="Analysis summary"),
@@ -296,7 +354,8 @@ def export_analysis(
     rep: float = Query(0.0, description="Reputation score"),
     trend: float = Query(0.0, description="Trend score"),
     econ: float = Query(0.0, description="Economic score"),
-    conf: float = Query(0.0, description="Investment confidence")
+    conf: float = Query(0.0, description="Investment confidence"),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Export analysis in the specified format (pdf, text, csv, json)."""
     try:
@@ -320,12 +379,17 @@ def export_analysis(
             }
         }
         
-        # Create output directory
-        output_dir = os.path.join(sys_path, "output")
-        os.makedirs(output_dir, exist_ok=True)
+        # Identical inputs reuse the cached export
+        key = export_key(format_type.lower(), zip=zip, summary=summary, scores=export_data["scores"])
+        etag = f'"{key}"'
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
         # Export the analysis
-        export_path = simple_export(export_data, format_type.lower(), output_dir)
+        export_path = await run_in_worker(
+            export_cache.get_or_create, key,
+            lambda output_dir: simple_export(export_data, format_type.lower(), output_dir)
+        )
         
         if not export_path or not os.path.exists(export_path):
             logger.error("Failed to generate export file")
@@ -348,21 +412,22 @@ def export_analysis(
             media_type = "text/plain"
             filename = f"real_estate_analysis_{zip}.txt"
         
-        # Return the file
+        # Return the file (streamed from disk)
         return FileResponse(
             path=export_path,
             filename=filename,
-            media_type=media_type
+            media_type=media_type,
+            headers={"ETag": etag}
         )
-    except HTTPException as e:
-        raise e
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/health")
-def health():
+async def health():
     """Health check endpoint."""
     return JSONResponse(content={
         "status": "healthy",
@@ -12,7 +12,7 @@ import os
 from typing import Tuple, Optional, Dict, Any
 from openai import OpenAI
 
-from modules.analyze_market import analyze_market
+from modules.analyze_market import analyze_market, warm_up
 from modules.market_export_formatter import format_market_export
 
 # Initialize OpenAI client
@@ -116,7 +116,19 @@ def display_metrics(export_row: dict):
     with col3:
         st.metric("Appreciation", f"{export_row['Avg Appreciation']:.1f}%")
 
+@st.cache_resource(show_spinner="Loading market data...")
+def load_market_data() -> bool:
+    """Load the market analyzers once per server process, not on the first analysis"""
+    warm_up()
+    return True
+
 def main():
+    # Market data is loaded once; a failure is retried on the next rerun
+    try:
+        load_market_data()
+    except RuntimeError as e:
+        st.error(f"❌ {e}")
+    
     # Header
     st.title("🏰 Welcome to Your Market Butler")
     st.caption("Your personal AI assistant for smart real estate decisions.")
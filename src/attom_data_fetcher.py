@@ -5,6 +5,7 @@ Handles async HTTP requests to ATTOM API endpoints
 import aiohttp
 import logging
 from typing import Dict, Optional
+from .integrations.http_pool import get_async_pool
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,7 @@ class AttomDataFetcher:
             "apikey": self.api_key,
             "accept": "application/json"
         }
+        self.http = get_async_pool()
     
     async def fetch_property_data(self, address: str, zipcode: str) -> Dict:
         """Fetch property details from ATTOM API"""
@@ -28,13 +30,12 @@ class AttomDataFetcher:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        logger.error(f"ATTOM API error: {response.status} - {await response.text()}")
-                        return {}
+            response = await self.http.get(endpoint, headers=self.headers, params=params)
+            if response.status == 200:
+                return response.json()
+            else:
+                logger.error(f"ATTOM API error: {response.status} - {response.text()}")
+                return {}
                         
         except aiohttp.ClientError as e:
             logger.error(f"Error fetching data from ATTOM: {str(e)}")
@@ -52,13 +53,12 @@ class AttomDataFetcher:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        logger.error(f"ATTOM API error: {response.status} - {await response.text()}")
-                        return {}
+            response = await self.http.get(endpoint, headers=self.headers, params=params)
+            if response.status == 200:
+                return response.json()
+            else:
+                logger.error(f"ATTOM API error: {response.status} - {response.text()}")
+                return {}
                         
         except aiohttp.ClientError as e:
             logger.error(f"Error searching properties: {str(e)}")
@@ -73,13 +73,12 @@ class AttomDataFetcher:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        logger.error(f"ATTOM API error: {response.status} - {await response.text()}")
-                        return {}
+            response = await self.http.get(endpoint, headers=self.headers, params=params)
+            if response.status == 200:
+                return response.json()
+            else:
+                logger.error(f"ATTOM API error: {response.status} - {response.text()}")
+                return {}
                         
         except aiohttp.ClientError as e:
             logger.error(f"Error fetching market data: {str(e)}")
@@ -90,6 +89,5 @@ if __name__ == "__main__":
     import asyncio
     api_key = "your_attom_api_key"
     fetcher = AttomDataFetcher(api_key)
-    loop = asyncio.get_event_loop()
-    data = loop.run_until_complete(fetcher.fetch_property_data("123 Main St", "90210"))
+    data = asyncio.run(fetcher.fetch_property_data("123 Main St", "90210"))
     print(data)
\ No newline at end of file
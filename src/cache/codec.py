@@ -0,0 +1,202 @@
+"""
+Binary serialization codec for cached payloads.
+
+Every encoded payload starts with a one-byte header:
+- high nibble: serializer (0x00 JSON, 0x10 msgpack)
+- low nibble:  compressor (0x0 none, 0x1 zlib, 0x2 zstd, 0x3 lz4)
+
+Payloads written before the header existed (bare JSON or zlib'd JSON)
+are still decoded: their first byte is never a valid header.
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+SERIALIZER_JSON = 0x00
+SERIALIZER_MSGPACK = 0x10
+
+COMPRESSOR_NONE = 0x0
+COMPRESSOR_ZLIB = 0x1
+COMPRESSOR_ZSTD = 0x2
+COMPRESSOR_LZ4 = 0x3
+
+SERIALIZERS = {'json': SERIALIZER_JSON, 'msgpack': SERIALIZER_MSGPACK}
+COMPRESSORS = {
+    'none': COMPRESSOR_NONE,
+    'zlib': COMPRESSOR_ZLIB,
+    'zstd': COMPRESSOR_ZSTD,
+    'lz4': COMPRESSOR_LZ4
+}
+_SERIALIZER_NAMES = {v: k for k, v in SERIALIZERS.items()}
+_COMPRESSOR_NAMES = {v: k for k, v in COMPRESSORS.items()}
+
+_ZLIB_MAGIC = 0x78
+
+
+class CodecError(ValueError):
+    """Raised when a payload cannot be encoded or decoded."""
+
+
+def available_codecs() -> Dict[str, bool]:
+    """Report which optional serializers/compressors are installed."""
+    return {
+        'json': True,
+        'msgpack': MSGPACK_AVAILABLE,
+        'zlib': True,
+        'zstd': ZSTD_AVAILABLE,
+        'lz4': LZ4_AVAILABLE
+    }
+
+
+def _best_compressor() -> int:
+    if ZSTD_AVAILABLE:
+        return COMPRESSOR_ZSTD
+    if LZ4_AVAILABLE:
+        return COMPRESSOR_LZ4
+    return COMPRESSOR_ZLIB
+
+
+class PayloadCodec:
+    """
+    Serialize and compress cache payloads behind a one-byte header.
+
+    Payloads at or below ``compression_threshold`` bytes are stored
+    uncompressed; larger ones use the configured compressor ('auto'
+    picks zstd, then lz4, then zlib) and fall back to raw if
+    compression does not shrink them.
+    """
+
+    def __init__(self,
+                 compression_threshold: int = 1024,
+                 compressor: str = 'auto',
+                 serializer: str = 'json',
+                 level: Optional[int] = None):
+        """
+        Initialize the codec.
+
+        Args:
+            compression_threshold: Size in bytes above which to compress
+            compressor: 'auto', 'none', 'zlib', 'zstd' or 'lz4'
+            serializer: 'json', 'msgpack' or 'auto' (msgpack if installed)
+            level: Optional compression level for the chosen compressor
+        """
+        self.compression_threshold = compression_threshold
+        self.level = level
+
+        if serializer == 'auto':
+            serializer = 'msgpack' if MSGPACK_AVAILABLE else 'json'
+        if serializer not in SERIALIZERS:
+            raise CodecError(f"Unknown serializer: {serializer}")
+        if serializer == 'msgpack' and not MSGPACK_AVAILABLE:
+            raise CodecError("msgpack serializer requested but msgpack is not installed")
+        self.serializer = SERIALIZERS[serializer]
+
+        if compressor == 'auto':
+            self.compressor = _best_compressor()
+        elif compressor in COMPRESSORS:
+            self.compressor = COMPRESSORS[compressor]
+        else:
+            raise CodecError(f"Unknown compressor: {compressor}")
+        if self.compressor == COMPRESSOR_ZSTD and not ZSTD_AVAILABLE:
+            raise CodecError("zstd compressor requested but zstandard is not installed")
+        if self.compressor == COMPRESSOR_LZ4 and not LZ4_AVAILABLE:
+            raise CodecError("lz4 compressor requested but lz4 is not installed")
+
+        if self.compressor == COMPRESSOR_ZSTD:
+            self._zstd_c = zstandard.ZstdCompressor(level=level or 3)
+
+    @property
+    def name(self) -> str:
+        """Human-readable codec name, e.g. 'json+zstd'."""
+        return f"{_SERIALIZER_NAMES[self.serializer]}+{_COMPRESSOR_NAMES[self.compressor]}"
+
+    def encode(self, data: Any) -> bytes:
+        """Serialize and, above the threshold, compress a payload."""
+        body = self._serialize(data)
+        compressor = COMPRESSOR_NONE
+        if self.compressor != COMPRESSOR_NONE and len(body) > self.compression_threshold:
+            packed = self._compress(body)
+            if len(packed) < len(body):
+                body, compressor = packed, self.compressor
+        return bytes((self.serializer | compressor,)) + body
+
+    def decode(self, payload: bytes) -> Any:
+        """Decode a payload written by any codec configuration."""
+        if not payload:
+            raise CodecError("Empty payload")
+        header = payload[0]
+        serializer, compressor = header & 0xF0, header & 0x0F
+        if serializer not in _SERIALIZER_NAMES or compressor not in _COMPRESSOR_NAMES:
+            return self._decode_legacy(payload)
+
+        body = memoryview(payload)[1:]
+        if compressor != COMPRESSOR_NONE:
+            body = _decompress(compressor, body)
+        return _deserialize(serializer, body)
+
+    @staticmethod
+    def describe(payload: bytes) -> Tuple[str, str]:
+        """Get the (serializer, compressor) names used for a payload."""
+        header = payload[0]
+        serializer, compressor = header & 0xF0, header & 0x0F
+        if serializer not in _SERIALIZER_NAMES or compressor not in _COMPRESSOR_NAMES:
+            return ('json', 'zlib' if header == _ZLIB_MAGIC else 'none')
+        return (_SERIALIZER_NAMES[serializer], _COMPRESSOR_NAMES[compressor])
+
+    def _serialize(self, data: Any) -> bytes:
+        if self.serializer == SERIALIZER_MSGPACK:
+            return msgpack.packb(data, use_bin_type=True)
+        return json.dumps(data, separators=(',', ':')).encode()
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.compressor == COMPRESSOR_ZSTD:
+            return self._zstd_c.compress(body)
+        if self.compressor == COMPRESSOR_LZ4:
+            return lz4.frame.compress(body, compression_level=self.level or 0)
+        return zlib.compress(body, self.level if self.level is not None else -1)
+
+    @staticmethod
+    def _decode_legacy(payload: bytes) -> Any:
+        """Decode pre-header payloads (bare or zlib'd JSON)."""
+        if payload[0] == _ZLIB_MAGIC:
+            payload = zlib.decompress(payload)
+        return json.loads(payload)
+
+
+def _decompress(compressor: int, body: memoryview) -> bytes:
+    if compressor == COMPRESSOR_ZLIB:
+        return zlib.decompress(body)
+    if compressor == COMPRESSOR_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise CodecError("Payload is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(body)
+    if not LZ4_AVAILABLE:
+        raise CodecError("Payload is lz4-compressed but lz4 is not installed")
+    return lz4.frame.decompress(body)
+
+
+def _deserialize(serializer: int, body) -> Any:
+    if serializer == SERIALIZER_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise CodecError("Payload is msgpack-encoded but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    return json.loads(bytes(body))
@@ -0,0 +1,301 @@
+"""
+Incremental LRU/LFU eviction for the Redis market cache.
+
+Every cached key is tracked in per-prefix index structures:
+- ix:r:{prefix}  sorted set, score = last access time (LRU)
+- ix:f:{prefix}  sorted set, score = access count (LFU)
+- ix:s:{prefix}  hash, key -> stored payload bytes
+- ix:bytes       hash, prefix -> total payload bytes
+
+Eviction pops the coldest members of a prefix index in small Lua
+batches until the prefix is back under its memory budget, so Redis
+is never blocked by a full keyspace scan. The scripts only touch the
+index; the popped cache keys are returned and UNLINKed by the client.
+A write that takes its prefix over budget runs that eviction before
+returning.
+
+The index structures have no TTL, so Redis must only evict keys that
+have one (maxmemory-policy volatile-lru or volatile-lfu); every cache
+entry is written with SETEX. The scripts address several ix:* keys
+at once and assume a standalone Redis.
+"""
+
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+import redis
+
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_PREFIX = 'ix:'
+
+_WRITE_SCRIPT = """
+local prefix, key, size, now = ARGV[1], ARGV[2], tonumber(ARGV[3]), ARGV[4]
+local old = tonumber(redis.call('HGET', 'ix:s:' .. prefix, key) or '0')
+redis.call('HSET', 'ix:s:' .. prefix, key, size)
+local used = redis.call('HINCRBY', 'ix:bytes', prefix, size - old)
+redis.call('ZADD', 'ix:r:' .. prefix, now, key)
+redis.call('ZINCRBY', 'ix:f:' .. prefix, 1, key)
+return used
+"""
+
+_FORGET_SCRIPT = """
+local prefix = ARGV[1]
+local freed = 0
+for i = 2, #ARGV do
+    local key = ARGV[i]
+    local size = tonumber(redis.call('HGET', 'ix:s:' .. prefix, key) or '0')
+    freed = freed + size
+    redis.call('HDEL', 'ix:s:' .. prefix, key)
+    redis.call('ZREM', 'ix:r:' .. prefix, key)
+    redis.call('ZREM', 'ix:f:' .. prefix, key)
+end
+if freed > 0 then
+    redis.call('HINCRBY', 'ix:bytes', prefix, -freed)
+end
+return freed
+"""
+
+_EVICT_SCRIPT = """
+local prefix, index, batch = ARGV[1], ARGV[2], tonumber(ARGV[3])
+local victims = redis.call('ZRANGE', 'ix:' .. index .. ':' .. prefix, 0, batch - 1)
+local freed = 0
+for _, key in ipairs(victims) do
+    local size = tonumber(redis.call('HGET', 'ix:s:' .. prefix, key) or '0')
+    freed = freed + size
+    redis.call('HDEL', 'ix:s:' .. prefix, key)
+    redis.call('ZREM', 'ix:r:' .. prefix, key)
+    redis.call('ZREM', 'ix:f:' .. prefix, key)
+end
+if freed > 0 then
+    redis.call('HINCRBY', 'ix:bytes', prefix, -freed)
+end
+return {#victims, freed, unpack(victims)}
+"""
+
+
+def key_prefix(key: str) -> str:
+    """Get the namespace prefix of a cache key (e.g. 'ma' for 'ma:90210:...')."""
+    return key.split(':', 1)[0]
+
+
+class CacheEvictor:
+    """
+    Tracks key recency/frequency and enforces per-prefix memory budgets.
+
+    Features:
+    - LRU or LFU victim selection from sorted-set indexes
+    - Per-prefix byte budgets (e.g. separate limits for ma: and p:)
+    - Bounded batches so each eviction step is a short Redis call
+    - Buffered access tracking flushed in pipelines
+    """
+
+    def __init__(self, redis_client: redis.Redis, config: Optional[Dict] = None,
+                 on_evict: Optional[Callable[[List[str]], None]] = None):
+        """
+        Initialize the evictor.
+
+        Args:
+            redis_client: Redis client shared with the cache
+            config: Optional configuration dictionary with:
+                - policy: 'lru' or 'lfu' (default: lru)
+                - budgets_mb: Dict of prefix -> MB budget (default: ma 256, p 128)
+                - batch_size: Keys evicted per Redis call (default: 200)
+                - max_batches: Max batches per enforcement run (default: 50)
+                - touch_batch: Buffered accesses before a flush (default: 100)
+            on_evict: Called with each batch of evicted keys, e.g. to drop local copies
+        """
+        self.redis_client = redis_client
+        self.on_evict = on_evict
+        self.config = config or {}
+        self.policy = self.config.get('policy', 'lru')
+        if self.policy not in ('lru', 'lfu'):
+            raise ValueError(f"Unknown eviction policy: {self.policy}")
+        self.budgets = {
+            prefix: int(mb * 1024 * 1024)
+            for prefix, mb in self.config.get('budgets_mb', {'ma': 256, 'p': 128}).items()
+        }
+        self.batch_size = self.config.get('batch_size', 200)
+        self.max_batches = self.config.get('max_batches', 50)
+        self.touch_batch = self.config.get('touch_batch', 100)
+
+        self._write = self.redis_client.register_script(_WRITE_SCRIPT)
+        self._forget = self.redis_client.register_script(_FORGET_SCRIPT)
+        self._evict = self.redis_client.register_script(_EVICT_SCRIPT)
+        self._pending_touches: Dict[str, int] = {}
+        self.stats = {
+            'evicted_keys': 0,
+            'evicted_bytes': 0,
+            'batches': 0,
+            'last_run_seconds': 0.0,
+            'max_batch_seconds': 0.0
+        }
+
+    def record_write(self, key: str, size: int) -> None:
+        """Index a newly written key with its payload size, evicting if its prefix is over budget."""
+        prefix = key_prefix(key)
+        used = int(self._write(args=[prefix, key, size, time.time()]) or 0)
+        budget = self.budgets.get(prefix)
+        if budget is not None and used > budget:
+            self.enforce_prefix(prefix)
+
+    def record_access(self, key: str) -> None:
+        """Buffer an access; flushed to Redis in batches."""
+        self._pending_touches[key] = self._pending_touches.get(key, 0) + 1
+        if len(self._pending_touches) >= self.touch_batch:
+            self.flush_accesses()
+
+    def flush_accesses(self) -> None:
+        """Write buffered accesses to the recency/frequency indexes."""
+        if not self._pending_touches:
+            return
+        touches, self._pending_touches = self._pending_touches, {}
+        now = time.time()
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key, count in touches.items():
+            prefix = key_prefix(key)
+            # XX: never resurrect index entries for deleted keys
+            pipe.zadd(f'ix:r:{prefix}', {key: now}, xx=True)
+            pipe.zadd(f'ix:f:{prefix}', {key: count}, xx=True, incr=True)
+        pipe.execute()
+
+    def forget(self, keys: Iterable[str]) -> int:
+        """Drop deleted keys from the indexes; returns bytes released."""
+        by_prefix: Dict[str, List[str]] = {}
+        for key in keys:
+            key = key.decode() if isinstance(key, bytes) else key
+            by_prefix.setdefault(key_prefix(key), []).append(key)
+
+        freed = 0
+        for prefix, prefix_keys in by_prefix.items():
+            for i in range(0, len(prefix_keys), self.batch_size):
+                freed += int(self._forget(args=[prefix, *prefix_keys[i:i + self.batch_size]]) or 0)
+        return freed
+
+    def usage(self) -> Dict[str, int]:
+        """Get tracked payload bytes per prefix."""
+        raw = self.redis_client.hgetall('ix:bytes') or {}
+        return {
+            (k.decode() if isinstance(k, bytes) else k): int(v)
+            for k, v in raw.items()
+        }
+
+    def evict_prefix(self, prefix: str, bytes_to_free: int) -> Tuple[int, int]:
+        """
+        Evict the coldest keys of a prefix until enough bytes are freed.
+
+        Returns:
+            Tuple of (keys evicted, bytes freed)
+        """
+        index = 'r' if self.policy == 'lru' else 'f'
+        evicted_keys = 0
+        freed = 0
+        for _ in range(self.max_batches):
+            if freed >= bytes_to_free:
+                break
+            start = time.perf_counter()
+            count, batch_freed, *victims = self._evict(args=[prefix, index, self.batch_size])
+            if victims:
+                self.redis_client.unlink(*victims)
+            elapsed = time.perf_counter() - start
+            self.stats['batches'] += 1
+            self.stats['max_batch_seconds'] = max(self.stats['max_batch_seconds'], elapsed)
+            if not count:
+                break
+            if victims and self.on_evict is not None:
+                self.on_evict([key.decode() if isinstance(key, bytes) else key for key in victims])
+            evicted_keys += int(count)
+            freed += int(batch_freed)
+
+        self.stats['evicted_keys'] += evicted_keys
+        self.stats['evicted_bytes'] += freed
+        return evicted_keys, freed
+
+    def enforce_budgets(self) -> Dict[str, Tuple[int, int]]:
+        """Bring every budgeted prefix back under its limit."""
+        start = time.perf_counter()
+        self.flush_accesses()
+        usage = self.usage()
+        results = {}
+        for prefix, budget in self.budgets.items():
+            used = usage.get(prefix, 0)
+            if used > budget:
+                # Evict down to 90% so we don't trip the budget on the next write
+                results[prefix] = self.evict_prefix(prefix, used - int(budget * 0.9))
+                logger.info(
+                    f"Evicted {results[prefix][0]} '{prefix}:' keys "
+                    f"({results[prefix][1] / (1024 * 1024):.2f}MB)"
+                )
+        self.stats['last_run_seconds'] = time.perf_counter() - start
+        return results
+
+    def enforce_prefix(self, prefix: str) -> Tuple[int, int]:
+        """
+        Bring one prefix back to 90% of its budget.
+
+        Runs on the write path, so it only evicts; index entries for keys
+        Redis already expired are dropped by the periodic reconcile().
+
+        Returns:
+            Tuple of (keys evicted, bytes freed)
+        """
+        budget = self.budgets.get(prefix)
+        if budget is None:
+            return 0, 0
+        start = time.perf_counter()
+        self.flush_accesses()
+        used = self.usage().get(prefix, 0)
+        result = (0, 0)
+        # Evict down to 90% so the next writes don't trip the budget again
+        if used > int(budget * 0.9):
+            result = self.evict_prefix(prefix, used - int(budget * 0.9))
+            logger.info(f"Evicted {result[0]} '{prefix}:' keys ({result[1] / (1024 * 1024):.2f}MB)")
+        self.stats['last_run_seconds'] = time.perf_counter() - start
+        return result
+
+    def reconcile(self, prefix: str) -> int:
+        """
+        Remove index entries whose keys already expired via TTL.
+
+        Walks the recency index with ZSCAN so Redis is never blocked.
+        """
+        stale: List[str] = []
+        batch: List[str] = []
+        for member, _ in self.redis_client.zscan_iter(f'ix:r:{prefix}', count=self.batch_size):
+            batch.append(member.decode() if isinstance(member, bytes) else member)
+            if len(batch) >= self.batch_size:
+                stale.extend(self._missing(batch))
+                batch = []
+        if batch:
+            stale.extend(self._missing(batch))
+
+        if stale:
+            self.forget(stale)
+        return len(stale)
+
+    def _missing(self, keys: List[str]) -> List[str]:
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.exists(key)
+        return [key for key, exists in zip(keys, pipe.execute()) if not exists]
+
+    def key_count(self, prefix: str) -> int:
+        """Number of tracked keys for a prefix."""
+        return int(self.redis_client.zcard(f'ix:r:{prefix}') or 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get eviction counters and per-prefix usage vs budget."""
+        usage = self.usage()
+        return {
+            'policy': self.policy,
+            **self.stats,
+            'prefixes': {
+                prefix: {
+                    'used_mb': usage.get(prefix, 0) / (1024 * 1024),
+                    'budget_mb': budget / (1024 * 1024)
+                }
+                for prefix, budget in self.budgets.items()
+            }
+        }
@@ -2,6 +2,9 @@
 Caching layer for market analysis results with space optimization and cleanup.
 
 This module provides Redis-based caching for market analysis data with:
+- In-process L1 cache in front of Redis
+- Request coalescing for concurrent misses
+- Incremental LRU/LFU eviction with per-prefix memory budgets
 - Automatic cache cleanup
 - Memory usage monitoring
 - Space-efficient storage
@@ -10,10 +13,14 @@ This module provides Redis-based caching for market analysis data with:
 
 import redis
 import json
-from typing import Dict, Any, Optional, List, Set
+import time
+from typing import Dict, Any, Optional, List, Set, Callable, Awaitable
 from datetime import datetime, timedelta
 import hashlib
-import zlib
+from itertools import islice
+from .codec import PayloadCodec, CodecError
+from .local_cache import LocalLRUCache, SingleFlight
+from .eviction import CacheEvictor, INDEX_PREFIX
 from ..utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -23,12 +30,17 @@ class MarketCache:
     Space-optimized caching system for market analysis data.
     
     Features:
+    - Bounded in-process L1 in front of Redis
+    - Single-flight computation of missing analyses
     - Compression for large datasets
     - Automatic cleanup of stale data
     - Memory usage monitoring
     - Configurable retention policies
     """
     
+    # Key prefixes indexed by the evictor
+    _tracked_prefixes = ('ma', 'p', 'n', 't')
+    
     def __init__(self, config: Optional[Dict] = None):
         """
         Initialize the cache with configuration.
@@ -41,6 +53,13 @@ class MarketCache:
                 - default_ttl: Default TTL in seconds (default: 3600)
                 - max_memory_mb: Max memory usage in MB (default: 512)
                 - compression_threshold: Size in bytes above which to compress (default: 1024)
+                - compressor: auto, none, zlib, zstd or lz4 (default: auto)
+                - serializer: json, msgpack or auto (default: json)
+                - l1_enabled: Keep decoded entries in process memory (default: True)
+                - l1_max_entries: Max L1 entries (default: 1024)
+                - l1_max_mb: Max L1 payload size in MB (default: 64)
+                - l1_ttl: Max L1 entry lifetime in seconds (default: 300)
+                - eviction: CacheEvictor config (policy, budgets_mb, batch_size, ...)
         """
         self.config = config or {}
         try:
@@ -58,30 +77,46 @@ class MarketCache:
         self.default_ttl = self.config.get('default_ttl', 3600)
         self.max_memory_mb = self.config.get('max_memory_mb', 512)
         self.compression_threshold = self.config.get('compression_threshold', 1024)
+        self.codec = PayloadCodec(
+            compression_threshold=self.compression_threshold,
+            compressor=self.config.get('compressor', 'auto'),
+            serializer=self.config.get('serializer', 'json')
+        )
         
-        # Set Redis max memory policy
+        # In-process L1 tier; entries never outlive their Redis TTL
+        self.l1: Optional[LocalLRUCache] = None
+        if self.config.get('l1_enabled', True):
+            self.l1 = LocalLRUCache(
+                max_entries=self.config.get('l1_max_entries', 1024),
+                max_bytes=int(self.config.get('l1_max_mb', 64) * 1024 * 1024),
+                default_ttl=self.config.get('l1_ttl', 300)
+            )
+        self._single_flight = SingleFlight()
+        self.evictor = CacheEvictor(self.redis_client, self.config.get('eviction'),
+                                    on_evict=self._drop_local)
+        self._l2_stats = {
+            'hits': 0,
+            'misses': 0,
+            'errors': 0,
+            'decode_seconds': 0.0
+        }
+        
+        # Set Redis max memory policy; only keys with a TTL may be evicted,
+        # so Redis never drops the evictor's index and byte ledger
         if not self.config.get('testing', False):
             self.redis_client.config_set('maxmemory', f'{self.max_memory_mb}mb')
-            self.redis_client.config_set('maxmemory-policy', 'allkeys-lru')
+            self.redis_client.config_set('maxmemory-policy', 'volatile-lru')
         
         # Initialize cleanup schedule
         self._schedule_cleanup()
     
     def _compress_data(self, data: Any) -> bytes:
-        """Compress data if it exceeds threshold."""
-        json_str = json.dumps(data, separators=(',', ':'))
-        data_bytes = json_str.encode()
-        if len(data_bytes) > self.compression_threshold:
-            return zlib.compress(data_bytes)
-        return data_bytes
+        """Serialize data, compressing it if it exceeds threshold."""
+        return self.codec.encode(data)
     
     def _decompress_data(self, data: bytes) -> Any:
-        """Decompress data if it was compressed."""
-        try:
-            decompressed = zlib.decompress(data).decode()
-        except zlib.error:
-            decompressed = data.decode()
-        return json.loads(decompressed)
+        """Decode data using the codec named in its header byte."""
+        return self.codec.decode(data)
     
     def _schedule_cleanup(self) -> None:
         """Schedule periodic cache cleanup."""
@@ -93,6 +128,13 @@ class MarketCache:
     def _cleanup_expired(self) -> None:
         """Remove expired keys and optimize memory usage."""
         try:
+            # Drop index entries for keys Redis already expired
+            for prefix in self._tracked_prefixes:
+                self.evictor.reconcile(prefix)
+            
+            # Keep each prefix within its own budget
+            self.evictor.enforce_budgets()
+            
             # Get memory usage
             info = self.redis_client.info()
             used_memory = int(info['used_memory']) / (1024 * 1024)  # Convert to MB
@@ -106,30 +148,126 @@ class MarketCache:
         except redis.RedisError as e:
             logger.error(f"Error during cache cleanup: {e}")
     
-    def _cleanup_lru(self) -> None:
-        """Remove least recently used items when memory is high."""
+    def _cleanup_lru(self, fraction: float = 0.1) -> None:
+        """Evict the coldest fraction of tracked bytes from every prefix."""
         try:
-            # Get all keys sorted by access time
-            keys = self.redis_client.keys('*')
-            if not keys:
-                return
-                
-            # Remove 10% of least recently used keys
-            num_to_remove = max(1, len(keys) // 10)
-            keys_to_remove = keys[:num_to_remove]
-            
-            if keys_to_remove:
-                self.redis_client.delete(*keys_to_remove)
-                logger.info(f"Removed {len(keys_to_remove)} least recently used cache entries")
+            usage = self.evictor.usage()
+            for prefix in self._tracked_prefixes:
+                to_free = int(usage.get(prefix, 0) * fraction)
+                if to_free > 0:
+                    keys, freed = self.evictor.evict_prefix(prefix, to_free)
+                    logger.info(f"Removed {keys} least recently used '{prefix}:' cache entries")
         except redis.RedisError as e:
             logger.error(f"Error during LRU cleanup: {e}")
     
+    def _drop_local(self, keys: List[str]) -> None:
+        """Drop keys evicted from Redis from L1."""
+        if self.l1 is not None:
+            for key in keys:
+                self.l1.delete(key)
+    
     def _generate_key(self, prefix: str, params: Dict[str, Any]) -> str:
         """Generate space-efficient cache key."""
         param_str = json.dumps(params, sort_keys=True, separators=(',', ':'))
         key_hash = hashlib.blake2b(param_str.encode(), digest_size=8).hexdigest()
         return f"{prefix}:{key_hash}"
     
+    def _get_cached(self, cache_key: str) -> Optional[Any]:
+        """Look up a key in L1, then Redis, promoting Redis hits into L1."""
+        if self.l1 is not None:
+            data = self.l1.get(cache_key)
+            if data is not None:
+                self.evictor.record_access(cache_key)
+                return data
+        
+        cached_data = self.redis_client.get(cache_key)
+        if not cached_data:
+            self._l2_stats['misses'] += 1
+            return None
+        
+        start = time.perf_counter()
+        data = self._decompress_data(cached_data)
+        self._l2_stats['decode_seconds'] += time.perf_counter() - start
+        self._l2_stats['hits'] += 1
+        self.evictor.record_access(cache_key)
+        
+        if self.l1 is not None:
+            self.l1.set(cache_key, data, len(cached_data), self._remaining_ttl(cache_key))
+        return data
+    
+    def _set_cached(self, cache_key: str, data: Any, ttl: int) -> None:
+        """Write an entry to Redis and L1."""
+        compressed_data = self._compress_data(data)
+        self.redis_client.setex(cache_key, ttl, compressed_data)
+        self.evictor.record_write(cache_key, len(compressed_data))
+        if self.l1 is not None:
+            self.l1.set(cache_key, data, len(compressed_data), ttl)
+    
+    def _remaining_ttl(self, cache_key: str) -> Optional[float]:
+        """Get the Redis TTL of a key so L1 copies expire no later."""
+        try:
+            ttl = self.redis_client.ttl(cache_key)
+        except redis.RedisError:
+            return None
+        return ttl if isinstance(ttl, int) and ttl > 0 else None
+    
+    def _invalidate_pattern(self, pattern: str) -> None:
+        """Delete matching keys from both tiers."""
+        if self.l1 is not None:
+            self.l1.delete_pattern(pattern)
+        batch = []
+        for key in self.redis_client.scan_iter(match=pattern, count=self.evictor.batch_size):
+            if key.startswith(INDEX_PREFIX.encode() if isinstance(key, bytes) else INDEX_PREFIX):
+                continue
+            batch.append(key)
+            if len(batch) >= self.evictor.batch_size:
+                self._delete_keys(batch)
+                batch = []
+        if batch:
+            self._delete_keys(batch)
+    
+    def _delete_keys(self, keys: List[Any]) -> None:
+        """Delete keys from Redis and the eviction index."""
+        self.redis_client.unlink(*keys)
+        self.evictor.forget(keys)
+    
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the L1 and Redis tiers and coalescing."""
+        l2_lookups = self._l2_stats['hits'] + self._l2_stats['misses']
+        return {
+            'l1': self.l1.get_stats() if self.l1 is not None else {'enabled': False},
+            'l2': {
+                **self._l2_stats,
+                'hit_rate': self._l2_stats['hits'] / l2_lookups if l2_lookups else 0.0
+            },
+            'coalescing': self._single_flight.get_stats()
+        }
+    
+    async def get_or_compute_market_analysis(self,
+                                           zip_code: str,
+                                           analysis_type: str,
+                                           params: Dict[str, Any],
+                                           compute: Callable[[], Awaitable[Dict[str, Any]]],
+                                           ttl: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get cached market analysis or compute it exactly once.
+        
+        Concurrent misses for the same key share a single call to
+        ``compute``; its result is cached in both tiers.
+        """
+        cached_result = self.get_market_analysis(zip_code, analysis_type, params)
+        if cached_result:
+            return cached_result
+        
+        cache_key = self._generate_key(f"ma:{zip_code}:{analysis_type}", params)
+        
+        async def _load() -> Dict[str, Any]:
+            result = await compute()
+            self.cache_market_analysis(zip_code, analysis_type, params, result, ttl)
+            return result
+        
+        return await self._single_flight.do(cache_key, _load)
+    
     def get_market_analysis(self,
                           zip_code: str,
                           analysis_type: str,
@@ -141,14 +279,14 @@ class MarketCache:
         )
         
         try:
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                data = self._decompress_data(cached_data)
+            data = self._get_cached(cache_key)
+            if data is not None:
                 logger.debug(f"Cache hit for {cache_key}")
                 return data
             logger.debug(f"Cache miss for {cache_key}")
             return None
-        except (redis.RedisError, json.JSONDecodeError) as e:
+        except (redis.RedisError, json.JSONDecodeError, CodecError) as e:
+            self._l2_stats['errors'] += 1
             logger.error(f"Error retrieving market analysis: {e}")
             return None
     
@@ -166,12 +304,10 @@ class MarketCache:
         
         try:
             results['cached_at'] = datetime.now().isoformat()
-            compressed_data = self._compress_data(results)
-            
-            self.redis_client.setex(
+            self._set_cached(
                 cache_key,
-                ttl or self.default_ttl,
-                compressed_data
+                results,
+                ttl or self.default_ttl
             )
             logger.debug(f"Cached market analysis for {cache_key}")
         except redis.RedisError as e:
@@ -184,14 +320,14 @@ class MarketCache:
         cache_key = f"p:{source}:{property_id}"  # Shortened prefix
         
         try:
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                data = self._decompress_data(cached_data)
+            data = self._get_cached(cache_key)
+            if data is not None:
                 logger.debug(f"Cache hit for property {property_id}")
                 return data
             logger.debug(f"Cache miss for property {property_id}")
             return None
-        except (redis.RedisError, json.JSONDecodeError) as e:
+        except (redis.RedisError, json.JSONDecodeError, CodecError) as e:
+            self._l2_stats['errors'] += 1
             logger.error(f"Error retrieving property data: {e}")
             return None
     
@@ -205,12 +341,10 @@ class MarketCache:
         
         try:
             data['cached_at'] = datetime.now().isoformat()
-            compressed_data = self._compress_data(data)
-            
-            self.redis_client.setex(
+            self._set_cached(
                 cache_key,
-                ttl or self.default_ttl,
-                compressed_data
+                data,
+                ttl or self.default_ttl
             )
             logger.debug(f"Cached property data for {property_id}")
         except redis.RedisError as e:
@@ -224,21 +358,23 @@ class MarketCache:
                 'memory_used_mb': int(info['used_memory']) / (1024 * 1024),
                 'memory_peak_mb': int(info['used_memory_peak']) / (1024 * 1024),
                 'memory_limit_mb': self.max_memory_mb,
-                'total_keys': len(self.redis_client.keys('*')),
+                'total_keys': self.redis_client.dbsize(),
                 'hit_rate': info['keyspace_hits'] / (
                     info['keyspace_hits'] + info['keyspace_misses']
                 ) if info['keyspace_hits'] > 0 else 0,
                 'uptime_seconds': info['uptime_in_seconds'],
-                'compression_ratio': self._get_compression_ratio()
+                'compression_ratio': self._get_compression_ratio(),
+                'tiers': self.get_tier_stats()
             }
             
             # Add key type statistics
             stats['key_counts'] = {
-                'market_analysis': len(self.redis_client.keys('ma:*')),
-                'property': len(self.redis_client.keys('p:*')),
-                'neighborhood': len(self.redis_client.keys('n:*')),
-                'trends': len(self.redis_client.keys('t:*'))
+                'market_analysis': self.evictor.key_count('ma'),
+                'property': self.evictor.key_count('p'),
+                'neighborhood': self.evictor.key_count('n'),
+                'trends': self.evictor.key_count('t')
             }
+            stats['eviction'] = self.evictor.get_stats()
             
             return stats
         except redis.RedisError as e:
@@ -248,18 +384,22 @@ class MarketCache:
     def _get_compression_ratio(self) -> float:
         """Calculate average compression ratio."""
         try:
-            keys = self.redis_client.keys('*')
+            # Sample up to 100 keys without scanning the whole keyspace
+            keys = list(islice(
+                (k for k in self.redis_client.scan_iter(match='*', count=100)
+                 if not k.startswith(INDEX_PREFIX.encode())),
+                100
+            ))
             if not keys:
                 return 0.0
                 
-            sample_size = min(100, len(keys))  # Sample up to 100 keys
             total_ratio = 0.0
             count = 0
             
-            for key in keys[:sample_size]:
+            for key in keys:
                 data = self.redis_client.get(key)
                 if data:
-                    original_size = len(self._decompress_data(data).encode())
+                    original_size = len(json.dumps(self._decompress_data(data)).encode())
                     compressed_size = len(data)
                     if original_size > 0:
                         total_ratio += compressed_size / original_size
@@ -274,14 +414,14 @@ class MarketCache:
         cache_key = f"n:{zip_code}"
         
         try:
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                data = self._decompress_data(cached_data)
+            data = self._get_cached(cache_key)
+            if data is not None:
                 logger.debug(f"Cache hit for neighborhood score {zip_code}")
                 return data
             logger.debug(f"Cache miss for neighborhood score {zip_code}")
             return None
-        except (redis.RedisError, json.JSONDecodeError) as e:
+        except (redis.RedisError, json.JSONDecodeError, CodecError) as e:
+            self._l2_stats['errors'] += 1
             logger.error(f"Error retrieving neighborhood score: {e}")
             return None
     
@@ -294,12 +434,10 @@ class MarketCache:
         
         try:
             score_data['cached_at'] = datetime.now().isoformat()
-            compressed_data = self._compress_data(score_data)
-            
-            self.redis_client.setex(
+            self._set_cached(
                 cache_key,
-                ttl or self.default_ttl * 24,  # Neighborhood scores cached for longer
-                compressed_data
+                score_data,
+                ttl or self.default_ttl * 24  # Neighborhood scores cached for longer
             )
             logger.debug(f"Cached neighborhood score for {zip_code}")
         except redis.RedisError as e:
@@ -313,14 +451,14 @@ class MarketCache:
         cache_key = f"t:{zip_code}:{trend_type}:{timeframe}"
         
         try:
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                data = self._decompress_data(cached_data)
+            data = self._get_cached(cache_key)
+            if data is not None:
                 logger.debug(f"Cache hit for market trends {zip_code}")
                 return data
             logger.debug(f"Cache miss for market trends {zip_code}")
             return None
-        except (redis.RedisError, json.JSONDecodeError) as e:
+        except (redis.RedisError, json.JSONDecodeError, CodecError) as e:
+            self._l2_stats['errors'] += 1
             logger.error(f"Error retrieving market trends: {e}")
             return None
     
@@ -335,12 +473,10 @@ class MarketCache:
         
         try:
             trend_data['cached_at'] = datetime.now().isoformat()
-            compressed_data = self._compress_data(trend_data)
-            
-            self.redis_client.setex(
+            self._set_cached(
                 cache_key,
-                ttl or self.default_ttl * 12,  # Market trends cached for 12 hours
-                compressed_data
+                trend_data,
+                ttl or self.default_ttl * 12  # Market trends cached for 12 hours
             )
             logger.debug(f"Cached market trends for {zip_code}")
         except redis.RedisError as e:
@@ -349,16 +485,12 @@ class MarketCache:
     def invalidate_zip_code(self, zip_code: str) -> None:
         """Invalidate all cached data for a ZIP code."""
         pattern = f"*:{zip_code}:*"
-        keys = self.redis_client.keys(pattern)
-        if keys:
-            self.redis_client.delete(*keys)
+        self._invalidate_pattern(pattern)
     
     def invalidate_property(self, property_id: str) -> None:
         """Invalidate cached data for a property."""
         pattern = f"p:*:{property_id}"
-        keys = self.redis_client.keys(pattern)
-        if keys:
-            self.redis_client.delete(*keys)
+        self._invalidate_pattern(pattern)
     
     def invalidate_analysis_type(self,
                                analysis_type: str,
@@ -368,6 +500,4 @@ class MarketCache:
         if zip_code:
             pattern = f"ma:{zip_code}:{analysis_type}:*"
             
-        keys = self.redis_client.keys(pattern)
-        if keys:
-            self.redis_client.delete(*keys)
+        self._invalidate_pattern(pattern)
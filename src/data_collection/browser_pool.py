@@ -0,0 +1,190 @@
+"""
+Browser Pool
+
+Shared headless Chromium for the neighborhood crawlers. Launching a browser
+costs far more than loading a search page, so one browser and context are
+started on first use and kept for every later crawl on the same event loop.
+Concurrent pages are bounded by a semaphore, pages for each source are rate
+limited, and images, fonts and media are aborted before they are requested
+since the crawlers only read page text. A launched browser is closed when
+its event loop shuts down, if nothing closed it before.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Collection, Dict, Mapping, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright, Route
+
+from src.utils.loop_shutdown import close_on_loop_shutdown
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/91.0.4472.124 Safari/537.36")
+
+# Resource types never needed to read post text
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+# Pages open at once per pool
+MAX_PAGES = 4
+
+# Pages per minute for each crawled site, and how many may start back to back
+SOURCE_RATE_LIMITS = {"reddit": 30, "city-data": 20}
+RATE_LIMIT_BURST = 3
+
+
+class RateLimiter:
+    """Token bucket limiting how often something may happen, for use on one event loop."""
+
+    def __init__(self, per_minute: float, burst: int = RATE_LIMIT_BURST):
+        """
+        Args:
+            per_minute: Sustained acquisitions per minute
+            burst: Acquisitions allowed back to back after an idle period
+        """
+        self.interval = 60 / per_minute
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it; waiters are served in order."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.interval)
+
+
+class BrowserPool:
+    """
+    A long-lived browser and context handing out pages to concurrent crawls.
+
+    Playwright objects belong to the event loop they were created on, so use
+    get_browser_pool() to get the pool for the running loop rather than
+    sharing one pool between loops.
+    """
+
+    def __init__(self, max_pages: int = MAX_PAGES, headless: bool = True,
+                 blocked_resource_types: Collection[str] = BLOCKED_RESOURCE_TYPES,
+                 user_agent: str = USER_AGENT, rate_limits: Mapping[str, float] = SOURCE_RATE_LIMITS):
+        """
+        Configure the pool; the browser is launched by the first page().
+
+        Args:
+            max_pages: Pages open at once; further page() calls wait
+            headless: Whether to run Chromium headless
+            blocked_resource_types: Playwright resource types to abort
+            user_agent: User agent for the shared context
+            rate_limits: Pages per minute by source; sources not listed are unlimited
+        """
+        self.max_pages = max_pages
+        self.headless = headless
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.user_agent = user_agent
+        self.pages_opened = 0
+        self._rate_limiters: Dict[str, RateLimiter] = {source: RateLimiter(per_minute)
+                                                       for source, per_minute in rate_limits.items()}
+        self._semaphore = asyncio.BoundedSemaphore(max_pages)
+        self._start_lock = asyncio.Lock()
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._shutdown_guard: Optional[AsyncGenerator[None, None]] = None
+
+    async def _get_context(self) -> BrowserContext:
+        async with self._start_lock:
+            if self._browser is not None and not self._browser.is_connected():
+                logger.warning("Browser disconnected, relaunching")
+                await self.close()
+            if self._context is None:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                self._context = await self._browser.new_context(user_agent=self.user_agent)
+                if self.blocked_resource_types:
+                    await self._context.route("**/*", self._filter_request)
+                self._shutdown_guard = await close_on_loop_shutdown(self._close_browser)
+                logger.info(f"Launched pooled browser for up to {self.max_pages} pages")
+            return self._context
+
+    async def _filter_request(self, route: Route) -> None:
+        if route.request.resource_type in self.blocked_resource_types:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def page(self, source: Optional[str] = None) -> AsyncIterator[Page]:
+        """
+        Open a page in the shared context and close it afterwards.
+
+        Waits for the source's rate limit, then for a free page slot.
+
+        Args:
+            source: Site the page will load, for its rate limit
+        """
+        limiter = self._rate_limiters.get(source)
+        if limiter is not None:
+            await limiter.acquire()
+        async with self._semaphore:
+            context = await self._get_context()
+            page = await context.new_page()
+            self.pages_opened += 1
+            try:
+                yield page
+            finally:
+                await page.close()
+
+    async def close(self) -> None:
+        """Close the browser; the next page() launches a new one."""
+        guard, self._shutdown_guard = self._shutdown_guard, None
+        if guard is not None:
+            await guard.aclose()
+        else:
+            await self._close_browser()
+
+    async def _close_browser(self) -> None:
+        self._shutdown_guard = None
+        context, browser, playwright = self._context, self._browser, self._playwright
+        self._context = self._browser = self._playwright = None
+        try:
+            if context is not None:
+                await context.close()
+            if browser is not None:
+                await browser.close()
+        except Exception as e:
+            logger.error(f"Error closing pooled browser: {str(e)}")
+        finally:
+            if playwright is not None:
+                await playwright.stop()
+
+
+# One pool per event loop, dropped with the loop
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = weakref.WeakKeyDictionary()
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Get the shared BrowserPool for the running event loop.
+
+    Returns:
+        The pool, created on first use on this loop. Its browser is closed
+        when the loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = BrowserPool()
+    return pool
@@ -11,71 +11,59 @@ import json
 import logging
 import os
 import re
-import sqlite3
+import sys
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import quote_plus
 
-from playwright.async_api import async_playwright, Page, Browser
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Ensure project directory is in path
+sys_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if sys_path not in sys.path:
+    sys.path.append(sys_path)
+
+from src.data_collection.browser_pool import BrowserPool, get_browser_pool
+from src.data_management.neighborhood_db import get_neighborhood_db
+
 # Database setup
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                       'data', 'neighborhood_data.db')
 
+# Search pages, formatted with the URL-encoded query
+REDDIT_SEARCH_URL = "https://www.reddit.com/search/?q={query}&sort=relevance"
+CITY_DATA_SEARCH_URL = "https://www.city-data.com/forum/search.php?do=process&query={query}&titleonly=0"
+
+REDDIT_POST_SELECTOR = "div[data-testid='post-container']"
+
 
 class NeighborhoodCrawler:
     """Crawler that collects neighborhood sentiment data from various sources."""
     
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: str = DB_PATH, browser_pool: Optional[BrowserPool] = None):
         """
         Initialize the neighborhood crawler.
         
         Args:
             db_path: Path to the SQLite database for storing crawled data
+            browser_pool: Browser pool to crawl with (the running event loop's
+                shared pool if None)
         """
         self.db_path = db_path
+        self.browser_pool = browser_pool
         self._ensure_db_exists()
     
     def _ensure_db_exists(self):
         """
         Ensure the database and required tables exist.
         """
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create tables if they don't exist
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS neighborhood_posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            neighborhood TEXT NOT NULL,
-            source TEXT NOT NULL,
-            title TEXT,
-            content TEXT NOT NULL,
-            url TEXT,
-            post_date TEXT,
-            crawl_date TEXT NOT NULL,
-            metadata TEXT
-        )
-        ''')
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS neighborhood_cache (
-            neighborhood TEXT PRIMARY KEY,
-            data TEXT NOT NULL,
-            last_updated TEXT NOT NULL
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        self.db = get_neighborhood_db(self.db_path)
         
         logger.info(f"Database initialized at {self.db_path}")
     
@@ -83,6 +71,9 @@ class NeighborhoodCrawler:
         """
         Crawl Reddit for posts about a specific neighborhood.
         
+        The search terms are fetched concurrently, each in its own page from
+        the shared browser pool.
+        
         Args:
             neighborhood: The neighborhood to search for
             max_posts: Maximum number of posts to collect
@@ -90,7 +81,6 @@ class NeighborhoodCrawler:
         Returns:
             List of dictionaries containing post data
         """
-        results = []
         search_terms = [
             f"{neighborhood} neighborhood review",
             f"{neighborhood} living",
@@ -98,68 +88,79 @@ class NeighborhoodCrawler:
         ]
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                )
+            searches = await asyncio.gather(*(
+                self._search_reddit(neighborhood, search_term, max_posts // len(search_terms))
+                for search_term in search_terms
+            ))
+        except Exception as e:
+            logger.error(f"Error during Reddit crawling: {str(e)}")
+            return []
+        
+        return [post for posts in searches for post in posts]
+    
+    async def _search_reddit(self, neighborhood: str, search_term: str, max_posts: int) -> List[Dict[str, Any]]:
+        """
+        Collect the relevant posts from one Reddit search.
+        
+        Args:
+            neighborhood: The neighborhood being crawled
+            search_term: The search query
+            max_posts: Maximum number of result posts to read
+            
+        Returns:
+            List of dictionaries containing post data
+        """
+        results = []
+        search_url = REDDIT_SEARCH_URL.format(query=quote_plus(search_term))
+        logger.info(f"Crawling Reddit with search term: {search_term}")
+        
+        async with self._browser_pool().page("reddit") as page:
+            try:
+                await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
                 
-                for search_term in search_terms:
-                    page = await context.new_page()
-                    encoded_term = quote_plus(search_term)
-                    search_url = f"https://www.reddit.com/search/?q={encoded_term}&sort=relevance"
-                    
-                    logger.info(f"Crawling Reddit with search term: {search_term}")
-                    
+                # Wait for posts to render rather than for a fixed time
+                try:
+                    await page.wait_for_selector(REDDIT_POST_SELECTOR, timeout=10000)
+                except PlaywrightTimeoutError:
+                    logger.info(f"No posts rendered for search term: {search_term}")
+                    return results
+                
+                # Extract posts
+                posts = await page.query_selector_all(REDDIT_POST_SELECTOR)
+                logger.info(f"Found {len(posts)} posts for search term: {search_term}")
+                
+                for post in posts[:max_posts]:
                     try:
-                        await page.goto(search_url, timeout=30000)
-                        await page.wait_for_load_state("networkidle", timeout=10000)
+                        # Extract title
+                        title_elem = await post.query_selector("h3")
+                        title = await title_elem.inner_text() if title_elem else "No title"
                         
-                        # Wait for posts to load
-                        await page.wait_for_timeout(3000)
+                        # Extract URL
+                        link_elem = await post.query_selector("a[data-click-id='body']")
+                        post_url = await link_elem.get_attribute("href") if link_elem else None
+                        if post_url and not post_url.startswith("http"):
+                            post_url = f"https://www.reddit.com{post_url}"
                         
-                        # Extract posts
-                        posts = await page.query_selector_all("div[data-testid='post-container']")
-                        logger.info(f"Found {len(posts)} posts for search term: {search_term}")
+                        # Extract content preview
+                        content = await post.inner_text()
                         
-                        for post in posts[:max_posts // len(search_terms)]:
-                            try:
-                                # Extract title
-                                title_elem = await post.query_selector("h3")
-                                title = await title_elem.inner_text() if title_elem else "No title"
-                                
-                                # Extract URL
-                                link_elem = await post.query_selector("a[data-click-id='body']")
-                                post_url = await link_elem.get_attribute("href") if link_elem else None
-                                if post_url and not post_url.startswith("http"):
-                                    post_url = f"https://www.reddit.com{post_url}"
-                                
-                                # Extract content preview
-                                content = await post.inner_text()
-                                
-                                # Only add if the post seems relevant
-                                if neighborhood.lower() in title.lower() or neighborhood.lower() in content.lower():
-                                    results.append({
-                                        "neighborhood": neighborhood,
-                                        "source": "reddit",
-                                        "title": title,
-                                        "content": content,
-                                        "url": post_url,
-                                        "post_date": None,  # Reddit doesn't show exact dates in search
-                                        "crawl_date": datetime.now().isoformat(),
-                                        "metadata": json.dumps({"search_term": search_term})
-                                    })
-                            except Exception as e:
-                                logger.error(f"Error extracting Reddit post: {str(e)}")
-                                continue
+                        # Only add if the post seems relevant
+                        if neighborhood.lower() in title.lower() or neighborhood.lower() in content.lower():
+                            results.append({
+                                "neighborhood": neighborhood,
+                                "source": "reddit",
+                                "title": title,
+                                "content": content,
+                                "url": post_url,
+                                "post_date": None,  # Reddit doesn't show exact dates in search
+                                "crawl_date": datetime.now().isoformat(),
+                                "metadata": json.dumps({"search_term": search_term})
+                            })
                     except Exception as e:
-                        logger.error(f"Error during Reddit search for '{search_term}': {str(e)}")
-                    finally:
-                        await page.close()
-                
-                await browser.close()
-        except Exception as e:
-            logger.error(f"Error during Reddit crawling: {str(e)}")
+                        logger.error(f"Error extracting Reddit post: {str(e)}")
+                        continue
+            except Exception as e:
+                logger.error(f"Error during Reddit search for '{search_term}': {str(e)}")
         
         return results
     
@@ -178,22 +179,18 @@ class NeighborhoodCrawler:
         search_term = f"{neighborhood} {city if city else ''}".strip()
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                )
-                page = await context.new_page()
-                
-                # City-Data search URL
-                encoded_term = quote_plus(search_term)
-                search_url = f"https://www.city-data.com/forum/search.php?do=process&query={encoded_term}&titleonly=0"
+            async with self._browser_pool().page("city-data") as page:
+                search_url = CITY_DATA_SEARCH_URL.format(query=quote_plus(search_term))
                 
                 logger.info(f"Crawling City-Data forums for: {search_term}")
                 
                 try:
-                    await page.goto(search_url, timeout=30000)
-                    await page.wait_for_load_state("networkidle", timeout=10000)
+                    await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
+                    try:
+                        await page.wait_for_selector("li.searchresult", timeout=10000)
+                    except PlaywrightTimeoutError:
+                        logger.info(f"No City-Data forum results rendered for: {search_term}")
+                        return results
                     
                     # Extract search results
                     result_items = await page.query_selector_all("li.searchresult")
@@ -233,14 +230,21 @@ class NeighborhoodCrawler:
                             continue
                 except Exception as e:
                     logger.error(f"Error during City-Data search: {str(e)}")
-                finally:
-                    await page.close()
-                    await browser.close()
         except Exception as e:
             logger.error(f"Error during City-Data crawling: {str(e)}")
         
         return results
     
+    def _browser_pool(self) -> BrowserPool:
+        """The pool passed to the constructor, or the running event loop's shared one."""
+        return self.browser_pool or get_browser_pool()
+    
+    async def close(self):
+        """
+        Close the crawler's browser; the next crawl launches a new one.
+        """
+        await self._browser_pool().close()
+    
     def store_posts(self, posts: List[Dict[str, Any]]):
         """
         Store crawled posts in the database.
@@ -252,27 +256,7 @@ class NeighborhoodCrawler:
             logger.info("No posts to store")
             return
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for post in posts:
-            cursor.execute('''
-            INSERT INTO neighborhood_posts 
-            (neighborhood, source, title, content, url, post_date, crawl_date, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                post["neighborhood"],
-                post["source"],
-                post["title"],
-                post["content"],
-                post["url"],
-                post["post_date"],
-                post["crawl_date"],
-                post["metadata"]
-            ))
-        
-        conn.commit()
-        conn.close()
+        self.db.insert_posts(posts)
         
         logger.info(f"Stored {len(posts)} posts in the database")
     
@@ -287,23 +271,10 @@ class NeighborhoodCrawler:
         Returns:
             List of post dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # This enables column access by name
-        cursor = conn.cursor()
-        
         # Calculate the cutoff date
         cutoff_date = (datetime.now() - timedelta(days=max_age_days)).isoformat()
         
-        cursor.execute('''
-        SELECT * FROM neighborhood_posts
-        WHERE neighborhood = ? AND crawl_date > ?
-        ORDER BY crawl_date DESC
-        ''', (neighborhood, cutoff_date))
-        
-        rows = cursor.fetchall()
-        posts = [dict(row) for row in rows]
-        
-        conn.close()
+        posts = self.db.get_posts(neighborhood, since=cutoff_date)
         
         logger.info(f"Retrieved {len(posts)} posts for {neighborhood} from database")
         return posts
@@ -327,9 +298,11 @@ class NeighborhoodCrawler:
                 logger.info(f"Using {len(existing_posts)} existing posts for {neighborhood}")
                 return existing_posts
         
-        # Crawl from multiple sources
-        reddit_posts = await self.crawl_reddit(neighborhood)
-        city_data_posts = await self.crawl_city_data(neighborhood, city)
+        # Crawl from multiple sources at once
+        reddit_posts, city_data_posts = await asyncio.gather(
+            self.crawl_reddit(neighborhood),
+            self.crawl_city_data(neighborhood, city)
+        )
         
         # Combine results
         all_posts = reddit_posts + city_data_posts
@@ -353,15 +326,18 @@ async def main():
         ("Mission District", "San Francisco")
     ]
     
-    for neighborhood, city in neighborhoods:
-        print(f"\nCrawling data for {neighborhood}, {city}...")
-        posts = await crawler.crawl_neighborhood(neighborhood, city)
-        
-        print(f"Found {len(posts)} posts for {neighborhood}")
-        if posts:
-            print("Sample titles:")
-            for post in posts[:3]:  # Show first 3 post titles
-                print(f"- {post['title']}")
+    try:
+        for neighborhood, city in neighborhoods:
+            print(f"\nCrawling data for {neighborhood}, {city}...")
+            posts = await crawler.crawl_neighborhood(neighborhood, city)
+            
+            print(f"Found {len(posts)} posts for {neighborhood}")
+            if posts:
+                print("Sample titles:")
+                for post in posts[:3]:  # Show first 3 post titles
+                    print(f"- {post['title']}")
+    finally:
+        await crawler.close()
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ Progressive Cache Layer for Neighborhood Data
 This module provides a caching layer for neighborhood sentiment data that:
 1. Stores data with configurable expiration periods
 2. Handles progressive degradation (fresh → stale → generic)
-3. Manages data refresh in the background
+3. Manages data refresh, in the background and on demand, on the shared RefreshScheduler
 4. Provides a unified interface for the real estate analysis system
 """
 
@@ -12,8 +12,6 @@ import asyncio
 import json
 import logging
 import os
-import sqlite3
-import threading
 import sys
 import time
 from datetime import datetime, timedelta
@@ -32,6 +30,10 @@ if sys_path not in sys.path:
 # Import the crawler and analyzer
 from src.data_collection.neighborhood_crawler import NeighborhoodCrawler
 from src.analysis.sentiment_analyzer import SentimentAnalyzer
+from src.data_management.neighborhood_db import get_neighborhood_db
+from src.data_management.refresh_scheduler import (FOREGROUND_PRIORITY, RefreshScheduler, get_refresh_scheduler,
+                                                   refresh_priority)
+from src.utils.executor import run_blocking
 
 # Database setup
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
@@ -49,7 +51,8 @@ class NeighborhoodCache:
     def __init__(self, db_path: str = DB_PATH, 
                  cache_expiry: int = DEFAULT_CACHE_EXPIRY,
                  refresh_threshold: int = REFRESH_THRESHOLD,
-                 background_refresh: bool = BACKGROUND_REFRESH):
+                 background_refresh: bool = BACKGROUND_REFRESH,
+                 scheduler: Optional[RefreshScheduler] = None):
         """
         Initialize the neighborhood cache.
         
@@ -58,11 +61,13 @@ class NeighborhoodCache:
             cache_expiry: Number of days before cache expires
             refresh_threshold: Number of days before triggering a refresh
             background_refresh: Whether to refresh in background
+            scheduler: Scheduler for background refreshes (defaults to the shared one)
         """
         self.db_path = db_path
         self.cache_expiry = cache_expiry
         self.refresh_threshold = refresh_threshold
         self.background_refresh = background_refresh
+        self.scheduler = scheduler or get_refresh_scheduler()
         
         # Initialize components
         self.crawler = NeighborhoodCrawler(db_path)
@@ -70,78 +75,12 @@ class NeighborhoodCache:
         
         # Ensure cache table exists
         self._ensure_cache_table()
-        
-        # Background refresh queue
-        self.refresh_queue = asyncio.Queue() if background_refresh else None
-        self.refresh_thread = None
-        
-        # Start background refresh thread if enabled
-        if background_refresh:
-            self._start_background_refresh()
     
     def _ensure_cache_table(self):
         """
         Ensure the neighborhood cache table exists in the database.
         """
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS neighborhood_cache (
-            neighborhood TEXT PRIMARY KEY,
-            city TEXT,
-            data TEXT NOT NULL,
-            last_updated TEXT NOT NULL,
-            refresh_status TEXT DEFAULT 'idle'
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
-    def _start_background_refresh(self):
-        """
-        Start the background refresh thread.
-        """
-        if self.refresh_thread is not None and self.refresh_thread.is_alive():
-            return
-        
-        def refresh_worker():
-            async def worker():
-                loop = asyncio.get_event_loop()
-                while True:
-                    try:
-                        # Get the next neighborhood to refresh
-                        neighborhood, city = await self.refresh_queue.get()
-                        
-                        # Update refresh status
-                        self._update_refresh_status(neighborhood, "refreshing")
-                        
-                        try:
-                            # Refresh the data
-                            await self.refresh_neighborhood_data(neighborhood, city)
-                            self._update_refresh_status(neighborhood, "idle")
-                        except Exception as e:
-                            logger.error(f"Error refreshing {neighborhood}: {str(e)}")
-                            self._update_refresh_status(neighborhood, "error")
-                        
-                        # Mark task as done
-                        self.refresh_queue.task_done()
-                    except Exception as e:
-                        logger.error(f"Error in refresh worker: {str(e)}")
-            
-            # Create and run the event loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(worker())
-        
-        # Start the thread
-        self.refresh_thread = threading.Thread(target=refresh_worker, daemon=True)
-        self.refresh_thread.start()
-        
-        logger.info("Background refresh thread started")
+        self.db = get_neighborhood_db(self.db_path)
     
     def _update_refresh_status(self, neighborhood: str, status: str):
         """
@@ -151,44 +90,42 @@ class NeighborhoodCache:
             neighborhood: The neighborhood name
             status: The refresh status (idle, refreshing, error)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        UPDATE neighborhood_cache
-        SET refresh_status = ?
-        WHERE neighborhood = ?
-        ''', (status, neighborhood))
-        
-        conn.commit()
-        conn.close()
+        self.db.set_cache_status(neighborhood, status)
     
-    def _queue_background_refresh(self, neighborhood: str, city: str = None):
+    def _queue_background_refresh(self, neighborhood: str, city: str = None, age_days: int = 0):
         """
         Queue a neighborhood for background refresh.
         
         Args:
             neighborhood: The neighborhood to refresh
             city: The city containing the neighborhood (optional)
+            age_days: Age of the cached data, older refreshes sooner
         """
-        if not self.background_refresh or self.refresh_queue is None:
+        if not self.background_refresh:
             return
         
-        # Add to the queue
-        try:
-            loop = asyncio.get_event_loop()
-            asyncio.run_coroutine_threadsafe(
-                self.refresh_queue.put((neighborhood, city)),
-                loop
-            )
-        except RuntimeError:
-            # If no event loop is available, create one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.refresh_queue.put((neighborhood, city)))
-        
+        self.scheduler.submit(neighborhood, city, self._background_refresh, refresh_priority(age_days))
         logger.info(f"Queued {neighborhood} for background refresh")
     
+    async def _background_refresh(self, neighborhood: str, city: str = None) -> Dict[str, Any]:
+        """
+        Refresh a neighborhood for the scheduler, tracking its refresh status.
+        
+        Args:
+            neighborhood: The neighborhood to refresh
+            city: The city containing the neighborhood (optional)
+            
+        Returns:
+            Dictionary with refreshed neighborhood data
+        """
+        self._update_refresh_status(neighborhood, "refreshing")
+        try:
+            # Caching the refreshed data sets the status back to idle
+            return await self.refresh_neighborhood_data(neighborhood, city)
+        except Exception:
+            self._update_refresh_status(neighborhood, "error")
+            raise
+    
     async def refresh_neighborhood_data(self, neighborhood: str, city: str = None) -> Dict[str, Any]:
         """
         Refresh neighborhood data by crawling and analyzing.
@@ -205,14 +142,29 @@ class NeighborhoodCache:
         # Crawl for new data
         posts = await self.crawler.crawl_neighborhood(neighborhood, city, force_refresh=True)
         
-        # Analyze the data
-        analysis = self.analyzer.analyze_neighborhood(neighborhood, force_refresh=True)
+        # Analyze the data off the event loop; scoring is CPU bound
+        analysis = await run_blocking(self.analyzer.analyze_neighborhood, neighborhood, force_refresh=True)
         
-        # Combine data
+        return self._cache_analysis(neighborhood, city, len(posts), analysis)
+    
+    def _cache_analysis(self, neighborhood: str, city: Optional[str], post_count: int,
+                        analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the cached data for a refreshed neighborhood and cache it.
+        
+        Args:
+            neighborhood: The neighborhood that was refreshed
+            city: The city containing the neighborhood
+            post_count: Number of posts crawled
+            analysis: The neighborhood's sentiment analysis
+            
+        Returns:
+            Dictionary with refreshed neighborhood data
+        """
         data = {
             "neighborhood": neighborhood,
             "city": city,
-            "post_count": len(posts),
+            "post_count": post_count,
             "analysis": analysis,
             "last_updated": datetime.now().isoformat(),
             "expiry": (datetime.now() + timedelta(days=self.cache_expiry)).isoformat()
@@ -232,21 +184,11 @@ class NeighborhoodCache:
             city: The city containing the neighborhood
             data: The data to cache
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Convert data to JSON
         data_json = json.dumps(data)
         
         # Insert or replace
-        cursor.execute('''
-        INSERT OR REPLACE INTO neighborhood_cache
-        (neighborhood, city, data, last_updated, refresh_status)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (neighborhood, city, data_json, datetime.now().isoformat(), "idle"))
-        
-        conn.commit()
-        conn.close()
+        self.db.put_cache_entry(neighborhood, city, data_json, datetime.now().isoformat(), "idle")
         
         logger.info(f"Cached data for {neighborhood}")
     
@@ -260,16 +202,7 @@ class NeighborhoodCache:
         Returns:
             Dictionary with cached data or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT data, last_updated, city, refresh_status FROM neighborhood_cache
-        WHERE neighborhood = ?
-        ''', (neighborhood,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        row = self.db.get_cache_entry(neighborhood)
         
         if not row:
             return None
@@ -291,7 +224,7 @@ class NeighborhoodCache:
         
         # Check if we should queue a refresh
         if self.background_refresh and age_days >= self.refresh_threshold and refresh_status == "idle":
-            self._queue_background_refresh(neighborhood, city)
+            self._queue_background_refresh(neighborhood, city, age_days)
         
         return data
     
@@ -321,7 +254,7 @@ class NeighborhoodCache:
         
         # If we got here, we need to refresh the data
         try:
-            return await self.refresh_neighborhood_data(neighborhood, city)
+            return await self._refresh_now(neighborhood, city)
         except Exception as e:
             logger.error(f"Error refreshing data for {neighborhood}: {str(e)}")
             
@@ -335,6 +268,31 @@ class NeighborhoodCache:
             # If all else fails, return a generic response
             return self._generate_generic_data(neighborhood, city)
     
+    async def _refresh_now(self, neighborhood: str, city: str = None) -> Dict[str, Any]:
+        """
+        Refresh a neighborhood on the scheduler ahead of background refreshes and wait for it.
+        
+        A refresh of the neighborhood that is already queued or running is
+        shared instead of crawling again.
+        
+        Args:
+            neighborhood: The neighborhood to refresh
+            city: The city containing the neighborhood (optional)
+            
+        Returns:
+            Dictionary with refreshed neighborhood data
+        """
+        future = self.scheduler.submit(neighborhood, city, self._background_refresh, FOREGROUND_PRIORITY)
+        result = await asyncio.wrap_future(future)
+        if "analysis" in result:
+            return result
+        
+        # Shared with the refresh agent's refresh, which crawls and analyzes but doesn't fill this cache
+        if result.get("reason") == "error":
+            raise RuntimeError(result.get("error", f"Refresh failed for {neighborhood}"))
+        analysis = await run_blocking(self.analyzer.analyze_neighborhood, neighborhood)
+        return self._cache_analysis(neighborhood, city, result.get("post_count") or 0, analysis)
+    
     def _generate_generic_data(self, neighborhood: str, city: str = None) -> Dict[str, Any]:
         """
         Generate generic data when no real data is available.
@@ -0,0 +1,816 @@
+"""
+Neighborhood Database
+
+This module provides the shared data access layer for data/neighborhood_data.db.
+The crawler, sentiment analyzer, neighborhood cache, refresh agent and
+reputation index all go through one NeighborhoodDB per database file, which
+hands each thread its own long-lived connection (WAL mode, tuned pragmas and
+a statement cache, so repeated queries skip re-preparing). The schema is
+versioned with PRAGMA user_version and migrated once per process.
+"""
+
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Database setup
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                      'data', 'neighborhood_data.db')
+
+# Per-connection tuning; WAL lets API threads read while the refresh thread writes
+PRAGMAS = [
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=67108864"
+]
+
+# Prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 256
+
+# Base schema
+CREATE_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS neighborhood_posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        neighborhood TEXT NOT NULL,
+        source TEXT NOT NULL,
+        title TEXT,
+        content TEXT NOT NULL,
+        url TEXT,
+        post_date TEXT,
+        crawl_date TEXT NOT NULL,
+        metadata TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS neighborhood_cache (
+        neighborhood TEXT PRIMARY KEY,
+        city TEXT,
+        data TEXT NOT NULL,
+        last_updated TEXT NOT NULL,
+        refresh_status TEXT DEFAULT 'idle'
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS sentiment_analysis (
+        neighborhood TEXT PRIMARY KEY,
+        analysis_data TEXT NOT NULL,
+        last_updated TEXT NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS refresh_tracking (
+        neighborhood TEXT PRIMARY KEY,
+        city TEXT,
+        last_refresh TEXT,
+        last_access TEXT,
+        access_count INTEGER DEFAULT 0,
+        priority INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'idle'
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS reputation_index (
+        zip_code TEXT PRIMARY KEY,
+        neighborhood TEXT,
+        city TEXT,
+        index_score REAL,
+        data_volume INTEGER,
+        data_freshness INTEGER,
+        sentiment_score REAL,
+        last_updated TEXT,
+        metadata TEXT
+    )
+    '''
+]
+
+# sentiment_analysis(neighborhood) is the primary key, so it is indexed already
+CREATE_INDEXES = [
+    '''
+    CREATE INDEX IF NOT EXISTS idx_posts_neighborhood_crawl_date
+        ON neighborhood_posts (neighborhood, crawl_date)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_refresh_tracking_status_last_refresh
+        ON refresh_tracking (status, last_refresh)
+    '''
+]
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    for statement in CREATE_TABLES:
+        conn.execute(statement)
+
+
+def _add_cache_columns(conn: sqlite3.Connection) -> None:
+    # The crawler used to create neighborhood_cache without these columns
+    # before NeighborhoodCache could create its own version of the table
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(neighborhood_cache)")}
+    if "city" not in columns:
+        conn.execute("ALTER TABLE neighborhood_cache ADD COLUMN city TEXT")
+    if "refresh_status" not in columns:
+        conn.execute("ALTER TABLE neighborhood_cache ADD COLUMN refresh_status TEXT DEFAULT 'idle'")
+
+
+def _create_indexes(conn: sqlite3.Connection) -> None:
+    for statement in CREATE_INDEXES:
+        conn.execute(statement)
+
+
+def post_key(post: Dict[str, Any]) -> int:
+    """
+    Get the dedup key for a crawled post.
+
+    A post is identified by its URL within a neighborhood; posts without a
+    URL fall back to their source, title and content. The key is a 64-bit
+    hash so the unique index stays small and cheap to insert into.
+
+    Args:
+        post: Post dictionary with the POST_COLUMNS fields
+
+    Returns:
+        Signed 64-bit integer identifying the post
+    """
+    identity = post["url"] or f"{post['source']}\x1f{post['title']}\x1f{post['content']}"
+    digest = hashlib.blake2b(f"{post['neighborhood']}\x1f{identity}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _dedupe_posts(conn: sqlite3.Connection) -> None:
+    # Re-crawls used to insert every post again; key the existing rows, keep
+    # the most recently crawled copy of each and enforce uniqueness from here on
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(neighborhood_posts)")}
+    if "post_key" not in columns:
+        conn.execute("ALTER TABLE neighborhood_posts ADD COLUMN post_key INTEGER")
+
+    rows = conn.execute('''
+        SELECT id, neighborhood, source, title, content, url FROM neighborhood_posts
+        WHERE post_key IS NULL
+    ''').fetchall()
+    conn.executemany("UPDATE neighborhood_posts SET post_key = ? WHERE id = ?",
+                     [(post_key(row), row["id"]) for row in rows])
+    conn.execute('''
+        DELETE FROM neighborhood_posts
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY post_key ORDER BY crawl_date DESC, id DESC
+                ) AS copy
+                FROM neighborhood_posts
+            ) WHERE copy > 1
+        )
+    ''')
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_posts_post_key
+            ON neighborhood_posts (post_key)
+    ''')
+
+
+def _add_post_revisions(conn: sqlite3.Connection) -> None:
+    # Every write that changes what a post says takes the next revision from
+    # post_revision, so readers can ask for posts changed since a revision
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(neighborhood_posts)")}
+    if "revision" not in columns:
+        conn.execute("ALTER TABLE neighborhood_posts ADD COLUMN revision INTEGER")
+    if "first_crawl_date" not in columns:
+        conn.execute("ALTER TABLE neighborhood_posts ADD COLUMN first_crawl_date TEXT")
+    conn.execute('''
+        UPDATE neighborhood_posts SET revision = id, first_crawl_date = crawl_date
+        WHERE revision IS NULL
+    ''')
+    conn.execute("CREATE TABLE IF NOT EXISTS post_revision (value INTEGER NOT NULL)")
+    conn.execute('''
+        INSERT INTO post_revision
+        SELECT COALESCE(MAX(revision), 0) FROM neighborhood_posts
+        WHERE NOT EXISTS (SELECT 1 FROM post_revision)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_posts_neighborhood_revision
+            ON neighborhood_posts (neighborhood, revision)
+    ''')
+
+
+def _create_sentiment_aggregates(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sentiment_aggregates (
+            neighborhood TEXT NOT NULL,
+            window_days INTEGER NOT NULL,
+            state BLOB NOT NULL,
+            revision INTEGER NOT NULL,
+            max_post_id INTEGER NOT NULL,
+            cutoff TEXT,
+            lexicon TEXT NOT NULL,
+            last_updated TEXT NOT NULL,
+            PRIMARY KEY (neighborhood, window_days)
+        )
+    ''')
+
+
+# Schema migrations, applied in order; the list index + 1 is the schema version
+MIGRATIONS = [
+    _create_tables,
+    _add_cache_columns,
+    _create_indexes,
+    _dedupe_posts,
+    _add_post_revisions,
+    _create_sentiment_aggregates
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+POST_COLUMNS = ("neighborhood", "source", "title", "content", "url", "post_date", "crawl_date", "metadata")
+_post_values = itemgetter(*POST_COLUMNS)
+
+# Columns iter_posts can read
+POST_READ_COLUMNS = ("id",) + POST_COLUMNS
+
+# A re-crawled post keeps its row, its first crawl date and, unless its text
+# changed, its revision, and takes the latest crawl's content and date
+UPSERT_POST = '''
+INSERT INTO neighborhood_posts
+(neighborhood, source, title, content, url, post_date, crawl_date, metadata, post_key, first_crawl_date, revision)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (post_key) DO UPDATE
+SET revision = CASE WHEN title IS excluded.title AND content IS excluded.content
+                    THEN revision ELSE excluded.revision END,
+    title = excluded.title, content = excluded.content,
+    post_date = COALESCE(excluded.post_date, post_date),
+    crawl_date = MAX(crawl_date, excluded.crawl_date), metadata = excluded.metadata
+'''
+
+# Reserves ? revisions and returns the last of them
+NEXT_REVISIONS = '''
+UPDATE post_revision SET value = value + ?
+RETURNING value
+'''
+
+SELECT_POST_WATERMARK = '''
+SELECT (SELECT value FROM post_revision), (SELECT COALESCE(MAX(id), 0) FROM neighborhood_posts)
+'''
+
+# A post that existed at a watermark and whose text has changed since
+SELECT_EDITED_POST = '''
+SELECT 1 FROM neighborhood_posts
+WHERE neighborhood = ? AND revision > ? AND id <= ?
+LIMIT 1
+'''
+
+SELECT_POSTS = '''
+SELECT id, neighborhood, source, title, content, url, post_date, crawl_date, metadata
+FROM neighborhood_posts
+WHERE neighborhood = ?
+ORDER BY crawl_date DESC
+'''
+
+SELECT_POSTS_SINCE = '''
+SELECT id, neighborhood, source, title, content, url, post_date, crawl_date, metadata
+FROM neighborhood_posts
+WHERE neighborhood = ? AND crawl_date > ?
+ORDER BY crawl_date DESC
+'''
+
+SELECT_POST_SHARD_KEYS = '''
+SELECT crawl_date, id FROM (
+    SELECT crawl_date, id, ROW_NUMBER() OVER (ORDER BY crawl_date DESC, id DESC) - 1 AS position
+    FROM neighborhood_posts
+    WHERE neighborhood = ?
+)
+WHERE position % ? = 0
+'''
+
+COUNT_POSTS_MATCHING = '''
+SELECT COUNT(*) FROM neighborhood_posts
+WHERE neighborhood = ? OR neighborhood LIKE ?
+'''
+
+SELECT_SENTIMENT = '''
+SELECT analysis_data FROM sentiment_analysis
+WHERE neighborhood = ?
+'''
+
+SELECT_SENTIMENT_MATCHING = '''
+SELECT analysis_data FROM sentiment_analysis
+WHERE neighborhood = ? OR neighborhood LIKE ?
+'''
+
+UPSERT_SENTIMENT = '''
+INSERT OR REPLACE INTO sentiment_analysis
+(neighborhood, analysis_data, last_updated)
+VALUES (?, ?, ?)
+'''
+
+SELECT_CACHE_ENTRY = '''
+SELECT data, last_updated, city, refresh_status FROM neighborhood_cache
+WHERE neighborhood = ?
+'''
+
+SELECT_CACHE_MATCH = '''
+SELECT * FROM neighborhood_cache
+WHERE neighborhood = ? OR city = ?
+'''
+
+SELECT_CACHE_PREFIX = '''
+SELECT * FROM neighborhood_cache
+WHERE neighborhood LIKE ? OR city LIKE ?
+LIMIT 1
+'''
+
+SELECT_CACHE_WITH_SENTIMENT = '''
+SELECT n.*, s.analysis_data
+FROM neighborhood_cache n
+LEFT JOIN sentiment_analysis s ON n.neighborhood = s.neighborhood
+WHERE n.neighborhood = ? OR n.city = ?
+'''
+
+SELECT_CACHE_WITH_SENTIMENT_PREFIX = '''
+SELECT n.*, s.analysis_data
+FROM neighborhood_cache n
+LEFT JOIN sentiment_analysis s ON n.neighborhood = s.neighborhood
+WHERE n.neighborhood LIKE ? OR n.city LIKE ?
+LIMIT 1
+'''
+
+UPSERT_CACHE_ENTRY = '''
+INSERT OR REPLACE INTO neighborhood_cache
+(neighborhood, city, data, last_updated, refresh_status)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+UPDATE_CACHE_STATUS = '''
+UPDATE neighborhood_cache
+SET refresh_status = ?
+WHERE neighborhood = ?
+'''
+
+RECORD_ACCESS = '''
+INSERT INTO refresh_tracking (neighborhood, city, last_access, access_count)
+VALUES (?, ?, ?, 1)
+ON CONFLICT (neighborhood) DO UPDATE
+SET last_access = excluded.last_access, access_count = access_count + 1
+'''
+
+UPDATE_TRACKING_STATUS = '''
+UPDATE refresh_tracking
+SET status = ?
+WHERE neighborhood = ?
+'''
+
+MARK_REFRESHED = '''
+INSERT INTO refresh_tracking (neighborhood, city, last_refresh, status)
+VALUES (?, ?, ?, 'idle')
+ON CONFLICT (neighborhood) DO UPDATE
+SET city = excluded.city, last_refresh = excluded.last_refresh, status = 'idle'
+'''
+
+SELECT_REFRESH_CANDIDATES = '''
+SELECT n.neighborhood, n.city, r.last_refresh, COALESCE(r.access_count, 0) as access_count
+FROM neighborhood_cache n
+LEFT JOIN refresh_tracking r ON n.neighborhood = r.neighborhood
+WHERE r.status IS NULL OR r.status = 'idle' OR r.status = 'error'
+'''
+
+UPSERT_REPUTATION_INDEX = '''
+INSERT OR REPLACE INTO reputation_index
+(zip_code, neighborhood, city, index_score, data_volume, data_freshness,
+ sentiment_score, last_updated, metadata)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SELECT_REPUTATION_INDEX = '''
+SELECT * FROM reputation_index
+WHERE zip_code = ?
+'''
+
+SELECT_SENTIMENT_AGGREGATE = '''
+SELECT state, revision, max_post_id, cutoff, lexicon, last_updated FROM sentiment_aggregates
+WHERE neighborhood = ? AND window_days = ?
+'''
+
+UPSERT_SENTIMENT_AGGREGATE = '''
+INSERT OR REPLACE INTO sentiment_aggregates
+(neighborhood, window_days, state, revision, max_post_id, cutoff, lexicon, last_updated)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+class NeighborhoodDB:
+    """
+    Data access object for the neighborhood database.
+
+    Connections are pooled per thread: each thread opens one connection on
+    first use and keeps it, so the background refresh thread and API threads
+    never share a connection or pay connect/pragma setup per call.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        """
+        Open the database and bring its schema up to date.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._migrate()
+
+    # Connections
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+
+        with self._lock:
+            # Close connections left behind by threads that have exited
+            alive = {thread.ident for thread in threading.enumerate()}
+            for ident in [i for i in self._connections if i not in alive]:
+                self._connections.pop(ident).close()
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _migrate(self) -> None:
+        conn = self.conn
+        # WAL is persistent in the file, so setting it once is enough
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(conn)
+                logger.info(f"Applied neighborhood DB migration {number} to {self.db_path}")
+            if version < SCHEMA_VERSION:
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run several statements in one transaction on this thread's connection."""
+        conn = self.conn
+        with conn:
+            yield conn
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Read in one transaction on this thread's connection, so every query sees the same database state."""
+        conn = self.conn
+        with conn:
+            conn.execute("BEGIN")
+            yield conn
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return self.conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return self.conn.execute(sql, params).fetchone()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Execute one write statement in its own transaction and return the row count."""
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # neighborhood_posts
+
+    def insert_posts(self, posts: Iterable[Dict[str, Any]], batch_size: int = 20000) -> int:
+        """
+        Upsert crawled posts, deduplicated on post_key.
+
+        Rows go through executemany in one transaction per batch_size posts,
+        so a large crawl neither holds the write lock for long nor builds one
+        huge parameter list.
+
+        Args:
+            posts: Post dictionaries with the POST_COLUMNS fields
+            batch_size: Posts written per transaction
+
+        Returns:
+            Number of posts written (new or updated)
+        """
+        written = 0
+        batch = []
+        for post in posts:
+            batch.append(_post_values(post) + (post_key(post), post["crawl_date"]))
+            if len(batch) >= batch_size:
+                written += self._upsert_posts(batch)
+                batch = []
+        if batch:
+            written += self._upsert_posts(batch)
+        return written
+
+    def _upsert_posts(self, rows: List[Tuple[Any, ...]]) -> int:
+        with self.transaction() as conn:
+            # Reserving revisions is the transaction's first write, so it takes
+            # the write lock and revisions increase in commit order
+            last = conn.execute(NEXT_REVISIONS, (len(rows),)).fetchall()[0][0]
+            first = last - len(rows) + 1
+            conn.executemany(UPSERT_POST, [row + (first + i,) for i, row in enumerate(rows)])
+        return len(rows)
+
+    def get_posts(self, neighborhood: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a neighborhood's posts, newest crawl first, optionally crawled after `since`."""
+        if since is None:
+            rows = self.query(SELECT_POSTS, (neighborhood,))
+        else:
+            rows = self.query(SELECT_POSTS_SINCE, (neighborhood, since))
+        return [dict(row) for row in rows]
+
+    def iter_posts(self, neighborhood: str, since: Optional[str] = None,
+                   columns: Sequence[str] = POST_READ_COLUMNS,
+                   batch_size: int = 1000, start: Optional[Tuple[str, int]] = None,
+                   stop: Optional[Tuple[str, int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a neighborhood's posts, newest crawl first.
+
+        Rows are fetched batch_size at a time and turned into dicts as they
+        are yielded, so large neighborhoods are never held in memory at once.
+
+        Args:
+            neighborhood: The neighborhood to read posts for
+            since: Only posts crawled after this ISO timestamp
+            columns: Columns to read, from POST_READ_COLUMNS
+            batch_size: Rows fetched from SQLite at a time
+            start: (crawl_date, id) key of the first post to read, from post_shard_keys
+            stop: Key of the first post not to read
+
+        Yields:
+            Post dictionaries with the requested columns
+        """
+        conditions = []
+        params: Tuple[Any, ...] = ()
+        if since is not None:
+            conditions.append("crawl_date > ?")
+            params += (since,)
+        if start is not None:
+            conditions.append("(crawl_date, id) <= (?, ?)")
+            params += tuple(start)
+        if stop is not None:
+            conditions.append("(crawl_date, id) > (?, ?)")
+            params += tuple(stop)
+        # id breaks crawl_date ties so the read order, and shard bounds, are total
+        return self._iter_posts(neighborhood, conditions, params, columns, batch_size,
+                                order="crawl_date DESC, id DESC")
+
+    def iter_posts_since_revision(self, neighborhood: str, revision: int,
+                                  first_crawled_after: Optional[str] = None,
+                                  columns: Sequence[str] = POST_READ_COLUMNS,
+                                  batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a neighborhood's posts added or edited after a revision.
+
+        Args:
+            neighborhood: The neighborhood to read posts for
+            revision: Revision from post_watermark
+            first_crawled_after: Only posts first crawled after this ISO timestamp
+            columns: Columns to read, from POST_READ_COLUMNS
+            batch_size: Rows fetched from SQLite at a time
+
+        Yields:
+            Post dictionaries with the requested columns, oldest revision first
+        """
+        conditions = ["revision > ?"]
+        params: Tuple[Any, ...] = (revision,)
+        if first_crawled_after is not None:
+            conditions.append("first_crawl_date > ?")
+            params += (first_crawled_after,)
+        return self._iter_posts(neighborhood, conditions, params, columns, batch_size, order="revision")
+
+    def iter_posts_first_crawled(self, neighborhood: str, after: str, until: Optional[str] = None,
+                                 max_revision: Optional[int] = None,
+                                 columns: Sequence[str] = POST_READ_COLUMNS,
+                                 batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a neighborhood's posts by when they were first crawled.
+
+        Unlike crawl_date, first_crawl_date doesn't move when a post is
+        crawled again, so a post enters and leaves a time window once.
+
+        Args:
+            neighborhood: The neighborhood to read posts for
+            after: Only posts first crawled after this ISO timestamp
+            until: Only posts first crawled at or before this ISO timestamp
+            max_revision: Only posts last written at or before this revision
+            columns: Columns to read, from POST_READ_COLUMNS
+            batch_size: Rows fetched from SQLite at a time
+
+        Yields:
+            Post dictionaries with the requested columns, in no particular order
+        """
+        conditions = ["first_crawl_date > ?"]
+        params: Tuple[Any, ...] = (after,)
+        if until is not None:
+            conditions.append("first_crawl_date <= ?")
+            params += (until,)
+        if max_revision is not None:
+            conditions.append("revision <= ?")
+            params += (max_revision,)
+        return self._iter_posts(neighborhood, conditions, params, columns, batch_size)
+
+    def _iter_posts(self, neighborhood: str, conditions: List[str], params: Tuple[Any, ...],
+                    columns: Sequence[str], batch_size: int,
+                    order: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        # Validated here, before the generator starts, so bad columns fail at the call
+        unknown = set(columns) - set(POST_READ_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown post columns: {sorted(unknown)}")
+
+        sql = f"SELECT {', '.join(columns)} FROM neighborhood_posts WHERE neighborhood = ?"
+        for condition in conditions:
+            sql += f" AND {condition}"
+        if order:
+            sql += f" ORDER BY {order}"
+        return self._stream_rows(sql, (neighborhood,) + params, columns, batch_size)
+
+    def _stream_rows(self, sql: str, params: Tuple[Any, ...], columns: Sequence[str],
+                     batch_size: int) -> Iterator[Dict[str, Any]]:
+        cursor = self.conn.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
+    def post_shard_keys(self, neighborhood: str, shard_size: int) -> List[Tuple[str, int]]:
+        """
+        Split a neighborhood's posts into shards of shard_size in iter_posts order.
+
+        Shards are bounded by keys rather than offsets, so posts written while
+        the shards are read can't shift a post from one shard into another.
+
+        Args:
+            neighborhood: The neighborhood to split
+            shard_size: Posts per shard
+
+        Returns:
+            The (crawl_date, id) key of each shard's first post; shard i is
+            read with iter_posts(start=keys[i], stop=keys[i + 1])
+        """
+        return [(row[0], row[1]) for row in self.query(SELECT_POST_SHARD_KEYS, (neighborhood, shard_size))]
+
+    def post_watermark(self) -> Tuple[int, int]:
+        """
+        Get the latest post revision and post id.
+
+        Read inside snapshot() together with the posts they describe: every
+        post at or below the watermark is visible in the snapshot, and every
+        later write gets a higher revision.
+
+        Returns:
+            (revision, id) of the most recent post write and insert
+        """
+        row = self.query_one(SELECT_POST_WATERMARK)
+        return row[0], row[1]
+
+    def has_edited_posts(self, neighborhood: str, revision: int, max_post_id: int) -> bool:
+        """Check whether any post up to max_post_id had its text changed after revision."""
+        return self.query_one(SELECT_EDITED_POST, (neighborhood, revision, max_post_id)) is not None
+
+    def count_posts_matching(self, name: str, prefix: str) -> int:
+        return self.query_one(COUNT_POSTS_MATCHING, (name, f"{prefix}%"))[0]
+
+    # sentiment_analysis
+
+    def get_sentiment(self, neighborhood: str) -> Optional[str]:
+        """Get the cached analysis JSON for a neighborhood."""
+        row = self.query_one(SELECT_SENTIMENT, (neighborhood,))
+        return row[0] if row else None
+
+    def find_sentiment(self, name: str, prefix: str) -> Optional[str]:
+        """Get the analysis JSON for a neighborhood, or one starting with prefix."""
+        row = self.query_one(SELECT_SENTIMENT_MATCHING, (name, f"{prefix}%"))
+        return row[0] if row else None
+
+    def put_sentiment(self, neighborhood: str, analysis_json: str, updated: str) -> None:
+        self.execute(UPSERT_SENTIMENT, (neighborhood, analysis_json, updated))
+
+    # sentiment_aggregates
+
+    def get_sentiment_aggregate(self, neighborhood: str, window_days: int) -> Optional[Dict[str, Any]]:
+        """Get the stored running aggregate and watermark for a neighborhood and window (0 for all posts)."""
+        row = self.query_one(SELECT_SENTIMENT_AGGREGATE, (neighborhood, window_days))
+        return dict(row) if row else None
+
+    def put_sentiment_aggregate(self, neighborhood: str, window_days: int, state: bytes, revision: int,
+                                max_post_id: int, cutoff: Optional[str], lexicon: str, updated: str) -> None:
+        self.execute(UPSERT_SENTIMENT_AGGREGATE,
+                     (neighborhood, window_days, state, revision, max_post_id, cutoff, lexicon, updated))
+
+    # neighborhood_cache
+
+    def get_cache_entry(self, neighborhood: str) -> Optional[Tuple[str, str, Optional[str], str]]:
+        """Get (data, last_updated, city, refresh_status) for a neighborhood."""
+        row = self.query_one(SELECT_CACHE_ENTRY, (neighborhood,))
+        return tuple(row) if row else None
+
+    def find_cache_entry(self, name: str, prefix: Optional[str] = None,
+                         with_sentiment: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Find a cache row by neighborhood or city, falling back to a prefix match.
+
+        Args:
+            name: Neighborhood name, city or ZIP code
+            prefix: Neighborhood/city prefix to try if nothing matches exactly
+            with_sentiment: Also return the cached analysis_data
+
+        Returns:
+            The row as a dictionary, or None if nothing matches
+        """
+        exact, by_prefix = ((SELECT_CACHE_WITH_SENTIMENT, SELECT_CACHE_WITH_SENTIMENT_PREFIX)
+                            if with_sentiment else (SELECT_CACHE_MATCH, SELECT_CACHE_PREFIX))
+        row = self.query_one(exact, (name, name))
+        if not row and prefix is not None:
+            row = self.query_one(by_prefix, (f"{prefix}%", f"{prefix}%"))
+        return dict(row) if row else None
+
+    def put_cache_entry(self, neighborhood: str, city: Optional[str], data_json: str,
+                        updated: str, status: str = "idle") -> None:
+        self.execute(UPSERT_CACHE_ENTRY, (neighborhood, city, data_json, updated, status))
+
+    def set_cache_status(self, neighborhood: str, status: str) -> None:
+        self.execute(UPDATE_CACHE_STATUS, (status, neighborhood))
+
+    # refresh_tracking
+
+    def record_access(self, neighborhood: str, city: Optional[str], accessed: str) -> None:
+        self.execute(RECORD_ACCESS, (neighborhood, city, accessed))
+
+    def set_tracking_status(self, neighborhood: str, status: str) -> None:
+        self.execute(UPDATE_TRACKING_STATUS, (status, neighborhood))
+
+    def mark_refreshed(self, neighborhood: str, city: Optional[str], refreshed: str) -> None:
+        self.execute(MARK_REFRESHED, (neighborhood, city, refreshed))
+
+    def refresh_candidates(self) -> List[Tuple[str, Optional[str], Optional[str], int]]:
+        """Get (neighborhood, city, last_refresh, access_count) for cached neighborhoods not refreshing."""
+        return [tuple(row) for row in self.query(SELECT_REFRESH_CANDIDATES)]
+
+    # reputation_index
+
+    def put_reputation_index(self, row: Sequence[Any]) -> None:
+        self.execute(UPSERT_REPUTATION_INDEX, row)
+
+    def get_reputation_index(self, zip_code: str) -> Optional[Dict[str, Any]]:
+        row = self.query_one(SELECT_REPUTATION_INDEX, (zip_code,))
+        return dict(row) if row else None
+
+
+_databases: Dict[str, NeighborhoodDB] = {}
+_databases_lock = threading.Lock()
+
+
+def get_neighborhood_db(db_path: str = DB_PATH) -> NeighborhoodDB:
+    """
+    Get the shared NeighborhoodDB for a database file.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        The process-wide NeighborhoodDB for that path
+    """
+    key = os.path.abspath(db_path)
+    db = _databases.get(key)
+    if db is None:
+        with _databases_lock:
+            db = _databases.get(key)
+            if db is None:
+                db = _databases[key] = NeighborhoodDB(db_path)
+    return db
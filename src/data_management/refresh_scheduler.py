@@ -0,0 +1,298 @@
+"""
+Refresh Scheduler
+
+One refresh engine per process for neighborhood sentiment data. The refresh
+agent and the neighborhood cache submit refreshes here instead of running
+their own loops and threads:
+1. Queued refreshes run highest priority first (staleness x access count)
+2. A fixed number of workers refresh concurrently on one event loop, so
+   crawls share that loop's browser pool and its per-source rate limits
+3. A neighborhood already queued or refreshing is not refreshed twice;
+   later submitters share the pending refresh's result
+4. Queue depth and refresh latency are tracked for metrics()
+"""
+
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.data_collection.browser_pool import get_browser_pool
+from src.modules.singleton import LazySingleton
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Refreshes running at once
+REFRESH_WORKERS = 4
+
+# Recent refreshes kept for latency percentiles
+LATENCY_SAMPLES = 1000
+
+# Staleness assumed for a neighborhood that was never refreshed
+NEVER_REFRESHED_DAYS = 365
+
+# Priority for a refresh a caller is waiting on; runs ahead of background refreshes
+FOREGROUND_PRIORITY = float("inf")
+
+RefreshFunc = Callable[[str, Optional[str]], Awaitable[Any]]
+
+
+def staleness_days(last_refresh: Optional[str], now: Optional[datetime] = None) -> float:
+    """
+    Get how many days ago a neighborhood was refreshed.
+
+    Args:
+        last_refresh: ISO timestamp of the last refresh, or None if never
+        now: Current time (defaults to datetime.now())
+
+    Returns:
+        Days since the refresh, NEVER_REFRESHED_DAYS if there was none
+    """
+    if not last_refresh:
+        return NEVER_REFRESHED_DAYS
+    try:
+        refreshed = datetime.fromisoformat(last_refresh)
+    except ValueError:
+        return NEVER_REFRESHED_DAYS
+    return max((now or datetime.now()) - refreshed, timedelta(0)).total_seconds() / 86400
+
+
+def refresh_priority(staleness: float, access_count: int = 0) -> float:
+    """
+    Score a refresh; stale, frequently read neighborhoods go first.
+
+    Args:
+        staleness: Days since the last refresh
+        access_count: Times the neighborhood's data was read
+
+    Returns:
+        Priority, higher refreshes sooner
+    """
+    return max(staleness, 0) * (access_count + 1)
+
+
+@dataclass
+class _RefreshJob:
+    neighborhood: str
+    city: Optional[str]
+    refresh: RefreshFunc
+    priority: float
+    seq: int
+    submitted: float = field(default_factory=time.monotonic)
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future)
+
+
+def _summarize(samples: Deque[float]) -> Dict[str, float]:
+    # Seconds; percentiles by nearest rank
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {"count": n, "mean": sum(ordered) / n, "p50": ordered[(n - 1) // 2],
+            "p95": ordered[min(n - 1, int(n * 0.95))], "max": ordered[-1]}
+
+
+class RefreshScheduler:
+    """
+    Priority queue of neighborhood refreshes drained by bounded concurrent workers.
+
+    submit() may be called from any thread. Refreshes run on the scheduler's
+    own event loop in a daemon thread, started by the first submit().
+    """
+
+    def __init__(self, workers: int = REFRESH_WORKERS):
+        """
+        Args:
+            workers: Refreshes running at once
+        """
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, str]] = []
+        self._queued: Dict[str, _RefreshJob] = {}
+        self._in_flight: Dict[str, _RefreshJob] = {}
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._counts = {"submitted": 0, "deduplicated": 0, "completed": 0, "failed": 0}
+        self._max_queue_depth = 0
+        self._latency: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._queue_wait: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def submit(self, neighborhood: str, city: Optional[str], refresh: RefreshFunc,
+               priority: float = 0.0) -> concurrent.futures.Future:
+        """
+        Queue a refresh unless one for the neighborhood is already pending.
+
+        Args:
+            neighborhood: The neighborhood to refresh
+            city: The city containing the neighborhood (optional)
+            refresh: Coroutine function called as refresh(neighborhood, city)
+            priority: Higher runs sooner; resubmitting can raise a queued
+                refresh's priority but never lowers it
+
+        Returns:
+            Future for the refresh result, shared with earlier submitters
+            while the refresh is queued or running
+        """
+        with self._lock:
+            self._counts["submitted"] += 1
+            job = self._queued.get(neighborhood) or self._in_flight.get(neighborhood)
+            if job is not None:
+                self._counts["deduplicated"] += 1
+                if neighborhood in self._queued and priority > job.priority:
+                    job.priority, job.seq = priority, next(self._seq)
+                    heapq.heappush(self._heap, (-priority, job.seq, neighborhood))
+                return job.future
+
+            job = _RefreshJob(neighborhood, city, refresh, priority, next(self._seq))
+            self._queued[neighborhood] = job
+            heapq.heappush(self._heap, (-priority, job.seq, neighborhood))
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queued))
+            if self._loop is None:
+                self._start()
+            loop, wakeup = self._loop, self._wakeup
+        loop.call_soon_threadsafe(wakeup.set)
+        return job.future
+
+    def _start(self):
+        # Called with the lock held
+        self._loop = asyncio.new_event_loop()
+        self._wakeup = asyncio.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(self._loop, self._wakeup),
+                                        name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Refresh scheduler started with {self.workers} workers")
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop, wakeup: asyncio.Event):
+        asyncio.set_event_loop(loop)
+        for _ in range(self.workers):
+            loop.create_task(self._worker(wakeup))
+        loop.run_forever()
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+    def _pop(self) -> Optional[_RefreshJob]:
+        with self._lock:
+            while self._heap:
+                _, seq, neighborhood = heapq.heappop(self._heap)
+                job = self._queued.get(neighborhood)
+                # Skip entries superseded by a priority raise
+                if job is None or job.seq != seq:
+                    continue
+                del self._queued[neighborhood]
+                self._in_flight[neighborhood] = job
+                return job
+            return None
+
+    async def _worker(self, wakeup: asyncio.Event):
+        while True:
+            job = self._pop()
+            if job is None:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            try:
+                await self._run(job)
+            finally:
+                with self._lock:
+                    del self._in_flight[job.neighborhood]
+
+    async def _run(self, job: _RefreshJob):
+        if not job.future.set_running_or_notify_cancel():
+            return
+        started = time.monotonic()
+        try:
+            result = await job.refresh(job.neighborhood, job.city)
+        except asyncio.CancelledError:
+            job.future.set_exception(RuntimeError("Refresh scheduler stopped"))
+            raise
+        except Exception as e:
+            logger.error(f"Error refreshing {job.neighborhood}: {str(e)}")
+            job.future.set_exception(e)
+            outcome = "failed"
+        else:
+            job.future.set_result(result)
+            outcome = "completed"
+        with self._lock:
+            self._counts[outcome] += 1
+            self._latency.append(time.monotonic() - started)
+            self._queue_wait.append(started - job.submitted)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get queue and latency metrics.
+
+        Returns:
+            Dictionary with queue depth, refreshes in flight, submit and
+            outcome counts, and refresh latency and queue wait summaries
+            in seconds over the last LATENCY_SAMPLES refreshes
+        """
+        with self._lock:
+            return {
+                "queue_depth": len(self._queued),
+                "max_queue_depth": self._max_queue_depth,
+                "in_flight": len(self._in_flight),
+                "workers": self.workers,
+                **self._counts,
+                "latency": _summarize(self._latency),
+                "queue_wait": _summarize(self._queue_wait),
+            }
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the workers and close the scheduler loop's browser.
+
+        Queued refreshes are cancelled and running ones fail with a
+        RuntimeError. A later submit() starts the scheduler again.
+
+        Args:
+            timeout: Seconds to wait for the loop to shut down
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._wakeup = None
+            queued = list(self._queued.values())
+            self._queued.clear()
+            self._heap.clear()
+        for job in queued:
+            job.future.cancel()
+        if loop is None:
+            return
+
+        async def shutdown():
+            tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await get_browser_pool().close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+        except Exception as e:
+            logger.error(f"Error stopping refresh scheduler: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+
+_scheduler = LazySingleton(RefreshScheduler)
+
+
+def get_refresh_scheduler() -> RefreshScheduler:
+    """
+    Get the process-wide RefreshScheduler.
+
+    Returns:
+        The shared scheduler, created on first use
+    """
+    return _scheduler.get()
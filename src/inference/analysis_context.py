@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Analysis Context
+
+This module provides a request-scoped memo for combined market + sentiment
+analysis, so the Past, Present and Future layers handling one query share a
+single combine_analysis run per ZIP code instead of each running their own.
+An optional cross-request TTL cache lets repeated queries reuse recent runs.
+"""
+
+import os
+import sys
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Ensure project directory is in path
+sys_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if sys_path not in sys.path:
+    sys.path.append(sys_path)
+
+from src.cache.local_cache import LocalLRUCache
+
+# Key under which the manager places the AnalysisContext in a layer's context
+CONTEXT_KEY = "analysis_context"
+
+
+class AnalysisContext:
+    """
+    Per-query memo of combine_analysis results keyed by ZIP code and parameters.
+
+    Thread-safe: if several layers ask for the same ZIP concurrently, one runs
+    the analysis and the others wait for its result. Results are shared, so
+    callers must treat them as read-only.
+    """
+
+    def __init__(self, shared_cache: Optional[LocalLRUCache] = None):
+        """
+        Initialize the analysis context.
+
+        Args:
+            shared_cache: Optional cross-request TTL cache consulted before computing
+        """
+        self.shared_cache = shared_cache
+        self._results: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.reused = 0
+
+    def get(self, zip_code: str, compute: Callable[..., Dict[str, Any]], **params) -> Dict[str, Any]:
+        """
+        Get the combined analysis for a ZIP code, computing it at most once per query.
+
+        Args:
+            zip_code: The ZIP code to analyze
+            compute: Function called as compute(zip_code, **params) on a miss
+            **params: Extra combine_analysis parameters (rent, value, income)
+
+        Returns:
+            Combined analysis result
+        """
+        key = (zip_code, tuple(sorted(params.items())))
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+            else:
+                self.reused += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._compute(key, zip_code, compute, params)
+        except BaseException as e:
+            future.set_exception(e)
+            with self._lock:
+                # Let a later caller in this query retry
+                self._results.pop(key, None)
+            raise
+
+        future.set_result(result)
+        return result
+
+    def _compute(self, key: Tuple, zip_code: str, compute: Callable[..., Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        cache_key = f"combine_analysis:{key}"
+        if self.shared_cache is not None:
+            cached = self.shared_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        result = compute(zip_code, **params)
+        self.computed += 1
+
+        if self.shared_cache is not None:
+            self.shared_cache.set(cache_key, result, size=1)
+        return result
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get computed/reused counters for this query."""
+        return {
+            "computed": self.computed,
+            "reused": self.reused
+        }
+
+
+def create_analysis_cache(ttl: float, max_entries: int = 1024) -> LocalLRUCache:
+    """
+    Create a cross-request cache for combine_analysis results.
+
+    Args:
+        ttl: Seconds a result may be reused across queries
+        max_entries: Maximum number of cached analyses
+
+    Returns:
+        Cache to pass as AnalysisContext(shared_cache=...)
+    """
+    # Entries are counted, not sized: each one is stored with size=1
+    return LocalLRUCache(max_entries=max_entries, max_bytes=max_entries, default_ttl=ttl)
+
+
+def get_combined_analysis(context: Optional[Dict[str, Any]], zip_code: str,
+                          compute: Callable[..., Dict[str, Any]], **params) -> Dict[str, Any]:
+    """
+    Get combined analysis through the query's AnalysisContext when there is one.
+
+    Args:
+        context: Layer context, possibly holding an AnalysisContext under CONTEXT_KEY
+        zip_code: The ZIP code to analyze
+        compute: combine_analysis implementation to use on a miss
+        **params: Extra combine_analysis parameters
+
+    Returns:
+        Combined analysis result
+    """
+    analysis_context = (context or {}).get(CONTEXT_KEY)
+    if analysis_context is None:
+        return compute(zip_code, **params)
+    return analysis_context.get(zip_code, compute, **params)
@@ -29,6 +29,12 @@ class InferenceLayer(ABC):
     Defines the common interface that all temporal layers must implement.
     """
     
+    # Keywords beyond the capabilities that make this layer relevant
+    time_keywords: List[str] = []
+    
+    # When set, the layer is also relevant if none of these words appear
+    default_unless: Optional[List[str]] = None
+    
     def __init__(self, name: str):
         """
         Initialize the inference layer.
@@ -73,14 +79,17 @@ class InferenceLayer(ABC):
         Returns:
             True if this layer is relevant, False otherwise
         """
-        # Default implementation checks if any capability keywords are in the query
-        capabilities = self.get_capabilities()
+        # Default implementation checks if any capability or time keywords are in the query
+        keywords = self.get_capabilities() + self.time_keywords
         query_lower = query.lower()
         
-        for capability in capabilities:
-            if capability.lower() in query_lower:
+        for keyword in keywords:
+            if keyword.lower() in query_lower:
                 return True
         
+        if self.default_unless is not None:
+            return not any(word in query_lower for word in self.default_unless)
+        
         return False
     
     def __str__(self) -> str:
@@ -25,6 +25,7 @@ if sys_path not in sys.path:
 
 # Import base layer
 from src.inference.base_layer import InferenceLayer
+from src.inference.analysis_context import get_combined_analysis
 
 # Import relevant components
 try:
@@ -75,6 +76,13 @@ class FutureInferenceLayer(InferenceLayer):
     - Future sentiment predictions
     """
     
+    # Time-related keywords
+    time_keywords = [
+        "future", "forecast", "predict", "projection", "outlook",
+        "potential", "growth", "will be", "expected", "anticipated",
+        "next year", "coming months", "next quarter", "long-term"
+    ]
+    
     def __init__(self):
         """
         Initialize the Future inference layer.
@@ -127,13 +135,13 @@ class FutureInferenceLayer(InferenceLayer):
         results = {}
         for zip_code in zip_codes:
             # Get current analysis as baseline
-            current_data = combine_analysis(zip_code)
+            current_data = get_combined_analysis(context, zip_code, combine_analysis)
             
             # Get investment confidence
             investment_data = calculate_investment_confidence(zip_code, investment_type)
             
             # Generate forecasts
-            forecasts = self._generate_forecasts(zip_code, start_date, end_date, months_ahead)
+            forecasts = self._generate_forecasts(zip_code, start_date, end_date, months_ahead, context)
             
             # Combine all data
             zip_result = {
@@ -182,37 +190,8 @@ class FutureInferenceLayer(InferenceLayer):
             "market outlook"
         ]
     
-    def is_relevant_for_query(self, query: str) -> bool:
-        """
-        Determine if this layer is relevant for the given query.
-        
-        Args:
-            query: The user query to check
-            
-        Returns:
-            True if this layer is relevant, False otherwise
-        """
-        # Check for time-related keywords
-        time_keywords = [
-            "future", "forecast", "predict", "projection", "outlook",
-            "potential", "growth", "will be", "expected", "anticipated",
-            "next year", "coming months", "next quarter", "long-term"
-        ]
-        
-        query_lower = query.lower()
-        
-        # Check base capabilities
-        if super().is_relevant_for_query(query):
-            return True
-        
-        # Check time keywords
-        for keyword in time_keywords:
-            if keyword in query_lower:
-                return True
-        
-        return False
-    
-    def _generate_forecasts(self, zip_code: str, start_date: datetime, end_date: datetime, months_ahead: int) -> Dict[str, Any]:
+    def _generate_forecasts(self, zip_code: str, start_date: datetime, end_date: datetime, months_ahead: int,
+                            context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Generate forecasts for a ZIP code over a specified time range.
         
@@ -221,6 +200,7 @@ class FutureInferenceLayer(InferenceLayer):
             start_date: Start date for forecast
             end_date: End date for forecast
             months_ahead: Number of months to forecast
+            context: Query context (shares the query's combined analysis)
             
         Returns:
             Dictionary with forecast data
@@ -229,7 +209,7 @@ class FutureInferenceLayer(InferenceLayer):
         # For now, we'll use a mock implementation
         
         # Get current analysis as a baseline
-        current_data = combine_analysis(zip_code)
+        current_data = get_combined_analysis(context, zip_code, combine_analysis)
         
         # Generate mock forecast data points
         forecast_points = []
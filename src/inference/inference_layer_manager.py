@@ -9,9 +9,10 @@ Past, Present, and Future temporal inference layers.
 
 import os
 import sys
+import time
 import logging
-from typing import Dict, List, Any, Optional, Union, Type
-import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Dict, List, Any, Optional, Union, Type, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -28,6 +29,8 @@ from src.inference.base_layer import InferenceLayer
 from src.inference.past_layer import PastInferenceLayer
 from src.inference.present_layer import PresentInferenceLayer
 from src.inference.future_layer import FutureInferenceLayer
+from src.inference.analysis_context import AnalysisContext, CONTEXT_KEY, create_analysis_cache
+from src.inference.query_parser import QueryParser
 
 
 class InferenceLayerManager:
@@ -41,12 +44,23 @@ class InferenceLayerManager:
     4. Providing a unified interface to the orchestrator
     """
     
-    def __init__(self):
+    def __init__(self, analysis_cache_ttl: Optional[float] = None,
+                 layer_timeouts: Optional[Dict[str, float]] = None):
         """
         Initialize the Inference Layer Manager with all temporal layers.
+        
+        Args:
+            analysis_cache_ttl: Seconds to reuse combined analyses across queries
+                (defaults to the ANALYSIS_CACHE_TTL environment variable; 0 disables)
+            layer_timeouts: Per-layer deadlines in seconds, keyed by layer name. Layers
+                not listed use INFERENCE_LAYER_TIMEOUT (default 30 seconds).
         """
         logger.info("Initializing Inference Layer Manager")
         
+        if analysis_cache_ttl is None:
+            analysis_cache_ttl = float(os.getenv("ANALYSIS_CACHE_TTL", "0"))
+        self.analysis_cache = create_analysis_cache(analysis_cache_ttl) if analysis_cache_ttl > 0 else None
+        
         # Initialize all layers
         self.past_layer = PastInferenceLayer()
         self.present_layer = PresentInferenceLayer()
@@ -59,6 +73,19 @@ class InferenceLayerManager:
             "future": self.future_layer
         }
         
+        # Compiled relevance/entity extraction, memoized per query
+        self.query_parser = QueryParser(
+            self.layers, cache_size=int(os.getenv("QUERY_PARSE_CACHE_SIZE", "4096"))
+        )
+        
+        # Layers run concurrently; each gets its own deadline
+        self.default_layer_timeout = float(os.getenv("INFERENCE_LAYER_TIMEOUT", "30"))
+        self.layer_timeouts = layer_timeouts or {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("INFERENCE_WORKERS", str(len(self.layers) * 4))),
+            thread_name_prefix="inference-layer"
+        )
+        
         logger.info("Inference Layer Manager initialized with all temporal layers")
     
     def process_query(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -89,19 +116,86 @@ class InferenceLayerManager:
         # Extract entities from query to enhance context
         enhanced_context = self._extract_entities(query, context)
         
-        # Process query with each relevant layer
-        layer_results = {}
-        for layer_name in relevant_layers:
-            layer = self.layers[layer_name]
-            layer_results[layer_name] = layer.process_query(query, enhanced_context)
+        # Share one combined analysis per ZIP across all layers for this query
+        if CONTEXT_KEY not in enhanced_context:
+            enhanced_context[CONTEXT_KEY] = AnalysisContext(shared_cache=self.analysis_cache)
+        
+        # Process query with all relevant layers concurrently
+        layer_results, layer_latency, timed_out = self._run_layers(query, relevant_layers, enhanced_context)
         
         # Combine results if multiple layers were used
-        if len(layer_results) > 1:
-            combined_result = self._combine_layer_results(layer_results, query)
-            return combined_result
-        else:
+        if len(relevant_layers) > 1:
+            result = self._combine_layer_results(layer_results, query)
+        elif layer_results:
             # Return the single layer result
-            return list(layer_results.values())[0]
+            result = list(layer_results.values())[0]
+        else:
+            result = {
+                "layer": relevant_layers[0],
+                "error": "Layer timed out",
+                "query": query
+            }
+        
+        result["layer_latency_ms"] = layer_latency
+        result["timed_out_layers"] = timed_out
+        return result
+    
+    def _run_layers(self, query: str, layer_names: List[str],
+                    context: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, float], List[str]]:
+        """
+        Run layers concurrently, each against its own deadline.
+        
+        A layer that misses its deadline is left out of the results (its worker
+        finishes in the background) so it can't hold back the other layers.
+        
+        Args:
+            query: The user query to process
+            layer_names: Names of the layers to run
+            context: Enhanced context shared by all layers
+            
+        Returns:
+            Tuple of (results by layer, latency in ms by layer, timed-out layer names)
+        """
+        start = time.monotonic()
+        futures = {
+            name: self._executor.submit(self._run_layer, name, query, context)
+            for name in layer_names
+        }
+        
+        layer_results = {}
+        layer_latency = {}
+        timed_out = []
+        for name, future in futures.items():
+            deadline = start + self.layer_timeouts.get(name, self.default_layer_timeout)
+            try:
+                layer_results[name], elapsed = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FuturesTimeout:
+                future.cancel()
+                elapsed = time.monotonic() - start
+                timed_out.append(name)
+                logger.warning(f"{name} layer timed out after {elapsed:.2f}s")
+            layer_latency[name] = round(elapsed * 1000, 1)
+        
+        return layer_results, layer_latency, timed_out
+    
+    def _run_layer(self, name: str, query: str, context: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        """
+        Run one layer, turning errors into an error result.
+        
+        Returns:
+            Tuple of (layer result, seconds taken)
+        """
+        start = time.monotonic()
+        try:
+            result = self.layers[name].process_query(query, context)
+        except Exception as e:
+            logger.error(f"Error in {name} layer: {str(e)}")
+            result = {
+                "layer": name,
+                "error": str(e),
+                "query": query
+            }
+        return result, time.monotonic() - start
     
     def _determine_relevant_layers(self, query: str) -> List[str]:
         """
@@ -113,14 +207,7 @@ class InferenceLayerManager:
         Returns:
             List of relevant layer names
         """
-        relevant_layers = []
-        
-        # Check each layer for relevance
-        for layer_name, layer in self.layers.items():
-            if layer.is_relevant_for_query(query):
-                relevant_layers.append(layer_name)
-        
-        return relevant_layers
+        return list(self.query_parser.parse(query).relevant_layers)
     
     def _extract_entities(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -135,166 +222,32 @@ class InferenceLayerManager:
         """
         # Create a copy of the context to avoid modifying the original
         enhanced_context = context.copy()
+        parsed = self.query_parser.parse(query)
         
         # Extract ZIP codes if not already in context
         if "zip_codes" not in enhanced_context or not enhanced_context["zip_codes"]:
-            zip_codes = self._extract_zip_codes(query)
-            if zip_codes:
-                enhanced_context["zip_codes"] = zip_codes
+            if parsed.zip_codes:
+                enhanced_context["zip_codes"] = list(parsed.zip_codes)
         
         # Extract streets if not already in context
         if "streets" not in enhanced_context or not enhanced_context["streets"]:
-            streets = self._extract_streets(query)
-            if streets:
-                enhanced_context["streets"] = streets
+            if parsed.streets:
+                enhanced_context["streets"] = list(parsed.streets)
         
         # Extract time frame if not already in context
         if "years_back" not in enhanced_context and "months_ahead" not in enhanced_context:
-            years_back, months_ahead = self._extract_time_frame(query)
-            if years_back is not None:
-                enhanced_context["years_back"] = years_back
-            if months_ahead is not None:
-                enhanced_context["months_ahead"] = months_ahead
+            if parsed.years_back is not None:
+                enhanced_context["years_back"] = parsed.years_back
+            if parsed.months_ahead is not None:
+                enhanced_context["months_ahead"] = parsed.months_ahead
         
         # Extract investment type if not already in context
         if "investment_type" not in enhanced_context:
-            investment_type = self._extract_investment_type(query)
-            if investment_type:
-                enhanced_context["investment_type"] = investment_type
+            if parsed.investment_type:
+                enhanced_context["investment_type"] = parsed.investment_type
         
         return enhanced_context
     
-    def _extract_zip_codes(self, query: str) -> List[str]:
-        """
-        Extract ZIP codes from the query.
-        
-        Args:
-            query: The user query to process
-            
-        Returns:
-            List of ZIP codes
-        """
-        # Look for 5-digit ZIP codes
-        zip_pattern = r'\b(\d{5})\b'
-        zip_codes = re.findall(zip_pattern, query)
-        
-        # Also look for ZIP codes mentioned as "ZIP: 12345" or similar
-        zip_label_pattern = r'\b[Zz][Ii][Pp]\s*(?:code)?\s*:?\s*(\d{5})\b'
-        labeled_zips = re.findall(zip_label_pattern, query)
-        
-        # Combine and deduplicate
-        all_zips = list(set(zip_codes + labeled_zips))
-        
-        return all_zips
-    
-    def _extract_streets(self, query: str) -> List[str]:
-        """
-        Extract street names from the query.
-        
-        Args:
-            query: The user query to process
-            
-        Returns:
-            List of street names
-        """
-        # This is a simplified approach - in a real system, you would use NER or a more
-        # sophisticated approach to extract street names
-        
-        # Look for common street suffixes
-        street_suffixes = ["Street", "St", "Avenue", "Ave", "Road", "Rd", "Boulevard", "Blvd", 
-                          "Lane", "Ln", "Drive", "Dr", "Court", "Ct", "Place", "Pl", "Way"]
-        
-        # Create pattern to match "<Word> <Suffix>"
-        suffix_pattern = "|".join([s + "\\b" for s in street_suffixes])
-        street_pattern = r'\b([A-Z][a-z]+ (?:' + suffix_pattern + '))'
-        
-        # Find all matches
-        streets = re.findall(street_pattern, query)
-        
-        return streets
-    
-    def _extract_time_frame(self, query: str) -> tuple[Optional[int], Optional[int]]:
-        """
-        Extract time frame from the query.
-        
-        Args:
-            query: The user query to process
-            
-        Returns:
-            Tuple of (years_back, months_ahead)
-        """
-        years_back = None
-        months_ahead = None
-        
-        # Look for past time references
-        past_patterns = [
-            r'\b(\d+)\s+years?\s+(?:ago|back|history|historical|past)\b',
-            r'\bpast\s+(\d+)\s+years?\b',
-            r'\bover\s+(?:the\s+)?(?:last|past)\s+(\d+)\s+years?\b'
-        ]
-        
-        for pattern in past_patterns:
-            matches = re.findall(pattern, query.lower())
-            if matches:
-                try:
-                    years_back = int(matches[0])
-                    break
-                except (ValueError, IndexError):
-                    pass
-        
-        # Look for future time references
-        future_patterns = [
-            r'\b(?:next|coming|following|future)\s+(\d+)\s+months?\b',
-            r'\b(\d+)\s+months?\s+(?:ahead|forward|future|forecast|projection)\b',
-            r'\b(?:next|coming|following|future)\s+(\d+)\s+years?\b',
-            r'\b(\d+)\s+years?\s+(?:ahead|forward|future|forecast|projection)\b'
-        ]
-        
-        for pattern in future_patterns:
-            matches = re.findall(pattern, query.lower())
-            if matches:
-                try:
-                    value = int(matches[0])
-                    if "year" in pattern:
-                        months_ahead = value * 12
-                    else:
-                        months_ahead = value
-                    break
-                except (ValueError, IndexError):
-                    pass
-        
-        return years_back, months_ahead
-    
-    def _extract_investment_type(self, query: str) -> Optional[str]:
-        """
-        Extract investment type from the query.
-        
-        Args:
-            query: The user query to process
-            
-        Returns:
-            Investment type string or None
-        """
-        # Define investment types to look for
-        investment_types = {
-            "residential": ["residential", "housing", "homes", "apartments", "condos"],
-            "commercial": ["commercial", "office", "retail", "shopping", "business"],
-            "industrial": ["industrial", "warehouse", "manufacturing", "factory"],
-            "mixed-use": ["mixed-use", "mixed use", "multi-use"],
-            "land": ["land", "vacant", "undeveloped", "lot"]
-        }
-        
-        query_lower = query.lower()
-        
-        # Check for each investment type
-        for inv_type, keywords in investment_types.items():
-            for keyword in keywords:
-                if keyword in query_lower:
-                    return inv_type
-        
-        # Default to residential if no specific type is found
-        return None
-    
     def _combine_layer_results(self, layer_results: Dict[str, Dict[str, Any]], query: str) -> Dict[str, Any]:
         """
         Combine results from multiple layers into a unified response.
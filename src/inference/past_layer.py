@@ -25,6 +25,7 @@ if sys_path not in sys.path:
 
 # Import base layer
 from src.inference.base_layer import InferenceLayer
+from src.inference.analysis_context import get_combined_analysis
 
 # Import relevant components
 try:
@@ -56,6 +57,12 @@ class PastInferenceLayer(InferenceLayer):
     - Comparative historical performance
     """
     
+    # Time-related keywords
+    time_keywords = [
+        "history", "historical", "past", "previous", "before",
+        "last year", "five years", "decade", "trend", "cycle"
+    ]
+    
     def __init__(self):
         """
         Initialize the Past inference layer.
@@ -99,7 +106,7 @@ class PastInferenceLayer(InferenceLayer):
         results = {}
         for zip_code in zip_codes:
             # Get historical analysis for this ZIP
-            historical_data = self._get_historical_data(zip_code, start_date, end_date)
+            historical_data = self._get_historical_data(zip_code, start_date, end_date, context)
             
             # Add to results
             results[zip_code] = historical_data
@@ -139,36 +146,8 @@ class PastInferenceLayer(InferenceLayer):
             "historical data"
         ]
     
-    def is_relevant_for_query(self, query: str) -> bool:
-        """
-        Determine if this layer is relevant for the given query.
-        
-        Args:
-            query: The user query to check
-            
-        Returns:
-            True if this layer is relevant, False otherwise
-        """
-        # Check for time-related keywords
-        time_keywords = [
-            "history", "historical", "past", "previous", "before",
-            "last year", "five years", "decade", "trend", "cycle"
-        ]
-        
-        query_lower = query.lower()
-        
-        # Check base capabilities
-        if super().is_relevant_for_query(query):
-            return True
-        
-        # Check time keywords
-        for keyword in time_keywords:
-            if keyword in query_lower:
-                return True
-        
-        return False
-    
-    def _get_historical_data(self, zip_code: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+    def _get_historical_data(self, zip_code: str, start_date: datetime, end_date: datetime,
+                             context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Get historical data for a ZIP code over a specified time range.
         
@@ -176,6 +155,7 @@ class PastInferenceLayer(InferenceLayer):
             zip_code: The ZIP code to analyze
             start_date: Start date for historical data
             end_date: End date for historical data
+            context: Query context (shares the query's combined analysis)
             
         Returns:
             Dictionary with historical data
@@ -184,7 +164,7 @@ class PastInferenceLayer(InferenceLayer):
         # For now, we'll use a mock implementation
         
         # Get current analysis as a baseline
-        current_data = combine_analysis(zip_code)
+        current_data = get_combined_analysis(context, zip_code, combine_analysis)
         
         # Generate mock historical data points
         historical_points = []
@@ -25,6 +25,7 @@ if sys_path not in sys.path:
 
 # Import base layer
 from src.inference.base_layer import InferenceLayer
+from src.inference.analysis_context import get_combined_analysis
 
 # Import relevant components
 try:
@@ -91,6 +92,18 @@ class PresentInferenceLayer(InferenceLayer):
     - Current economic indicators
     """
     
+    # Time-related keywords
+    time_keywords = [
+        "current", "now", "today", "present", "real-time",
+        "live", "active", "right now", "currently", "at the moment"
+    ]
+    
+    # If no time frame is specified, default to present
+    default_unless = [
+        "history", "historical", "past", "previous", "before",
+        "future", "predict", "forecast", "projection", "will be"
+    ]
+    
     def __init__(self):
         """
         Initialize the Present inference layer.
@@ -135,7 +148,7 @@ class PresentInferenceLayer(InferenceLayer):
         results = {}
         for zip_code in zip_codes:
             # Get current analysis for this ZIP
-            current_data = combine_analysis(zip_code)
+            current_data = get_combined_analysis(context, zip_code, combine_analysis)
             
             # Get metro information
             metro = get_metro_for_zip(zip_code)
@@ -191,46 +204,6 @@ class PresentInferenceLayer(InferenceLayer):
             "current buzz"
         ]
     
-    def is_relevant_for_query(self, query: str) -> bool:
-        """
-        Determine if this layer is relevant for the given query.
-        
-        Args:
-            query: The user query to check
-            
-        Returns:
-            True if this layer is relevant, False otherwise
-        """
-        # Check for time-related keywords
-        time_keywords = [
-            "current", "now", "today", "present", "real-time",
-            "live", "active", "right now", "currently", "at the moment"
-        ]
-        
-        query_lower = query.lower()
-        
-        # Check base capabilities
-        if super().is_relevant_for_query(query):
-            return True
-        
-        # Check time keywords
-        for keyword in time_keywords:
-            if keyword in query_lower:
-                return True
-        
-        # If no time frame is specified, default to present
-        time_frame_words = [
-            "history", "historical", "past", "previous", "before",
-            "future", "predict", "forecast", "projection", "will be"
-        ]
-        
-        for keyword in time_frame_words:
-            if keyword in query_lower:
-                return False
-        
-        # Default to present if no time frame is specified
-        return True
-    
     def _generate_real_time_insights(self, results: Dict[str, Any], query: str) -> List[Dict[str, Any]]:
         """
         Generate insights from real-time data.
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Query Parser
+
+This module implements single-pass intent and entity extraction for the
+Inference Layer Manager. Layer relevance keywords and investment-type
+keywords are compiled once into a trie-shaped regex, so one scan of the
+lowercased query yields every keyword hit; ZIP codes, streets and time
+frames use precompiled patterns. Parses are memoized per query string.
+"""
+
+import os
+import sys
+import re
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Ensure project directory is in path
+sys_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if sys_path not in sys.path:
+    sys.path.append(sys_path)
+
+from src.inference.base_layer import InferenceLayer
+
+# Investment types and their keywords, checked in order
+INVESTMENT_TYPES = {
+    "residential": ["residential", "housing", "homes", "apartments", "condos"],
+    "commercial": ["commercial", "office", "retail", "shopping", "business"],
+    "industrial": ["industrial", "warehouse", "manufacturing", "factory"],
+    "mixed-use": ["mixed-use", "mixed use", "multi-use"],
+    "land": ["land", "vacant", "undeveloped", "lot"]
+}
+
+# Common street suffixes
+STREET_SUFFIXES = ["Street", "St", "Avenue", "Ave", "Road", "Rd", "Boulevard", "Blvd",
+                   "Lane", "Ln", "Drive", "Dr", "Court", "Ct", "Place", "Pl", "Way"]
+
+# 5-digit ZIP codes, bare or labeled as "ZIP: 12345" or similar
+ZIP_PATTERN = re.compile(r'\b(\d{5})\b|\b[Zz][Ii][Pp]\s*(?:code)?\s*:?\s*(\d{5})\b')
+
+# "<Word> <Suffix>"
+STREET_PATTERN = re.compile(
+    r'\b([A-Z][a-z]+ (?:' + "|".join([s + "\\b" for s in STREET_SUFFIXES]) + '))'
+)
+
+# Past time references, in priority order
+PAST_PATTERNS = [
+    re.compile(r'\b(\d+)\s+years?\s+(?:ago|back|history|historical|past)\b'),
+    re.compile(r'\bpast\s+(\d+)\s+years?\b'),
+    re.compile(r'\bover\s+(?:the\s+)?(?:last|past)\s+(\d+)\s+years?\b')
+]
+
+# Future time references as (pattern, months per unit), in priority order
+FUTURE_PATTERNS = [
+    (re.compile(r'\b(?:next|coming|following|future)\s+(\d+)\s+months?\b'), 1),
+    (re.compile(r'\b(\d+)\s+months?\s+(?:ahead|forward|future|forecast|projection)\b'), 1),
+    (re.compile(r'\b(?:next|coming|following|future)\s+(\d+)\s+years?\b'), 12),
+    (re.compile(r'\b(\d+)\s+years?\s+(?:ahead|forward|future|forecast|projection)\b'), 12)
+]
+
+# Time frames always carry a number of months or years
+DIGIT_PATTERN = re.compile(r'\d')
+
+# Keyword tag kinds
+_LAYER = "layer"
+_NOT_DEFAULT = "not_default"
+_INVESTMENT = "investment"
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """Relevance flags and entities extracted from one query."""
+    relevant_layers: Tuple[str, ...]
+    zip_codes: Tuple[str, ...]
+    streets: Tuple[str, ...]
+    years_back: Optional[int]
+    months_ahead: Optional[int]
+    investment_type: Optional[str]
+
+
+def _trie_regex(words: List[str]) -> str:
+    """
+    Build a regex matching the longest of the given words at a position.
+
+    Alternatives are factored by shared prefix, so the engine dispatches on
+    one character at a time instead of trying every word.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional group: prefer the longer word when a shorter one ends here
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class QueryParser:
+    """
+    Single-pass relevance and entity extractor for a set of inference layers.
+
+    Layers that use the base keyword rule (capabilities, time_keywords and
+    default_unless) are folded into the compiled keyword scan; layers that
+    override is_relevant_for_query are asked directly.
+    """
+
+    def __init__(self, layers: Dict[str, InferenceLayer], cache_size: int = 4096):
+        """
+        Compile the keyword scanner for the given layers.
+
+        Args:
+            layers: Inference layers keyed by layer name
+            cache_size: Number of parsed queries to memoize
+        """
+        self.layer_names = list(layers)
+        self._custom_layers = {}
+        self._default_layers = []
+
+        tags: Dict[str, Set[Tuple[str, str]]] = {}
+        for name, layer in layers.items():
+            if type(layer).is_relevant_for_query is not InferenceLayer.is_relevant_for_query:
+                self._custom_layers[name] = layer
+                continue
+            for keyword in layer.get_capabilities() + layer.time_keywords:
+                tags.setdefault(keyword.lower(), set()).add((_LAYER, name))
+            if layer.default_unless is not None:
+                self._default_layers.append(name)
+                for word in layer.default_unless:
+                    tags.setdefault(word, set()).add((_NOT_DEFAULT, name))
+        for inv_type, keywords in INVESTMENT_TYPES.items():
+            for keyword in keywords:
+                tags.setdefault(keyword, set()).add((_INVESTMENT, inv_type))
+
+        # The scan reports the longest keyword at each position; credit every
+        # keyword that is a prefix of it too, since those match there as well
+        self._tags = {
+            keyword: frozenset().union(*(t for other, t in tags.items() if keyword.startswith(other)))
+            for keyword in tags
+        }
+        self._keyword_re = re.compile("(?=(" + _trie_regex(list(tags)) + "))")
+
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    def _parse(self, query: str) -> ParsedQuery:
+        """
+        Parse a query without the memo.
+
+        Args:
+            query: The user query to parse
+
+        Returns:
+            ParsedQuery with relevance flags and entities
+        """
+        query_lower = query.lower()
+
+        hits: Set[Tuple[str, str]] = set()
+        for match in self._keyword_re.finditer(query_lower):
+            hits |= self._tags[match.group(1)]
+
+        relevant = []
+        for name in self.layer_names:
+            if name in self._custom_layers:
+                is_relevant = self._custom_layers[name].is_relevant_for_query(query)
+            else:
+                is_relevant = (_LAYER, name) in hits or (
+                    name in self._default_layers and (_NOT_DEFAULT, name) not in hits
+                )
+            if is_relevant:
+                relevant.append(name)
+
+        investment_type = next(
+            (inv_type for inv_type in INVESTMENT_TYPES if (_INVESTMENT, inv_type) in hits), None
+        )
+
+        years_back, months_ahead = self._extract_time_frame(query_lower)
+
+        return ParsedQuery(
+            relevant_layers=tuple(relevant),
+            zip_codes=self._extract_zip_codes(query),
+            streets=tuple(STREET_PATTERN.findall(query)),
+            years_back=years_back,
+            months_ahead=months_ahead,
+            investment_type=investment_type
+        )
+
+    @staticmethod
+    def _extract_zip_codes(query: str) -> Tuple[str, ...]:
+        """Extract unique ZIP codes in order of first mention."""
+        zip_codes = {}
+        for match in ZIP_PATTERN.finditer(query):
+            zip_codes[match.group(1) or match.group(2)] = None
+        return tuple(zip_codes)
+
+    @staticmethod
+    def _extract_time_frame(query_lower: str) -> Tuple[Optional[int], Optional[int]]:
+        """Extract (years_back, months_ahead) using the first matching pattern of each kind."""
+        years_back = None
+        months_ahead = None
+
+        has_years = "year" in query_lower
+        if not (has_years or "month" in query_lower) or not DIGIT_PATTERN.search(query_lower):
+            return years_back, months_ahead
+
+        # Every past pattern counts years
+        for pattern in PAST_PATTERNS if has_years else []:
+            match = pattern.search(query_lower)
+            if match:
+                years_back = int(match.group(1))
+                break
+
+        for pattern, months_per_unit in FUTURE_PATTERNS:
+            match = pattern.search(query_lower)
+            if match:
+                months_ahead = int(match.group(1)) * months_per_unit
+                break
+
+        return years_back, months_ahead
+
+    def cache_info(self):
+        """Get hit/miss statistics for the parse memo."""
+        return self.parse.cache_info()
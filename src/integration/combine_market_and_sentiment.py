@@ -11,7 +11,7 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator, Callable
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -24,6 +24,8 @@ import sys
 if sys_path not in sys.path:
     sys.path.append(sys_path)
 
+from src.utils.executor import run_blocking
+
 # Import existing modules
 try:
     from src.market_analysis import analyze_market
@@ -92,7 +94,7 @@ except ImportError:
 
         print(f"📊 Computing reputation score...")
         reputation_index = NeighborhoodReputationIndex()
-        index_result = reputation_index.compute_reputation_index(zip_code)
+        index_result = await run_blocking(reputation_index.compute_reputation_index, zip_code)
 
         return {
             "zip": zip_code,
@@ -139,8 +141,8 @@ async def combined_analysis(zip_code: str, force_refresh: bool = False, rent: fl
     logger.info(f"Starting combined analysis for ZIP {zip_code}")
     print(f"\n📍 Running combined analysis for ZIP: {zip_code}")
     
-    # Get market data
-    market_data = analyze_market(zip_code, rent=rent, value=value, income=income)
+    # Get market data (CSV-backed and synchronous, so keep it off the event loop)
+    market_data = await run_blocking(analyze_market, zip_code, rent=rent, value=value, income=income)
     
     # Get sentiment data
     sentiment_data = await get_sentiment_data(zip_code, force_refresh)
@@ -206,23 +208,82 @@ async def combined_analysis(zip_code: str, force_refresh: bool = False, rent: fl
     return combined_data
 
 
-async def batch_analysis(zip_codes: List[str], force_refresh: bool = False) -> List[Dict[str, Any]]:
+ProgressCallback = Callable[[int, int, Dict[str, Any]], None]
+
+
+async def iter_batch_analysis(zip_codes: List[str],
+                              force_refresh: bool = False,
+                              concurrency: int = 8,
+                              timeout: Optional[float] = None,
+                              progress_callback: Optional[ProgressCallback] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run combined analysis for many ZIP codes concurrently, yielding results as they finish.
+    
+    Args:
+        zip_codes: List of ZIP codes to analyze
+        force_refresh: Whether to force a refresh of sentiment data
+        concurrency: Maximum number of ZIP codes analyzed at once
+        timeout: Per-ZIP timeout in seconds (None for no limit)
+        progress_callback: Called as callback(completed, total, result) after each ZIP
+        
+    Yields:
+        Combined analysis results in completion order. Failed or timed-out
+        ZIPs yield {"zip": ..., "error": ...} instead of raising.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def analyze_one(zip_code: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(combined_analysis(zip_code, force_refresh), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Combined analysis for ZIP {zip_code} timed out after {timeout}s")
+                return {"zip": zip_code, "error": "timeout"}
+            except Exception as e:
+                logger.error(f"Combined analysis for ZIP {zip_code} failed: {e}")
+                return {"zip": zip_code, "error": str(e)}
+    
+    tasks = [asyncio.ensure_future(analyze_one(zip_code)) for zip_code in zip_codes]
+    try:
+        for completed, next_result in enumerate(asyncio.as_completed(tasks), start=1):
+            result = await next_result
+            if progress_callback:
+                progress_callback(completed, len(tasks), result)
+            yield result
+    finally:
+        # Consumer stopped early: don't leave analyses running
+        for task in tasks:
+            task.cancel()
+
+
+async def batch_analysis(zip_codes: List[str],
+                         force_refresh: bool = False,
+                         concurrency: int = 8,
+                         timeout: Optional[float] = None,
+                         progress_callback: Optional[ProgressCallback] = None) -> List[Dict[str, Any]]:
     """
     Perform combined analysis for multiple ZIP codes.
     
     Args:
         zip_codes: List of ZIP codes to analyze
         force_refresh: Whether to force a refresh of sentiment data
+        concurrency: Maximum number of ZIP codes analyzed at once
+        timeout: Per-ZIP timeout in seconds (None for no limit)
+        progress_callback: Called as callback(completed, total, result) after each ZIP
         
     Returns:
-        List of combined analysis results
+        List of combined analysis results in input order. Failed or timed-out
+        ZIPs are {"zip": ..., "error": ...} entries in their place.
     """
-    results = []
-    for zip_code in zip_codes:
-        result = await combined_analysis(zip_code, force_refresh)
-        results.append(result)
+    by_zip = {}
+    failed = 0
+    async for result in iter_batch_analysis(zip_codes, force_refresh, concurrency, timeout, progress_callback):
+        by_zip[result["zip"]] = result
+        failed += "error" in result
     
-    return results
+    if failed:
+        logger.warning(f"Combined analysis failed for {failed} of {len(zip_codes)} ZIP codes")
+    return [by_zip[zip_code] for zip_code in zip_codes]
 
 
 def combine_analysis(zip_code: str, rent: float = None, value: float = None, income: float = None) -> Dict[str, Any]:
@@ -239,14 +300,9 @@ def combine_analysis(zip_code: str, rent: float = None, value: float = None, inc
     Returns:
         Dictionary with scores, summaries, and risk indicators
     """
-    # Run the async function in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(combined_analysis(zip_code, rent=rent, value=value, income=income))
-        return result
-    finally:
-        loop.close()
+    # Run the async function in a new event loop; asyncio.run() closes the
+    # loop's pooled browser before it closes the loop
+    return asyncio.run(combined_analysis(zip_code, rent=rent, value=value, income=income))
 
 
 async def main():
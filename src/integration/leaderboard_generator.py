@@ -12,7 +12,7 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, List, Any, Optional, Tuple, Union, AsyncIterator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -25,7 +25,9 @@ import sys
 if sys_path not in sys.path:
     sys.path.append(sys_path)
 
-from src.integration.combine_market_and_sentiment import combined_analysis, batch_analysis
+from src.integration.combine_market_and_sentiment import (
+    combined_analysis, batch_analysis, iter_batch_analysis, ProgressCallback
+)
 from src.utils.export_to_csv import export_to_csv
 
 
@@ -38,30 +40,72 @@ class LeaderboardGenerator:
         """
         self.results_cache = {}
     
-    async def analyze_zip_codes(self, zip_codes: List[str], force_refresh: bool = False) -> List[Dict[str, Any]]:
+    async def analyze_zip_codes(self, zip_codes: List[str], force_refresh: bool = False,
+                                concurrency: int = 8, timeout: Optional[float] = None,
+                                progress_callback: Optional[ProgressCallback] = None) -> List[Dict[str, Any]]:
         """
         Analyze a list of ZIP codes to generate leaderboard data.
         
         Args:
             zip_codes: List of ZIP codes to analyze
             force_refresh: Whether to force a refresh of sentiment data
+            concurrency: Maximum number of ZIP codes analyzed at once
+            timeout: Per-ZIP timeout in seconds (None for no limit)
+            progress_callback: Called as callback(completed, total, result) after each ZIP
             
         Returns:
             List of analysis results
         """
         logger.info(f"Analyzing {len(zip_codes)} ZIP codes for leaderboard generation")
         
-        # Use batch analysis to get results for all ZIP codes
-        results = await batch_analysis(zip_codes, force_refresh)
+        # Use batch analysis to get results for all ZIP codes; failed ZIPs can't be ranked
+        results = [result for result in
+                   await batch_analysis(zip_codes, force_refresh, concurrency, timeout, progress_callback)
+                   if "error" not in result]
         
         # Cache the results
         for result in results:
-            zip_code = result.get("zip_code")
-            if zip_code:
-                self.results_cache[zip_code] = result
+            self._cache_result(result)
         
         return results
     
+    async def iter_leaderboard(self, zip_codes: List[str], metric: str = "investment",
+                               top_n: int = 10, force_refresh: bool = False,
+                               concurrency: int = 8,
+                               timeout: Optional[float] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream partial leaderboards as ZIP code analyses complete.
+        
+        Yields the current top-N after each successful result, so callers can
+        render a leaderboard before the slowest ZIP codes have finished. The
+        last snapshot yielded is the final leaderboard.
+        
+        Args:
+            zip_codes: List of ZIP codes to analyze
+            metric: Metric to sort by (see generate_leaderboard)
+            top_n: Number of top results to include
+            force_refresh: Whether to force a refresh of sentiment data
+            concurrency: Maximum number of ZIP codes analyzed at once
+            timeout: Per-ZIP timeout in seconds (None for no limit)
+            
+        Yields:
+            Leaderboard snapshots
+        """
+        results = []
+        async for result in iter_batch_analysis(zip_codes, force_refresh, concurrency, timeout):
+            if "error" in result:
+                continue
+            self._cache_result(result)
+            results.append(result)
+            yield self.generate_leaderboard(results, metric, top_n)
+    
+    def _cache_result(self, result: Dict[str, Any]) -> None:
+        """Cache an analysis result by its ZIP code."""
+        # combined_analysis reports the ZIP under "zip"
+        zip_code = result.get("zip_code") or result.get("zip")
+        if zip_code:
+            self.results_cache[zip_code] = result
+    
     def generate_leaderboard(self, results: List[Dict[str, Any]], metric: str = "investment", 
                            top_n: int = 10, ascending: bool = False) -> List[Dict[str, Any]]:
         """
@@ -314,7 +358,8 @@ class LeaderboardGenerator:
 
 async def generate_leaderboard(zip_codes: List[str], metric: str = "investment", 
                              top_n: int = 10, force_refresh: bool = False,
-                             export_format: str = "both") -> Dict[str, Any]:
+                             export_format: str = "both", concurrency: int = 8,
+                             timeout: Optional[float] = None) -> Dict[str, Any]:
     """
     Generate a neighborhood leaderboard and export it to CSV and/or HTML.
     
@@ -324,6 +369,8 @@ async def generate_leaderboard(zip_codes: List[str], metric: str = "investment",
         top_n: Number of top results to include
         force_refresh: Whether to force a refresh of sentiment data
         export_format: Export format ("csv", "html", or "both")
+        concurrency: Maximum number of ZIP codes analyzed at once
+        timeout: Per-ZIP timeout in seconds (None for no limit)
         
     Returns:
         Dictionary with leaderboard results and export paths
@@ -331,7 +378,7 @@ async def generate_leaderboard(zip_codes: List[str], metric: str = "investment",
     generator = LeaderboardGenerator()
     
     # Analyze ZIP codes
-    results = await generator.analyze_zip_codes(zip_codes, force_refresh)
+    results = await generator.analyze_zip_codes(zip_codes, force_refresh, concurrency, timeout)
     
     # Generate leaderboard
     leaderboard = generator.generate_leaderboard(results, metric, top_n)
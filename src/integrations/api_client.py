@@ -1,10 +1,10 @@
 from typing import Dict, Optional
-import aiohttp
 import logging
 import os
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from datetime import datetime
+from .http_pool import get_async_pool
 
 class APIClient:
     """Unified API client for ATTOM and Redfin data"""
@@ -12,6 +12,7 @@ class APIClient:
     def __init__(self):
         load_dotenv()
         self.logger = logging.getLogger(__name__)
+        self.http = get_async_pool()
         
         # API configurations
         self.attom_api_key = os.getenv('ATTOM_API_KEY')
@@ -42,20 +43,19 @@ class APIClient:
     async def _get_redfin_data(self, address: str, zipcode: str) -> Dict:
         """Get property data from Redfin"""
         try:
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    'location': f"{address} {zipcode}",
-                    'start': 0,
-                    'count': 1
-                }
-                
-                async with session.get(self.redfin_base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_redfin_response(data)
-                    else:
-                        self.logger.warning(f"Redfin API returned status {response.status}")
-                        return {}
+            params = {
+                'location': f"{address} {zipcode}",
+                'start': 0,
+                'count': 1
+            }
+            
+            response = await self.http.get(self.redfin_base_url, params=params)
+            if response.status == 200:
+                data = response.json()
+                return self._parse_redfin_response(data)
+            else:
+                self.logger.warning(f"Redfin API returned status {response.status}")
+                return {}
                         
         except Exception as e:
             self.logger.error(f"Error fetching Redfin data: {str(e)}")
@@ -75,14 +75,13 @@ class APIClient:
                 'zipcode': zipcode
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_attom_response(data)
-                    else:
-                        self.logger.error(f"ATTOM API returned status {response.status}")
-                        raise Exception(f"ATTOM API error: {response.status}")
+            response = await self.http.get(endpoint, headers=headers, params=params)
+            if response.status == 200:
+                data = response.json()
+                return self._parse_attom_response(data)
+            else:
+                self.logger.error(f"ATTOM API returned status {response.status}")
+                raise Exception(f"ATTOM API error: {response.status}")
                         
         except Exception as e:
             self.logger.error(f"Error fetching ATTOM data: {str(e)}")
@@ -99,13 +98,12 @@ class APIClient:
             endpoint = f"{self.attom_base_url}/market/snapshot"
             params = {'zipcode': zipcode}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_market_data(data)
-                    else:
-                        raise Exception(f"Market data API error: {response.status}")
+            response = await self.http.get(endpoint, headers=headers, params=params)
+            if response.status == 200:
+                data = response.json()
+                return self._parse_market_data(data)
+            else:
+                raise Exception(f"Market data API error: {response.status}")
                         
         except Exception as e:
             self.logger.error(f"Error fetching market data: {str(e)}")
@@ -125,13 +123,12 @@ class APIClient:
                 'zipcode': zipcode
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_owner_info(data)
-                    else:
-                        raise Exception(f"Owner info API error: {response.status}")
+            response = await self.http.get(endpoint, headers=headers, params=params)
+            if response.status == 200:
+                data = response.json()
+                return self._parse_owner_info(data)
+            else:
+                raise Exception(f"Owner info API error: {response.status}")
                         
         except Exception as e:
             self.logger.error(f"Error fetching owner info: {str(e)}")
@@ -0,0 +1,256 @@
+"""
+Shared, pooled HTTP clients for outbound API calls.
+
+One lifecycle-managed pool per process (and per event loop for the async
+face) so ATTOM, Redfin and LLM calls reuse keep-alive connections instead
+of paying TCP+TLS setup on every request.
+
+Features:
+- Keep-alive connection reuse
+- Per-host concurrency limits
+- DNS caching (async face)
+- Retry with exponential backoff on connection errors and 429/5xx; POST
+  and PATCH are only retried when the connection could not be made, so
+  billed calls never repeat
+- Async sessions are closed when their event loop shuts down
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import random
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..utils.loop_shutdown import close_on_loop_shutdown
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that may charge or change state again if repeated
+NON_IDEMPOTENT_METHODS = frozenset({'POST', 'PATCH'})
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Connection pool settings shared by the async and sync faces."""
+    max_connections: int = 100
+    max_connections_per_host: int = 20
+    dns_cache_ttl: int = 300
+    keepalive_timeout: float = 30.0
+    connect_timeout: float = 5.0
+    total_timeout: float = 30.0
+    retries: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 10.0
+    retry_statuses: Tuple[int, ...] = RETRY_STATUSES
+
+
+@dataclass
+class HTTPResponse:
+    """Fully-read response returned by the async pool."""
+    status: int
+    headers: Mapping[str, str]
+    body: bytes = field(repr=False)
+    url: str = ''
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def text(self, encoding: str = 'utf-8') -> str:
+        return self.body.decode(encoding, errors='replace')
+
+
+class AsyncHTTPPool:
+    """
+    aiohttp session pool keyed by event loop.
+
+    aiohttp sessions cannot cross event loops, and parts of this codebase
+    spin up short-lived loops, so each running loop gets its own pooled
+    session that is reused for every request made on it and closed when
+    the loop shuts down.
+    """
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None):
+        self.config = config or HTTPPoolConfig()
+        # Each session is kept with the guard that closes it at loop shutdown
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[aiohttp.ClientSession, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session, _ = self._sessions.get(loop, (None, None))
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.max_connections,
+                limit_per_host=self.config.max_connections_per_host,
+                ttl_dns_cache=self.config.dns_cache_ttl,
+                keepalive_timeout=self.config.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.config.total_timeout,
+                    connect=self.config.connect_timeout
+                )
+            )
+            self._sessions[loop] = (session, await close_on_loop_shutdown(
+                lambda: self._close_session(loop, session)))
+        return session
+
+    async def _close_session(self, loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession) -> None:
+        # The session references its loop, so the entry must be dropped for the loop to be freed
+        if self._sessions.get(loop, (None,))[0] is session:
+            del self._sessions[loop]
+        await session.close()
+
+    async def request(self,
+                      method: str,
+                      url: str,
+                      retries: Optional[int] = None,
+                      **kwargs) -> HTTPResponse:
+        """
+        Send a request, retrying connection errors and retryable statuses.
+
+        Returns the last response even if its status is not 2xx; raises
+        only when every attempt failed to get a response at all. POST and
+        PATCH return their first response and are retried only when the
+        connection could not be made, since the server may already have
+        acted on a request that timed out or was cut off.
+        """
+        retries = self.config.retries if retries is None else retries
+        idempotent = method.upper() not in NON_IDEMPOTENT_METHODS
+        session = await self._get_session()
+        for attempt in range(retries + 1):
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    body = await response.read()
+                    result = HTTPResponse(
+                        status=response.status,
+                        headers=response.headers.copy(),
+                        body=body,
+                        url=str(response.url)
+                    )
+                if not idempotent or result.status not in self.config.retry_statuses or attempt == retries:
+                    return result
+                delay = _retry_after(result.headers) or _backoff(self.config, attempt)
+                logger.warning(f"{method} {url} returned {result.status}; retrying in {delay:.2f}s")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == retries or not (idempotent or isinstance(e, aiohttp.ClientConnectorError)):
+                    raise
+                delay = _backoff(self.config, attempt)
+                logger.warning(f"{method} {url} failed ({e!r}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('POST', url, **kwargs)
+
+    async def close(self) -> None:
+        """Close the session bound to the running loop."""
+        _, guard = self._sessions.get(asyncio.get_running_loop(), (None, None))
+        if guard is not None:
+            await guard.aclose()
+
+
+class SyncHTTPPool:
+    """
+    requests.Session with a bounded, retrying connection pool.
+
+    pool_block keeps at most max_connections_per_host sockets open per
+    host; extra callers wait for a free connection instead of opening one.
+    Non-idempotent methods such as POST are retried only on connection
+    errors, never after the request may have reached the server.
+    """
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None):
+        self.config = config or HTTPPoolConfig()
+        retry = Retry(
+            total=self.config.retries,
+            connect=self.config.retries,
+            read=self.config.retries,
+            status=self.config.retries,
+            backoff_factor=self.config.backoff_factor,
+            status_forcelist=self.config.retry_statuses,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=max(10, self.config.max_connections // max(1, self.config.max_connections_per_host)),
+            pool_maxsize=self.config.max_connections_per_host,
+            pool_block=True,
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', (self.config.connect_timeout, self.config.total_timeout))
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _backoff(config: HTTPPoolConfig, attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(config.max_backoff, config.backoff_factor * (2 ** attempt)))
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_lock = threading.Lock()
+_async_pool: Optional[AsyncHTTPPool] = None
+_sync_pool: Optional[SyncHTTPPool] = None
+
+
+def get_async_pool() -> AsyncHTTPPool:
+    """Get the process-wide async HTTP pool."""
+    global _async_pool
+    if _async_pool is None:
+        with _lock:
+            if _async_pool is None:
+                _async_pool = AsyncHTTPPool()
+    return _async_pool
+
+
+def get_sync_pool() -> SyncHTTPPool:
+    """Get the process-wide sync HTTP pool."""
+    global _sync_pool
+    if _sync_pool is None:
+        with _lock:
+            if _sync_pool is None:
+                _sync_pool = SyncHTTPPool()
+                atexit.register(_sync_pool.close)
+    return _sync_pool
+
+
+async def close_async_pool() -> None:
+    """Close the async pool's session for the running loop (call on shutdown)."""
+    if _async_pool is not None:
+        await _async_pool.close()
@@ -14,9 +14,9 @@ from typing import Dict, Optional, Any
 from dataclasses import dataclass
 from pydantic import BaseModel, Field
 
-from modules.market_trend import analyzer as trend_analyzer
-from modules.market_economics import analyzer as econ_analyzer
-from modules.extended_market_metrics import analyzer as ext_analyzer
+from modules.market_trend import get_analyzer as get_trend_analyzer
+from modules.market_economics import get_analyzer as get_econ_analyzer
+from modules.extended_market_metrics import get_analyzer as get_ext_analyzer
 from modules.property_score import combined_score
 from modules.gpt_report import generate_property_report
 
@@ -39,6 +39,18 @@ class MarketAnalysisResult(BaseModel):
     gpt_summary: Optional[str] = None
     error: Optional[str] = None
 
+def warm_up() -> None:
+    """
+    Load all market analyzers now instead of on the first analysis.
+    
+    The Streamlit app (src/app.py) calls this once at startup so the
+    first analysis doesn't pay for CSV loading. Raises RuntimeError if
+    market data is missing.
+    """
+    get_trend_analyzer()
+    get_econ_analyzer()
+    get_ext_analyzer()
+
 def analyze_market(
     region: str,
     rent: float,
@@ -67,7 +79,7 @@ def analyze_market(
         logger.info(f"Starting market analysis for {region}")
         
         # Get market trend analysis
-        trend_result = trend_analyzer.get_trend_score(region)
+        trend_result = get_trend_analyzer().get_trend_score(region)
         if not trend_result.trend_score:
             return MarketAnalysisResult(
                 region=region,
@@ -77,7 +89,7 @@ def analyze_market(
             )
 
         # Get economic analysis
-        econ_result = econ_analyzer.get_market_score(region, income)
+        econ_result = get_econ_analyzer().get_market_score(region, income)
         if not econ_result.econ_score:
             return MarketAnalysisResult(
                 region=region,
@@ -87,7 +99,7 @@ def analyze_market(
             )
 
         # Get extended metrics
-        ext_result = ext_analyzer.get_extended_metrics(region)
+        ext_result = get_ext_analyzer().get_extended_metrics(region)
         if not ext_result.investment_score:
             return MarketAnalysisResult(
                 region=region,
@@ -9,11 +9,13 @@ This module provides additional market analysis metrics including:
 
 import os
 from typing import Dict, Optional, List, Union
-import pandas as pd
 import numpy as np
 from pydantic import BaseModel, Field
 from dataclasses import dataclass
 
+from .singleton import LazySingleton
+from .zillow_store import get_dataset
+
 @dataclass
 class MarketIndicators:
     """Container for extended market indicators"""
@@ -47,12 +49,9 @@ class ExtendedMarketAnalyzer:
         """Load and validate market data"""
         try:
             # Load home price data
+            # Same file as MarketTrendAnalyzer, so both share one loaded store
             price_path = os.path.join(self.data_dir, "Metro_zhvi_uc_sfrcondo_tier_0.33_0.67_sm_sa_month.csv")
-            if not os.path.exists(price_path):
-                raise FileNotFoundError(f"Price data file not found: {price_path}")
-            
-            self.price_df = pd.read_csv(price_path)
-            self.price_df["RegionName"] = self.price_df["RegionName"].str.lower()
+            self.price_store = get_dataset(price_path)
 
             # Load mock data (to be replaced with real data sources)
             self.rental_data = {
@@ -79,7 +78,7 @@ class ExtendedMarketAnalyzer:
     def _calculate_indicators(self, region: str) -> MarketIndicators:
         """Calculate extended market indicators"""
         # Get latest price
-        latest_price = float(self.price_df[self.price_df["RegionName"] == region].iloc[0, -1])
+        latest_price = self.price_store.latest(region)
         
         # Get region data
         rental_info = self.rental_data.get(region, {"rent": 2000, "trend": 0})
@@ -118,7 +117,7 @@ class ExtendedMarketAnalyzer:
             region = region_name.lower()
             
             # Check if region exists
-            if not self.price_df["RegionName"].eq(region).any():
+            if region not in self.price_store:
                 return ExtendedMetricsResult(
                     market_phase="Unknown",
                     risk_level="Unknown",
@@ -210,5 +209,15 @@ class ExtendedMarketAnalyzer:
                 note=f"Error analyzing {region_name}: {str(e)}"
             )
 
-# Create singleton instance
-analyzer = ExtendedMarketAnalyzer()
+# Shared instance, built on first use so importing this module stays cheap
+_analyzer = LazySingleton(ExtendedMarketAnalyzer)
+
+def get_analyzer() -> ExtendedMarketAnalyzer:
+    """Get the shared analyzer, loading market data on first call"""
+    return _analyzer.get()
+
+def __getattr__(name: str):
+    # Keeps `from ... import analyzer` working (that form loads eagerly)
+    if name == "analyzer":
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
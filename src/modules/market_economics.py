@@ -9,12 +9,14 @@ This module analyzes economic indicators including:
 
 import os
 from typing import Dict, Optional, Union, List
-import pandas as pd
 import numpy as np
 from pydantic import BaseModel, Field
 from dataclasses import dataclass
 from datetime import datetime
 
+from .singleton import LazySingleton
+from .zillow_store import get_dataset
+
 @dataclass
 class MarketMetrics:
     """Container for market metrics calculations"""
@@ -44,20 +46,14 @@ class MarketEconomicsAnalyzer:
     def _load_data(self) -> None:
         """Load and validate economic indicator data"""
         try:
-            # Load datasets
-            self.income_df = pd.read_csv(os.path.join(self.data_dir, 
+            # Load datasets (shared, region-indexed stores)
+            self.income_store = get_dataset(os.path.join(self.data_dir, 
                 "Metro_new_homeowner_income_needed_downpayment_0.20_uc_sfrcondo_tier_0.33_0.67_sm_sa_month.csv"))
-            self.sales_df = pd.read_csv(os.path.join(self.data_dir,
+            self.sales_store = get_dataset(os.path.join(self.data_dir,
                 "Metro_sales_count_now_uc_sfrcondo_month.csv"))
-            self.inv_df = pd.read_csv(os.path.join(self.data_dir,
+            self.inv_store = get_dataset(os.path.join(self.data_dir,
                 "Metro_invt_fs_uc_sfrcondo_sm_month.csv"))
 
-            # Validate required columns
-            for df, name in [(self.income_df, "income"), (self.sales_df, "sales"), (self.inv_df, "inventory")]:
-                if "RegionName" not in df.columns:
-                    raise ValueError(f"Missing RegionName column in {name} dataset")
-                df["RegionName"] = df["RegionName"].str.lower()
-
         except FileNotFoundError as e:
             raise RuntimeError(f"Missing required data file: {str(e)}")
         except Exception as e:
@@ -66,9 +62,9 @@ class MarketEconomicsAnalyzer:
     def _calculate_metrics(self, region: str, actual_income: float) -> MarketMetrics:
         """Calculate key market metrics"""
         # Get latest data points
-        income_needed = float(self.income_df[self.income_df["RegionName"] == region].iloc[0, -1])
-        monthly_sales = float(self.sales_df[self.sales_df["RegionName"] == region].iloc[0, -1])
-        inventory = float(self.inv_df[self.inv_df["RegionName"] == region].iloc[0, -1])
+        income_needed = self.income_store.latest(region)
+        monthly_sales = self.sales_store.latest(region)
+        inventory = self.inv_store.latest(region)
 
         # Calculate metrics
         affordability_ratio = income_needed / actual_income
@@ -109,7 +105,7 @@ class MarketEconomicsAnalyzer:
             warnings = []
 
             # Check if region exists in all datasets
-            if not all(df["RegionName"].eq(region).any() for df in [self.income_df, self.sales_df, self.inv_df]):
+            if not all(region in store for store in [self.income_store, self.sales_store, self.inv_store]):
                 return EconomicsResult(
                     econ_score=None,
                     market_health="Unknown",
@@ -166,8 +162,8 @@ class MarketEconomicsAnalyzer:
             return EconomicsResult(
                 econ_score=max(0, min(100, base_score)),
                 affordability_ratio=round(metrics.affordability_ratio, 2),
-                monthly_sales=int(self.sales_df[self.sales_df["RegionName"] == region].iloc[0, -1]),
-                inventory_level=int(self.inv_df[self.inv_df["RegionName"] == region].iloc[0, -1]),
+                monthly_sales=int(self.sales_store.latest(region)),
+                inventory_level=int(self.inv_store.latest(region)),
                 price_to_income=round(metrics.price_to_income, 2),
                 market_health=market_health,
                 note=note,
@@ -181,5 +177,15 @@ class MarketEconomicsAnalyzer:
                 note=f"Error analyzing {region_name}: {str(e)}"
             )
 
-# Create singleton instance
-analyzer = MarketEconomicsAnalyzer()
+# Shared instance, built on first use so importing this module stays cheap
+_analyzer = LazySingleton(MarketEconomicsAnalyzer)
+
+def get_analyzer() -> MarketEconomicsAnalyzer:
+    """Get the shared analyzer, loading market data on first call"""
+    return _analyzer.get()
+
+def __getattr__(name: str):
+    # Keeps `from ... import analyzer` working (that form loads eagerly)
+    if name == "analyzer":
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
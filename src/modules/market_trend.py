@@ -5,11 +5,27 @@ appreciation rates, and volatility scores for different regions.
 """
 
 import os
+import warnings
 from typing import Dict, Optional, Union
-import pandas as pd
 import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field
 
+from .singleton import LazySingleton
+from .zillow_store import get_dataset
+
+MIN_MONTHS = 12
+
+# (note, score adjustment) per trend bucket, checked in order
+TREND_BUCKETS = [
+    ("Strong appreciation with low volatility", 15),
+    ("Stable growth with moderate volatility", 5),
+    ("Modest but consistent appreciation", 0),
+    ("Slow but positive appreciation", -5),
+    ("Low or negative appreciation", -15)
+]
+VOLATILITY_NOTES = [" (High price volatility)", " (Moderate price volatility)", " (Stable prices)"]
+
 class MarketTrendResult(BaseModel):
     """Market trend analysis result schema"""
     trend_score: Optional[float] = Field(None, ge=0, le=100)
@@ -18,6 +34,68 @@ class MarketTrendResult(BaseModel):
     note: str
     raw_data: Optional[Dict] = None
 
+def compute_trend_scores(prices: np.ndarray, months: int = 36) -> Dict[str, np.ndarray]:
+    """
+    Score price histories for many regions in one vectorized pass.
+    
+    Args:
+        prices: Regions x months price matrix (NaN for missing months)
+        months: Number of most recent non-missing months to use per region
+        
+    Returns:
+        Dictionary of per-region arrays: observations, avg_appreciation,
+        volatility, base_score, trend_score, bucket and volatility_bucket.
+        Regions with fewer than MIN_MONTHS observations get NaN metrics.
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    missing = np.isnan(prices)
+
+    # Shift each row's observed values to the right (stable, so month order is
+    # kept) and take the trailing window: the same values as dropna()[-months:]
+    order = np.argsort(~missing, axis=1, kind="stable")
+    window = np.take_along_axis(prices, order, axis=1)[:, -months:]
+    observations = np.minimum((~missing).sum(axis=1), window.shape[1])
+
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        pct_changes = np.diff(window, axis=1) / window[:, :-1]
+        avg_appreciation = np.nanmean(pct_changes, axis=1)
+        volatility = np.nanstd(pct_changes, axis=1)
+
+    insufficient = observations < MIN_MONTHS
+    avg_appreciation[insufficient] = np.nan
+    volatility[insufficient] = np.nan
+
+    base_score = np.clip(50 + (avg_appreciation * 500) - (volatility * 300), 0, 100)
+
+    bucket = np.select(
+        [
+            (avg_appreciation > 0.06) & (volatility < 0.07),
+            avg_appreciation > 0.04,
+            avg_appreciation > 0.02,
+            avg_appreciation > 0
+        ],
+        [0, 1, 2, 3],
+        default=4
+    )
+    adjustment = np.array([adj for _, adj in TREND_BUCKETS], dtype=np.float64)[bucket]
+    trend_score = np.clip(base_score + adjustment, 0, 100)
+
+    volatility_bucket = np.select([volatility > 0.1, volatility > 0.05], [0, 1], default=2)
+
+    return {
+        "observations": observations,
+        "avg_appreciation": avg_appreciation,
+        "volatility": volatility,
+        "base_score": base_score,
+        "trend_score": trend_score,
+        "bucket": bucket,
+        "volatility_bucket": volatility_bucket
+    }
+
+def _trend_note(bucket: int, volatility_bucket: int) -> str:
+    return TREND_BUCKETS[bucket][0] + VOLATILITY_NOTES[volatility_bucket]
+
 class MarketTrendAnalyzer:
     def __init__(self, data_path: Optional[str] = None):
         """Initialize the market trend analyzer with data path"""
@@ -27,19 +105,8 @@ class MarketTrendAnalyzer:
     def _load_data(self) -> None:
         """Load and preprocess the market data"""
         try:
-            if not os.path.exists(self.data_path):
-                raise FileNotFoundError(f"Market data file not found: {self.data_path}")
-            
-            self.trend_df = pd.read_csv(self.data_path)
-            
-            # Validate required columns
-            required_cols = ["RegionName"]
-            missing_cols = [col for col in required_cols if col not in self.trend_df.columns]
-            if missing_cols:
-                raise ValueError(f"Missing required columns: {', '.join(missing_cols)}")
-            
-            # Convert region names to lowercase for case-insensitive matching
-            self.trend_df["RegionName"] = self.trend_df["RegionName"].str.lower()
+            # Shared, region-indexed store (region lookups are case-insensitive)
+            self.trend_store = get_dataset(self.data_path)
             
         except Exception as e:
             raise RuntimeError(f"Failed to load market data: {str(e)}")
@@ -61,64 +128,30 @@ class MarketTrendAnalyzer:
             - raw_data: Optional dictionary with raw calculation data
         """
         try:
-            # Find region (case-insensitive)
-            row = self.trend_df[self.trend_df["RegionName"] == region_name.lower()]
-            if row.empty:
+            # Get price history (monthly columns only, case-insensitive lookup)
+            price_series = self.trend_store.series(region_name, months)
+            if price_series is None:
                 return MarketTrendResult(
                     trend_score=None,
                     note=f"Region not found: {region_name}"
                 )
-
-            # Get price history (excluding metadata columns)
-            price_series = row.iloc[0, 5:].dropna().astype(float).values[-months:]
-            if len(price_series) < 12:
+            if len(price_series) < MIN_MONTHS:
                 return MarketTrendResult(
                     trend_score=None,
-                    note=f"Insufficient data for {region_name}. Need at least 12 months."
+                    note=f"Insufficient data for {region_name}. Need at least {MIN_MONTHS} months."
                 )
 
-            # Calculate metrics
-            pct_changes = np.diff(price_series) / price_series[:-1]
-            avg_appreciation = float(np.mean(pct_changes))
-            volatility = float(np.std(pct_changes))
-
-            # Score calculation
-            base_score = min(100, max(0, 50 + (avg_appreciation * 500) - (volatility * 300)))
-            
-            # Determine trend strength
-            if avg_appreciation > 0.06 and volatility < 0.07:
-                trend_score = min(100, base_score + 15)
-                note = "Strong appreciation with low volatility"
-            elif avg_appreciation > 0.04:
-                trend_score = min(100, base_score + 5)
-                note = "Stable growth with moderate volatility"
-            elif avg_appreciation > 0.02:
-                trend_score = base_score
-                note = "Modest but consistent appreciation"
-            elif avg_appreciation > 0:
-                trend_score = max(0, base_score - 5)
-                note = "Slow but positive appreciation"
-            else:
-                trend_score = max(0, base_score - 15)
-                note = "Low or negative appreciation"
-
-            # Add volatility context
-            if volatility > 0.1:
-                note += " (High price volatility)"
-            elif volatility > 0.05:
-                note += " (Moderate price volatility)"
-            else:
-                note += " (Stable prices)"
+            scores = compute_trend_scores(price_series[np.newaxis, :], months)
 
             return MarketTrendResult(
-                trend_score=round(trend_score, 1),
-                avg_appreciation=round(avg_appreciation, 4),
-                volatility=round(volatility, 4),
-                note=note,
+                trend_score=round(float(scores["trend_score"][0]), 1),
+                avg_appreciation=round(float(scores["avg_appreciation"][0]), 4),
+                volatility=round(float(scores["volatility"][0]), 4),
+                note=_trend_note(scores["bucket"][0], scores["volatility_bucket"][0]),
                 raw_data={
                     "price_history": price_series.tolist(),
-                    "monthly_changes": pct_changes.tolist(),
-                    "base_score": base_score
+                    "monthly_changes": (np.diff(price_series) / price_series[:-1]).tolist(),
+                    "base_score": float(scores["base_score"][0])
                 }
             )
 
@@ -128,5 +161,49 @@ class MarketTrendAnalyzer:
                 note=f"Error analyzing {region_name}: {str(e)}"
             )
 
-# Create singleton instance
-analyzer = MarketTrendAnalyzer()
+    def score_all_regions(self, months: int = 36) -> pd.DataFrame:
+        """
+        Calculate market trend scores for every region in one pass.
+        
+        Args:
+            months: Number of months of historical data to analyze (default: 36)
+            
+        Returns:
+            DataFrame indexed by (lowercased) region name with columns
+            trend_score, avg_appreciation, volatility, base_score, months
+            and note. Scores are NaN for regions with insufficient data.
+        """
+        store = self.trend_store
+        scores = compute_trend_scores(store.values, months)
+        notes = [
+            _trend_note(bucket, vol_bucket) if observed >= MIN_MONTHS
+            else f"Insufficient data. Need at least {MIN_MONTHS} months."
+            for bucket, vol_bucket, observed in zip(
+                scores["bucket"], scores["volatility_bucket"], scores["observations"]
+            )
+        ]
+
+        return pd.DataFrame(
+            {
+                "trend_score": scores["trend_score"].round(1),
+                "avg_appreciation": scores["avg_appreciation"].round(4),
+                "volatility": scores["volatility"].round(4),
+                "base_score": scores["base_score"],
+                "months": scores["observations"],
+                "note": notes
+            },
+            index=pd.Index(store.regions, name="region")
+        )
+
+# Shared instance, built on first use so importing this module stays cheap
+_analyzer = LazySingleton(MarketTrendAnalyzer)
+
+def get_analyzer() -> MarketTrendAnalyzer:
+    """Get the shared analyzer, loading market data on first call"""
+    return _analyzer.get()
+
+def __getattr__(name: str):
+    # Keeps `from ... import analyzer` working (that form loads eagerly)
+    if name == "analyzer":
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
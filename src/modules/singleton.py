@@ -0,0 +1,38 @@
+"""Lazy Singleton Helper
+
+Module-level analyzers load market data when constructed. Wrapping them in
+a LazySingleton defers that cost (and any missing-file error) from import
+time to first use, and makes concurrent first use construct only once.
+"""
+
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+class LazySingleton(Generic[T]):
+    """Thread-safe, build-on-first-use holder for a shared instance"""
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        """Get the shared instance, building it on first call"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._instance = self._factory()
+        return instance
+
+    def reset(self) -> None:
+        """Drop the shared instance so the next get() rebuilds it"""
+        with self._lock:
+            self._instance = None
@@ -0,0 +1,179 @@
+"""Zillow Dataset Store
+
+This module loads Zillow metro CSV datasets once per process into a
+region-indexed, columnar form shared by the market analyzers:
+- Month columns as one contiguous float64 matrix (regions x months)
+- Dict index from lowercased region name to matrix row for O(1) lookups
+- Optional memory-mapped .npy cache so later process starts skip CSV parsing
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MONTH_COLUMN = re.compile(r"^\d{4}-\d{2}(-\d{2})?$")
+CACHE_VERSION = 1
+
+
+class ZillowDataset:
+    """Region-indexed view of a single Zillow metro CSV"""
+
+    def __init__(self, path: str, regions: List[str], columns: List[str], values: np.ndarray):
+        self.path = path
+        self.regions = regions
+        self.columns = columns
+        self.values = values
+        self.index: Dict[str, int] = {}
+        for i, region in enumerate(regions):
+            # Keep the first row for duplicate names, matching a filter + iloc[0]
+            self.index.setdefault(region, i)
+
+    def __contains__(self, region_name: str) -> bool:
+        return region_name.lower() in self.index
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def row(self, region_name: str) -> Optional[np.ndarray]:
+        """Get the full month row for a region (NaNs included), or None if unknown"""
+        i = self.index.get(region_name.lower())
+        return None if i is None else self.values[i]
+
+    def series(self, region_name: str, months: Optional[int] = None) -> Optional[np.ndarray]:
+        """Get the region's non-missing monthly values, optionally only the last `months`"""
+        row = self.row(region_name)
+        if row is None:
+            return None
+        values = row[~np.isnan(row)]
+        return values[-months:] if months else values
+
+    def latest(self, region_name: str) -> Optional[float]:
+        """Get the region's value for the most recent month (may be NaN)"""
+        row = self.row(region_name)
+        return None if row is None else float(row[-1])
+
+
+def _parse_csv(path: str) -> ZillowDataset:
+    """Parse a Zillow CSV into a ZillowDataset"""
+    df = pd.read_csv(path)
+    if "RegionName" not in df.columns:
+        raise ValueError(f"Missing RegionName column in {path}")
+
+    columns = [col for col in df.columns if MONTH_COLUMN.match(str(col))]
+    if not columns:
+        raise ValueError(f"No monthly columns found in {path}")
+
+    values = df[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    regions = df["RegionName"].astype(str).str.lower().tolist()
+    return ZillowDataset(path, regions, columns, np.ascontiguousarray(values))
+
+
+def _cache_paths(path: str, cache_dir: str):
+    """Get the (.npy, .json) cache file paths for a source CSV"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    base = os.path.join(cache_dir, f"{stem}-{digest}")
+    return base + ".npy", base + ".json"
+
+
+def _source_signature(path: str) -> Dict[str, int]:
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _load_cached(path: str, cache_dir: str) -> Optional[ZillowDataset]:
+    """Load a dataset from the binary cache if it is still current"""
+    values_path, meta_path = _cache_paths(path, cache_dir)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("version") != CACHE_VERSION or meta.get("source") != _source_signature(path):
+            return None
+        values = np.load(values_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    if values.shape != (len(meta["regions"]), len(meta["columns"])):
+        return None
+    return ZillowDataset(path, meta["regions"], meta["columns"], values)
+
+
+def _write_cache(dataset: ZillowDataset, cache_dir: str) -> None:
+    """Persist a dataset to the binary cache (best effort, atomic replace)"""
+    values_path, meta_path = _cache_paths(dataset.path, cache_dir)
+    meta = {
+        "version": CACHE_VERSION,
+        "source": _source_signature(dataset.path),
+        "regions": dataset.regions,
+        "columns": dataset.columns
+    }
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(values_path + ".tmp", "wb") as f:
+            np.save(f, dataset.values)
+        os.replace(values_path + ".tmp", values_path)
+        # Metadata goes last: it is what marks the cache entry as valid
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+    except OSError as e:
+        logger.warning(f"Could not write Zillow cache for {dataset.path}: {str(e)}")
+
+
+_lock = threading.Lock()
+_datasets: Dict[str, ZillowDataset] = {}
+_signatures: Dict[str, Dict[str, int]] = {}
+
+
+def get_dataset(path: str, cache_dir: Optional[str] = None) -> ZillowDataset:
+    """
+    Get the shared dataset for a Zillow CSV, loading it on first use.
+
+    Args:
+        path: Path to the Zillow CSV file
+        cache_dir: Directory for the memory-mapped binary cache. Defaults to
+            the ZILLOW_CACHE_DIR environment variable; no persistence if unset.
+
+    Returns:
+        ZillowDataset shared by every caller in the process
+
+    Raises:
+        FileNotFoundError: If the CSV does not exist
+        ValueError: If the CSV is not a Zillow region/month dataset
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Market data file not found: {path}")
+
+    key = os.path.realpath(path)
+    cache_dir = cache_dir or os.getenv("ZILLOW_CACHE_DIR")
+    with _lock:
+        signature = _source_signature(path)
+        dataset = _datasets.get(key)
+        if dataset is not None and _signatures.get(key) == signature:
+            return dataset
+
+        dataset = _load_cached(path, cache_dir) if cache_dir else None
+        if dataset is None:
+            dataset = _parse_csv(path)
+            if cache_dir:
+                _write_cache(dataset, cache_dir)
+
+        _datasets[key] = dataset
+        _signatures[key] = signature
+        return dataset
+
+
+def clear_datasets() -> None:
+    """Drop all loaded datasets (the binary cache on disk is left in place)"""
+    with _lock:
+        _datasets.clear()
+        _signatures.clear()
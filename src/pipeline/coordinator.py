@@ -1,6 +1,8 @@
 """Market analysis pipeline coordinator."""
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Set, Tuple
 from datetime import datetime
 
 from ..cache.market_cache import MarketCache
@@ -18,17 +20,43 @@ from ..utils.error_handler import (
 
 logger = logging.getLogger(__name__)
 
+SourceFetcher = Callable[[str], Awaitable[Dict[str, Any]]]
+
 class PipelineCoordinator:
     """Coordinates the market analysis pipeline."""
     
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
-        self.cache = MarketCache(config.get('redis_config'))
-        self.validator = MarketDataValidator(config.get('validation_config'))
-        self.market_predictor = MarketPredictor(config.get('predictor_config'))
-        self.neighborhood_scorer = NeighborhoodScorer(config.get('scorer_config'))
-        self.opportunity_detector = OpportunityDetector(config.get('detector_config'))
-        self.cma_analyzer = CMAAnalyzer(config.get('cma_config'))
+        self.cache = MarketCache(self.config.get('redis_config'))
+        self.validator = MarketDataValidator(self.config.get('validation_config'))
+        self.market_predictor = MarketPredictor(self.config.get('predictor_config'))
+        self.neighborhood_scorer = NeighborhoodScorer(self.config.get('scorer_config'))
+        self.opportunity_detector = OpportunityDetector(self.config.get('detector_config'))
+        self.cma_analyzer = CMAAnalyzer(self.config.get('cma_config'))
+        
+        # Market data sources, fetched concurrently on every cold analysis.
+        # source_config:
+        #   - default_timeout: Seconds before a source is dropped (default: 10)
+        #   - timeouts: Per-source timeout overrides, e.g. {'attom': 5}
+        #   - hedge_after: Per-source delay before a duplicate request is sent
+        #   - redfin_client: Object with get_properties(zip_code, state) for Redfin listings
+        #   - mock_redfin: Use random MockRedfinData listings when no client is set
+        #     (default: False); marked 'mock' in source_status
+        source_config = self.config.get('source_config', {})
+        self.default_source_timeout = source_config.get('default_timeout', 10.0)
+        self.source_timeouts: Dict[str, float] = source_config.get('timeouts', {})
+        self.hedge_after: Dict[str, float] = source_config.get('hedge_after', {})
+        self.sources: Dict[str, SourceFetcher] = {
+            'redfin': self._fetch_redfin_data,
+            'attom': self._fetch_attom_data
+        }
+        self.mock_sources: Set[str] = set()
+        self._attom_api = None
+        self._redfin_data = source_config.get('redfin_client')
+        if self._redfin_data is None and source_config.get('mock_redfin', False):
+            from ..data.mock_redfin_data import MockRedfinData
+            self._redfin_data = MockRedfinData()
+            self.mock_sources.add('redfin')
     
     @handle_errors({
         DataValidationError: 'VALIDATION_ERROR',
@@ -39,16 +67,19 @@ class PipelineCoordinator:
                            analysis_type: str,
                            params: Dict[str, Any]) -> Dict[str, Any]:
         """Run market analysis pipeline."""
-        # Check cache first
-        cached_result = self.cache.get_market_analysis(
+        # Concurrent misses for the same key share one pipeline run
+        return await self.cache.get_or_compute_market_analysis(
             zip_code,
             analysis_type,
-            params
+            params,
+            lambda: self._compute_market_analysis(zip_code, analysis_type, params)
         )
-        if cached_result:
-            logger.info(f"Cache hit for {zip_code} {analysis_type}")
-            return cached_result
-        
+    
+    async def _compute_market_analysis(self,
+                                     zip_code: str,
+                                     analysis_type: str,
+                                     params: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch, validate and analyze market data on a cache miss."""
         # Get market data
         market_data = await self._get_market_data(zip_code)
         
@@ -64,46 +95,144 @@ class PipelineCoordinator:
                 )
         
         # Run analysis based on type
-        result = await self._run_analysis(
+        return await self._run_analysis(
             analysis_type,
             market_data,
             params
         )
+    
+    async def _get_market_data(self, zip_code: str) -> Dict[str, Any]:
+        """Get market data from all sources concurrently."""
+        # Each source handles its own timeout/failure, so gather never raises
+        fetches = await asyncio.gather(*[
+            self._fetch_source(name, fetch, zip_code)
+            for name, fetch in self.sources.items()
+        ])
         
-        # Cache results
-        self.cache.cache_market_analysis(
-            zip_code,
-            analysis_type,
-            params,
-            result
-        )
+        results = {name: data for name, data, _ in fetches if data is not None}
+        source_status = {name: status for name, _, status in fetches}
+        if not results:
+            raise DataSourceError(
+                "Failed to fetch market data: no source responded",
+                'DATA_SOURCE_ERROR',
+                {'zip_code': zip_code, 'source_status': source_status}
+            )
         
-        return result
+        # Merge whatever arrived; missing sources are left out of the weighting
+        market_data = self._merge_market_data(
+            results.get('redfin', {}),
+            results.get('attom', {})
+        )
+        market_data['sources'] = [name for name in self.sources if name in results]
+        market_data['source_status'] = source_status
+        return market_data
     
-    async def _get_market_data(self, zip_code: str) -> Dict[str, Any]:
-        """Get market data from various sources."""
+    async def _fetch_source(self,
+                          name: str,
+                          fetch: SourceFetcher,
+                          zip_code: str) -> Tuple[str, Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Fetch one source within its timeout; failures yield no data."""
+        timeout = self.source_timeouts.get(name, self.default_source_timeout)
+        start = time.perf_counter()
+        data = None
         try:
-            # Get data from different sources
-            redfin_data = await self._fetch_redfin_data(zip_code)
-            attom_data = await self._fetch_attom_data(zip_code)
-            
-            # Merge data
-            market_data = self._merge_market_data(
-                redfin_data,
-                attom_data
+            data = await asyncio.wait_for(
+                self._hedged_fetch(fetch, zip_code, self.hedge_after.get(name)),
+                timeout
             )
-            
-            return market_data
-            
+            status = 'ok'
+        except asyncio.TimeoutError:
+            logger.warning(f"Source {name} timed out after {timeout}s for {zip_code}")
+            status = 'timeout'
         except Exception as e:
-            error_logger.log_error(
-                e,
-                {'zip_code': zip_code}
-            )
-            raise DataSourceError(
-                f"Failed to fetch market data: {str(e)}",
-                'DATA_SOURCE_ERROR'
-            )
+            error_logger.log_error(e, {'zip_code': zip_code, 'source': name})
+            status = 'error'
+        
+        status = {
+            'status': status,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 1)
+        }
+        if name in self.mock_sources:
+            status['mock'] = True
+        return name, data, status
+    
+    async def _hedged_fetch(self,
+                          fetch: SourceFetcher,
+                          zip_code: str,
+                          hedge_after: Optional[float]) -> Dict[str, Any]:
+        """
+        Run a fetch, sending a duplicate if the first is slower than hedge_after.
+        
+        The first successful response wins and the other request is cancelled.
+        """
+        if not hedge_after:
+            return await fetch(zip_code)
+        
+        primary = asyncio.ensure_future(fetch(zip_code))
+        pending = {primary}
+        error: Optional[BaseException] = None
+        try:
+            # Cancelled here by the caller's timeout, the primary is cancelled below
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if done:
+                return primary.result()
+            
+            pending.add(asyncio.ensure_future(fetch(zip_code)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _fetch_redfin_data(self, zip_code: str) -> Dict[str, Any]:
+        """Summarize Redfin listings for a ZIP code."""
+        if self._redfin_data is None:
+            raise DataSourceError("No Redfin client configured", 'DATA_SOURCE_ERROR')
+        listings = await asyncio.to_thread(
+            self._redfin_data.get_properties,
+            zip_code,
+            self.config.get('state', '')
+        )
+        if not listings:
+            raise DataSourceError(f"No Redfin listings for {zip_code}", 'DATA_SOURCE_ERROR')
+        
+        prices = sorted(p['price'] for p in listings)
+        return {
+            'price_data': {
+                'median': prices[len(prices) // 2],
+                'average': sum(prices) / len(prices),
+                'min': prices[0],
+                'max': prices[-1]
+            },
+            'inventory_data': {
+                'active': len(listings),
+                'dom': sum(p['days_on_market'] for p in listings) / len(listings)
+            }
+        }
+    
+    async def _fetch_attom_data(self, zip_code: str) -> Dict[str, Any]:
+        """Get ATTOM market snapshot for a ZIP code."""
+        if self._attom_api is None:
+            from ..integrations.attom_api import AttomAPI
+            self._attom_api = AttomAPI()
+        stats = await asyncio.to_thread(self._attom_api.get_market_stats, zip_code)
+        if stats.get('status') == 'error':
+            raise DataSourceError(stats.get('error', 'ATTOM request failed'), 'DATA_SOURCE_ERROR')
+        
+        price_data = {'median': stats['price_trends'].get('median_price')}
+        inventory_data = {
+            'active': stats['market_metrics'].get('inventory'),
+            'dom': stats['market_metrics'].get('days_on_market')
+        }
+        return {
+            'price_data': {k: v for k, v in price_data.items() if v is not None},
+            'inventory_data': {k: v for k, v in inventory_data.items() if v is not None}
+        }
     
     async def _run_analysis(self,
                           analysis_type: str,
@@ -195,14 +324,8 @@ class PipelineCoordinator:
         """Merge price data with weighting."""
         # Implement sophisticated price merging logic
         return {
-            'median_price': (
-                redfin_prices.get('median', 0) * 0.6 +
-                attom_prices.get('median', 0) * 0.4
-            ),
-            'average_price': (
-                redfin_prices.get('average', 0) * 0.6 +
-                attom_prices.get('average', 0) * 0.4
-            ),
+            'median_price': self._weighted_value(redfin_prices, attom_prices, 'median', 0.6),
+            'average_price': self._weighted_value(redfin_prices, attom_prices, 'average', 0.6),
             'price_range': {
                 'min': min(
                     redfin_prices.get('min', float('inf')),
@@ -228,12 +351,19 @@ class PipelineCoordinator:
                 redfin_inventory.get('pending', 0),
                 attom_inventory.get('pending', 0)
             ),
-            'days_on_market': (
-                redfin_inventory.get('dom', 0) * 0.7 +
-                attom_inventory.get('dom', 0) * 0.3
-            )
+            'days_on_market': self._weighted_value(redfin_inventory, attom_inventory, 'dom', 0.7)
         }
     
+    def _weighted_value(self,
+                        redfin_values: Dict[str, Any],
+                        attom_values: Dict[str, Any],
+                        key: str,
+                        redfin_weight: float) -> float:
+        """Blend a metric from both sources, or take whichever one reported it."""
+        if key in redfin_values and key in attom_values:
+            return redfin_values[key] * redfin_weight + attom_values[key] * (1 - redfin_weight)
+        return redfin_values.get(key, attom_values.get(key, 0))
+    
     def _merge_trend_data(self,
                          redfin_trends: Dict[str, Any],
                          attom_trends: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,19 +1,18 @@
 """Usage and Cost Tracking for ATTOM API"""
-import pandas as pd
 from datetime import datetime, timedelta
-import json
-import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
 
+from src.utils.accounting import UsageAccounting, get_accounting
+
 logger = logging.getLogger(__name__)
 
 class UsageTracker:
     """Tracks API usage, costs, and data utilization"""
     
-    def __init__(self):
-        self.data_dir = "tracking"
-        self.create_tracking_directory()
+    def __init__(self, accounting: Optional[UsageAccounting] = None):
+        # Calls and cache hits are counted in the shared accounting store
+        self.accounting = accounting or get_accounting()
         
         # Define cost structure for ATTOM solutions
         self.solution_costs = {
@@ -23,92 +22,54 @@ class UsageTracker:
             'market_trends': {'cost_per_call': 0.08, 'daily_limit': 200},
             'owner_info': {'cost_per_call': 0.12, 'daily_limit': 400}
         }
-        
-        # Initialize tracking files
-        self.files = {
-            'api_usage': 'api_usage.xlsx',
-            'data_utilization': 'data_utilization.xlsx',
-            'cost_analysis': 'cost_analysis.xlsx',
-            'roi_metrics': 'roi_metrics.xlsx'
-        }
-    
-    def create_tracking_directory(self):
-        """Create tracking directory if it doesn't exist"""
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
     
     def track_api_call(self, solution_name: str, address: str, success: bool):
         """Track individual API call"""
-        timestamp = datetime.now()
-        
-        df_data = {
-            'timestamp': timestamp,
-            'solution': solution_name,
-            'address': address,
-            'success': success,
-            'cost': self.solution_costs.get(solution_name, {}).get('cost_per_call', 0)
-        }
-        
-        self._update_excel('api_usage', df_data)
+        # Reports are counted against the quota by the ATTOM tracker
+        self.accounting.record_call(
+            solution_name,
+            location=address,
+            success=success,
+            cost=self.solution_costs.get(solution_name, {}).get('cost_per_call', 0),
+            reports=0
+        )
         self._update_daily_limits(solution_name)
     
     def track_data_usage(self, data_type: str, fields_accessed: List[str]):
         """Track how stored data is being used"""
-        timestamp = datetime.now()
-        
-        df_data = {
-            'timestamp': timestamp,
-            'data_type': data_type,
-            'fields_accessed': json.dumps(fields_accessed),
-            'cache_hit': True  # Data was available in storage
-        }
-        
-        self._update_excel('data_utilization', df_data)
+        self.accounting.record_cache_hit(data_type=data_type)
     
     def analyze_costs(self, time_period: str = 'last_30_days') -> Dict:
         """Analyze API costs and usage patterns"""
-        api_usage_path = os.path.join(self.data_dir, self.files['api_usage'])
-        if not os.path.exists(api_usage_path):
-            return {}
-            
-        df = pd.read_excel(api_usage_path)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Filter by time period
+        start = None
         if time_period == 'last_30_days':
-            cutoff_date = datetime.now() - timedelta(days=30)
-            df = df[df['timestamp'] > cutoff_date]
-        
-        # Calculate costs by solution
-        cost_analysis = df.groupby('solution').agg({
-            'cost': 'sum',
-            'success': 'count'
-        }).reset_index()
-        
-        # Calculate success rate
-        cost_analysis['success_rate'] = df.groupby('solution')['success'].mean()
-        
-        # Calculate cost per successful call
-        cost_analysis['cost_per_success'] = cost_analysis['cost'] / (cost_analysis['success'] * cost_analysis['success_rate'])
+            start = (datetime.now() - timedelta(days=30)).date()
+        
+        cost_analysis = []
+        for solution, totals in sorted(self.accounting.solution_totals(start).items()):
+            success_rate = totals['successes'] / totals['calls']
+            cost_analysis.append({
+                'solution': solution,
+                'cost': totals['cost'],
+                'success': totals['calls'],
+                'success_rate': success_rate,
+                # Cost per successful call
+                'cost_per_success': totals['cost'] / totals['successes'] if totals['successes'] else float('inf')
+            })
         
-        return cost_analysis.to_dict('records')
+        return cost_analysis
     
     def calculate_roi_metrics(self) -> Dict:
         """Calculate ROI metrics for data storage vs API calls"""
-        api_usage_path = os.path.join(self.data_dir, self.files['api_usage'])
-        data_util_path = os.path.join(self.data_dir, self.files['data_utilization'])
+        solution_totals = self.accounting.solution_totals().values()
+        total_api_calls = sum(totals['calls'] for totals in solution_totals)
+        total_cache_hits = sum(self.accounting.data_usage.values())
         
-        if not (os.path.exists(api_usage_path) and os.path.exists(data_util_path)):
+        if not (total_api_calls and total_cache_hits):
             return {}
-            
-        api_df = pd.read_excel(api_usage_path)
-        util_df = pd.read_excel(data_util_path)
         
         # Calculate savings from cache hits
-        total_cache_hits = len(util_df[util_df['cache_hit'] == True])
-        total_api_calls = len(api_df)
-        
-        avg_api_cost = api_df['cost'].mean()
+        avg_api_cost = sum(totals['cost'] for totals in solution_totals) / total_api_calls
         estimated_savings = total_cache_hits * avg_api_cost
         
         return {
@@ -156,37 +117,9 @@ class UsageTracker:
         
         return recommendations
     
-    def _update_excel(self, tracking_type: str, new_data: Dict):
-        """Update Excel tracking file"""
-        file_path = os.path.join(self.data_dir, self.files[tracking_type])
-        
-        try:
-            if os.path.exists(file_path):
-                df = pd.read_excel(file_path)
-                df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
-            else:
-                df = pd.DataFrame([new_data])
-            
-            df.to_excel(file_path, index=False)
-            
-        except Exception as e:
-            logger.error(f"Error updating tracking file: {str(e)}")
-    
     def _update_daily_limits(self, solution_name: str):
         """Check and update daily API limits"""
-        api_usage_path = os.path.join(self.data_dir, self.files['api_usage'])
-        if not os.path.exists(api_usage_path):
-            return
-            
-        df = pd.read_excel(api_usage_path)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Check today's usage
-        today = datetime.now().date()
-        today_usage = len(df[
-            (df['timestamp'].dt.date == today) & 
-            (df['solution'] == solution_name)
-        ])
+        today_usage = self.accounting.calls_today(solution_name)
         
         daily_limit = self.solution_costs.get(solution_name, {}).get('daily_limit', float('inf'))
         if today_usage >= daily_limit:
@@ -199,34 +132,31 @@ class UsageTracker:
         if not end_date:
             end_date = datetime.now()
             
-        api_usage_path = os.path.join(self.data_dir, self.files['api_usage'])
-        if not os.path.exists(api_usage_path):
+        solution_totals = self.accounting.solution_totals(start_date.date(), end_date.date())
+        if not solution_totals:
             return {}
-            
-        df = pd.read_excel(api_usage_path)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Filter by date range
-        mask = (df['timestamp'] >= start_date) & (df['timestamp'] <= end_date)
-        df = df[mask]
         
         # Calculate daily costs
-        daily_costs = df.groupby(df['timestamp'].dt.date)['cost'].sum()
+        daily_costs = self.accounting.daily_costs(start_date.date(), end_date.date())
         
         # Calculate solution-specific metrics
-        solution_metrics = df.groupby('solution').agg({
-            'cost': 'sum',
-            'success': ['count', 'mean']
-        }).round(2)
+        solution_metrics = {
+            solution: {
+                'cost': round(totals['cost'], 2),
+                'calls': totals['calls'],
+                'success_rate': round(totals['successes'] / totals['calls'], 2)
+            }
+            for solution, totals in sorted(solution_totals.items())
+        }
         
         return {
             'date_range': {
                 'start': start_date.strftime('%Y-%m-%d'),
                 'end': end_date.strftime('%Y-%m-%d')
             },
-            'total_cost': float(df['cost'].sum()),
-            'total_calls': len(df),
-            'daily_average_cost': float(daily_costs.mean()),
-            'solution_breakdown': solution_metrics.to_dict(),
+            'total_cost': float(sum(daily_costs.values())),
+            'total_calls': sum(totals['calls'] for totals in solution_totals.values()),
+            'daily_average_cost': float(sum(daily_costs.values()) / len(daily_costs)),
+            'solution_breakdown': solution_metrics,
             'roi_metrics': self.calculate_roi_metrics()
         }
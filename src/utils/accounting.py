@@ -0,0 +1,335 @@
+"""
+Unified API usage and cost accounting.
+
+One thread-safe store of in-memory counters backs every usage tracker:
+ATTOM report quota by month and location, per-day/per-solution call and
+cost totals, and cache hits. Recording a call is a few dictionary updates
+under a lock; the state is snapshotted to JSON periodically (and on close
+or process exit) instead of on every call. Calls that consume ATTOM
+reports are snapshotted right away so the monthly quota survives a crash.
+should_use_attom answers from the counters without touching disk.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.modules.singleton import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = os.getenv('ATTOM_USAGE_FILE', 'data/usage/attom_usage.json')
+
+# ATTOM API report limit per month
+DEFAULT_MONTHLY_LIMIT = 400
+
+# A location is "high usage" past this share of the monthly limit
+HIGH_USAGE_SHARE = 0.05
+
+# Days of per-solution history kept for cost reports
+HISTORY_DAYS = 90
+
+
+def _month_bounds(now: datetime):
+    """Get the 'YYYY-MM' key and the epoch time the month ends."""
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start.strftime('%Y-%m'), next_month.timestamp()
+
+
+class UsageAccounting:
+    """Thread-safe usage and cost counters with periodic durable snapshots."""
+
+    def __init__(self, snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH,
+                 monthly_limit: int = DEFAULT_MONTHLY_LIMIT, snapshot_interval: float = 5.0):
+        """
+        Initialize the store, restoring the last snapshot if there is one.
+
+        Args:
+            snapshot_path: JSON file for snapshots (None keeps state in memory only)
+            monthly_limit: ATTOM reports allowed per month
+            snapshot_interval: Seconds between background snapshots of changed state
+        """
+        self.snapshot_path = snapshot_path
+        self.monthly_limit = monthly_limit
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        self._dirty = False
+
+        self.current_month, self._month_ends_at = _month_bounds(datetime.now())
+        self.reports_used = 0
+        self.usage_by_location: Dict[str, Dict[str, Any]] = {}
+        self._high_usage: List[str] = []
+        self._high_usage_set = set()
+        # {day: {solution: [calls, successes, cost]}}
+        self.solution_calls: Dict[str, Dict[str, List[float]]] = defaultdict(dict)
+        self.data_usage: Dict[str, int] = defaultdict(int)
+
+        self._load()
+
+        self._closed = threading.Event()
+        self._snapshotter = None
+        if snapshot_path and snapshot_interval > 0:
+            self._snapshotter = threading.Thread(target=self._snapshot_loop, name='usage-accounting', daemon=True)
+            self._snapshotter.start()
+
+    # Recording
+
+    def record_call(self, solution: str, location: Optional[str] = None, success: bool = True,
+                    cost: float = 0.0, reports: int = 1, timestamp: Optional[datetime] = None) -> None:
+        """
+        Record one API call.
+
+        Args:
+            solution: API solution or endpoint name
+            location: Address or location the call was for
+            success: Whether the call succeeded
+            cost: Cost of the call
+            reports: ATTOM reports the call consumed (0 for free sources)
+            timestamp: When the call was made (default now)
+        """
+        timestamp = timestamp or datetime.now()
+        day = timestamp.date().isoformat()
+        with self._lock:
+            self._roll_month_if_due()
+            totals = self.solution_calls[day].setdefault(solution, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += int(bool(success))
+            totals[2] += cost
+
+            if reports:
+                self.reports_used += reports
+                if location is not None:
+                    loc_data = self.usage_by_location.setdefault(
+                        location, {'reports_used': 0, 'last_used': None, 'cache_hits': 0}
+                    )
+                    loc_data['reports_used'] += reports
+                    loc_data['last_used'] = timestamp.isoformat()
+                    if (loc_data['reports_used'] > self.monthly_limit * HIGH_USAGE_SHARE
+                            and location not in self._high_usage_set):
+                        self._high_usage.append(location)
+                        self._high_usage_set.add(location)
+            self._dirty = True
+
+        # Reports are paid for; don't wait for the background snapshot
+        if reports:
+            self.snapshot()
+
+    def record_cache_hit(self, location: Optional[str] = None, data_type: Optional[str] = None) -> None:
+        """Record data served from storage instead of an API call."""
+        with self._lock:
+            if location is not None and location in self.usage_by_location:
+                self.usage_by_location[location]['cache_hits'] += 1
+            if data_type is not None:
+                self.data_usage[data_type] += 1
+            self._dirty = True
+
+    # Decisions
+
+    @property
+    def reports_remaining(self) -> int:
+        if time.time() >= self._month_ends_at:
+            with self._lock:
+                self._roll_month_if_due()
+        return max(0, self.monthly_limit - self.reports_used)
+
+    def should_use_attom(self, location: str, property_filters: Dict) -> bool:
+        """Determine if ATTOM API should be used for this request"""
+        # Always use ATTOM for high-priority requests
+        if property_filters.get('prioritize_attom'):
+            return True
+
+        # Check remaining reports
+        if self.reports_remaining <= 0:
+            return False
+
+        # Check if location is high-usage
+        if location in self._high_usage_set:
+            # For high-usage locations, only use ATTOM for specific cases
+            return any([
+                property_filters.get('investment_property'),
+                property_filters.get('include_foreclosures'),
+                property_filters.get('min_price', 0) > 1000000  # Luxury properties
+            ])
+
+        # For normal locations, use ATTOM more liberally
+        return True
+
+    def calls_today(self, solution: str) -> int:
+        """Get today's call count for a solution."""
+        totals = self.solution_calls.get(date.today().isoformat(), {}).get(solution)
+        return int(totals[0]) if totals else 0
+
+    # Reporting
+
+    def monthly_summary(self) -> Dict[str, Any]:
+        """Get summary of current month's usage"""
+        remaining = self.reports_remaining
+        with self._lock:
+            return {
+                'month': self.current_month,
+                'reports_used': self.reports_used,
+                'reports_remaining': remaining,
+                'high_usage_locations': list(self._high_usage)
+            }
+
+    def location_stats(self, location: str) -> Dict[str, Any]:
+        """Get usage statistics for a specific location"""
+        with self._lock:
+            if location in self.usage_by_location:
+                return dict(self.usage_by_location[location])
+        return {'reports_used': 0, 'last_used': None, 'cache_hits': 0}
+
+    def solution_totals(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Get per-solution totals over an inclusive date range.
+
+        Returns:
+            {solution: {'calls', 'successes', 'cost'}}
+        """
+        result: Dict[str, Dict[str, float]] = {}
+        for _, solution, (calls, successes, cost) in self._iter_days(start, end):
+            totals = result.setdefault(solution, {'calls': 0, 'successes': 0, 'cost': 0.0})
+            totals['calls'] += calls
+            totals['successes'] += successes
+            totals['cost'] += cost
+        return result
+
+    def daily_costs(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[date, float]:
+        """Get total cost per day over an inclusive date range."""
+        result: Dict[date, float] = defaultdict(float)
+        for day, _, (_, _, cost) in self._iter_days(start, end):
+            result[day] += cost
+        return dict(result)
+
+    def _iter_days(self, start: Optional[date], end: Optional[date]) -> Iterable:
+        with self._lock:
+            rows = [
+                (date.fromisoformat(day), solution, tuple(totals))
+                for day, solutions in self.solution_calls.items()
+                for solution, totals in solutions.items()
+            ]
+        return [
+            row for row in rows
+            if (start is None or row[0] >= start) and (end is None or row[0] <= end)
+        ]
+
+    # Month rollover
+
+    def _roll_month_if_due(self) -> None:
+        """Reset the monthly quota counters once the month is over (lock held)."""
+        if time.time() < self._month_ends_at:
+            return
+        now = datetime.now()
+        self.current_month, self._month_ends_at = _month_bounds(now)
+        self.reports_used = 0
+        self.usage_by_location = {}
+        self._high_usage = []
+        self._high_usage_set = set()
+        cutoff = (now.date() - timedelta(days=HISTORY_DAYS)).isoformat()
+        for day in [d for d in self.solution_calls if d < cutoff]:
+            del self.solution_calls[day]
+        self._dirty = True
+
+    # Persistence
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the state in the attom_usage.json layout (plus cost history)."""
+        remaining = self.reports_remaining
+        with self._lock:
+            return {
+                'current_month': self.current_month,
+                'reports_used': self.reports_used,
+                'reports_remaining': remaining,
+                'usage_by_location': {loc: dict(data) for loc, data in self.usage_by_location.items()},
+                'high_usage_locations': list(self._high_usage),
+                'solution_calls': {day: {s: list(t) for s, t in sols.items()}
+                                   for day, sols in self.solution_calls.items()},
+                'data_usage': dict(self.data_usage)
+            }
+
+    def _load(self) -> None:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading usage data: {str(e)}")
+            return
+
+        for day, solutions in data.get('solution_calls', {}).items():
+            self.solution_calls[day] = {s: list(t) for s, t in solutions.items()}
+        self.data_usage.update(data.get('data_usage', {}))
+
+        # Quota counters only carry over within the same month
+        if data.get('current_month') == self.current_month:
+            self.reports_used = data.get('reports_used', 0)
+            self.usage_by_location = data.get('usage_by_location', {})
+            self._high_usage = list(data.get('high_usage_locations', []))
+            self._high_usage_set = set(self._high_usage)
+
+    def snapshot(self, force: bool = False) -> bool:
+        """
+        Write the state to the snapshot file if it changed.
+
+        Returns:
+            True if a snapshot was written
+        """
+        if not self.snapshot_path:
+            return False
+        # One writer at a time, so the file always ends with the latest state
+        with self._snapshot_lock:
+            with self._lock:
+                if not (self._dirty or force):
+                    return False
+                data = self.to_dict()
+                self._dirty = False
+
+            try:
+                directory = os.path.dirname(self.snapshot_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.snapshot_path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp_path, self.snapshot_path)
+                return True
+            except Exception as e:
+                logger.error(f"Error saving usage data: {str(e)}")
+                with self._lock:
+                    self._dirty = True
+                return False
+
+    def _snapshot_loop(self) -> None:
+        while not self._closed.wait(self.snapshot_interval):
+            self.snapshot()
+
+    def close(self) -> None:
+        """Stop background snapshots and write a final one."""
+        self._closed.set()
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        self.snapshot()
+
+
+def _build_accounting() -> UsageAccounting:
+    accounting = UsageAccounting()
+    # Write the last snapshot when the process exits
+    atexit.register(accounting.close)
+    return accounting
+
+
+_accounting = LazySingleton(_build_accounting)
+
+
+def get_accounting() -> UsageAccounting:
+    """Get the process-wide accounting store."""
+    return _accounting.get()
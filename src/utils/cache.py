@@ -1,22 +1,23 @@
 from typing import Any, Optional
 import aioredis
-import json
 import logging
 from functools import wraps
 from datetime import datetime
+from ..cache.codec import PayloadCodec
 
 logger = logging.getLogger(__name__)
 
 class CacheManager:
-    def __init__(self, redis_url: str):
+    def __init__(self, redis_url: str, codec: Optional[PayloadCodec] = None):
         self.redis = aioredis.from_url(redis_url)
+        self.codec = codec or PayloadCodec()
         
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
         try:
             value = await self.redis.get(key)
             if value:
-                return json.loads(value)
+                return self.codec.decode(value)
             return None
         except Exception as e:
             logger.error(f"Cache get error: {str(e)}")
@@ -25,8 +26,7 @@ class CacheManager:
     async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
         """Set value in cache with TTL."""
         try:
-            value = json.dumps(value)
-            await self.redis.set(key, value, ex=ttl)
+            await self.redis.set(key, self.codec.encode(value), ex=ttl)
             return True
         except Exception as e:
             logger.error(f"Cache set error: {str(e)}")
@@ -4,260 +4,487 @@ Chat History Module
 
 This module provides functionality for storing and retrieving chat history,
 including queries, results, and timestamps.
+
+History is held in a ChatHistoryStore: entries are kept in arrival order
+(which is timestamp order), each user has a bounded ring buffer of chat IDs,
+and the store as a whole is capped, so reading the latest N entries touches
+only those N. Changes are appended to a JSONL file in batches by a
+background thread, and the file is compacted once it is mostly superseded.
 """
 
 import os
 import sys
 import json
 import uuid
+import atexit
 import logging
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime
+from itertools import islice
 from typing import Dict, List, Any, Optional
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, 
+logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# In-memory chat session storage
-session_log = {}
+# Ensure project directory is in path
+sys_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if sys_path not in sys.path:
+    sys.path.append(sys_path)
+
+from src.modules.singleton import LazySingleton
+
+DATA_DIR = os.path.join(sys_path, "data")
+DEFAULT_HISTORY_FILE = os.path.join(DATA_DIR, "chat_history.jsonl")
+# Whole-dict JSON file written by earlier versions; imported once if present
+LEGACY_HISTORY_FILE = os.path.join(DATA_DIR, "chat_history.json")
+
+
+class ChatHistoryStore:
+    """
+    Bounded chat history with per-user ring buffers and batched JSONL persistence.
+
+    Retention is enforced on insert: a user's oldest entry is dropped once
+    they have max_per_user entries, and the oldest entry overall once the
+    store holds max_entries. Safe to use from several threads.
+    """
+
+    def __init__(self, file_path: Optional[str] = None, max_entries: int = 10000,
+                 max_per_user: int = 200, flush_interval: float = 1.0, batch_size: int = 500):
+        """
+        Initialize the store, replaying the history file if it exists.
+
+        Args:
+            file_path: JSONL history file (None keeps history in memory only)
+            max_entries: Entries kept across all users
+            max_per_user: Entries kept per user
+            flush_interval: Seconds between background writes of pending changes
+            batch_size: Pending changes that trigger an early write
+        """
+        self.file_path = file_path
+        self.max_entries = max_entries
+        self.max_per_user = max_per_user
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._by_user: Dict[Optional[str], deque] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._file_records = 0
+
+        if file_path:
+            self.load(file_path)
+
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._flusher = None
+        if file_path:
+            self._flusher = threading.Thread(target=self._flush_loop, name="chat-history-flush", daemon=True)
+            self._flusher.start()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Writes
+
+    def add(self, query: str, result: dict, user_id: str = None) -> str:
+        """
+        Store a query and its result.
+
+        Args:
+            query: The user's query string
+            result: The result dictionary from the orchestrator
+            user_id: Optional user identifier
+
+        Returns:
+            A unique chat history ID
+        """
+        chat_id = str(uuid.uuid4())[:8]
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "query": query,
+            "result": result,
+            "result_type": result.get("type", "unknown"),
+            "user_id": user_id
+        }
+
+        with self._lock:
+            self._insert(chat_id, entry)
+            self._pending.append({"op": "add", "id": chat_id, "entry": entry})
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+        return chat_id
+
+    def clear(self, user_id: str = None) -> int:
+        """
+        Clear history, optionally for a specific user only.
+
+        Returns:
+            Number of history items cleared
+        """
+        with self._lock:
+            cleared = self._remove(user_id)
+            self._pending.append({"op": "clear", "user_id": user_id})
+        self._wake.set()
+        return cleared
+
+    def _insert(self, chat_id: str, entry: Dict[str, Any]) -> None:
+        """Add an entry and enforce retention (lock held)."""
+        if chat_id in self._entries:
+            self._entries[chat_id] = entry
+            return
+
+        user_id = entry.get("user_id")
+        ring = self._by_user.setdefault(user_id, deque())
+        if len(ring) >= self.max_per_user:
+            del self._entries[ring.popleft()]
+        ring.append(chat_id)
+        self._entries[chat_id] = entry
+
+        while len(self._entries) > self.max_entries:
+            # The oldest entry overall is also the oldest in its user's ring
+            _, oldest = self._entries.popitem(last=False)
+            oldest_ring = self._by_user[oldest.get("user_id")]
+            oldest_ring.popleft()
+            if not oldest_ring:
+                del self._by_user[oldest.get("user_id")]
+
+    def _remove(self, user_id: Optional[str]) -> int:
+        """Drop one user's entries, or all entries if user_id is None (lock held)."""
+        if user_id is None:
+            cleared = len(self._entries)
+            self._entries.clear()
+            self._by_user.clear()
+            return cleared
+
+        ring = self._by_user.pop(user_id, ())
+        for chat_id in ring:
+            del self._entries[chat_id]
+        return len(ring)
+
+    # Reads
+
+    def latest(self, user_id: str = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the most recent entries, newest first.
+
+        Args:
+            user_id: Optional user identifier to filter history
+            limit: Maximum number of history items to return
+
+        Returns:
+            List of chat history items
+        """
+        with self._lock:
+            if user_id:
+                chat_ids = list(islice(reversed(self._by_user.get(user_id, ())), limit))
+            else:
+                chat_ids = list(islice(reversed(self._entries), limit))
+            return [
+                {
+                    "id": chat_id,
+                    "query": self._entries[chat_id]["query"],
+                    "timestamp": self._entries[chat_id]["timestamp"],
+                    "result_type": self._entries[chat_id].get("result_type", "unknown")
+                }
+                for chat_id in chat_ids
+            ]
+
+    def get(self, chat_id: str) -> Dict[str, Any]:
+        """Get a full entry by ID, or an empty dict if not found."""
+        with self._lock:
+            return self._entries.get(chat_id, {})
+
+    # Persistence
+
+    def flush(self) -> bool:
+        """
+        Append pending changes to the history file, compacting it if needed.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.file_path:
+            return False
+
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                # Rewrite the file once it is mostly superseded records
+                compact = self._file_records + len(batch) > 2 * max(len(self._entries), self.max_per_user)
+                if compact:
+                    records = [{"op": "add", "id": cid, "entry": entry} for cid, entry in self._entries.items()]
+            try:
+                if compact:
+                    self._write_snapshot(self.file_path, records)
+                    self._file_records = len(records)
+                elif batch:
+                    os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+                    with open(self.file_path, "a") as f:
+                        f.write("".join(json.dumps(record) + "\n" for record in batch))
+                    self._file_records += len(batch)
+                return True
+            except Exception as e:
+                logger.error(f"Error persisting chat history: {e}")
+                if not compact:
+                    with self._lock:
+                        # Keep them for the next attempt
+                        self._pending[:0] = batch
+                return False
+
+    def save(self, file_path: str) -> bool:
+        """
+        Write a compacted copy of the current history to another file.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        with self._lock:
+            records = [{"op": "add", "id": cid, "entry": entry} for cid, entry in self._entries.items()]
+        try:
+            self._write_snapshot(file_path, records)
+            return True
+        except Exception as e:
+            logger.error(f"Error persisting chat history: {e}")
+            return False
+
+    @staticmethod
+    def _write_snapshot(file_path: str, records: List[Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+        os.replace(tmp_path, file_path)
+
+    def load(self, file_path: str) -> bool:
+        """
+        Replay a history file into the store.
+
+        Accepts the JSONL format written by flush() and the whole-dict JSON
+        format written by earlier versions.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            if not os.path.exists(file_path):
+                logger.info(f"No chat history file found at {file_path}")
+                return False
+
+            with open(file_path, "r") as f:
+                text = f.read()
+            records = self._parse_records(text, file_path)
+
+            with self._lock:
+                for record in records:
+                    if record.get("op") == "clear":
+                        self._remove(record.get("user_id"))
+                    elif record.get("op") == "add":
+                        self._insert(record["id"], record["entry"])
+                if file_path == self.file_path:
+                    self._file_records = len(records)
+
+            logger.info(f"Chat history loaded from {file_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error loading chat history: {e}")
+            return False
+
+    @staticmethod
+    def _parse_records(text: str, file_path: str) -> List[Dict[str, Any]]:
+        try:
+            legacy = json.loads(text)
+        except ValueError:
+            legacy = None
+        if isinstance(legacy, dict) and "op" not in legacy:
+            # {chat_id: entry}, oldest first
+            ordered = sorted(legacy.items(), key=lambda item: item[1].get("timestamp", ""))
+            return [{"op": "add", "id": cid, "entry": entry} for cid, entry in ordered]
+
+        records = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # A write cut short by a crash leaves a partial last line
+                logger.warning(f"Skipping unreadable chat history record in {file_path}")
+        return records
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._pending:
+                self.flush()
+
+    def close(self) -> None:
+        """Stop the background writer and write pending changes."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+
+def _build_store() -> ChatHistoryStore:
+    store = ChatHistoryStore(
+        DEFAULT_HISTORY_FILE,
+        max_entries=int(os.getenv("CHAT_HISTORY_MAX_ENTRIES", "10000")),
+        max_per_user=int(os.getenv("CHAT_HISTORY_MAX_PER_USER", "200"))
+    )
+    if not os.path.exists(DEFAULT_HISTORY_FILE) and os.path.exists(LEGACY_HISTORY_FILE):
+        store.load(LEGACY_HISTORY_FILE)
+        store.save(DEFAULT_HISTORY_FILE)
+    atexit.register(store.close)
+    return store
+
+
+_store = LazySingleton(_build_store)
+
+
+def get_store() -> ChatHistoryStore:
+    """Get the shared chat history store, loading persisted history on first use."""
+    return _store.get()
 
 
 def log_chat(query: str, result: dict, user_id: str = None) -> str:
     """
     Stores query + result to memory and returns a unique history ID.
-    
+
     Args:
         query: The user's query string
         result: The result dictionary from the orchestrator
         user_id: Optional user identifier for multi-user systems
-        
+
     Returns:
         A unique chat history ID
     """
-    chat_id = str(uuid.uuid4())[:8]
-    timestamp = datetime.now().isoformat()
-    
-    # Create the log entry
-    log_entry = {
-        "timestamp": timestamp,
-        "query": query,
-        "result": result,
-        "result_type": result.get("type", "unknown"),
-        "user_id": user_id
-    }
-    
-    # Store in memory
-    session_log[chat_id] = log_entry
-    
-    # Also attempt to persist to disk
-    try:
-        persist_chat_history()
-    except Exception as e:
-        logger.warning(f"Failed to persist chat history: {e}")
-    
-    return chat_id
+    # Persisted in the background by the store
+    return get_store().add(query, result, user_id)
 
 
 def get_chat_history(user_id: str = None, limit: int = 20) -> List[Dict[str, Any]]:
     """
     Returns a list of recent queries and timestamps.
-    
+
     Args:
         user_id: Optional user identifier to filter history
         limit: Maximum number of history items to return
-        
+
     Returns:
         List of chat history items
     """
-    # Filter by user_id if provided
-    if user_id:
-        filtered_logs = {cid: log for cid, log in session_log.items() 
-                        if log.get("user_id") == user_id}
-    else:
-        filtered_logs = session_log
-    
-    # Sort by timestamp (newest first) and limit
-    sorted_logs = sorted(filtered_logs.items(), 
-                        key=lambda x: x[1]["timestamp"], 
-                        reverse=True)
-    
-    # Format the history items
-    history = [
-        {
-            "id": cid,
-            "query": log["query"],
-            "timestamp": log["timestamp"],
-            "result_type": log.get("result_type", "unknown")
-        }
-        for cid, log in sorted_logs[:limit]
-    ]
-    
-    return history
+    return get_store().latest(user_id, limit)
 
 
 def load_chat_result(chat_id: str) -> Dict[str, Any]:
     """
     Retrieves a stored chat result by its unique ID.
-    
+
     Args:
         chat_id: The unique chat history ID
-        
+
     Returns:
         The stored chat result or an empty dict if not found
     """
-    log_entry = session_log.get(chat_id, {})
-    return log_entry.get("result", {})
+    return get_store().get(chat_id).get("result", {})
 
 
 def get_full_chat_entry(chat_id: str) -> Dict[str, Any]:
     """
     Retrieves the full chat entry including query, result, and metadata.
-    
+
     Args:
         chat_id: The unique chat history ID
-        
+
     Returns:
         The full chat entry or an empty dict if not found
     """
-    return session_log.get(chat_id, {})
+    return get_store().get(chat_id)
 
 
 def clear_chat_history(user_id: str = None) -> int:
     """
     Clears chat history, optionally for a specific user only.
-    
+
     Args:
         user_id: Optional user identifier to clear history for
-        
+
     Returns:
         Number of history items cleared
     """
-    global session_log
-    
-    if user_id:
-        # Only clear history for the specified user
-        count_before = len(session_log)
-        session_log = {cid: log for cid, log in session_log.items() 
-                      if log.get("user_id") != user_id}
-        cleared_count = count_before - len(session_log)
-    else:
-        # Clear all history
-        cleared_count = len(session_log)
-        session_log = {}
-    
-    # Update persisted history
-    try:
-        persist_chat_history()
-    except Exception as e:
-        logger.warning(f"Failed to persist chat history after clearing: {e}")
-    
-    return cleared_count
+    return get_store().clear(user_id)
 
 
 def persist_chat_history(file_path: str = None) -> bool:
     """
     Persists the chat history to disk.
-    
+
     Args:
-        file_path: Optional path to save the history file
-        
+        file_path: Optional path to save a compacted copy of the history to
+
     Returns:
         True if successful, False otherwise
     """
     if file_path is None:
-        # Use default path in the project directory
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        file_path = os.path.join(base_dir, "data", "chat_history.json")
-    
-    try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        # Write to file
-        with open(file_path, 'w') as f:
-            json.dump(session_log, f, indent=2)
-        
-        logger.info(f"Chat history persisted to {file_path}")
-        return True
-    
-    except Exception as e:
-        logger.error(f"Error persisting chat history: {e}")
-        return False
+        return get_store().flush()
+    return get_store().save(file_path)
 
 
 def load_persisted_chat_history(file_path: str = None) -> bool:
     """
     Loads the chat history from disk.
-    
+
     Args:
         file_path: Optional path to load the history file from
-        
+
     Returns:
         True if successful, False otherwise
     """
-    global session_log
-    
+    store = get_store()
     if file_path is None:
-        # Use default path in the project directory
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        file_path = os.path.join(base_dir, "data", "chat_history.json")
-    
-    try:
-        # Check if file exists
-        if not os.path.exists(file_path):
-            logger.info(f"No chat history file found at {file_path}")
-            return False
-        
-        # Read from file
-        with open(file_path, 'r') as f:
-            loaded_log = json.load(f)
-        
-        # Update session log
-        session_log.update(loaded_log)
-        
-        logger.info(f"Chat history loaded from {file_path}")
-        return True
-    
-    except Exception as e:
-        logger.error(f"Error loading chat history: {e}")
-        return False
-
-
-# Try to load persisted history on module import
-try:
-    load_persisted_chat_history()
-except Exception as e:
-    logger.warning(f"Failed to load persisted chat history on startup: {e}")
+        # Loaded when the store is first used
+        return bool(store.file_path and os.path.exists(store.file_path))
+    return store.load(file_path)
 
 
 if __name__ == "__main__":
     # Test functionality
     print("Chat History Module Test")
     print("=" * 30)
-    
+
     # Test logging a chat
     test_query = "What is the investment confidence in 90210?"
     test_result = {"type": "investment_analysis", "zip": "90210", "confidence_score": 85}
-    
+
     chat_id = log_chat(test_query, test_result)
     print(f"Logged chat with ID: {chat_id}")
-    
+
     # Test retrieving history
     history = get_chat_history()
     print(f"\nChat History ({len(history)} items):")
     for item in history:
         print(f"ID: {item['id']} | {item['timestamp']} | {item['query']}")
-    
+
     # Test retrieving a specific result
     result = load_chat_result(chat_id)
     print(f"\nRetrieved result for {chat_id}: {result}")
-    
+
     # Test persistence
     print("\nTesting persistence...")
     success = persist_chat_history()
     print(f"Persisted chat history: {success}")
-    
+
     # Test clearing history
     clear_count = clear_chat_history()
     print(f"\nCleared {clear_count} history items")
@@ -0,0 +1,134 @@
+"""
+Shared bounded executor for blocking work called from async code.
+
+Market analysis, reputation scoring and other synchronous pipeline steps
+are run here so they don't stall the event loop, while the bounded pool
+keeps a burst of requests from spawning unbounded threads.
+
+BoundedExecutor adds admission control on top for request handlers: work
+beyond a fixed number of running plus queued jobs is rejected up front
+instead of queueing without limit.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Get the process-wide executor (size from ANALYSIS_WORKERS, default 8)."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('ANALYSIS_WORKERS', '8')),
+                    thread_name_prefix='analysis'
+                )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on the shared executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_blocking_executor(),
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a BoundedExecutor has no room for more work."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Executor saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a cap on running plus queued jobs.
+
+    A job counts against the cap until its thread finishes, even if the
+    caller stopped waiting on a timeout, so abandoned work still applies
+    backpressure.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int,
+                 thread_name_prefix: str = 'bounded', retry_after: int = 1):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Number of worker threads
+            max_pending: Maximum running plus queued jobs before rejecting
+            thread_name_prefix: Prefix for worker thread names
+            retry_after: Seconds suggested to rejected callers
+        """
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        Args:
+            func: Callable to run
+            *args: Positional arguments for func
+            timeout: Seconds to wait before raising asyncio.TimeoutError
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+
+        Raises:
+            ExecutorSaturated: If max_pending jobs are already running or queued
+            asyncio.TimeoutError: If the job doesn't finish within timeout
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(self.retry_after)
+            self._pending += 1
+
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # Drop it if it hasn't started; a running job finishes in the background
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get current load and rejection counters."""
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out
+            }
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Export Cache Module
+
+This module provides a content-addressed cache for exported reports. Each
+artifact is stored under a hash of the inputs it was rendered from, so
+repeated exports of the same ZIP/summary/scores reuse one file instead of
+rendering and writing a new timestamped copy. The cache directory is kept
+under a byte cap by evicting the least recently used artifacts.
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Artifacts are named <sha256 hex><extension>
+ARTIFACT_PATTERN = re.compile(r'^([0-9a-f]{64})(\.\w+)?$')
+RENDER_PREFIX = ".render-"
+
+
+def export_key(format_type: str, **inputs: Any) -> str:
+    """
+    Compute the cache key for an export.
+
+    Args:
+        format_type: Export format (pdf, text, csv, json)
+        **inputs: Everything the rendered content depends on
+
+    Returns:
+        Hex SHA-256 of the canonical JSON encoding of the inputs and format
+    """
+    payload = json.dumps({"format": format_type, **inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+
+    Args:
+        if_none_match: Raw If-None-Match header value, if any
+        etag: Quoted ETag of the current representation
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+class ExportCache:
+    """
+    Content-addressed, size-capped store of rendered export files.
+
+    Recency is tracked through file modification times, which are bumped on
+    every hit, so LRU order survives restarts. Safe to use from several
+    threads; concurrent requests for the same key render once.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache, indexing any artifacts already on disk.
+
+        Args:
+            cache_dir: Directory holding cached artifacts
+            max_bytes: Total artifact size to keep before evicting
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Index existing artifacts oldest first and drop interrupted renders."""
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(RENDER_PREFIX):
+                shutil.rmtree(entry.path, ignore_errors=True)
+                continue
+            match = ARTIFACT_PATTERN.match(entry.name)
+            if match and entry.is_file():
+                stat = entry.stat()
+                found.append((stat.st_mtime, match.group(1), entry.path, stat.st_size))
+
+        for _, key, path, size in sorted(found):
+            self._entries[key] = path
+            self._sizes[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get the artifact path for a key, marking it recently used.
+
+        Args:
+            key: Export key from export_key()
+
+        Returns:
+            Path to the artifact, or None if it isn't cached
+        """
+        with self._lock:
+            path = self._entries.get(key)
+            if path is None:
+                return None
+            if not os.path.exists(path):
+                # Removed behind our back
+                self._forget(key)
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def get_or_create(self, key: str, render: Callable[[str], str]) -> str:
+        """
+        Get the artifact for a key, rendering it on a miss.
+
+        Args:
+            key: Export key from export_key()
+            render: Function that writes the export into the given directory
+                and returns its path (or "" on failure)
+
+        Returns:
+            Path to the cached artifact, or "" if rendering failed
+        """
+        path = self.get(key)
+        if path:
+            with self._lock:
+                self.hits += 1
+            return path
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                # Another request may have rendered it while we waited
+                path = self.get(key)
+                if path:
+                    with self._lock:
+                        self.hits += 1
+                    return path
+                return self._render(key, render)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def _render(self, key: str, render: Callable[[str], str]) -> str:
+        """Render into a scratch directory and move the result into place."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        render_dir = tempfile.mkdtemp(prefix=RENDER_PREFIX, dir=self.cache_dir)
+        try:
+            rendered = render(render_dir)
+            if not rendered or not os.path.exists(rendered):
+                return ""
+            path = os.path.join(self.cache_dir, key + os.path.splitext(rendered)[1])
+            os.replace(rendered, path)
+        finally:
+            shutil.rmtree(render_dir, ignore_errors=True)
+
+        with self._lock:
+            self.misses += 1
+            self._add(key, path)
+            self._evict(keep=key)
+        return path
+
+    def _add(self, key: str, path: str) -> None:
+        if key in self._entries:
+            self._forget(key)
+        size = os.path.getsize(path)
+        self._entries[key] = path
+        self._sizes[key] = size
+        self.total_bytes += size
+
+    def _forget(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self.total_bytes -= self._sizes.pop(key, 0)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used artifacts until under max_bytes."""
+        while self.total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            path = self._entries[key]
+            self._forget(key)
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove evicted export {path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
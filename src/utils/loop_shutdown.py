@@ -0,0 +1,36 @@
+"""
+Loop Shutdown Hooks
+
+Resources bound to one event loop, like aiohttp sessions and Playwright
+browsers, have to be closed on that loop before it goes away. asyncio.run()
+closes every open async generator before it closes its loop, so a generator
+parked at its first yield can run the cleanup at exactly that point.
+
+Loops driven by hand should call loop.shutdown_asyncgens() before close(),
+as asyncio.run() does.
+"""
+
+from typing import AsyncGenerator, Awaitable, Callable
+
+
+async def _closer(aclose: Callable[[], Awaitable[None]]) -> AsyncGenerator[None, None]:
+    try:
+        yield
+    finally:
+        await aclose()
+
+
+async def close_on_loop_shutdown(aclose: Callable[[], Awaitable[None]]) -> AsyncGenerator[None, None]:
+    """
+    Arrange for aclose() to be awaited when the running loop shuts down.
+
+    Args:
+        aclose: Coroutine function closing the loop-bound resource
+
+    Returns:
+        The guard generator. Keep it referenced for as long as the resource
+        lives; await guard.aclose() to close the resource early.
+    """
+    guard = _closer(aclose)
+    await guard.__anext__()
+    return guard
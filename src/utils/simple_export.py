@@ -145,8 +145,8 @@ def export_to_csv_file(data: Dict[str, Any], output_path: str = "output") -> str
                 f.write(f"{label},{score}\n")
             
             # Write summary as a note
-            summary = data.get("summary", "No summary available")
-            f.write(f"\nSummary,\"{summary.replace('"', '""')}\"\n")
+            summary = data.get("summary", "No summary available").replace('"', '""')
+            f.write(f"\nSummary,\"{summary}\"\n")
         
         logger.info(f"Exported analysis to CSV file: {filepath}")
         return filepath
@@ -1,14 +1,19 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import logging
-from datetime import datetime, timedelta
-import pandas as pd
+from datetime import datetime
 from pathlib import Path
 
+from src.utils.accounting import UsageAccounting, get_accounting
+from src.utils.usage_log import UsageLog
+
 class UsageTracker:
     """Track API usage and costs"""
     
-    def __init__(self):
+    def __init__(self, data_dir: Optional[Path] = None,
+                 accounting: Optional[UsageAccounting] = None):
         self.logger = logging.getLogger(__name__)
+        # Quota and cost counters shared with the other trackers
+        self.accounting = accounting or get_accounting()
         self.tracking_data = {}
         self.api_costs = {
             'property_details': 0.05,
@@ -18,38 +23,22 @@ class UsageTracker:
             'liens': 0.04,
             'tax': 0.03
         }
-        self._init_tracking_file()
+        self._init_tracking_file(data_dir)
     
-    def _init_tracking_file(self):
-        """Initialize tracking file"""
-        self.tracking_file = Path(__file__).parent.parent.parent / 'data' / 'usage_tracking.xlsx'
-        self.tracking_file.parent.mkdir(exist_ok=True)
-        
-        if not self.tracking_file.exists():
-            self._create_tracking_structure()
+    def _init_tracking_file(self, data_dir: Optional[Path] = None):
+        """Initialize tracking store"""
+        data_dir = Path(data_dir or Path(__file__).parent.parent.parent / 'data')
+        # Excel workbook is only written on export; calls go to the append-only log
+        self.tracking_file = data_dir / 'usage_tracking.xlsx'
+        self.usage_log = UsageLog(data_dir / 'usage_tracking.db')
     
-    def _create_tracking_structure(self):
-        """Create tracking file structure"""
-        sheets = {
-            'api_usage': [
-                'timestamp', 'endpoint', 'address', 'success',
-                'response_time', 'cost', 'data_source'
-            ],
-            'daily_summary': [
-                'date', 'total_requests', 'success_rate',
-                'total_cost', 'avg_response_time'
-            ],
-            'endpoint_stats': [
-                'endpoint', 'total_calls', 'success_rate',
-                'avg_cost', 'avg_response_time'
-            ]
-        }
-        
-        with pd.ExcelWriter(self.tracking_file) as writer:
-            for sheet, columns in sheets.items():
-                pd.DataFrame(columns=columns).to_excel(
-                    writer, sheet_name=sheet, index=False
-                )
+    def close(self) -> None:
+        """Flush buffered calls to disk"""
+        self.usage_log.close()
+    
+    def export_excel(self, path: Optional[Path] = None) -> Path:
+        """Export usage, daily summary and endpoint stats to the Excel workbook"""
+        return self.usage_log.export_excel(path or self.tracking_file)
     
     def start_tracking(self, address: str) -> None:
         """Start tracking API usage for an address"""
@@ -83,7 +72,7 @@ class UsageTracker:
             'data_source': data_source
         })
         
-        # Store in Excel
+        # Append to usage log
         self._store_api_call(
             timestamp=end_time,
             endpoint=endpoint,
@@ -101,133 +90,65 @@ class UsageTracker:
             tracking['end_time'] = datetime.now()
             tracking['success'] &= success
             
-            # Update daily summary
-            self._update_daily_summary()
-            # Update endpoint statistics
-            self._update_endpoint_stats()
-            
+            # Daily and endpoint summaries are maintained as calls are stored
             del self.tracking_data[address]
     
     def _store_api_call(self, timestamp: datetime, endpoint: str,
                        address: str, success: bool, response_time: float,
                        cost: float, data_source: str) -> None:
-        """Store API call in tracking file"""
+        """Store API call in usage log"""
         try:
-            df = pd.DataFrame([{
-                'timestamp': timestamp,
-                'endpoint': endpoint,
-                'address': address,
-                'success': success,
-                'response_time': response_time,
-                'cost': cost,
-                'data_source': data_source
-            }])
-            
-            with pd.ExcelWriter(
-                self.tracking_file, mode='a', if_sheet_exists='overlay'
-            ) as writer:
-                df.to_excel(
-                    writer, sheet_name='api_usage',
-                    header=False, index=False
-                )
+            self.usage_log.record(
+                timestamp=timestamp,
+                endpoint=endpoint,
+                address=address,
+                success=success,
+                response_time=response_time,
+                cost=cost,
+                data_source=data_source
+            )
+            # ATTOM reports are counted against the quota by the ATTOM tracker
+            self.accounting.record_call(
+                endpoint,
+                location=address,
+                success=success,
+                cost=cost,
+                reports=0,
+                timestamp=timestamp
+            )
         except Exception as e:
             self.logger.error(f"Error storing API call: {str(e)}")
     
-    def _update_daily_summary(self) -> None:
-        """Update daily usage summary"""
-        try:
-            today = datetime.now().date()
-            
-            # Read existing data
-            df = pd.read_excel(self.tracking_file, sheet_name='api_usage')
-            
-            # Filter today's data
-            today_data = df[df['timestamp'].dt.date == today]
-            
-            summary = {
-                'date': today,
-                'total_requests': len(today_data),
-                'success_rate': today_data['success'].mean() * 100,
-                'total_cost': today_data['cost'].sum(),
-                'avg_response_time': today_data['response_time'].mean()
-            }
-            
-            # Update summary sheet
-            summary_df = pd.DataFrame([summary])
-            with pd.ExcelWriter(
-                self.tracking_file, mode='a', if_sheet_exists='overlay'
-            ) as writer:
-                summary_df.to_excel(
-                    writer, sheet_name='daily_summary',
-                    header=False, index=False
-                )
-        except Exception as e:
-            self.logger.error(f"Error updating daily summary: {str(e)}")
-    
-    def _update_endpoint_stats(self) -> None:
-        """Update endpoint statistics"""
-        try:
-            # Read existing data
-            df = pd.read_excel(self.tracking_file, sheet_name='api_usage')
-            
-            # Group by endpoint
-            endpoint_stats = df.groupby('endpoint').agg({
-                'endpoint': 'count',
-                'success': 'mean',
-                'cost': 'mean',
-                'response_time': 'mean'
-            }).rename(columns={
-                'endpoint': 'total_calls',
-                'success': 'success_rate',
-                'cost': 'avg_cost',
-                'response_time': 'avg_response_time'
-            }).reset_index()
-            
-            # Update stats sheet
-            with pd.ExcelWriter(
-                self.tracking_file, mode='a', if_sheet_exists='replace'
-            ) as writer:
-                endpoint_stats.to_excel(
-                    writer, sheet_name='endpoint_stats',
-                    index=False
-                )
-        except Exception as e:
-            self.logger.error(f"Error updating endpoint stats: {str(e)}")
-    
     def get_stats(self) -> Dict:
         """Get usage statistics"""
         try:
-            # Read data
-            usage_df = pd.read_excel(self.tracking_file, sheet_name='api_usage')
-            daily_df = pd.read_excel(self.tracking_file, sheet_name='daily_summary')
-            endpoint_df = pd.read_excel(self.tracking_file, sheet_name='endpoint_stats')
-            
             # Calculate time periods
             now = datetime.now()
             today = now.date()
             month_start = today.replace(day=1)
             
             # Daily stats
-            today_data = usage_df[usage_df['timestamp'].dt.date == today]
+            today_data = self.usage_log.daily_summary(today)
             daily_stats = {
-                'requests': len(today_data),
-                'success_rate': f"{today_data['success'].mean()*100:.1f}%",
-                'cost': f"${today_data['cost'].sum():.2f}"
+                'requests': today_data['total_requests'],
+                'success_rate': f"{today_data['success_rate']:.1f}%",
+                'cost': f"${today_data['total_cost']:.2f}"
             }
             
             # Monthly stats
-            month_data = usage_df[usage_df['timestamp'].dt.date >= month_start]
+            month_data = self.usage_log.period_summary(month_start, today)
             monthly_stats = {
-                'requests': len(month_data),
-                'success_rate': f"{month_data['success'].mean()*100:.1f}%",
-                'cost': f"${month_data['cost'].sum():.2f}"
+                'requests': month_data['total_requests'],
+                'success_rate': f"{month_data['success_rate']:.1f}%",
+                'cost': f"${month_data['total_cost']:.2f}"
             }
             
             # Endpoint stats
-            endpoint_stats = endpoint_df.to_dict('records')
+            endpoint_stats = self.usage_log.endpoint_stats()
             
             # Cost optimization
-            cost_saved = self._calculate_cost_savings(usage_df)
+            cost_saved = self._calculate_cost_savings(endpoint_stats)
+            total_cost = self.usage_log.totals()['total_cost']
             
             return {
                 'daily': daily_stats,
@@ -235,24 +156,24 @@ class UsageTracker:
                 'endpoints': endpoint_stats,
                 'cost_optimization': {
                     'total_saved': f"${cost_saved:.2f}",
-                    'optimization_rate': f"{(cost_saved / (cost_saved + usage_df['cost'].sum()))*100:.1f}%"
+                    'optimization_rate': f"{(cost_saved / (cost_saved + total_cost))*100:.1f}%"
                 }
             }
         except Exception as e:
             self.logger.error(f"Error getting stats: {str(e)}")
             return {}
     
-    def _calculate_cost_savings(self, df: pd.DataFrame) -> float:
+    def _calculate_cost_savings(self, endpoint_stats: List[Dict]) -> float:
         """Calculate cost savings from data prioritization"""
         try:
             # Calculate potential cost if all data came from paid APIs
             potential_cost = sum(
-                len(df[df['endpoint'] == endpoint]) * cost
-                for endpoint, cost in self.api_costs.items()
+                stats['total_calls'] * self.api_costs.get(stats['endpoint'], 0)
+                for stats in endpoint_stats
             )
             
             # Actual cost
-            actual_cost = df['cost'].sum()
+            actual_cost = sum(stats['total_calls'] * stats['avg_cost'] for stats in endpoint_stats)
             
             return potential_cost - actual_cost
         except Exception as e:
@@ -264,14 +185,10 @@ class UsageTracker:
         alerts = []
         
         try:
-            # Read data
-            df = pd.read_excel(self.tracking_file, sheet_name='api_usage')
-            daily_df = pd.read_excel(self.tracking_file, sheet_name='daily_summary')
+            totals = self.usage_log.totals()
             
             # Check for high costs
-            today_cost = df[
-                df['timestamp'].dt.date == datetime.now().date()
-            ]['cost'].sum()
+            today_cost = self.usage_log.daily_summary()['total_cost']
             
             if today_cost > 50:  # $50 daily threshold
                 alerts.append({
@@ -281,8 +198,8 @@ class UsageTracker:
                 })
             
             # Check for low success rates
-            success_rate = df['success'].mean() * 100
-            if success_rate < 90:  # 90% success threshold
+            success_rate = totals['success_rate']
+            if totals['total_requests'] and success_rate < 90:  # 90% success threshold
                 alerts.append({
                     'level': 'warning',
                     'message': f"Low API success rate: {success_rate:.1f}%",
@@ -290,7 +207,7 @@ class UsageTracker:
                 })
             
             # Check for response time issues
-            avg_response = df['response_time'].mean()
+            avg_response = totals['avg_response_time']
             if avg_response > 2:  # 2 second threshold
                 alerts.append({
                     'level': 'info',
@@ -299,8 +216,8 @@ class UsageTracker:
                 })
             
             # Check for cost optimization opportunities
-            redfin_usage = len(df[df['data_source'] == 'redfin'])
-            attom_usage = len(df[df['data_source'] == 'attom'])
+            redfin_usage = self.usage_log.data_sources.get('redfin', 0)
+            attom_usage = self.usage_log.data_sources.get('attom', 0)
             
             if attom_usage > redfin_usage:
                 alerts.append({
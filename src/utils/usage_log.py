@@ -0,0 +1,246 @@
+"""
+Append-only API usage log.
+
+Tracked API calls are buffered in memory and flushed in batches to a
+SQLite table in WAL mode, so recording a call costs a list append rather
+than a workbook rewrite. Daily and per-endpoint aggregates are kept up to
+date incrementally as calls are recorded; the Excel workbook finance uses
+is produced on demand by export_excel().
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['timestamp', 'endpoint', 'address', 'success', 'response_time', 'cost', 'data_source']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS api_usage (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    address TEXT,
+    success INTEGER NOT NULL,
+    response_time REAL,
+    cost REAL,
+    data_source TEXT
+)
+"""
+
+
+class _Totals:
+    """Running totals for one aggregate bucket."""
+
+    __slots__ = ('calls', 'successes', 'cost', 'response_time')
+
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.cost = 0.0
+        self.response_time = 0.0
+
+    def add(self, calls: int, successes: int, cost: float, response_time: float) -> None:
+        self.calls += calls
+        self.successes += successes
+        self.cost += cost
+        self.response_time += response_time
+
+    def summary(self) -> Dict[str, float]:
+        calls = self.calls or 1
+        return {
+            'total_requests': self.calls,
+            'success_rate': self.successes / calls * 100,
+            'total_cost': self.cost,
+            'avg_cost': self.cost / calls,
+            'avg_response_time': self.response_time / calls
+        }
+
+
+class UsageLog:
+    """Buffered, append-only store of tracked API calls with live aggregates."""
+
+    def __init__(self, db_path: Union[str, Path], batch_size: int = 1000,
+                 flush_interval: float = 2.0):
+        """
+        Open (or create) the log and load aggregates for existing rows.
+
+        Args:
+            db_path: SQLite database file
+            batch_size: Buffered calls that trigger a flush
+            flush_interval: Seconds between background flushes of a partial batch
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._buffer: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+        self.daily: Dict[date, _Totals] = defaultdict(_Totals)
+        self.endpoints: Dict[str, _Totals] = defaultdict(_Totals)
+        self.data_sources: Dict[str, int] = defaultdict(int)
+        self._load_aggregates()
+
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name='usage-log-flush', daemon=True)
+        self._flusher.start()
+        # Don't lose the buffered calls when the process exits
+        atexit.register(self.close)
+
+    def _load_aggregates(self) -> None:
+        """Rebuild aggregates from the stored rows (once, at startup)."""
+        rows = self._conn.execute(
+            "SELECT substr(timestamp, 1, 10), endpoint, data_source, COUNT(*), SUM(success), "
+            "COALESCE(SUM(cost), 0), COALESCE(SUM(response_time), 0) "
+            "FROM api_usage GROUP BY 1, 2, 3"
+        )
+        for day, endpoint, data_source, calls, successes, cost, response_time in rows:
+            self.daily[date.fromisoformat(day)].add(calls, successes, cost, response_time)
+            self.endpoints[endpoint].add(calls, successes, cost, response_time)
+            self.data_sources[data_source] += calls
+
+    def record(self, timestamp: datetime, endpoint: str, address: str, success: bool,
+               response_time: float, cost: float, data_source: str) -> None:
+        """Record one API call."""
+        row = (timestamp.isoformat(), endpoint, address, int(bool(success)),
+               float(response_time), float(cost), data_source)
+        with self._lock:
+            self._buffer.append(row)
+            self.daily[timestamp.date()].add(1, row[3], row[5], row[4])
+            self.endpoints[endpoint].add(1, row[3], row[5], row[4])
+            self.data_sources[data_source] += 1
+            full = len(self._buffer) >= self.batch_size
+
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write buffered calls to disk.
+
+        Returns:
+            Number of calls written
+        """
+        with self._write_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO api_usage (timestamp, endpoint, address, success, "
+                        "response_time, cost, data_source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        batch
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Error flushing {len(batch)} usage records: {e}")
+                with self._lock:
+                    # Keep them for the next attempt
+                    self._buffer[:0] = batch
+                return 0
+            return len(batch)
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        """Flush remaining calls and close the database."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        atexit.unregister(self.close)
+        self._flusher.join()
+        self.flush()
+        self._conn.close()
+
+    def daily_summary(self, day: Optional[date] = None) -> Dict[str, Any]:
+        """Get totals for one day (default today)."""
+        day = day or datetime.now().date()
+        with self._lock:
+            totals = self.daily.get(day, _Totals())
+            return {'date': day, **totals.summary()}
+
+    def period_summary(self, start: date, end: Optional[date] = None) -> Dict[str, Any]:
+        """Get totals over an inclusive date range."""
+        end = end or datetime.now().date()
+        combined = _Totals()
+        with self._lock:
+            for day, totals in self.daily.items():
+                if start <= day <= end:
+                    combined.add(totals.calls, totals.successes, totals.cost, totals.response_time)
+        return combined.summary()
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        """Get per-endpoint totals, in the endpoint_stats sheet layout."""
+        with self._lock:
+            return [
+                {
+                    'endpoint': endpoint,
+                    'total_calls': totals.calls,
+                    'success_rate': totals.successes / totals.calls,
+                    'avg_cost': totals.cost / totals.calls,
+                    'avg_response_time': totals.response_time / totals.calls
+                }
+                for endpoint, totals in sorted(self.endpoints.items()) if totals.calls
+            ]
+
+    def totals(self) -> Dict[str, float]:
+        """Get all-time totals."""
+        combined = _Totals()
+        with self._lock:
+            for totals in self.endpoints.values():
+                combined.add(totals.calls, totals.successes, totals.cost, totals.response_time)
+        return combined.summary()
+
+    def export_excel(self, path: Union[str, Path]) -> Path:
+        """
+        Write the api_usage, daily_summary and endpoint_stats sheets to a workbook.
+
+        Args:
+            path: Destination .xlsx file
+
+        Returns:
+            Path to the workbook
+        """
+        import pandas as pd
+
+        self.flush()
+        with self._write_lock:
+            usage = pd.read_sql_query(
+                f"SELECT {', '.join(COLUMNS)} FROM api_usage ORDER BY id", self._conn,
+                parse_dates=['timestamp']
+            )
+        usage['success'] = usage['success'].astype(bool)
+
+        with self._lock:
+            daily = [
+                {k: v for k, v in {'date': day, **totals.summary()}.items() if k != 'avg_cost'}
+                for day, totals in sorted(self.daily.items())
+            ]
+        daily_df = pd.DataFrame(daily, columns=['date', 'total_requests', 'success_rate',
+                                                'total_cost', 'avg_response_time'])
+        endpoint_df = pd.DataFrame(self.endpoint_stats(), columns=['endpoint', 'total_calls', 'success_rate',
+                                                                   'avg_cost', 'avg_response_time'])
+
+        path = Path(path)
+        with pd.ExcelWriter(path) as writer:
+            usage.to_excel(writer, sheet_name='api_usage', index=False)
+            daily_df.to_excel(writer, sheet_name='daily_summary', index=False)
+            endpoint_df.to_excel(writer, sheet_name='endpoint_stats', index=False)
+        return path
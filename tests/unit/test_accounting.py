@@ -0,0 +1,147 @@
+"""Unit tests for the unified usage accounting store."""
+import json
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime
+import pytest
+from src.utils.accounting import UsageAccounting
+from src.usage_tracker import UsageTracker
+from src.utils.tracker import UsageTracker as CallTracker
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+THREADS = 16
+CALLS_PER_THREAD = 500
+
+def run_threads(target, n=THREADS):
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        target(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+def test_concurrent_record_call_totals(tmp_path):
+    """Test counters stay exact with many threads recording calls."""
+    accounting = UsageAccounting(tmp_path / "usage.json", monthly_limit=10 ** 6, snapshot_interval=0.01)
+
+    def record(i):
+        for j in range(CALLS_PER_THREAD):
+            accounting.record_call(["avm", "owner_info"][j % 2], location=f"zip-{i % 4}",
+                                   success=j % 10 != 0, cost=0.25)
+
+    run_threads(record)
+    accounting.close()
+
+    total = THREADS * CALLS_PER_THREAD
+    assert accounting.reports_used == total
+    assert sum(accounting.location_stats(f"zip-{i}")["reports_used"] for i in range(4)) == total
+    totals = accounting.solution_totals()
+    assert totals["avm"]["calls"] + totals["owner_info"]["calls"] == total
+    assert totals["avm"]["successes"] + totals["owner_info"]["successes"] == total - total // 10
+    assert totals["avm"]["cost"] + totals["owner_info"]["cost"] == pytest.approx(total * 0.25)
+
+def test_concurrent_decisions_while_recording(tmp_path):
+    """Test should_use_attom stays consistent while other threads record calls."""
+    accounting = UsageAccounting(tmp_path / "usage.json", monthly_limit=THREADS * 100)
+    decisions = []
+
+    def work(i):
+        if i % 2:
+            for _ in range(200):
+                accounting.record_call("attom", location="Austin")
+        else:
+            for _ in range(200):
+                decisions.append(accounting.should_use_attom("Dallas", {}))
+
+    run_threads(work)
+    accounting.close()
+
+    # Half the threads used 200 reports each, exhausting the limit exactly
+    assert accounting.reports_used == THREADS // 2 * 200
+    assert accounting.reports_remaining == 0
+    assert not accounting.should_use_attom("Dallas", {})
+    assert accounting.should_use_attom("Dallas", {"prioritize_attom": True})
+    assert len(decisions) == THREADS // 2 * 200
+
+def test_high_usage_location_rule(tmp_path):
+    """Test high-usage locations only use ATTOM for specific cases."""
+    accounting = UsageAccounting(None, monthly_limit=100)
+    accounting.record_call("attom", location="Austin", reports=6)
+    assert accounting.monthly_summary()["high_usage_locations"] == ["Austin"]
+    assert not accounting.should_use_attom("Austin", {})
+    assert accounting.should_use_attom("Austin", {"include_foreclosures": True})
+    assert accounting.should_use_attom("Houston", {})
+
+def test_snapshot_round_trip(tmp_path):
+    """Test snapshots keep the attom_usage.json layout and reload."""
+    path = tmp_path / "usage" / "attom_usage.json"
+    accounting = UsageAccounting(path, snapshot_interval=0)
+    accounting.record_call("attom", location="Austin", reports=3)
+    accounting.record_call("avm", location="Austin", cost=0.1, reports=0,
+                           timestamp=datetime(2025, 5, 1, 9))
+    accounting.record_cache_hit("Austin", data_type="property_details")
+    assert "property_details" not in json.loads(path.read_text())["data_usage"]
+    accounting.close()
+
+    data = json.loads(path.read_text())
+    assert data["reports_used"] == 3
+    assert data["reports_remaining"] == 397
+    assert data["usage_by_location"]["Austin"]["cache_hits"] == 1
+
+    reloaded = UsageAccounting(path, snapshot_interval=0)
+    assert reloaded.reports_used == 3
+    assert reloaded.solution_totals() == accounting.solution_totals()
+    assert reloaded.data_usage == {"property_details": 1}
+    assert not reloaded.snapshot()
+
+def test_trackers_share_counters():
+    """Test the cost tracker adapter records into the shared store."""
+    accounting = UsageAccounting(None)
+    accounting.record_call("attom", location="Austin", reports=2)
+    cost_tracker = UsageTracker(accounting)
+    cost_tracker.track_api_call("avm", "Austin", True)
+    cost_tracker.track_data_usage("avm", ["market_value"])
+
+    assert accounting.monthly_summary()["reports_used"] == 2
+    assert {row["solution"] for row in cost_tracker.analyze_costs()} == {"attom", "avm"}
+    roi = cost_tracker.calculate_roi_metrics()
+    assert roi["total_api_calls"] == 2
+    assert roi["total_cache_hits"] == 1
+
+def test_attom_call_counts_once_across_trackers(tmp_path):
+    """Test an ATTOM call seen by the quota and call trackers uses one report."""
+    accounting = UsageAccounting(None)
+    call_tracker = CallTracker(data_dir=tmp_path, accounting=accounting)
+    # What tools.api_usage_tracker records for the report
+    accounting.record_call("attom", location="Austin", reports=1)
+    call_tracker.track_api_call("Austin", "property_details", True, "attom")
+    call_tracker.close()
+
+    assert accounting.reports_used == 1
+    assert accounting.solution_totals()["property_details"]["cost"] == pytest.approx(0.05)
+
+def test_report_usage_is_saved_immediately(tmp_path):
+    """Test calls using reports are snapshotted right away and free calls wait."""
+    path = tmp_path / "attom_usage.json"
+    accounting = UsageAccounting(path, snapshot_interval=0)
+    accounting.record_call("avm", cost=0.1, reports=0)
+    assert not path.exists()
+    accounting.record_call("attom", location="Austin", reports=2)
+    assert json.loads(path.read_text())["reports_used"] == 2
+
+def test_shared_store_is_saved_at_exit(tmp_path):
+    """Test the process-wide store writes its counters when the process exits."""
+    path = tmp_path / "attom_usage.json"
+    script = ("from src.utils.accounting import get_accounting; "
+              "get_accounting().record_call('avm', location='Austin', cost=0.1, reports=0)")
+    subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, check=True,
+                   env={**os.environ, "ATTOM_USAGE_FILE": str(path)})
+    assert json.loads(path.read_text())["solution_calls"]
@@ -0,0 +1,89 @@
+"""Unit tests for the per-query analysis context."""
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from src.inference import past_layer, present_layer, future_layer
+from src.inference.analysis_context import AnalysisContext, create_analysis_cache
+from src.inference.inference_layer_manager import InferenceLayerManager
+
+QUERY = "How has 30318 changed over the past 5 years, what are conditions now, and what is the forecast for the next 12 months?"
+
+@pytest.fixture
+def counted_analysis():
+    """Patch every layer's combine_analysis with a call counter."""
+    calls = []
+
+    def combine_analysis(zip_code, **params):
+        calls.append(zip_code)
+        return {"zip": zip_code, "market_score": 70.0, "reputation_score": 75.0,
+                "trend_score": 60.0, "econ_score": 65.0}
+
+    with patch.object(past_layer, "combine_analysis", combine_analysis), \
+         patch.object(present_layer, "combine_analysis", combine_analysis), \
+         patch.object(future_layer, "combine_analysis", combine_analysis):
+        yield calls
+
+def test_three_layer_query_computes_once(counted_analysis):
+    """Test all layers share one combine_analysis run per ZIP."""
+    result = InferenceLayerManager(analysis_cache_ttl=0).process_query(QUERY)
+    assert sorted(result["layers_used"]) == ["future", "past", "present"]
+    assert counted_analysis == ["30318"]
+
+def test_cache_is_per_query_without_ttl(counted_analysis):
+    """Test results are not reused across queries when the TTL cache is off."""
+    manager = InferenceLayerManager(analysis_cache_ttl=0)
+    manager.process_query(QUERY)
+    manager.process_query(QUERY)
+    assert counted_analysis == ["30318", "30318"]
+
+def test_ttl_cache_reuses_across_queries(counted_analysis):
+    """Test the cross-request cache serves repeat queries."""
+    manager = InferenceLayerManager(analysis_cache_ttl=60)
+    manager.process_query(QUERY)
+    manager.process_query(QUERY)
+    assert counted_analysis == ["30318"]
+
+def test_params_are_part_of_the_key():
+    """Test different parameters are computed separately."""
+    context = AnalysisContext()
+    compute = lambda zip_code, **params: {"zip": zip_code, **params}
+    assert context.get("30318", compute, rent=1000) == {"zip": "30318", "rent": 1000}
+    assert context.get("30318", compute, rent=2000) == {"zip": "30318", "rent": 2000}
+    assert context.get("30318", compute, rent=1000) == {"zip": "30318", "rent": 1000}
+    assert context.get_stats() == {"computed": 2, "reused": 1}
+
+def test_concurrent_callers_share_one_run():
+    """Test concurrent layers wait for the in-flight analysis."""
+    context = AnalysisContext()
+    calls = []
+
+    def compute(zip_code):
+        calls.append(zip_code)
+        time.sleep(0.05)
+        return {"zip": zip_code}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(context.get("30318", compute))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["30318"]
+    assert all(r is results[0] for r in results)
+
+def test_failure_is_not_memoized():
+    """Test a failed analysis is retried by the next caller."""
+    context = AnalysisContext(shared_cache=create_analysis_cache(60))
+    attempts = []
+
+    def compute(zip_code):
+        attempts.append(zip_code)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return {"zip": zip_code}
+
+    with pytest.raises(RuntimeError):
+        context.get("30318", compute)
+    assert context.get("30318", compute) == {"zip": "30318"}
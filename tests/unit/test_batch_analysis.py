@@ -0,0 +1,88 @@
+"""Unit tests for concurrent batch combined analysis."""
+import asyncio
+import importlib
+import sys
+import types
+from contextlib import aclosing
+import pytest
+
+@pytest.fixture
+def combine(monkeypatch):
+    # The real pipeline needs crawlers and models; the batch code only calls combined_analysis
+    pipeline = types.ModuleType("neighborhood_full_pipeline")
+    pipeline.run_neighborhood_analysis = None
+    monkeypatch.setitem(sys.modules, "neighborhood_full_pipeline", pipeline)
+    monkeypatch.delitem(sys.modules, "src.integration.combine_market_and_sentiment", raising=False)
+    return importlib.import_module("src.integration.combine_market_and_sentiment")
+
+def fake_analysis(monkeypatch, module, delays, running=None, cancelled=None):
+    running = running if running is not None else {"now": 0, "max": 0}
+
+    async def combined_analysis(zip_code, force_refresh=False):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        try:
+            await asyncio.sleep(delays[zip_code])
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(zip_code)
+            raise
+        finally:
+            running["now"] -= 1
+        if zip_code == "bad":
+            raise ValueError("no market data")
+        return {"zip": zip_code, "investment_score": 50}
+
+    monkeypatch.setattr(module, "combined_analysis", combined_analysis)
+    return running
+
+def test_concurrency_is_bounded(combine, monkeypatch):
+    """Test no more than `concurrency` ZIPs are analyzed at once."""
+    running = fake_analysis(monkeypatch, combine, {f"3030{i}": 0.02 for i in range(6)})
+    results = asyncio.run(combine.batch_analysis([f"3030{i}" for i in range(6)], concurrency=2))
+    assert len(results) == 6
+    assert running["max"] == 2
+
+def test_slow_zip_times_out_without_failing_batch(combine, monkeypatch):
+    """Test a ZIP over the per-ZIP timeout yields an error entry while the others complete."""
+    fake_analysis(monkeypatch, combine, {"30301": 0.01, "30302": 5, "30303": 0.01})
+    results = asyncio.run(combine.batch_analysis(["30301", "30302", "30303"], timeout=0.1))
+    assert results == [{"zip": "30301", "investment_score": 50}, {"zip": "30302", "error": "timeout"},
+                       {"zip": "30303", "investment_score": 50}]
+
+def test_results_stream_in_completion_order(combine, monkeypatch):
+    """Test iter_batch_analysis yields each ZIP as it finishes and reports progress."""
+    fake_analysis(monkeypatch, combine, {"30301": 0.06, "30302": 0.0, "30303": 0.03})
+    progress = []
+
+    async def collect():
+        return [result["zip"] async for result in combine.iter_batch_analysis(
+            ["30301", "30302", "30303"], progress_callback=lambda done, total, result: progress.append((done, total)))]
+
+    assert asyncio.run(collect()) == ["30302", "30303", "30301"]
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+def test_early_exit_cancels_remaining_analyses(combine, monkeypatch):
+    """Test closing the iterator early cancels analyses that are still running."""
+    cancelled = []
+    fake_analysis(monkeypatch, combine, {"30301": 0.0, "30302": 5, "30303": 5}, cancelled=cancelled)
+
+    async def first_only():
+        async with aclosing(combine.iter_batch_analysis(["30301", "30302", "30303"])) as results:
+            async for result in results:
+                break
+        await asyncio.sleep(0.01)
+        # Checked before asyncio.run() cancels whatever is left over
+        return result, sorted(cancelled)
+
+    result, cancelled_early = asyncio.run(first_only())
+    assert result["zip"] == "30301"
+    assert cancelled_early == ["30302", "30303"]
+
+def test_batch_keeps_failed_zips_in_place(combine, monkeypatch):
+    """Test batch_analysis returns failed ZIPs as error entries in input order."""
+    fake_analysis(monkeypatch, combine, {"30301": 0.02, "bad": 0.0, "30303": 0.01})
+    results = asyncio.run(combine.batch_analysis(["30301", "bad", "30303"]))
+    assert [result["zip"] for result in results] == ["30301", "bad", "30303"]
+    assert results[1] == {"zip": "bad", "error": "no market data"}
+    assert "error" not in results[0] and "error" not in results[2]
@@ -0,0 +1,211 @@
+"""Unit tests for the pooled Playwright crawler, against a local fixture server."""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from playwright.async_api import async_playwright
+from src.data_collection import browser_pool, neighborhood_crawler
+from src.data_collection.browser_pool import BrowserPool, RateLimiter, get_browser_pool
+from src.data_collection.neighborhood_crawler import NeighborhoodCrawler
+
+# Posts are rendered by script after a delay, like Reddit's client-side search
+SEARCH_PAGE = """<html><head><link rel="stylesheet" href="/style.css"></head><body>
+<img src="/banner.png"><video src="/clip.mp4"></video>
+<div id="results"></div>
+<script>
+setTimeout(function () {
+  var results = document.getElementById("results");
+  for (var i = 0; i < 4; i++) {
+    results.insertAdjacentHTML("beforeend",
+      '<div data-testid="post-container"><h3>Living in Midtown ' + i + ' (%s)</h3>' +
+      '<a data-click-id="body" href="/r/atlanta/%s/' + i + '">Great parks, safe streets</a></div>');
+  }
+}, 200);
+</script></body></html>"""
+
+class FixtureServer:
+    def __init__(self):
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                search = url.path == "/search"
+                with fixture._lock:
+                    fixture.requests.append(url.path)
+                    fixture.active += search
+                    fixture.max_active = max(fixture.max_active, fixture.active)
+                try:
+                    if search:
+                        time.sleep(0.2)
+                        query = parse_qs(url.query)["q"][0].replace(" ", "-")
+                        body, content_type = (SEARCH_PAGE % (query, query)).encode(), "text/html"
+                    else:
+                        body, content_type = b"", "text/css"
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with fixture._lock:
+                        fixture.active -= search
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def chromium_available():
+    async def launch():
+        async with async_playwright() as p:
+            browser = await p.chromium.launch()
+            await browser.close()
+
+    try:
+        asyncio.run(launch())
+        return True
+    except Exception:
+        return False
+
+requires_chromium = pytest.mark.skipif(not chromium_available(), reason="Chromium is not installed for Playwright")
+
+@pytest.fixture
+def fixture_server(monkeypatch):
+    server = FixtureServer()
+    monkeypatch.setattr(neighborhood_crawler, "REDDIT_SEARCH_URL", server.url + "/search?q={query}")
+    yield server
+    server.close()
+
+def test_pool_is_shared_per_event_loop():
+    """Test get_browser_pool returns one pool per running loop without launching a browser."""
+    async def pools():
+        return get_browser_pool(), get_browser_pool()
+
+    first, again = asyncio.run(pools())
+    other, _ = asyncio.run(pools())
+    assert first is again
+    assert first is not other
+    assert first.pages_opened == 0
+
+class FakePlaywright:
+    """Stands in for async_playwright(), recording what was launched and closed."""
+
+    def __init__(self):
+        self.events = []
+        self.chromium = self
+
+    def __call__(self):
+        return self
+
+    async def start(self):
+        self.events.append("start")
+        return self
+
+    async def stop(self):
+        self.events.append("stop")
+
+    async def launch(self, headless=True):
+        return self
+
+    async def new_context(self, user_agent=None):
+        return self
+
+    async def new_page(self):
+        return self
+
+    async def route(self, url, handler):
+        pass
+
+    def is_connected(self):
+        return True
+
+    async def close(self):
+        self.events.append("close")
+
+def test_browser_closes_when_its_loop_shuts_down(monkeypatch):
+    """Test each loop's launched browser is closed by asyncio.run without an explicit close."""
+    fake = FakePlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", fake)
+
+    async def crawl():
+        pool = get_browser_pool()
+        async with pool.page():
+            pass
+        return pool
+
+    pools = [asyncio.run(crawl()) for _ in range(3)]
+    assert len(set(map(id, pools))) == 3
+    assert all(pool._browser is None and pool._shutdown_guard is None for pool in pools)
+    assert fake.events.count("start") == fake.events.count("stop") == 3
+
+def test_explicit_close_is_not_repeated_at_loop_shutdown(monkeypatch):
+    """Test closing the pool early closes the browser once and a relaunch is closed again."""
+    fake = FakePlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", fake)
+
+    async def crawl():
+        pool = BrowserPool()
+        async with pool.page():
+            pass
+        await pool.close()
+        stopped = fake.events.count("stop")
+        async with pool.page():
+            pass
+        return stopped
+
+    assert asyncio.run(crawl()) == 1
+    assert fake.events.count("start") == fake.events.count("stop") == 2
+
+def test_rate_limiter_spaces_acquisitions():
+    """Test a token bucket lets a burst through at once and spaces the rest."""
+    async def acquire_times():
+        limiter = RateLimiter(per_minute=600, burst=2)
+        start = time.monotonic()
+        times = []
+        for _ in range(4):
+            await limiter.acquire()
+            times.append(time.monotonic() - start)
+        return times
+
+    times = asyncio.run(acquire_times())
+    assert times[1] < 0.05
+    assert 0.08 < times[2] < 0.2 and 0.18 < times[3] < 0.3
+
+@requires_chromium
+def test_crawl_reddit_reuses_browser_and_bounds_pages(tmp_path, fixture_server):
+    """Test crawls share one browser, run at most max_pages searches at once and skip images and media."""
+    async def crawl():
+        pool = BrowserPool(max_pages=2, rate_limits={})
+        crawler = NeighborhoodCrawler(str(tmp_path / "neighborhood.db"), browser_pool=pool)
+        try:
+            first = await crawler.crawl_reddit("Midtown", max_posts=9)
+            browser = pool._browser
+            second = await crawler.crawl_reddit("Midtown", max_posts=6)
+            return first, second, browser is pool._browser, pool.pages_opened
+        finally:
+            await crawler.close()
+
+    first, second, same_browser, pages_opened = asyncio.run(crawl())
+    assert len(first) == 9 and len(second) == 6
+    assert first[0]["url"] == "https://www.reddit.com/r/atlanta/Midtown-neighborhood-review/0"
+    assert [post["metadata"] for post in first[::3]] == [
+        '{"search_term": "Midtown neighborhood review"}', '{"search_term": "Midtown living"}',
+        '{"search_term": "moving to Midtown"}']
+    assert same_browser and pages_opened == 6
+    assert fixture_server.requests.count("/search") == 6
+    assert fixture_server.max_active == 2
+    assert "/banner.png" not in fixture_server.requests and "/clip.mp4" not in fixture_server.requests
+    assert "/style.css" in fixture_server.requests
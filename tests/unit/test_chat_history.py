@@ -0,0 +1,91 @@
+"""Unit tests for the chat history store."""
+import json
+import threading
+from src.utils.chat_history import ChatHistoryStore
+
+def test_latest_is_newest_first_per_user():
+    """Test latest() returns the newest entries for a user, newest first."""
+    store = ChatHistoryStore(None)
+    ids = [store.add(f"q{i}", {"type": "zip"}, user_id=["a", "b"][i % 2]) for i in range(10)]
+    assert [h["id"] for h in store.latest("a", limit=3)] == [ids[8], ids[6], ids[4]]
+    assert [h["id"] for h in store.latest(limit=2)] == [ids[9], ids[8]]
+    assert store.latest("a")[0] == {"id": ids[8], "query": "q8", "timestamp": store.get(ids[8])["timestamp"],
+                                    "result_type": "zip"}
+
+def test_retention_limits():
+    """Test per-user ring buffers and the global cap drop the oldest entries."""
+    store = ChatHistoryStore(None, max_entries=5, max_per_user=3)
+    a = [store.add(f"a{i}", {}, user_id="a") for i in range(4)]
+    assert store.get(a[0]) == {}
+    assert [h["query"] for h in store.latest("a")] == ["a3", "a2", "a1"]
+
+    b = [store.add(f"b{i}", {}, user_id="b") for i in range(3)]
+    assert len(store) == 5
+    assert [h["query"] for h in store.latest("a")] == ["a3", "a2"]
+    assert [h["id"] for h in store.latest("b")] == b[::-1]
+
+def test_clear_user_and_all():
+    """Test clearing one user's history and then everything."""
+    store = ChatHistoryStore(None)
+    for i in range(4):
+        store.add(f"q{i}", {}, user_id=["a", "b"][i % 2])
+    assert store.clear("a") == 2
+    assert store.latest("a") == []
+    assert len(store.latest()) == 2
+    assert store.clear() == 2
+    assert len(store) == 0
+
+def test_persistence_round_trip(tmp_path):
+    """Test batched appends, clears and reload reproduce the same history."""
+    path = tmp_path / "history.jsonl"
+    store = ChatHistoryStore(str(path), flush_interval=60)
+    ids = [store.add(f"q{i}", {"type": "zip", "n": i}, user_id=["a", "b"][i % 2]) for i in range(6)]
+    store.clear("b")
+    assert not path.exists()
+    store.close()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 7
+    reloaded = ChatHistoryStore(str(path), flush_interval=60)
+    assert reloaded.latest("a") == store.latest("a")
+    assert reloaded.latest("b") == []
+    assert reloaded.get(ids[4])["result"] == {"type": "zip", "n": 4}
+    reloaded.close()
+
+def test_compaction_and_legacy_import(tmp_path):
+    """Test the file is compacted when superseded and old JSON dicts load."""
+    legacy = tmp_path / "chat_history.json"
+    legacy.write_text(json.dumps({
+        "new": {"timestamp": "2025-05-02T00:00:00", "query": "later", "result": {}, "user_id": "a"},
+        "old": {"timestamp": "2025-05-01T00:00:00", "query": "earlier", "result": {}, "user_id": "a"}
+    }))
+    path = tmp_path / "history.jsonl"
+    store = ChatHistoryStore(str(path), max_per_user=2, flush_interval=60)
+    assert store.load(str(legacy))
+    assert [h["id"] for h in store.latest("a")] == ["new", "old"]
+
+    for i in range(20):
+        store.add(f"q{i}", {}, user_id="a")
+    store.close()
+    assert len(path.read_text().splitlines()) == 2
+
+def test_concurrent_adds_are_all_persisted(tmp_path):
+    """Test many threads logging at once lose no entries on disk."""
+    path = tmp_path / "history.jsonl"
+    store = ChatHistoryStore(str(path), max_entries=10000, max_per_user=1000, flush_interval=0.01, batch_size=50)
+
+    def worker(user):
+        for i in range(250):
+            store.add(f"{user}-{i}", {}, user_id=user)
+
+    threads = [threading.Thread(target=worker, args=(f"u{n}",)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.close()
+
+    reloaded = ChatHistoryStore(str(path), max_entries=10000, max_per_user=1000, flush_interval=60)
+    assert len(reloaded) == 2000
+    assert [h["query"] for h in reloaded.latest("u3", limit=2)] == ["u3-249", "u3-248"]
+    reloaded.close()
@@ -0,0 +1,90 @@
+"""Unit tests for CMA comparable search."""
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis.cma_analyzer import CMAAnalyzer
+from src.analysis.comps_index import CompsIndex, EARTH_RADIUS_MILES
+
+@pytest.fixture
+def properties():
+    """Create a synthetic comps dataset around Atlanta."""
+    rng = np.random.default_rng(3)
+    n = 5000
+    return pd.DataFrame({
+        'latitude': 33.75 + rng.normal(0, 0.05, n),
+        'longitude': -84.39 + rng.normal(0, 0.05, n),
+        'sqft': rng.integers(800, 4000, n),
+        'beds': rng.integers(1, 6, n),
+        'baths': rng.integers(1, 4, n),
+        'lot_size': rng.integers(2000, 20000, n),
+        'age': rng.integers(0, 80, n),
+        'condition': rng.integers(1, 6, n),
+        'price': rng.integers(150000, 900000, n)
+    })
+
+@pytest.fixture
+def market_data():
+    """Create six months of synthetic listings."""
+    rng = np.random.default_rng(4)
+    n = 600
+    return pd.DataFrame({
+        'period': rng.choice(pd.date_range('2024-01-01', periods=12, freq='MS'), n),
+        'days_on_market': rng.integers(5, 120, n),
+        'status': rng.choice(['active', 'sold'], n),
+        'price': rng.integers(150000, 900000, n)
+    })
+
+def make_target(properties, i):
+    target = properties.iloc[i].drop('price').to_dict()
+    target['latitude'] += 0.001
+    target['list_price'] = 400000
+    return target
+
+def haversine_miles(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.deg2rad, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+def test_radius_query_matches_brute_force(properties):
+    """Test the index returns exactly the properties within the radius."""
+    index = CompsIndex(properties)
+    for lat, lon in [(33.75, -84.39), (33.8, -84.3)]:
+        positions, distances = index.query_radius(lat, lon, 1.0)[0]
+        brute = haversine_miles(lat, lon, properties['latitude'].values, properties['longitude'].values)
+        expected = np.flatnonzero(brute <= 1.0)
+        assert positions.tolist() == expected.tolist()
+        np.testing.assert_allclose(distances, brute[expected], atol=1e-9)
+
+def test_missing_coordinates_are_skipped(properties):
+    """Test rows without coordinates never match."""
+    properties.loc[0, 'latitude'] = np.nan
+    positions, _ = CompsIndex(properties).query_radius(33.75, -84.39, 50.0)[0]
+    assert 0 not in positions
+    assert len(positions) == len(properties) - 1
+
+def test_generate_cma_does_not_mutate_input(properties, market_data):
+    """Test comps search leaves the caller's DataFrame untouched."""
+    columns = list(properties.columns)
+    report = CMAAnalyzer().generate_cma(make_target(properties, 0), properties, market_data)
+    assert list(properties.columns) == columns
+    assert 0 < len(report['comparable_properties']) <= 5
+    assert all(c['distance'] <= 1.0 for c in report['comparable_properties'])
+
+def test_index_is_reused(properties):
+    """Test the spatial index is built once per dataset."""
+    analyzer = CMAAnalyzer()
+    assert analyzer.get_comps_index(properties) is analyzer.get_comps_index(properties)
+    assert analyzer.get_comps_index(properties.copy()) is not analyzer.get_comps_index(properties)
+
+def test_batch_matches_single(properties, market_data):
+    """Test generate_cma_batch produces the same reports as generate_cma."""
+    analyzer = CMAAnalyzer()
+    targets = [make_target(properties, i) for i in range(10)]
+    batch = analyzer.generate_cma_batch(targets, properties, market_data)
+
+    assert len(batch) == len(targets)
+    for target, report in zip(targets, batch):
+        single = analyzer.generate_cma(target, properties, market_data)
+        assert report['comparable_properties'] == single['comparable_properties']
+        assert report['value_analysis'] == single['value_analysis']
+        assert report['recommendations'] == single['recommendations']
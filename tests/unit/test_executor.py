@@ -0,0 +1,40 @@
+"""Unit tests for the bounded request executor."""
+import asyncio
+import threading
+import pytest
+from src.utils.executor import BoundedExecutor, ExecutorSaturated
+
+def test_rejects_when_full():
+    """Test work beyond max_pending is rejected with a retry hint."""
+    executor = BoundedExecutor(max_workers=1, max_pending=2, retry_after=3)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated) as exc:
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.gather(*running)
+        return exc.value
+
+    assert asyncio.run(scenario()).retry_after == 3
+    assert executor.get_stats()["rejected"] == 1
+    assert executor.get_stats()["pending"] == 0
+
+def test_timeout_keeps_slot_until_work_finishes():
+    """Test a timed-out job still counts against the cap while it runs."""
+    executor = BoundedExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(release.wait, timeout=0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.sleep(0.05)
+        return await executor.run(lambda x: x * 2, 21)
+
+    assert asyncio.run(scenario()) == 42
+    assert executor.get_stats()["timed_out"] == 1
@@ -0,0 +1,73 @@
+"""Unit tests for the content-addressed export cache."""
+import os
+import time
+from src.utils.export_cache import ExportCache, export_key, etag_matches
+
+def make_render(calls, size=100):
+    def render(output_dir):
+        calls.append(output_dir)
+        path = os.path.join(output_dir, f"report_{len(calls)}.csv")
+        with open(path, "w") as f:
+            f.write("x" * size)
+        return path
+    return render
+
+def test_identical_inputs_render_once(tmp_path):
+    """Test repeat exports reuse the cached artifact."""
+    cache = ExportCache(str(tmp_path))
+    calls = []
+    key = export_key("csv", zip="30318", summary="Strong", scores={"Market Score": 70})
+    first = cache.get_or_create(key, make_render(calls))
+    assert cache.get_or_create(key, make_render(calls)) == first
+    assert len(calls) == 1
+    assert os.path.basename(first) == key + ".csv"
+    assert os.listdir(tmp_path) == [key + ".csv"]
+
+def test_key_depends_on_inputs_not_order():
+    """Test keys are stable across dict ordering and change with content."""
+    a = export_key("csv", zip="30318", scores={"a": 1, "b": 2})
+    assert a == export_key("csv", scores={"b": 2, "a": 1}, zip="30318")
+    assert a != export_key("json", zip="30318", scores={"a": 1, "b": 2})
+    assert a != export_key("csv", zip="30318", scores={"a": 1, "b": 3})
+
+def test_lru_eviction_under_size_cap(tmp_path):
+    """Test the least recently used artifacts are removed past max_bytes."""
+    cache = ExportCache(str(tmp_path), max_bytes=250)
+    calls = []
+    keys = [export_key("csv", zip=str(i)) for i in range(3)]
+    cache.get_or_create(keys[0], make_render(calls))
+    cache.get_or_create(keys[1], make_render(calls))
+    cache.get(keys[0])
+    cache.get_or_create(keys[2], make_render(calls))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) and cache.get(keys[2])
+    assert cache.get_stats()["total_bytes"] == 200
+    assert sorted(os.listdir(tmp_path)) == sorted(k + ".csv" for k in (keys[0], keys[2]))
+
+def test_index_survives_restart(tmp_path):
+    """Test a new cache instance picks up artifacts and recency from disk."""
+    calls = []
+    cache = ExportCache(str(tmp_path), max_bytes=250)
+    old, new = export_key("csv", zip="old"), export_key("csv", zip="new")
+    cache.get_or_create(old, make_render(calls))
+    time.sleep(0.01)
+    cache.get_or_create(new, make_render(calls))
+
+    reopened = ExportCache(str(tmp_path), max_bytes=150)
+    assert reopened.get(old) is None
+    assert reopened.get(new)
+
+def test_failed_render_is_not_cached(tmp_path):
+    """Test a render that returns no file leaves nothing behind."""
+    cache = ExportCache(str(tmp_path))
+    assert cache.get_or_create(export_key("pdf", zip="30318"), lambda output_dir: "") == ""
+    assert os.listdir(tmp_path) == []
+
+def test_etag_matching():
+    """Test If-None-Match parsing."""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+    assert not etag_matches(None, '"abc"')
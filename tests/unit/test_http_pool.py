@@ -0,0 +1,163 @@
+"""Unit tests for the shared HTTP pools, against a local fixture server."""
+import asyncio
+import gc
+import threading
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import aiohttp
+import pytest
+from src.integrations.http_pool import AsyncHTTPPool, HTTPPoolConfig, SyncHTTPPool
+
+# Queued in place of a status: read the request, then close without answering
+DROP = 0
+
+class FixtureServer:
+    """Answers with the next queued status for each path, then 200."""
+
+    def __init__(self):
+        self.requests = []
+        self.statuses = {}
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                fixture.requests.append((self.command, self.path))
+                queued = fixture.statuses.get(self.path, [])
+                status = queued.pop(0) if queued else 200
+                if status == DROP:
+                    self.close_connection = True
+                    return
+                body = b'{"ok": true}'
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = respond
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def server():
+    fixture = FixtureServer()
+    yield fixture
+    fixture.close()
+
+def no_backoff(retries=2):
+    return HTTPPoolConfig(retries=retries, backoff_factor=0, max_backoff=0)
+
+def test_async_sessions_close_with_their_loop(server):
+    """Test each asyncio.run reuses one session and closes it when the loop shuts down."""
+    pool = AsyncHTTPPool(no_backoff())
+    sessions = []
+
+    async def fetch_twice():
+        first = await pool.get(server.url + "/a")
+        second = await pool.get(server.url + "/b")
+        sessions.append(await pool._get_session())
+        return first.status, second.json()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for _ in range(5):
+            assert asyncio.run(fetch_twice()) == (200, {"ok": True})
+        gc.collect()
+
+    assert len(set(map(id, sessions))) == 5
+    assert all(session.closed for session in sessions)
+    assert not [w for w in caught if "Unclosed" in str(w.message)]
+    assert len(pool._sessions) == 0
+
+def test_async_close_releases_session(server):
+    """Test closing the pool on a loop closes that loop's session."""
+    pool = AsyncHTTPPool(no_backoff())
+
+    async def fetch_and_close():
+        await pool.get(server.url + "/a")
+        session = await pool._get_session()
+        await pool.close()
+        return session
+
+    assert asyncio.run(fetch_and_close()).closed
+
+def test_async_retries_retryable_statuses(server):
+    """Test 5xx responses are retried until one succeeds or retries run out."""
+    pool = AsyncHTTPPool(no_backoff(retries=2))
+    server.statuses = {"/flaky": [503, 502], "/down": [503, 503, 503, 503]}
+
+    async def fetch():
+        return (await pool.get(server.url + "/flaky")).status, (await pool.get(server.url + "/down")).status
+
+    assert asyncio.run(fetch()) == (200, 503)
+    assert server.requests.count(("GET", "/flaky")) == 3
+    assert server.requests.count(("GET", "/down")) == 3
+
+def test_async_pool_does_not_retry_posts_after_a_response(server):
+    """Test a 5xx POST is returned as-is, while a 5xx GET is retried."""
+    pool = AsyncHTTPPool(no_backoff(retries=3))
+    server.statuses = {"/complete": [500], "/quote": [503, 200]}
+
+    async def fetch():
+        posted = await pool.post(server.url + "/complete", json={"prompt": "hi"})
+        return posted.status, (await pool.get(server.url + "/quote")).status
+
+    assert asyncio.run(fetch()) == (500, 200)
+    assert server.requests.count(("POST", "/complete")) == 1
+    assert server.requests.count(("GET", "/quote")) == 2
+
+def test_async_pool_does_not_retry_posts_cut_off_by_the_server(server):
+    """Test a POST the server received and then dropped is raised, not re-sent."""
+    pool = AsyncHTTPPool(no_backoff(retries=2))
+    server.statuses = {"/complete": [DROP], "/quote": [DROP, 200]}
+
+    async def fetch():
+        with pytest.raises(aiohttp.ServerDisconnectedError):
+            await pool.post(server.url + "/complete", json={"prompt": "hi"})
+        return (await pool.get(server.url + "/quote")).status
+
+    assert asyncio.run(fetch()) == 200
+    assert server.requests.count(("POST", "/complete")) == 1
+    assert server.requests.count(("GET", "/quote")) == 2
+
+def test_sync_pool_does_not_retry_posts_after_a_response(server):
+    """Test a 5xx POST is returned as-is, while a 5xx GET is retried."""
+    pool = SyncHTTPPool(no_backoff(retries=3))
+    server.statuses = {"/complete": [500], "/quote": [503, 200]}
+    try:
+        assert pool.post(server.url + "/complete", json={"prompt": "hi"}).status_code == 500
+        assert pool.get(server.url + "/quote").status_code == 200
+    finally:
+        pool.close()
+
+    assert server.requests.count(("POST", "/complete")) == 1
+    assert server.requests.count(("GET", "/quote")) == 2
+
+def test_sync_pool_applies_default_timeout_unless_given(server, monkeypatch):
+    """Test requests get the pool's timeouts and callers can pass a longer one."""
+    pool = SyncHTTPPool(HTTPPoolConfig(connect_timeout=2.0, total_timeout=7.0))
+    timeouts = []
+    send = pool.session.request
+
+    def request(method, url, **kwargs):
+        timeouts.append(kwargs["timeout"])
+        return send(method, url, **kwargs)
+
+    monkeypatch.setattr(pool.session, "request", request)
+    try:
+        pool.get(server.url + "/a")
+        pool.post(server.url + "/b", timeout=(2.0, 300.0))
+    finally:
+        pool.close()
+    assert timeouts == [(2.0, 7.0), (2.0, 300.0)]
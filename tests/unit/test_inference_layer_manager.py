@@ -0,0 +1,60 @@
+"""Unit tests for concurrent inference layer execution."""
+import time
+from src.inference.inference_layer_manager import InferenceLayerManager
+
+QUERY = "How has 30318 changed over the past 5 years, what are conditions now, and what is the forecast for the next 12 months?"
+
+class StubLayer:
+    """Layer that sleeps before answering."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+
+    def process_query(self, query, context=None):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"layer": self.name, "query": query, "insights": [{"text": self.name}], "results": {}}
+
+def make_manager(layer_timeouts=None, **layers):
+    manager = InferenceLayerManager(analysis_cache_ttl=0, layer_timeouts=layer_timeouts)
+    for name, layer in manager.layers.items():
+        layer.process_query = layers.get(name, StubLayer(name)).process_query
+    return manager
+
+def test_layers_run_concurrently():
+    """Test layer latency overlaps rather than adds up."""
+    manager = make_manager(**{name: StubLayer(name, 0.2) for name in ("past", "present", "future")})
+    start = time.monotonic()
+    result = manager.process_query(QUERY)
+    assert time.monotonic() - start < 0.45
+    assert sorted(result["layers_used"]) == ["future", "past", "present"]
+    assert result["timed_out_layers"] == []
+    assert all(ms >= 190 for ms in result["layer_latency_ms"].values())
+
+def test_slow_layer_times_out_with_partial_result():
+    """Test a slow layer is dropped and flagged without blocking the others."""
+    manager = make_manager(layer_timeouts={"future": 0.1}, future=StubLayer("future", 1.0))
+    start = time.monotonic()
+    result = manager.process_query(QUERY)
+    assert time.monotonic() - start < 0.5
+    assert sorted(result["layers_used"]) == ["past", "present"]
+    assert result["timed_out_layers"] == ["future"]
+    assert set(result["layer_latency_ms"]) == {"past", "present", "future"}
+
+def test_layer_error_becomes_error_result():
+    """Test a failing layer doesn't take down the whole query."""
+    manager = make_manager(past=StubLayer("past", error=RuntimeError("no history")))
+    result = manager.process_query(QUERY)
+    assert result["temporal_analysis"]["past"]["error"] == "no history"
+    assert "insights" in result["temporal_analysis"]["present"]
+
+def test_single_layer_reports_latency():
+    """Test single-layer answers also carry latency and timeout flags."""
+    manager = make_manager(layer_timeouts={"present": 0.05}, present=StubLayer("present", 0.5))
+    result = manager.process_query("What is the current median price in 30318?")
+    assert result["timed_out_layers"] == ["present"]
+    assert "error" in result
+    assert "present" in result["layer_latency_ms"]
@@ -0,0 +1,72 @@
+"""Unit tests for lazy analyzer singletons."""
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from src.modules.singleton import LazySingleton
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_builds_once_under_concurrency():
+    """Test concurrent first use constructs a single instance."""
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    singleton = LazySingleton(factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(singleton.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+def test_failed_build_is_retried():
+    """Test a factory error is raised and the next call tries again."""
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("data missing")
+        return "ready"
+
+    singleton = LazySingleton(factory)
+    try:
+        singleton.get()
+    except RuntimeError:
+        pass
+    assert not singleton.loaded
+    assert singleton.get() == "ready"
+
+def test_import_does_not_load_data():
+    """Test importing analyzer modules in a fresh interpreter defers loading until first access."""
+    script = textwrap.dedent("""
+        import json
+        from src.modules import zillow_store, market_trend, market_economics, extended_market_metrics
+        modules = (market_trend, market_economics, extended_market_metrics)
+        state = {"imported": [m._analyzer.loaded for m in modules], "datasets": len(zillow_store._datasets)}
+        analyzer = market_trend.analyzer
+        state["accessed"] = [m._analyzer.loaded for m in modules]
+        state["same"] = analyzer is market_trend.get_analyzer()
+        state["datasets_after"] = len(zillow_store._datasets)
+        print(json.dumps(state))
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    state = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert state["imported"] == [False, False, False]
+    assert state["datasets"] == 0
+    assert state["accessed"] == [True, False, False]
+    assert state["same"]
+    assert state["datasets_after"] > 0
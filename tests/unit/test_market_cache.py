@@ -1,4 +1,7 @@
 """Unit tests for market cache."""
+import asyncio
+import json
+import zlib
 import pytest
 from src.cache.market_cache import MarketCache
 
@@ -61,10 +64,46 @@ def test_cache_stats(market_cache, mock_redis):
     assert stats['total_keys'] == 2  # From mock dbsize
     assert round(stats['hit_rate'], 2) == 0.91  # From mock hits/misses
 
-@pytest.mark.skip(reason="Cleanup test is not implemented")
-def test_cleanup(market_cache):
-    """Test cache cleanup."""
-    pass
+def test_cleanup(market_cache, mock_redis):
+    """Test cache cleanup evicts through the index, not a keyspace scan."""
+    mock_redis.hgetall.return_value = {b'ma': b'1000', b'p': b'0'}
+    mock_redis.register_script.return_value.return_value = [5, 1000]
+    mock_redis.info.return_value['used_memory'] = 600 * 1024 * 1024
+    
+    market_cache._cleanup_expired()
+    
+    mock_redis.keys.assert_not_called()
+    assert market_cache.evictor.stats['evicted_keys'] == 5
+
+def test_write_over_budget_evicts_and_drops_l1(market_cache, mock_redis):
+    """Test a write that takes a prefix over budget evicts cold keys from Redis and L1."""
+    market_cache.cache_property_data('cold', 'mls', {'price': 1})
+    cold_key = 'p:mls:cold'
+    assert market_cache.l1.get(cold_key) is not None
+    budget = market_cache.evictor.budgets['p']
+    evictions = [[1, budget // 2, cold_key.encode()], [0, 0]]
+
+    def script(args):
+        # Index writes report the prefix total; evictions pop the queued batches
+        if len(args) == 4:
+            return budget + 1
+        return evictions.pop(0) if evictions else [0, 0]
+
+    mock_redis.register_script.return_value.side_effect = script
+    mock_redis.hgetall.return_value = {b'p': str(budget + 1).encode()}
+    market_cache.cache_property_data('hot', 'mls', {'price': 2})
+
+    assert market_cache.evictor.stats['evicted_keys'] == 1
+    mock_redis.unlink.assert_called_once_with(cold_key.encode())
+    # The write path only evicts; the full reconcile pass is left to periodic cleanup
+    mock_redis.zscan_iter.assert_not_called()
+    assert market_cache.l1.get(cold_key) is None
+    assert market_cache.get_property_data('hot', 'mls')['price'] == 2
+
+def test_redis_only_evicts_keys_with_ttl(mock_redis):
+    """Test startup picks a volatile policy so Redis never evicts the untimed eviction index."""
+    MarketCache({'max_memory_mb': 512})
+    mock_redis.config_set.assert_any_call('maxmemory-policy', 'volatile-lru')
 
 @pytest.mark.parametrize("property_id,metric,timeframe", [
     ('12345', 'price', '1y'),
@@ -78,3 +117,54 @@ def test_market_trends(market_cache, mock_redis, property_id, metric, timeframe)
     
     result = market_cache.get_market_trends(property_id, metric, timeframe)
     assert result == data
+
+def test_l1_serves_repeat_reads(market_cache, mock_redis):
+    """Test repeat reads are served from the in-process tier."""
+    data = {'values': [1, 2, 3]}
+    mock_redis.get.return_value = market_cache._compress_data(data)
+    
+    assert market_cache.get_property_data('12345', 'mls') == data
+    assert market_cache.get_property_data('12345', 'mls') == data
+    assert mock_redis.get.call_count == 1
+    
+    stats = market_cache.get_tier_stats()
+    assert stats['l1']['hits'] == 1
+    assert stats['l2']['hits'] == 1
+
+def test_invalidation_clears_l1(market_cache, mock_redis):
+    """Test invalidation drops in-process entries too."""
+    market_cache.cache_property_data('12345', 'mls', {'price': 100000})
+    market_cache.invalidate_property('12345')
+    
+    assert market_cache.get_property_data('12345', 'mls') is None
+
+def test_concurrent_misses_coalesce(market_cache):
+    """Test concurrent misses for the same key compute once."""
+    calls = 0
+    
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {'score': 42}
+    
+    async def run():
+        return await asyncio.gather(*[
+            market_cache.get_or_compute_market_analysis(
+                '90210', 'price_trends', {'timeframe': '1y'}, compute
+            )
+            for _ in range(10)
+        ])
+    
+    results = asyncio.run(run())
+    assert calls == 1
+    assert all(r['score'] == 42 for r in results)
+    assert market_cache.get_tier_stats()['coalescing']['coalesced'] == 9
+
+def test_decodes_legacy_payloads(market_cache):
+    """Test entries written before the codec header still decode."""
+    data = {'test': 'data', 'values': list(range(50))}
+    raw = json.dumps(data, separators=(',', ':')).encode()
+    
+    assert market_cache._decompress_data(raw) == data
+    assert market_cache._decompress_data(zlib.compress(raw)) == data
@@ -0,0 +1,54 @@
+"""Unit tests for market trend scoring."""
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from src.modules.market_trend import MarketTrendAnalyzer
+from src.modules.zillow_store import clear_datasets
+
+@pytest.fixture
+def trend_analyzer(tmp_path):
+    """Create an analyzer over random price histories with gaps."""
+    clear_datasets()
+    rng = np.random.default_rng(7)
+    months = pd.period_range("2018-01", periods=60, freq="M").astype(str)
+    growth = rng.uniform(-0.01, 0.08, size=(40, 1))
+    noise = rng.normal(0, rng.uniform(0.001, 0.12, size=(40, 1)), size=(40, 60))
+    prices = 300000 * np.cumprod(1 + growth + noise, axis=1)
+    prices[rng.random(prices.shape) < 0.1] = np.nan   # scattered missing months
+    prices[0, :52] = np.nan                          # too little history
+
+    df = pd.DataFrame(prices, columns=months)
+    df.insert(0, "RegionName", [f"Metro {i}" for i in range(40)])
+    path = tmp_path / "Metro_zhvi.csv"
+    df.to_csv(path, index=False)
+    yield MarketTrendAnalyzer(str(path))
+    clear_datasets()
+
+@pytest.mark.parametrize("months", [12, 36, 60])
+def test_batch_matches_single_region(trend_analyzer, months):
+    """Test score_all_regions agrees with get_trend_score for every region."""
+    scores = trend_analyzer.score_all_regions(months=months)
+    assert len(scores) == 40
+
+    for region, row in scores.iterrows():
+        single = trend_analyzer.get_trend_score(region, months=months)
+        if single.trend_score is None:
+            assert math.isnan(row["trend_score"])
+            assert single.note.startswith("Insufficient data")
+            continue
+        assert row["trend_score"] == single.trend_score
+        assert row["avg_appreciation"] == single.avg_appreciation
+        assert row["volatility"] == single.volatility
+        assert row["note"] == single.note
+
+def test_single_region_matches_reference(trend_analyzer):
+    """Test the kernel reproduces the per-region dropna/diff computation."""
+    row = trend_analyzer.trend_store.row("metro 5")
+    series = row[~np.isnan(row)][-36:]
+    changes = np.diff(series) / series[:-1]
+
+    result = trend_analyzer.get_trend_score("Metro 5")
+    assert result.avg_appreciation == round(float(np.mean(changes)), 4)
+    assert result.volatility == round(float(np.std(changes)), 4)
+    assert result.raw_data["price_history"] == series.tolist()
@@ -0,0 +1,261 @@
+"""Unit tests for the shared neighborhood database layer."""
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+import pytest
+from src.data_management.neighborhood_db import NeighborhoodDB, SCHEMA_VERSION, get_neighborhood_db
+from src.analysis import sentiment_analyzer
+from src.analysis.sentiment_analyzer import ANALYZED_POST_COLUMNS, SentimentAnalyzer
+from src.advanced.refresh_agent import SentimentRefreshAgent
+from src.advanced.reputation_index import ReputationIndex
+
+def make_post(neighborhood, i, days_ago=0):
+    return {"neighborhood": neighborhood, "source": "reddit", "title": f"Post {i}",
+            "content": "Great parks and safe streets", "url": f"https://example.com/{i}",
+            "post_date": None, "crawl_date": (datetime.now() - timedelta(days=days_ago, seconds=i)).isoformat(),
+            "metadata": "{}"}
+
+def test_migrates_legacy_cache_table(tmp_path):
+    """Test the crawler's old neighborhood_cache table gains city and refresh_status."""
+    path = str(tmp_path / "neighborhood.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE neighborhood_cache (neighborhood TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                 "last_updated TEXT NOT NULL)")
+    conn.execute("INSERT INTO neighborhood_cache VALUES ('30318', '{}', '2025-05-01T00:00:00')")
+    conn.commit()
+    conn.close()
+
+    db = NeighborhoodDB(path)
+    assert db.query_one("PRAGMA user_version")[0] == SCHEMA_VERSION
+    assert db.query_one("PRAGMA journal_mode")[0] == "wal"
+    assert db.get_cache_entry("30318") == ("{}", "2025-05-01T00:00:00", None, "idle")
+    db.put_cache_entry("30318", "Atlanta", "{}", "2025-05-02T00:00:00")
+    assert db.get_cache_entry("30318")[2] == "Atlanta"
+    db.close()
+
+    # Reopening doesn't re-run migrations
+    reopened = NeighborhoodDB(path)
+    assert reopened.query_one("PRAGMA user_version")[0] == SCHEMA_VERSION
+    reopened.close()
+
+def test_queries_use_indexes(tmp_path):
+    """Test post and refresh queries are served by the secondary indexes."""
+    db = NeighborhoodDB(str(tmp_path / "neighborhood.db"))
+    plan = " ".join(row[3] for row in db.query(
+        "EXPLAIN QUERY PLAN SELECT * FROM neighborhood_posts WHERE neighborhood = ? AND crawl_date > ? "
+        "ORDER BY crawl_date DESC", ("30318", "2025")))
+    assert "idx_posts_neighborhood_crawl_date" in plan
+    assert "TEMP B-TREE" not in plan
+    plan = " ".join(row[3] for row in db.query(
+        "EXPLAIN QUERY PLAN SELECT neighborhood FROM refresh_tracking WHERE status = 'idle' "
+        "ORDER BY last_refresh", ()))
+    assert "idx_refresh_tracking_status_last_refresh" in plan
+    db.close()
+
+def test_connections_are_pooled_per_thread(tmp_path):
+    """Test each thread reuses one connection and threads don't share."""
+    db = NeighborhoodDB(str(tmp_path / "neighborhood.db"))
+    seen = {}
+
+    def worker(name):
+        seen[name] = (db.conn, db.conn)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(first is second for first, second in seen.values())
+    assert len({id(first) for first, _ in seen.values()}) == 4
+    assert get_neighborhood_db(str(tmp_path / "neighborhood.db")) is get_neighborhood_db(str(tmp_path / "neighborhood.db"))
+    db.close()
+
+def test_concurrent_readers_and_writer(tmp_path):
+    """Test a writer thread and reader threads run together without errors or lost rows."""
+    db = NeighborhoodDB(str(tmp_path / "neighborhood.db"))
+    errors = []
+
+    def writer():
+        try:
+            for batch in range(20):
+                db.insert_posts([make_post("30318", batch * 10 + i) for i in range(10)])
+                db.record_access("30318", "Atlanta", datetime.now().isoformat())
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(50):
+                db.get_posts("30318", since=(datetime.now() - timedelta(days=1)).isoformat())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(db.get_posts("30318")) == 200
+    assert db.query_one("SELECT access_count FROM refresh_tracking WHERE neighborhood = '30318'")[0] == 20
+    db.close()
+
+def test_components_share_database(tmp_path):
+    """Test the analyzer, refresh agent and reputation index read each other's rows."""
+    path = str(tmp_path / "neighborhood.db")
+    db = get_neighborhood_db(path)
+    db.insert_posts([make_post("30318", i) for i in range(4)] + [make_post("30318", 9, days_ago=60)])
+    db.put_cache_entry("30318", "Atlanta", json.dumps({"post_count": 5}), datetime.now().isoformat())
+
+    analyzer = SentimentAnalyzer(path)
+    analysis = analyzer.analyze_neighborhood("30318")
+    assert analyzer._get_cached_analysis("30318") == analysis
+
+    agent = SentimentRefreshAgent(path)
+    cached = agent.get_cached_sentiment("30318")
+    assert cached["city"] == "Atlanta"
+    assert cached["analysis"] == analysis
+    agent._update_refresh_tracking("30318", "Atlanta")
+    row = db.query_one("SELECT access_count, status, last_refresh FROM refresh_tracking WHERE neighborhood = '30318'")
+    assert row[0] == 1 and row[1] == "idle" and row[2]
+    assert agent.get_neighborhoods_to_refresh() == [("30318", "Atlanta")]
+
+    index = ReputationIndex(path).compute_reputation_index("30318")
+    assert index["volume"] == 5
+    assert ReputationIndex(path).get_stored_index("30318")["index_score"] == index["score"]
+
+def test_recrawled_posts_are_deduplicated(tmp_path):
+    """Test re-inserting posts updates the existing rows instead of duplicating them."""
+    db = NeighborhoodDB(str(tmp_path / "neighborhood.db"))
+    first = [make_post("30318", i, days_ago=2) for i in range(10)]
+    no_url = dict(make_post("30318", 99, days_ago=2), url=None)
+    assert db.insert_posts(first + [no_url], batch_size=4) == 11
+
+    recrawl = [dict(make_post("30318", i), content="Updated") for i in range(5, 15)] + [dict(no_url)]
+    db.insert_posts(recrawl)
+
+    posts = db.get_posts("30318")
+    assert len(posts) == 16
+    by_url = {p["url"]: p for p in posts}
+    assert by_url["https://example.com/7"]["content"] == "Updated"
+    assert by_url["https://example.com/2"]["content"] == "Great parks and safe streets"
+    # The same URL in another neighborhood is a different post
+    db.insert_posts([make_post("30309", 1)])
+    assert len(db.get_posts("30309")) == 1
+    db.close()
+
+def test_migration_removes_existing_duplicates(tmp_path):
+    """Test upgrading a database with duplicate crawls keeps the newest copy of each post."""
+    path = str(tmp_path / "neighborhood.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE neighborhood_posts (id INTEGER PRIMARY KEY AUTOINCREMENT, neighborhood TEXT NOT NULL, "
+                 "source TEXT NOT NULL, title TEXT, content TEXT NOT NULL, url TEXT, post_date TEXT, "
+                 "crawl_date TEXT NOT NULL, metadata TEXT)")
+    for crawl_date in ("2025-05-01", "2025-05-03", "2025-05-02"):
+        conn.executemany("INSERT INTO neighborhood_posts (neighborhood, source, title, content, url, crawl_date) "
+                         "VALUES (?, 'reddit', 't', ?, ?, ?)",
+                         [("30318", crawl_date, f"https://example.com/{i}", crawl_date) for i in range(3)])
+    conn.commit()
+    conn.close()
+
+    db = NeighborhoodDB(path)
+    posts = db.get_posts("30318")
+    assert len(posts) == 3
+    assert {p["crawl_date"] for p in posts} == {"2025-05-03"}
+    db.insert_posts([dict(make_post("30318", 0), url="https://example.com/0")])
+    assert len(db.get_posts("30318")) == 3
+    db.close()
+
+def test_iter_posts_streams_rows(tmp_path):
+    """Test iter_posts yields the same posts as get_posts, in batches and with column subsets."""
+    db = NeighborhoodDB(str(tmp_path / "neighborhood.db"))
+    db.insert_posts([make_post("30318", i, days_ago=i % 3) for i in range(25)])
+    since = (datetime.now() - timedelta(days=1, hours=12)).isoformat()
+
+    assert list(db.iter_posts("30318", batch_size=4)) == db.get_posts("30318")
+    streamed = list(db.iter_posts("30318", since=since, columns=("id", "title")))
+    assert [p["id"] for p in streamed] == [p["id"] for p in db.get_posts("30318", since=since)]
+    assert set(streamed[0]) == {"id", "title"}
+    with pytest.raises(ValueError):
+        next(db.iter_posts("30318", columns=("id", "1; DROP TABLE neighborhood_posts")))
+    db.close()
+
+def test_post_shard_keys_partition_posts(tmp_path):
+    """Test shards bounded by post_shard_keys cover every post once, in read order."""
+    db = NeighborhoodDB(str(tmp_path / "neighborhood.db"))
+    # Equal crawl dates force the id tie-break
+    db.insert_posts([dict(make_post("30318", i), crawl_date="2025-05-01T00:00:00" if i % 2 else
+                          make_post("30318", i)["crawl_date"]) for i in range(23)])
+    keys = db.post_shard_keys("30318", 5)
+    assert len(keys) == 5
+    shards = [[p["id"] for p in db.iter_posts("30318", columns=("id",), start=start, stop=stop)]
+              for start, stop in zip(keys, keys[1:] + [None])]
+    assert [len(shard) for shard in shards] == [5, 5, 5, 5, 3]
+    assert sum(shards, []) == [p["id"] for p in db.iter_posts("30318", columns=("id",))]
+    assert db.post_shard_keys("nowhere", 5) == []
+    db.close()
+
+def test_parallel_analysis_matches_serial(tmp_path):
+    """Test analyze_neighborhoods across worker processes equals analyze_neighborhood."""
+    path = str(tmp_path / "neighborhood.db")
+    db = get_neighborhood_db(path)
+    contents = ["Great parks and safe streets", "Not safe at night, traffic is terrible",
+                "Rent is expensive but the schools are good", "Quiet, clean and friendly neighbors"]
+    for n, neighborhood in enumerate(["30318", "30309", "30307"]):
+        db.insert_posts([dict(make_post(neighborhood, i), content=contents[(i + n) % 4]) for i in range(12 + 7 * n)])
+
+    analyzer = SentimentAnalyzer(path)
+    parallel = analyzer.analyze_neighborhoods(["30318", "30309", "30307", "00000"], force_refresh=True,
+                                              workers=2, shard_size=4)
+    for neighborhood in ["30318", "30309", "30307", "00000"]:
+        serial = analyzer.analyze_neighborhood(neighborhood, force_refresh=True)
+        assert {k: v for k, v in parallel[neighborhood].items() if k != "analysis_date"} == \
+            {k: v for k, v in serial.items() if k != "analysis_date"}
+    assert parallel["00000"]["post_count"] == 0
+    assert analyzer.analyze_neighborhoods(["30318"], workers=1)["30318"] == analyzer._get_cached_analysis("30318")
+
+def test_incremental_aggregates_match_full_recompute(tmp_path, monkeypatch):
+    """Test refreshing the stored aggregate with new, re-crawled, aged-out and edited posts equals recomputing it."""
+    path = str(tmp_path / "neighborhood.db")
+    db = get_neighborhood_db(path)
+    contents = ["Great parks and safe streets", "Not safe at night, traffic is terrible",
+                "Rent is expensive but the schools are good", "Quiet, clean and friendly neighbors"]
+
+    def posts(ids, days_ago=lambda i: i % 20):
+        return [dict(make_post("30318", i, days_ago=days_ago(i)), content=contents[i % 4]) for i in ids]
+
+    analyzer = SentimentAnalyzer(path)
+    engine = sentiment_analyzer._engine.get()
+    full_scan = db.iter_posts
+
+    def check(window_days=None, now=None):
+        now = now or datetime.now()
+        incremental = analyzer._refresh_aggregate("30318", window_days, now=now)
+        if window_days:
+            cutoff = (now - timedelta(days=window_days)).isoformat()
+            full = engine.aggregate(db.iter_posts_first_crawled("30318", cutoff, columns=ANALYZED_POST_COLUMNS))
+        else:
+            full = engine.aggregate(full_scan("30318", columns=ANALYZED_POST_COLUMNS))
+        assert incremental.to_analysis("30318", "2025-05-01") == full.to_analysis("30318", "2025-05-01")
+        return incremental
+
+    db.insert_posts(posts(range(40)))
+    check()
+    check(window_days=7)
+
+    # New posts and unchanged re-crawls are merged without re-reading every post
+    monkeypatch.setattr(db, "iter_posts", lambda *args, **kwargs: pytest.fail("full recompute"))
+    db.insert_posts(posts(range(40, 55), days_ago=lambda i: 0) + posts(range(10), days_ago=lambda i: 0))
+    assert check().post_count == 55
+    for days in (0, 3, 6):
+        check(window_days=7, now=datetime.now() + timedelta(days=days))
+
+    # Editing a counted post forces a recompute
+    monkeypatch.setattr(db, "iter_posts", full_scan)
+    db.insert_posts([dict(posts([5])[0], content="Terrible noisy dangerous street")])
+    check()
+    assert analyzer.analyze_neighborhood("30318", force_refresh=True) == analyzer._get_cached_analysis("30318")
+    assert analyzer.analyze_neighborhood("30318", window_days=3)["post_count"] < 55
@@ -0,0 +1,126 @@
+"""Unit tests for concurrent market data fetching in the pipeline coordinator."""
+import asyncio
+import time
+import pytest
+from src.pipeline.coordinator import PipelineCoordinator
+
+def stub_source(latency, median, fail=False):
+    """Create a market data source with an injected latency."""
+    calls = []
+    
+    async def fetch(zip_code):
+        calls.append(zip_code)
+        await asyncio.sleep(latency if not callable(latency) else latency(len(calls)))
+        if fail:
+            raise ConnectionError("source unavailable")
+        return {
+            'price_data': {'median': median, 'average': median},
+            'inventory_data': {'active': 10, 'dom': 30}
+        }
+    
+    fetch.calls = calls
+    return fetch
+
+@pytest.fixture
+def coordinator(mock_redis):
+    """Create coordinator with test configuration."""
+    return PipelineCoordinator({
+        'redis_config': {'testing': True},
+        'source_config': {'default_timeout': 1.0}
+    })
+
+def test_sources_fetched_concurrently(coordinator):
+    """Test cold fetch latency tracks the slowest source, not the sum."""
+    coordinator.sources = {
+        'redfin': stub_source(0.2, 500000),
+        'attom': stub_source(0.3, 400000)
+    }
+    
+    start = time.perf_counter()
+    market_data = asyncio.run(coordinator._get_market_data('90210'))
+    elapsed = time.perf_counter() - start
+    
+    assert elapsed < 0.45
+    assert market_data['sources'] == ['redfin', 'attom']
+    assert market_data['metrics']['price']['median_price'] == pytest.approx(460000)
+
+def test_slow_source_yields_partial_result(coordinator):
+    """Test a source exceeding its timeout is dropped from the merge."""
+    coordinator.source_timeouts = {'attom': 0.1}
+    coordinator.sources = {
+        'redfin': stub_source(0.05, 500000),
+        'attom': stub_source(5.0, 400000)
+    }
+    
+    start = time.perf_counter()
+    market_data = asyncio.run(coordinator._get_market_data('90210'))
+    
+    assert time.perf_counter() - start < 0.5
+    assert market_data['sources'] == ['redfin']
+    assert market_data['source_status']['attom']['status'] == 'timeout'
+    assert market_data['metrics']['price']['median_price'] == 500000
+
+def test_failed_source_yields_partial_result(coordinator):
+    """Test a failing source doesn't fail the analysis."""
+    coordinator.sources = {
+        'redfin': stub_source(0.01, 500000, fail=True),
+        'attom': stub_source(0.01, 400000)
+    }
+    
+    market_data = asyncio.run(coordinator._get_market_data('90210'))
+    
+    assert market_data['source_status']['redfin']['status'] == 'error'
+    assert market_data['metrics']['price']['median_price'] == 400000
+
+def test_hedged_request_beats_slow_primary(coordinator):
+    """Test a hedged duplicate request wins when the first one stalls."""
+    coordinator.hedge_after = {'attom': 0.05}
+    attom = stub_source(lambda n: 5.0 if n == 1 else 0.01, 400000)
+    coordinator.sources = {'redfin': stub_source(0.01, 500000), 'attom': attom}
+    
+    start = time.perf_counter()
+    market_data = asyncio.run(coordinator._get_market_data('90210'))
+    
+    assert time.perf_counter() - start < 0.5
+    assert len(attom.calls) == 2
+    assert market_data['source_status']['attom']['status'] == 'ok'
+
+def test_hedged_fetch_cancels_primary_on_timeout(coordinator):
+    """Test a source timing out before the hedge fires doesn't leave its request running."""
+    coordinator.hedge_after = {'attom': 1.0}
+    coordinator.source_timeouts = {'attom': 0.05}
+    cancelled = []
+    
+    async def attom(zip_code):
+        try:
+            await asyncio.sleep(5.0)
+        except asyncio.CancelledError:
+            cancelled.append(zip_code)
+            raise
+    
+    async def run():
+        market_data = await coordinator._get_market_data('90210')
+        await asyncio.sleep(0.01)
+        # Checked before asyncio.run cancels leftover tasks on shutdown
+        return market_data, list(cancelled)
+    
+    coordinator.sources = {'redfin': stub_source(0.01, 500000), 'attom': attom}
+    market_data, cancelled_in_loop = asyncio.run(run())
+    
+    assert market_data['source_status']['attom']['status'] == 'timeout'
+    assert cancelled_in_loop == ['90210']
+
+def test_redfin_requires_client_unless_mock_enabled(mock_redis):
+    """Test Redfin fails without a client and mock listings are opt-in and labelled."""
+    coordinator = PipelineCoordinator({'redis_config': {'testing': True}})
+    coordinator.sources['attom'] = stub_source(0.01, 400000)
+    market_data = asyncio.run(coordinator._get_market_data('90210'))
+    assert market_data['sources'] == ['attom']
+    assert market_data['source_status']['redfin']['status'] == 'error'
+    assert market_data['metrics']['price']['median_price'] == 400000
+    
+    mocked = PipelineCoordinator({'redis_config': {'testing': True}, 'source_config': {'mock_redfin': True}})
+    mocked.sources['attom'] = stub_source(0.01, 400000)
+    market_data = asyncio.run(mocked._get_market_data('90210'))
+    assert market_data['source_status']['redfin'].get('mock') is True
+    assert 'mock' not in market_data['source_status']['attom']
@@ -0,0 +1,66 @@
+"""Unit tests for the compiled query parser."""
+import pytest
+from src.inference.base_layer import InferenceLayer
+from src.inference.inference_layer_manager import InferenceLayerManager
+from src.inference.query_parser import QueryParser
+
+PROMPTS = [
+    "What is the current median price in 30318?",
+    "How has 30318 changed over the past 5 years?",
+    "Show me past performance and price history on Peachtree Street",
+    "What will prices be in the next 18 months?",
+    "Market outlook for ZIP code 30307 and 30308",
+    "Do you know anything about Moreland Ave?",
+    "Historical comparison of commercial rents, right now vs a decade ago",
+    "Rental demand this quarter",
+    "",
+]
+
+@pytest.fixture(scope="module")
+def layers():
+    """Create the manager's temporal layers."""
+    return InferenceLayerManager(analysis_cache_ttl=0).layers
+
+@pytest.mark.parametrize("query", PROMPTS)
+def test_relevance_matches_layers(layers, query):
+    """Test the compiled scan agrees with each layer's is_relevant_for_query."""
+    expected = tuple(name for name, layer in layers.items() if layer.is_relevant_for_query(query))
+    assert QueryParser(layers).parse(query).relevant_layers == expected
+
+def test_entities():
+    """Test ZIP codes, streets, time frames and investment type in one parse."""
+    parsed = QueryParser({}).parse(
+        "Compare 30318 and zip:30307 office space near Howell Mill Rd over the last 3 years and the next 2 years"
+    )
+    assert parsed.zip_codes == ("30318", "30307")
+    assert parsed.streets == ("Mill Rd",)
+    assert parsed.years_back == 3
+    assert parsed.months_ahead == 24
+    assert parsed.investment_type == "commercial"
+
+def test_overlapping_keywords_all_count():
+    """Test a keyword that is a prefix of a longer one still matches."""
+    parsed = QueryParser({}).parse("mixed-use lots")
+    assert parsed.investment_type == "mixed-use"
+
+def test_custom_relevance_is_respected(layers):
+    """Test layers overriding is_relevant_for_query are asked directly."""
+    class AlwaysLayer(InferenceLayer):
+        def process_query(self, query, context):
+            return {}
+
+        def get_capabilities(self):
+            return []
+
+        def is_relevant_for_query(self, query):
+            return True
+
+    parser = QueryParser({**layers, "always": AlwaysLayer("Always")})
+    assert "always" in parser.parse("How has 30318 changed over the past 5 years?").relevant_layers
+
+def test_repeated_queries_are_memoized(layers):
+    """Test repeat prompts are served from the memo."""
+    parser = QueryParser(layers)
+    first = parser.parse(PROMPTS[0])
+    assert parser.parse(PROMPTS[0]) is first
+    assert parser.cache_info().hits == 1
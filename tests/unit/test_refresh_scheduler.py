@@ -0,0 +1,245 @@
+"""Unit tests for the process-wide neighborhood refresh scheduler."""
+import asyncio
+import functools
+import json
+import threading
+from datetime import datetime, timedelta
+import pytest
+from src.advanced import refresh_agent
+from src.advanced.refresh_agent import SentimentRefreshAgent
+from src.data_management.neighborhood_cache import NeighborhoodCache
+from src.data_management.neighborhood_db import get_neighborhood_db
+from src.data_management.refresh_scheduler import (NEVER_REFRESHED_DAYS, RefreshScheduler, refresh_priority,
+                                                   staleness_days)
+
+@pytest.fixture
+def scheduler():
+    schedulers = []
+
+    def make(workers):
+        schedulers.append(RefreshScheduler(workers))
+        return schedulers[-1]
+
+    yield make
+    for s in schedulers:
+        s.stop()
+
+def test_staleness_and_priority():
+    """Test priority grows with both staleness and access count."""
+    now = datetime(2025, 6, 1)
+    assert staleness_days(None, now) == NEVER_REFRESHED_DAYS
+    assert staleness_days("2025-05-30T12:00:00", now) == 1.5
+    assert staleness_days("2025-06-02T00:00:00", now) == 0
+    assert refresh_priority(10, access_count=4) == 50
+    assert refresh_priority(20) < refresh_priority(10, access_count=2)
+
+def test_runs_highest_priority_first(scheduler):
+    """Test queued refreshes run by priority, and resubmitting raises a queued refresh's priority."""
+    sched = scheduler(1)
+    release = threading.Event()
+    order = []
+
+    async def refresh(neighborhood, city):
+        if neighborhood == "blocker":
+            await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        order.append(neighborhood)
+
+    first = sched.submit("blocker", None, refresh, 100)
+    futures = [sched.submit(name, None, refresh, priority)
+               for name, priority in [("low", 1), ("high", 30), ("mid", 10), ("later", 5)]]
+    assert sched.submit("later", None, refresh, 50) is futures[-1]
+    release.set()
+    for future in [first] + futures:
+        future.result(5)
+    assert order == ["blocker", "later", "high", "mid", "low"]
+
+def test_deduplicates_queued_and_in_flight_refreshes(scheduler):
+    """Test a neighborhood is refreshed once while queued or running, and again after it finishes."""
+    sched = scheduler(2)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    async def refresh(neighborhood, city):
+        calls.append(neighborhood)
+        started.set()
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        return {"neighborhood": neighborhood, "call": len(calls)}
+
+    first = sched.submit("30318", "Atlanta", refresh)
+    started.wait(5)
+    assert sched.submit("30318", "Atlanta", refresh) is first
+    release.set()
+    assert first.result(5) == {"neighborhood": "30318", "call": 1}
+    assert sched.submit("30318", "Atlanta", refresh).result(5)["call"] == 2
+    assert calls == ["30318", "30318"]
+    assert sched.metrics()["deduplicated"] == 1
+
+def test_bounds_concurrency_and_reports_metrics(scheduler):
+    """Test no more than `workers` refreshes run at once and failures are counted."""
+    sched = scheduler(2)
+    running = {"now": 0, "max": 0}
+
+    async def refresh(neighborhood, city):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.02)
+        running["now"] -= 1
+        if neighborhood == "bad":
+            raise ValueError("crawl failed")
+        return neighborhood
+
+    futures = [sched.submit(f"n{i}", None, refresh, i) for i in range(6)] + [sched.submit("bad", None, refresh)]
+    assert [future.result(5) for future in futures[:6]] == [f"n{i}" for i in range(6)]
+    with pytest.raises(ValueError):
+        futures[-1].result(5)
+
+    metrics = sched.metrics()
+    assert running["max"] == 2
+    assert metrics["queue_depth"] == 0 and metrics["in_flight"] == 0
+    assert 1 <= metrics["max_queue_depth"] <= 7
+    assert metrics["submitted"] == 7 and metrics["completed"] == 6 and metrics["failed"] == 1
+    assert metrics["latency"]["count"] == 7
+    assert 0.02 <= metrics["latency"]["p50"] <= metrics["latency"]["p95"] <= metrics["latency"]["max"]
+
+def test_stop_cancels_queued_refreshes(scheduler):
+    """Test stopping fails running refreshes, cancels queued ones and restarts on the next submit."""
+    sched = scheduler(1)
+    started = threading.Event()
+
+    async def hang(neighborhood, city):
+        started.set()
+        await asyncio.sleep(60)
+
+    async def refresh(neighborhood, city):
+        return neighborhood
+
+    running = sched.submit("running", None, hang)
+    queued = sched.submit("queued", None, refresh)
+    started.wait(5)
+    sched.stop()
+    with pytest.raises(RuntimeError):
+        running.result(5)
+    assert queued.cancelled()
+    assert sched.submit("queued", None, refresh).result(5) == "queued"
+
+def test_cache_queues_stale_entries_on_scheduler(tmp_path, scheduler, monkeypatch):
+    """Test the cache refreshes stale entries through the scheduler and tracks their status."""
+    path = str(tmp_path / "neighborhood.db")
+    db = get_neighborhood_db(path)
+    stale = (datetime.now() - timedelta(days=27)).isoformat()
+    db.put_cache_entry("30318", "Atlanta", json.dumps({"post_count": 1}), stale)
+    sched = scheduler(2)
+    cache = NeighborhoodCache(path, scheduler=sched)
+    release = threading.Event()
+
+    async def refresh_neighborhood_data(neighborhood, city=None):
+        assert db.get_cache_entry(neighborhood)[3] == "refreshing"
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        cache._cache_neighborhood_data(neighborhood, city, {"post_count": 2})
+        return {"post_count": 2}
+
+    monkeypatch.setattr(cache, "refresh_neighborhood_data", refresh_neighborhood_data)
+    # Reading a stale entry queues its refresh; a later submit shares it
+    assert cache.get_cached_data("30318")["cache_metadata"]["is_stale"]
+    future = sched.submit("30318", "Atlanta", cache._background_refresh)
+    release.set()
+    assert future.result(5) == {"post_count": 2}
+    assert sched.metrics()["completed"] == 1 and sched.metrics()["deduplicated"] == 1
+    assert cache.get_cached_data("30318")["cache_metadata"]["is_fresh"]
+
+def test_agent_refresh_batch_runs_on_scheduler(tmp_path, scheduler, monkeypatch):
+    """Test refresh_batch picks the stalest, most read neighborhoods and refreshes them concurrently."""
+    path = str(tmp_path / "neighborhood.db")
+    db = get_neighborhood_db(path)
+    now = datetime.now()
+    for name, days, reads in [("old", 40, 0), ("popular", 10, 9), ("fresh", 1, 0), ("never", None, 0)]:
+        db.put_cache_entry(name, "Atlanta", "{}", now.isoformat())
+        if days is not None:
+            db.mark_refreshed(name, "Atlanta", (now - timedelta(days=days)).isoformat())
+        for _ in range(reads):
+            db.record_access(name, "Atlanta", now.isoformat())
+    sched = scheduler(3)
+    agent = SentimentRefreshAgent(path, scheduler=sched)
+    assert agent.get_neighborhoods_to_refresh(3) == [("never", "Atlanta"), ("popular", "Atlanta"),
+                                                     ("old", "Atlanta")]
+
+    running = {"now": 0, "max": 0}
+
+    async def refresh_sentiment_for_zip(zip_code, city=None, force=False):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.05)
+        running["now"] -= 1
+        if zip_code == "old":
+            raise RuntimeError("crawl failed")
+        return {"refreshed": True, "neighborhood": zip_code, "city": city}
+
+    monkeypatch.setattr(agent, "refresh_sentiment_for_zip", refresh_sentiment_for_zip)
+    result = asyncio.run(agent.refresh_batch(limit=3))
+    assert result["refreshed"] == 2 and result["total"] == 3
+    assert [r["neighborhood"] for r in result["neighborhoods"]] == ["never", "popular", "old"]
+    assert result["neighborhoods"][2]["reason"] == "error"
+    assert running["max"] == 3
+
+def test_cache_miss_refreshes_once_on_scheduler(tmp_path, scheduler, monkeypatch):
+    """Test concurrent reads of an uncached neighborhood share one scheduled refresh, analyzed off the loop."""
+    path = str(tmp_path / "neighborhood.db")
+    sched = scheduler(2)
+    cache = NeighborhoodCache(path, scheduler=sched)
+    crawls = []
+    analysis_threads = []
+
+    async def crawl_neighborhood(neighborhood, city=None, force_refresh=False):
+        crawls.append(neighborhood)
+        await asyncio.sleep(0.05)
+        return [{"title": "post"}] * 3
+
+    def analyze_neighborhood(neighborhood, force_refresh=False):
+        analysis_threads.append(threading.current_thread().name)
+        return {"neighborhood": neighborhood, "overall_sentiment": {"score": 0.4}}
+
+    monkeypatch.setattr(cache.crawler, "crawl_neighborhood", crawl_neighborhood)
+    monkeypatch.setattr(cache.analyzer, "analyze_neighborhood", analyze_neighborhood)
+
+    async def read_twice():
+        return await asyncio.gather(cache.get_neighborhood_data("30318", "Atlanta"),
+                                    cache.get_neighborhood_data("30318", "Atlanta"))
+
+    first, second = asyncio.run(read_twice())
+    assert first["post_count"] == second["post_count"] == 3
+    assert crawls == ["30318"]
+    assert analysis_threads and analysis_threads[0].startswith("analysis")
+    assert sched.metrics()["submitted"] == 2 and sched.metrics()["deduplicated"] == 1
+    assert cache.get_cached_data("30318")["cache_metadata"]["is_fresh"]
+
+def test_refresh_for_zip_shares_queued_refresh(tmp_path, scheduler, monkeypatch):
+    """Test the module-level refresh goes through the scheduler and shares a refresh already running."""
+    path = str(tmp_path / "neighborhood.db")
+    sched = scheduler(2)
+    monkeypatch.setattr(refresh_agent, "SentimentRefreshAgent",
+                        functools.partial(SentimentRefreshAgent, path, scheduler=sched))
+    direct = []
+
+    async def refresh_sentiment_for_zip(self, zip_code, city=None, force=False):
+        direct.append(zip_code)
+        return {"refreshed": True, "neighborhood": zip_code, "city": city, "post_count": 1}
+
+    monkeypatch.setattr(SentimentRefreshAgent, "refresh_sentiment_for_zip", refresh_sentiment_for_zip)
+    started = threading.Event()
+    release = threading.Event()
+
+    async def cache_refresh(neighborhood, city):
+        started.set()
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        return {"neighborhood": neighborhood, "post_count": 7, "analysis": {}}
+
+    running = sched.submit("30318", "Atlanta", cache_refresh)
+    started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    result = asyncio.run(refresh_agent.refresh_sentiment_for_zip("30318", "Atlanta"))
+    assert running.result(5)["post_count"] == 7
+    assert result["refreshed"] and result["post_count"] == 7
+    assert asyncio.run(refresh_agent.refresh_sentiment_for_zip("30309"))["post_count"] == 1
+    assert direct == ["30309"]
+    assert sched.metrics()["deduplicated"] == 1
@@ -0,0 +1,80 @@
+"""Unit tests for REIC API request offload and backpressure."""
+import asyncio
+import os
+import threading
+import time
+import httpx
+import pytest
+from unittest.mock import patch
+from src.api import reic_api
+from src.utils.executor import BoundedExecutor
+from src.utils.export_cache import ExportCache
+
+BODY = {"prompt": "What is the current median price?", "zip_code": "30318"}
+
+async def post_all(bodies):
+    transport = httpx.ASGITransport(app=reic_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://reic") as client:
+        return await asyncio.gather(*(client.post("/conversation/query", json=b) for b in bodies))
+
+@pytest.fixture
+def slow_manager():
+    """Make process_query block until released."""
+    release = threading.Event()
+
+    def process_query(query, context=None):
+        release.wait(2)
+        return {"layer": "present", "query": query}
+
+    with patch.object(reic_api.inference_manager, "process_query", process_query):
+        yield release
+
+def test_full_executor_returns_429(slow_manager):
+    """Test requests beyond the executor cap get 429 with Retry-After."""
+    executor = BoundedExecutor(max_workers=1, max_pending=1, retry_after=5)
+
+    async def scenario():
+        first = asyncio.create_task(post_all([BODY]))
+        await asyncio.sleep(0.1)
+        [rejected] = await post_all([BODY])
+        slow_manager.set()
+        [accepted] = await first
+        return accepted, rejected
+
+    with patch.object(reic_api, "api_executor", executor):
+        accepted, rejected = asyncio.run(scenario())
+    assert accepted.status_code == 200
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "5"
+
+def test_slow_request_times_out(slow_manager):
+    """Test requests over REQUEST_TIMEOUT get 504."""
+    with patch.object(reic_api, "REQUEST_TIMEOUT", 0.05):
+        start = time.monotonic()
+        [response] = asyncio.run(post_all([BODY]))
+    slow_manager.set()
+    assert response.status_code == 504
+    assert time.monotonic() - start < 1
+
+def test_export_is_cached_with_etag(tmp_path):
+    """Test repeat exports reuse one file and honor If-None-Match."""
+    params = {"zip": "30318", "summary": "Strong rental demand", "market": 72.0}
+    cache = ExportCache(str(tmp_path))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=reic_api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://reic") as client:
+            first = await client.get("/export/csv", params=params)
+            second = await client.get("/export/csv", params=params)
+            revalidated = await client.get("/export/csv", params=params,
+                                           headers={"If-None-Match": first.headers["ETag"]})
+            return first, second, revalidated
+
+    with patch.object(reic_api, "export_cache", cache):
+        first, second, revalidated = asyncio.run(scenario())
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert revalidated.status_code == 304
+    assert cache.get_stats()["misses"] == 1
+    assert len(os.listdir(tmp_path)) == 1
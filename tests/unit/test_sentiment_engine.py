@@ -0,0 +1,114 @@
+"""Unit tests for the vectorized sentiment batch engine."""
+import random
+from src.analysis.sentiment_analyzer import (SentimentAnalyzer, POSITIVE_TERMS, NEGATIVE_TERMS, NEGATION_WORDS,
+                                             INTENSIFIERS, ASPECT_CATEGORIES, KEY_PHRASE_STOP_WORDS)
+from src.analysis.sentiment_engine import SentimentAggregate, SentimentBatchEngine
+
+GOLDEN_CORPUS = [
+    {"id": 1, "source": "reddit", "title": "Moving to Midtown?",
+     "content": "Great parks, friendly neighbors and walkable streets. Traffic is terrible though."},
+    {"id": 2, "source": "city-data", "title": "Safety in 30318",
+     "content": "It is not safe at night. Not dangerous during the day, but crime is up."},
+    {"id": 3, "source": "reddit", "title": "Rent",
+     "content": "Rent is not cheap, never affordable, hardly any parking, and the schools are good."},
+    {"id": 4, "source": "reddit", "title": None,
+     "content": "Very quiet, really clean, extremely peaceful. A very nice park and a lovely garden."},
+    {"id": 5, "source": "city-data", "title": "Numbers",
+     "content": "5 stars 10/10 a b c i x 2024 break-in near the bus stop (again)! [noisy] {loud}"},
+    {"id": 6, "source": "reddit", "title": "", "content": ""},
+    {"id": 7, "source": "reddit", "content": "the and of the and of in on at to"},
+    {"id": 8, "source": "reddit", "title": "Repeat repeat",
+     "content": "great park great park great park bad traffic bad traffic nobody likes it"},
+    {"id": 9, "source": "reddit", "title": "Café culture in São Paulo",
+     "content": "Diverse community, trendy cafés; no shops open late: nothing to do, nowhere to go."},
+    {"id": 10, "source": "city-data", "title": "Long one",
+     "content": " ".join(["commute"] * 3 + ["not", "bad", "at", "all"] + ["school"] * 12 + ["unsafe", "noisy"])},
+]
+
+def synthetic_corpus(n, seed=0):
+    rng = random.Random(seed)
+    vocabulary = (sorted(POSITIVE_TERMS) + sorted(NEGATIVE_TERMS) + sorted(NEGATION_WORDS) + sorted(INTENSIFIERS)
+                  + [t for terms in ASPECT_CATEGORIES.values() for t in terms]
+                  + sorted(KEY_PHRASE_STOP_WORDS) + ["house", "street", "42", "x", "I", "neighborhood", "zip,", "ok."])
+    return [{"id": i, "source": rng.choice(["reddit", "city-data"]),
+             "title": " ".join(rng.choices(vocabulary, k=rng.randint(0, 6))),
+             "content": " ".join(rng.choices(vocabulary, k=rng.randint(0, 80)))}
+            for i in range(n)]
+
+def test_batch_matches_analyze_post_on_golden_corpus():
+    """Test analyze_posts returns exactly what analyze_post does, post by post."""
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    expected = [analyzer.analyze_post(post) for post in GOLDEN_CORPUS]
+    assert list(analyzer.analyze_posts(GOLDEN_CORPUS, batch_size=3)) == expected
+
+def test_batch_matches_analyze_post_on_synthetic_corpus():
+    """Test lexicon-dense random posts score identically across batch boundaries."""
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    corpus = synthetic_corpus(400)
+    expected = [analyzer.analyze_post(post) for post in corpus]
+    assert list(analyzer.analyze_posts(corpus, batch_size=64)) == expected
+
+def test_golden_values():
+    """Test scores for a post without negations are unchanged from the original analyzer."""
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    result = next(analyzer.analyze_posts(GOLDEN_CORPUS[:1]))
+    assert result["sentiment"] == {"positive_score": 4 / 6, "negative_score": 2 / 6, "compound_score": 2 / 6,
+                                   "positive_count": 4, "negative_count": 2}
+    assert result["sentiment_label"] == "positive"
+    assert result["aspects"]["transportation"] == {"mentions": 2, "positive": 6, "negative": 4, "score": 0.2}
+    assert result["key_phrases"][:2] == ["moving to", "to midtown"]
+
+def test_negation_scope():
+    """Test a negation flips the next three tokens only."""
+    engine = SentimentBatchEngine(POSITIVE_TERMS, NEGATIVE_TERMS, NEGATION_WORDS, INTENSIFIERS,
+                                  ASPECT_CATEGORIES, KEY_PHRASE_STOP_WORDS)
+    near, far = engine.analyze_batch([{"content": "not really very safe"},
+                                      {"content": "not here or there safe"}])
+    assert near["sentiment"]["negative_count"] == 1
+    assert far["sentiment"]["positive_count"] == 1
+
+def test_vocab_reset_keeps_results():
+    """Test results are unchanged when the vocabulary is rebuilt between batches."""
+    engine = SentimentBatchEngine(POSITIVE_TERMS, NEGATIVE_TERMS, NEGATION_WORDS, INTENSIFIERS,
+                                  ASPECT_CATEGORIES, KEY_PHRASE_STOP_WORDS, max_vocab=20)
+    corpus = synthetic_corpus(50, seed=1)
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    assert list(engine.analyze(corpus, batch_size=5)) == [analyzer.analyze_post(post) for post in corpus]
+
+def without_date(analysis):
+    return {k: v for k, v in analysis.items() if k != "analysis_date"}
+
+def test_engine_aggregate_matches_per_post_aggregation():
+    """Test folding posts straight into an aggregate equals aggregating analyze_post results."""
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    engine = SentimentBatchEngine(POSITIVE_TERMS, NEGATIVE_TERMS, NEGATION_WORDS, INTENSIFIERS,
+                                  ASPECT_CATEGORIES, KEY_PHRASE_STOP_WORDS)
+    corpus = GOLDEN_CORPUS + synthetic_corpus(300, seed=2)
+    expected = analyzer._aggregate_analyses((analyzer.analyze_post(post) for post in corpus), "30318")
+    assert without_date(engine.aggregate(corpus, batch_size=37).to_analysis("30318")) == without_date(expected)
+
+def test_aggregate_merge_is_associative():
+    """Test merging shard aggregates in any grouping gives the single-pass result."""
+    engine = SentimentBatchEngine(POSITIVE_TERMS, NEGATIVE_TERMS, NEGATION_WORDS, INTENSIFIERS,
+                                  ASPECT_CATEGORIES, KEY_PHRASE_STOP_WORDS)
+    corpus = synthetic_corpus(301, seed=3)
+    whole = engine.aggregate(corpus).to_analysis("30318", "2025-05-01")
+    a, b, c = (engine.aggregate(corpus[i:j]) for i, j in ((0, 100), (100, 200), (200, None)))
+    left = engine.aggregate(corpus[:100]).merge(b).merge(c)
+    right = a.merge(engine.aggregate(corpus[100:200]).merge(engine.aggregate(corpus[200:])))
+    assert left.to_analysis("30318", "2025-05-01") == whole
+    assert right.to_analysis("30318", "2025-05-01") == whole
+
+def test_aggregate_subtract_and_state_round_trip():
+    """Test subtracting a subset's totals and restoring from stored state give the aggregate of the rest."""
+    engine = SentimentBatchEngine(POSITIVE_TERMS, NEGATIVE_TERMS, NEGATION_WORDS, INTENSIFIERS,
+                                  ASPECT_CATEGORIES, KEY_PHRASE_STOP_WORDS)
+    corpus = synthetic_corpus(300, seed=4)
+    rest = engine.aggregate(corpus[120:])
+    restored = SentimentAggregate.from_state(engine.aggregate(corpus).to_state())
+    restored.subtract(engine.aggregate(corpus[:120]))
+    assert restored.to_analysis("30318", "2025-05-01") == rest.to_analysis("30318", "2025-05-01")
+    assert restored.phrases == rest.phrases and restored.compound_sum == rest.compound_sum
+    # The analysis doesn't depend on the order posts were added in
+    assert engine.aggregate(corpus[::-1]).to_analysis("30318", "2025-05-01") == \
+        engine.aggregate(corpus).to_analysis("30318", "2025-05-01")
@@ -0,0 +1,100 @@
+"""Unit tests for the append-only usage log."""
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from src.utils.usage_log import UsageLog
+from src.utils.accounting import UsageAccounting
+from src.utils.tracker import UsageTracker
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def record_calls(log, n, start=datetime(2025, 5, 1, 9)):
+    for i in range(n):
+        log.record(timestamp=start + timedelta(hours=i), endpoint=["property_details", "tax"][i % 2],
+                   address=f"{i} Main St", success=i % 5 != 0, response_time=0.1 * (i % 7),
+                   cost=0.05 if i % 2 == 0 else 0.03, data_source=["attom", "redfin"][i % 3 == 0])
+
+def recompute(db_path):
+    """Full recompute of the aggregates from the stored rows."""
+    with sqlite3.connect(db_path) as conn:
+        df = pd.read_sql_query("SELECT * FROM api_usage", conn, parse_dates=["timestamp"])
+    return df
+
+def test_aggregates_match_full_recompute(tmp_path):
+    """Test incremental aggregates equal a recompute from disk."""
+    log = UsageLog(tmp_path / "usage.db", batch_size=16)
+    record_calls(log, 100)
+    log.close()
+
+    df = recompute(tmp_path / "usage.db")
+    assert len(df) == 100
+    stats = {s["endpoint"]: s for s in log.endpoint_stats()}
+    for endpoint, group in df.groupby("endpoint"):
+        assert stats[endpoint]["total_calls"] == len(group)
+        assert stats[endpoint]["success_rate"] == pytest.approx(group["success"].mean())
+        assert stats[endpoint]["avg_cost"] == pytest.approx(group["cost"].mean())
+        assert stats[endpoint]["avg_response_time"] == pytest.approx(group["response_time"].mean())
+    for day, group in df.groupby(df["timestamp"].dt.date):
+        summary = log.daily_summary(day)
+        assert summary["total_requests"] == len(group)
+        assert summary["total_cost"] == pytest.approx(group["cost"].sum())
+
+def test_aggregates_reload_from_disk(tmp_path):
+    """Test a reopened log starts from the stored totals."""
+    log = UsageLog(tmp_path / "usage.db")
+    record_calls(log, 50)
+    log.close()
+
+    reopened = UsageLog(tmp_path / "usage.db")
+    assert reopened.totals() == pytest.approx(log.totals())
+    assert dict(reopened.data_sources) == dict(log.data_sources)
+    reopened.close()
+
+def test_concurrent_records_are_all_flushed(tmp_path):
+    """Test calls recorded from many threads all reach disk."""
+    log = UsageLog(tmp_path / "usage.db", batch_size=50)
+    threads = [threading.Thread(target=record_calls, args=(log, 200)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    log.close()
+    assert len(recompute(tmp_path / "usage.db")) == 1600
+    assert log.totals()["total_requests"] == 1600
+
+def test_buffered_records_are_flushed_at_exit(tmp_path):
+    """Test calls still buffered when the process exits reach disk."""
+    script = ("import sys; from datetime import datetime; from src.utils.usage_log import UsageLog; "
+              "log = UsageLog(sys.argv[1], batch_size=1000, flush_interval=60); "
+              "[log.record(datetime(2025, 5, 1), 'tax', 'Main St', True, 0.1, 0.03, 'attom') for _ in range(5)]")
+    subprocess.run([sys.executable, "-c", script, str(tmp_path / "usage.db")], cwd=PROJECT_ROOT, check=True)
+    assert len(recompute(tmp_path / "usage.db")) == 5
+
+def test_excel_export(tmp_path):
+    """Test the finance workbook has all three sheets."""
+    pytest.importorskip("openpyxl")
+    log = UsageLog(tmp_path / "usage.db")
+    record_calls(log, 30)
+    path = log.export_excel(tmp_path / "usage.xlsx")
+    sheets = pd.read_excel(path, sheet_name=None)
+    log.close()
+    assert set(sheets) == {"api_usage", "daily_summary", "endpoint_stats"}
+    assert len(sheets["api_usage"]) == 30
+    assert sheets["daily_summary"]["total_requests"].sum() == 30
+
+def test_tracker_stats_from_log(tmp_path):
+    """Test UsageTracker reports stats without touching Excel."""
+    tracker = UsageTracker(data_dir=tmp_path, accounting=UsageAccounting(None))
+    tracker.track_api_call("1 Main St", "property_details", True, "attom")
+    tracker.track_api_call("1 Main St", "tax", False, "redfin")
+    tracker.complete_tracking("1 Main St", True)
+    stats = tracker.get_stats()
+    tracker.close()
+    assert stats["daily"] == {"requests": 2, "success_rate": "50.0%", "cost": "$0.08"}
+    assert {s["endpoint"] for s in stats["endpoints"]} == {"property_details", "tax"}
+    assert not (tmp_path / "usage_tracking.xlsx").exists()
@@ -0,0 +1,69 @@
+"""Unit tests for the Zillow dataset store."""
+import math
+import pytest
+from unittest.mock import patch
+from src.modules import zillow_store
+from src.modules.zillow_store import get_dataset, clear_datasets
+
+CSV = (
+    "RegionID,SizeRank,RegionName,RegionType,StateName,2024-01-31,2024-02-29,2024-03-31\n"
+    "1,0,Atlanta,msa,GA,100,,120\n"
+    "2,1,Chicago,msa,IL,200,210,\n"
+    "3,2,atlanta,msa,GA,999,999,999\n"
+)
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """Write a small Zillow-style CSV."""
+    clear_datasets()
+    path = tmp_path / "Metro_test.csv"
+    path.write_text(CSV)
+    yield str(path)
+    clear_datasets()
+
+def test_lookup_is_case_insensitive(csv_path):
+    """Test region lookup and month column detection."""
+    store = get_dataset(csv_path)
+    assert store.columns == ["2024-01-31", "2024-02-29", "2024-03-31"]
+    assert "ATLANTA" in store
+    assert "Boston" not in store
+    assert store.row("boston") is None
+    # First row wins for duplicate names
+    assert store.series("Atlanta").tolist() == [100.0, 120.0]
+
+def test_latest_and_series(csv_path):
+    """Test latest value and trailing-month series."""
+    store = get_dataset(csv_path)
+    assert store.latest("atlanta") == 120.0
+    assert math.isnan(store.latest("chicago"))
+    assert store.series("chicago", months=1).tolist() == [210.0]
+
+def test_dataset_is_shared(csv_path):
+    """Test the CSV is parsed once per process."""
+    assert get_dataset(csv_path) is get_dataset(csv_path)
+
+def test_reload_on_change(csv_path):
+    """Test a modified CSV is reparsed."""
+    store = get_dataset(csv_path)
+    with open(csv_path, "a") as f:
+        f.write("4,3,Boston,msa,MA,1,2,3\n")
+    assert get_dataset(csv_path) is not store
+    assert "boston" in get_dataset(csv_path)
+
+def test_binary_cache(csv_path, tmp_path):
+    """Test a fresh process loads from the memory-mapped cache without parsing."""
+    cache_dir = str(tmp_path / "cache")
+    original = get_dataset(csv_path, cache_dir=cache_dir)
+    clear_datasets()
+
+    with patch.object(zillow_store.pd, "read_csv", side_effect=AssertionError("parsed")):
+        cached = get_dataset(csv_path, cache_dir=cache_dir)
+
+    assert cached is not original
+    assert cached.regions == original.regions
+    assert cached.series("atlanta").tolist() == [100.0, 120.0]
+
+def test_missing_file(tmp_path):
+    """Test a missing CSV raises."""
+    with pytest.raises(FileNotFoundError):
+        get_dataset(str(tmp_path / "missing.csv"))
@@ -4,27 +4,42 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from src.cache.codec import PayloadCodec
+
+CACHE_EXTENSION = '.bin'
+LEGACY_EXTENSION = '.json'
+
 class RedfinCacheManager:
-    def __init__(self, cache_dir: str = 'data/redfin_cache'):
+    def __init__(self, cache_dir: str = 'data/redfin_cache', codec: Optional[PayloadCodec] = None):
         """Initialize the cache manager"""
         self.cache_dir = cache_dir
         self.cache_duration = timedelta(hours=12)  # Cache data for 12 hours
+        self.codec = codec or PayloadCodec()
         os.makedirs(cache_dir, exist_ok=True)
         
     def _get_cache_file(self, zip_code: str) -> str:
         """Get cache file path for a ZIP code"""
-        return os.path.join(self.cache_dir, f"{zip_code}.json")
+        return os.path.join(self.cache_dir, f"{zip_code}{CACHE_EXTENSION}")
+        
+    def _read_cache_file(self, cache_file: str) -> Dict:
+        """Read a codec-encoded or legacy JSON cache file"""
+        if cache_file.endswith(LEGACY_EXTENSION):
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+        with open(cache_file, 'rb') as f:
+            return self.codec.decode(f.read())
         
     def get_cached_data(self, zip_code: str) -> Optional[List[Dict]]:
         """Get cached property data if available and not expired"""
         cache_file = self._get_cache_file(zip_code)
         
         if not os.path.exists(cache_file):
-            return None
+            cache_file = os.path.join(self.cache_dir, f"{zip_code}{LEGACY_EXTENSION}")
+            if not os.path.exists(cache_file):
+                return None
             
         try:
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
+            cache_data = self._read_cache_file(cache_file)
                 
             # Check if cache is expired
             cache_time = datetime.fromisoformat(cache_data['timestamp'])
@@ -47,8 +62,8 @@ class RedfinCacheManager:
                 'properties': properties
             }
             
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            with open(cache_file, 'wb') as f:
+                f.write(self.codec.encode(cache_data))
                 
         except Exception as e:
             print(f"Error saving to cache: {str(e)}")
@@ -56,12 +71,13 @@ class RedfinCacheManager:
     def clear_cache(self, zip_code: Optional[str] = None):
         """Clear cache for specific ZIP code or all cache"""
         if zip_code:
-            cache_file = self._get_cache_file(zip_code)
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+            for ext in (CACHE_EXTENSION, LEGACY_EXTENSION):
+                cache_file = os.path.join(self.cache_dir, f"{zip_code}{ext}")
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
         else:
             for file in os.listdir(self.cache_dir):
-                if file.endswith('.json'):
+                if file.endswith((CACHE_EXTENSION, LEGACY_EXTENSION)):
                     os.remove(os.path.join(self.cache_dir, file))
                     
     def get_cache_stats(self) -> Dict:
@@ -74,10 +90,9 @@ class RedfinCacheManager:
         }
         
         for file in os.listdir(self.cache_dir):
-            if file.endswith('.json'):
+            if file.endswith((CACHE_EXTENSION, LEGACY_EXTENSION)):
                 try:
-                    with open(os.path.join(self.cache_dir, file), 'r') as f:
-                        cache_data = json.load(f)
+                    cache_data = self._read_cache_file(os.path.join(self.cache_dir, file))
                         
                     stats['total_cached_zips'] += 1
                     stats['total_properties'] += len(cache_data['properties'])